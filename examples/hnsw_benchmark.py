@@ -0,0 +1,89 @@
+#!/usr/bin/env python3
+"""
+HNSW 재현율 / 지연 시간 벤치마크
+합성 계층 데이터 (포인카레 공의 무작위 트리) 에서 ef 별 recall@10 과 쿼리 지연 시간 (p50 / p99) 측정
+
+    python examples/hnsw_benchmark.py --n 200000 --dim 16 --ef 16 32 64 128 256
+"""
+
+import argparse
+import time
+import torch
+import reality_stone as rs
+from reality_stone.index import HNSWIndex
+
+
+def hierarchical_points(n, dim, c=1.0, branching=8, step=0.8, spread=0.6, seed=0):
+    """원점을 뿌리로 하는 무작위 트리의 노드 n 개
+
+    접공간에서 자식 = 부모 + step·(부모 방향 + spread·무작위 방향) 으로 깊이마다 바깥으로 뻗어
+    부분 트리가 원뿔 모양으로 모이고, expmap0 으로 포인카레 공에 올린다. 깊은 노드일수록 경계 가까이 몰린다.
+    """
+    g = torch.Generator().manual_seed(seed)
+    tangent = [torch.zeros(1, dim, dtype=torch.float64)]
+    total = 1
+    while total < n:
+        parents = tangent[-1].repeat_interleave(branching, dim=0)
+        heading = parents / parents.norm(dim=1, keepdim=True).clamp_min(1e-15)
+        direction = heading + spread * torch.randn(parents.shape, generator=g, dtype=torch.float64)
+        direction = direction / direction.norm(dim=1, keepdim=True)
+        tangent.append(parents + step * direction)
+        total += parents.size(0)
+    v = torch.cat(tangent)[:n]
+    v = v[torch.randperm(n, generator=g)]
+    norm = v.norm(dim=1, keepdim=True).clamp_min(1e-15)
+    sqrt_c = c ** 0.5
+    # float32 에서 경계를 넘지 않도록 반지름을 잘라 둔다
+    radius = torch.tanh(sqrt_c * norm).clamp_max(1 - 1e-5) / sqrt_c
+    return (v / norm * radius).float()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="HNSW recall@k vs latency on synthetic hierarchical data")
+    parser.add_argument("--n", type=int, default=100000)
+    parser.add_argument("--dim", type=int, default=16)
+    parser.add_argument("--queries", type=int, default=1000)
+    parser.add_argument("--k", type=int, default=10)
+    parser.add_argument("--c", type=float, default=1.0)
+    parser.add_argument("--M", type=int, default=16)
+    parser.add_argument("--ef-construction", type=int, default=200)
+    parser.add_argument("--ef", type=int, nargs="+", default=[16, 32, 64, 128, 256])
+    parser.add_argument("--threads", type=int, default=0, help="torch.set_num_threads (0 = default)")
+    args = parser.parse_args()
+    if args.threads > 0:
+        torch.set_num_threads(args.threads)
+
+    data = hierarchical_points(args.n + args.queries, args.dim, args.c)
+    points, queries = data[:args.n], data[args.n:]
+
+    start = time.perf_counter()
+    index = HNSWIndex(args.dim, c=args.c, M=args.M, ef_construction=args.ef_construction)
+    index.add(points)
+    build = time.perf_counter() - start
+    print(f"build: {args.n} points, dim {args.dim}, {torch.get_num_threads()} threads -> {build:.2f}s "
+          f"({args.n / build:.0f} inserts/s)")
+
+    start = time.perf_counter()
+    _, truth = rs.cdist(queries.double(), points.double(), c=args.c, k=args.k)
+    print(f"ground truth (rs.cdist top-k): {time.perf_counter() - start:.2f}s")
+
+    print(f"{'ef':>6} {'recall@' + str(args.k):>10} {'batch qps':>10} {'p50 ms':>8} {'p99 ms':>8}")
+    for ef in args.ef:
+        start = time.perf_counter()
+        _, found = index.search(queries, args.k, ef=ef)
+        qps = args.queries / (time.perf_counter() - start)
+        hits = sum(len(set(a.tolist()) & set(b.tolist())) for a, b in zip(found, truth))
+        recall = hits / truth.numel()
+
+        latencies = []
+        for q in queries:
+            t = time.perf_counter()
+            index.search(q, args.k, ef=ef)
+            latencies.append((time.perf_counter() - t) * 1e3)
+        latencies = torch.tensor(latencies)
+        p50, p99 = torch.quantile(latencies, torch.tensor([0.5, 0.99])).tolist()
+        print(f"{ef:>6} {recall:>10.4f} {qps:>10.0f} {p50:>8.3f} {p99:>8.3f}")
+
+
+if __name__ == "__main__":
+    main()
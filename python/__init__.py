@@ -1,66 +1,31 @@
+import importlib
+
 import torch
 import numpy as np
 from torch.autograd import Function
 
-from ._C import (
-    poincare_ball_forward_cpu, poincare_ball_backward_cpu,
-    lorentz_forward_cpu, lorentz_backward_cpu,
-    klein_forward_cpu, klein_backward_cpu,
-    mobius_add_cpu, mobius_scalar_cpu,
-    poincare_to_lorentz_cpu, lorentz_to_poincare_cpu,
-    poincare_to_klein_cpu, klein_to_poincare_cpu,
-    lorentz_to_klein_cpu, klein_to_lorentz_cpu,
-    chebyshev_approximation_cpu,
-    chebyshev_distance_cpu,
-    hyperbolic_laplacian_cpu,
-    heat_kernel_cpu,
-    hyperbolic_fft_cpu,
-    inverse_hyperbolic_fft_cpu,
-    spherical_harmonics_cpu,
-)
-
-_has_cuda = False
-if torch.cuda.is_available():
-    try:
-        from ._C import (
-            poincare_ball_forward_cuda, poincare_ball_backward_cuda,
-            lorentz_forward_cuda, lorentz_backward_cuda,
-            klein_forward_cuda, klein_backward_cuda,
-            mobius_add_cuda, mobius_scalar_cuda,
-            poincare_to_lorentz_cuda, lorentz_to_poincare_cuda,
-            poincare_to_klein_cuda, klein_to_poincare_cuda,
-            lorentz_to_klein_cuda, klein_to_lorentz_cuda,
-            chebyshev_approximation_cuda,
-            chebyshev_distance_cuda,
-            hyperbolic_laplacian_cuda,
-            heat_kernel_cuda,
-            hyperbolic_fft_cuda,
-            inverse_hyperbolic_fft_cuda,
-            spherical_harmonics_cuda,
-        )
-        _has_cuda = True
-    except ImportError as e:
-        _has_cuda = False
-        print(f"⚠️ Reality Stone: CUDA features not available: {e}")
+from . import library as _library
+
+def __getattr__(name):
+    """reality_stone._C 와 <name>_cpu / <name>_cuda 커널 심볼을 처음 조회할 때 불러온다"""
+    if name == "_C":
+        return importlib.import_module("._C", __name__)
+    if name.endswith(("_cpu", "_cuda")) and hasattr(_library.extension, name):
+        return getattr(_library.extension, name)
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
 
 class PoincareBall(Function):
     @staticmethod
     def forward(ctx, u, v, c, t):
         ctx.save_for_backward(u, v)
         ctx.c, ctx.t = c, t
-        if u.is_cuda and _has_cuda:
-            return poincare_ball_forward_cuda(u, v, c, t)
-        else:
-            return poincare_ball_forward_cpu(u, v, c, t)
+        return _library.kernel("poincare_ball_forward", u.device)(u, v, c, t)
 
     @staticmethod
     def backward(ctx, grad_output):
         u, v = ctx.saved_tensors
         c, t = ctx.c, ctx.t
-        if u.is_cuda and _has_cuda:
-            grad_u, grad_v = poincare_ball_backward_cuda(grad_output, u, v, c, t)
-        else:
-            grad_u, grad_v = poincare_ball_backward_cpu(grad_output, u, v, c, t)
+        grad_u, grad_v = _library.kernel("poincare_ball_backward", u.device)(grad_output, u, v, c, t)
         return grad_u, grad_v, None, None
 
 class LorentzModel(Function):
@@ -68,19 +33,13 @@ class LorentzModel(Function):
     def forward(ctx, u, v, c, t):
         ctx.save_for_backward(u, v)
         ctx.c, ctx.t = c, t
-        if u.is_cuda and _has_cuda:
-            return lorentz_forward_cuda(u, v, c, t)
-        else:
-            return lorentz_forward_cpu(u, v, c, t)
+        return _library.kernel("lorentz_forward", u.device)(u, v, c, t)
 
     @staticmethod
     def backward(ctx, grad_output):
         u, v = ctx.saved_tensors
         c, t = ctx.c, ctx.t
-        if u.is_cuda and _has_cuda:
-            grad_u, grad_v = lorentz_backward_cuda(grad_output, u, v, c, t)
-        else:
-            grad_u, grad_v = lorentz_backward_cpu(grad_output, u, v, c, t)
+        grad_u, grad_v = _library.kernel("lorentz_backward", u.device)(grad_output, u, v, c, t)
         return grad_u, grad_v, None, None
 
 class KleinModel(Function):
@@ -88,97 +47,273 @@ class KleinModel(Function):
     def forward(ctx, u, v, c, t):
         ctx.save_for_backward(u, v)
         ctx.c, ctx.t = c, t
-        if u.is_cuda and _has_cuda:
-            return klein_forward_cuda(u, v, c, t)
-        else:
-            return klein_forward_cpu(u, v, c, t)
+        return _library.kernel("klein_forward", u.device)(u, v, c, t)
 
     @staticmethod
     def backward(ctx, grad_output):
         u, v = ctx.saved_tensors
         c, t = ctx.c, ctx.t
-        if u.is_cuda and _has_cuda:
-            grad_u, grad_v = klein_backward_cuda(grad_output, u, v, c, t)
-        else:
-            grad_u, grad_v = klein_backward_cpu(grad_output, u, v, c, t)
+        grad_u, grad_v = _library.kernel("klein_backward", u.device)(grad_output, u, v, c, t)
         return grad_u, grad_v, None, None
 
 def poincare_ball_layer(u, v, c, t):
+    if _library.enabled():
+        return _library.call("poincare_ball_forward", u, v, c, t)
     return PoincareBall.apply(u, v, c, t)
 
 def lorentz_layer(u, v, c, t):
+    if _library.enabled():
+        return _library.call("lorentz_forward", u, v, c, t)
     return LorentzModel.apply(u, v, c, t)
 
 def klein_layer(u, v, c, t):
+    if _library.enabled():
+        return _library.call("klein_forward", u, v, c, t)
     return KleinModel.apply(u, v, c, t)
 
-def poincare_to_lorentz(x, c):
-    fn = poincare_to_lorentz_cuda if (x.is_cuda and _has_cuda) else poincare_to_lorentz_cpu
-    return fn(x, c)
+def _run_op(name, x, *args, out=None):
+    """CPU/CUDA 커널 선택 후 실행, out 이 주어지면 그 버퍼에 결과 기록
+
+    out 이 없으면 reality_stone::<name> custom op 로 호출해 torch.compile 이 그래프를 끊지 않는다.
+    CPU 는 `<name>_out_cpu` 커널이 out 에 직접 쓰고 (중간 텐서 없음),
+    CUDA 는 결과를 out 으로 복사한다.
+    """
+    if out is None:
+        return _library.call(name, x, *args)
+    if x.is_cuda:
+        return out.copy_(_library.kernel(name, x.device)(x, *args))
+    return _library.kernel(f"{name}_out", x.device)(x, *args, out)
+
+def poincare_to_lorentz(x, c, out=None):
+    return _run_op("poincare_to_lorentz", x, c, out=out)
+
+def lorentz_to_poincare(x, c, out=None):
+    return _run_op("lorentz_to_poincare", x, c, out=out)
+
+def poincare_to_klein(x, c, out=None):
+    return _run_op("poincare_to_klein", x, c, out=out)
+
+def klein_to_poincare(x, c, out=None):
+    return _run_op("klein_to_poincare", x, c, out=out)
+
+def lorentz_to_klein(x, c, out=None):
+    return _run_op("lorentz_to_klein", x, c, out=out)
+
+def klein_to_lorentz(x, c, out=None):
+    return _run_op("klein_to_lorentz", x, c, out=out)
+
+def _curvature_column(c, x):
+    """배치별 곡률 [B] / [B,1] 을 브로드캐스트용 [B,1] 로"""
+    return c.reshape(-1, 1).to(x.dtype)
+
+def _mobius_add_broadcast(x, y, c):
+    """곡률 텐서용 u ⊕_c v 텐서 연산 경로 (CUDA 커널이 float c 만 받는 경우)"""
+    c = _curvature_column(c, x)
+    x2 = (x * x).sum(dim=1, keepdim=True)
+    y2 = (y * y).sum(dim=1, keepdim=True)
+    xy = (x * y).sum(dim=1, keepdim=True)
+    denom = (1 + 2 * c * xy + c * c * x2 * y2).clamp_min(1e-5)
+    return ((1 + 2 * c * xy + c * y2) * x + (1 - c * x2) * y) / denom
+
+def _mobius_scalar_broadcast(x, c, r):
+    """곡률 텐서용 r ⊗_c x 텐서 연산 경로"""
+    sqrtc = torch.sqrt(_curvature_column(c, x))
+    norm = x.norm(dim=1, keepdim=True).clamp_min(1e-6)
+    scn = (sqrtc * norm).clamp(1e-6, 1.0 - 1e-5)
+    return torch.tanh(r * torch.atanh(scn)) / (sqrtc * norm) * x
+
+def mobius_add(x, y, c, out=None):
+    """u ⊕_c v, c 는 float 또는 배치별 곡률 텐서 [B] / [B,1]"""
+    if torch.is_tensor(c) and x.is_cuda:
+        result = _mobius_add_broadcast(x, y, c)
+        return result if out is None else out.copy_(result)
+    if torch.is_tensor(c) and out is None:
+        return _library.call("mobius_add_batched", x, y, c)
+    return _run_op("mobius_add", x, y, c, out=out)
+
+def mobius_scalar(x, r, c, out=None):
+    """r ⊗_c x, c 는 float 또는 배치별 곡률 텐서 [B] / [B,1]
+
+    인자 순서는 기존 API 의 (x, r, c) 를 유지한다 (커널은 (x, c, r) 순서).
+    """
+    if torch.is_tensor(c) and x.is_cuda:
+        result = _mobius_scalar_broadcast(x, c, r)
+        return result if out is None else out.copy_(result)
+    if torch.is_tensor(c) and out is None:
+        return _library.call("mobius_scalar_batched", x, c, r)
+    return _run_op("mobius_scalar", x, c, r, out=out)
+
+def lorentz_add(x, y, c, out=None):
+    return _run_op("lorentz_add", x, y, c, out=out)
 
-def lorentz_to_poincare(x, c):
-    fn = lorentz_to_poincare_cuda if (x.is_cuda and _has_cuda) else lorentz_to_poincare_cpu
-    return fn(x, c)
+def lorentz_scalar(x, c, r, out=None):
+    return _run_op("lorentz_scalar", x, c, r, out=out)
 
-def poincare_to_klein(x, c):
-    fn = poincare_to_klein_cuda if (x.is_cuda and _has_cuda) else poincare_to_klein_cpu
-    return fn(x, c)
+def lorentz_inner(x, y, out=None):
+    return _run_op("lorentz_inner", x, y, out=out)
 
-def klein_to_poincare(x, c):
-    fn = klein_to_poincare_cuda if (x.is_cuda and _has_cuda) else klein_to_poincare_cpu
-    return fn(x, c)
+def lorentz_distance(x, y, c, out=None):
+    return _run_op("lorentz_distance", x, y, c, out=out)
 
-def lorentz_to_klein(x, c):
-    fn = lorentz_to_klein_cuda if (x.is_cuda and _has_cuda) else lorentz_to_klein_cpu
-    return fn(x, c)
+def klein_add(x, y, c, out=None):
+    return _run_op("klein_add", x, y, c, out=out)
 
-def klein_to_lorentz(x, c):
-    fn = klein_to_lorentz_cuda if (x.is_cuda and _has_cuda) else klein_to_lorentz_cpu
-    return fn(x, c)
+def klein_scalar(x, c, r, out=None):
+    return _run_op("klein_scalar", x, c, r, out=out)
 
-def mobius_add(x, y, c):
-    fn = mobius_add_cuda if (x.is_cuda and _has_cuda) else mobius_add_cpu
-    return fn(x, y, c)
+def klein_distance(x, y, c, out=None):
+    return _run_op("klein_distance", x, y, c, out=out)
 
-def mobius_scalar(x, r, c):
-    fn = mobius_scalar_cuda if (x.is_cuda and _has_cuda) else mobius_scalar_cpu
-    return fn(x, r, c)
+# in-place 변형: 결과를 첫 번째 인자에 기록
+def poincare_to_klein_(x, c):
+    return poincare_to_klein(x, c, out=x)
+
+def klein_to_poincare_(x, c):
+    return klein_to_poincare(x, c, out=x)
+
+def mobius_add_(x, y, c):
+    return mobius_add(x, y, c, out=x)
+
+def mobius_scalar_(x, r, c):
+    return mobius_scalar(x, r, c, out=x)
+
+def lorentz_add_(x, y, c):
+    return lorentz_add(x, y, c, out=x)
+
+def lorentz_scalar_(x, c, r):
+    return lorentz_scalar(x, c, r, out=x)
+
+def klein_add_(x, y, c):
+    return klein_add(x, y, c, out=x)
+
+def klein_scalar_(x, c, r):
+    return klein_scalar(x, c, r, out=x)
 
 def chebyshev_approximation(x, order=15, curvature=1.0):
-    fn = chebyshev_approximation_cuda if (x.is_cuda and _has_cuda) else chebyshev_approximation_cpu
-    return fn(x, order, curvature)
+    return _library.call("chebyshev_approximation", x, order, curvature)
 
 def chebyshev_distance(x, y, curvature=1.0):
-    fn = chebyshev_distance_cuda if (x.is_cuda and _has_cuda) else chebyshev_distance_cpu
-    return fn(x, y, curvature)
+    return _library.call("chebyshev_distance", x, y, curvature)
 
 def hyperbolic_laplacian(f, curvature=1.0):
-    fn = hyperbolic_laplacian_cuda if (f.is_cuda and _has_cuda) else hyperbolic_laplacian_cpu
-    return fn(f, curvature)
+    return _library.call("hyperbolic_laplacian", f, curvature)
+
+def _heat_kernel_torch(x, times, curvature):
+    """여러 시각 [T] 의 열 커널 텐서 연산 경로 -> [T, ...]"""
+    t = times.to(x).reshape((-1,) + (1,) * x.dim())
+    norm_sq = (x * x).sum(dim=-1, keepdim=True)
+    log_factor = -norm_sq / (4 * t) - curvature * t - 0.5 * x.size(-1) * torch.log(4 * np.pi * t)
+    return x * torch.exp(log_factor)
 
 def heat_kernel(x, t, curvature=1.0):
-    fn = heat_kernel_cuda if (x.is_cuda and _has_cuda) else heat_kernel_cpu
-    return fn(x, t, curvature)
+    """열 커널. t 가 시각 텐서 [T] 이면 모든 시각을 한 번에 [T, ...] 로 반환"""
+    if torch.is_tensor(t) or isinstance(t, (list, tuple)):
+        times = torch.as_tensor(t, dtype=torch.float64)
+        if x.is_cuda:
+            return _heat_kernel_torch(x, times.to(x.device), curvature)
+        return _library.call("heat_kernel_times", x, times, curvature)
+    return _library.call("heat_kernel", x, t, curvature)
 
-def hyperbolic_fft(x, curvature=1.0):
-    fn = hyperbolic_fft_cuda if (x.is_cuda and _has_cuda) else hyperbolic_fft_cpu
-    return fn(x, curvature)
+def hyperbolic_fft(x, curvature=1.0, max_l=20):
+    """구면 조화 계수 [B, (max_l+1)²] (CUDA 커널은 max_l=20 고정)"""
+    if x.is_cuda:
+        return _library.kernel("hyperbolic_fft", x.device)(x, curvature)
+    return _library.call("hyperbolic_fft", x, curvature, max_l)
 
 def inverse_hyperbolic_fft(coeffs, curvature=1.0):
-    fn = inverse_hyperbolic_fft_cuda if (coeffs.is_cuda and _has_cuda) else inverse_hyperbolic_fft_cpu
-    return fn(coeffs, curvature)
+    return _library.call("inverse_hyperbolic_fft", coeffs, curvature)
 
 def spherical_harmonics(theta_phi, l_max=10):
-    fn = spherical_harmonics_cuda if (theta_phi.is_cuda and _has_cuda) else spherical_harmonics_cpu
-    return fn(theta_phi, l_max)
+    return _library.call("spherical_harmonics", theta_phi, l_max)
+
+def _cdist_exact_excess(x, y, model, c):
+    """행 쌍 (x[p], y[p]) 의 z = A - 1 을 좌표 차 d = y - x 로 계산 (C++ exact_excess 와 같은 뺄셈 없는 식)"""
+    d = y - x
+    dd = d.pow(2).sum(-1)
+    if model == "lorentz":
+        return (0.5 * c * (dd - 2 * d[:, 0].pow(2))).clamp_min(0)
+    xx = x.pow(2).sum(-1)
+    xd = (x * d).sum(-1)
+    x_conf = (1 - c * xx).clamp_min(1e-6)
+    y_conf = (1 - c * (xx + 2 * xd + dd)).clamp_min(1e-6)
+    if model == "poincare":
+        return 2 * c * dd / (x_conf * y_conf)
+    sinh_sq = c * (dd * x_conf + c * xd.pow(2)) / (x_conf * y_conf)
+    return sinh_sq / (1 + (1 + sinh_sq).sqrt())
+
+def _cdist_excess_torch(x, y, model, c):
+    """cdist 의 z = A - 1 [N, M] (A 는 acosh 의 인자, 텐서 연산 경로)
+
+    GEMM + rank-1 보정으로 구하고, 자릿수가 상쇄된 쌍 (z ≤ √ε · 항의 크기) 은 CPU 커널처럼
+    _cdist_exact_excess 로 다시 계산해 가까운 점의 거리와 top-k 순서가 장치와 무관하다.
+    """
+    tol = torch.finfo(x.dtype).eps ** 0.5
+    if model == "lorentz":
+        time = x[:, :1] * y[:, 0]
+        z = c * (time - x[:, 1:] @ y[:, 1:].t()) - 1
+        near = z <= tol * c * time.abs()
+    else:
+        x_sq = x.pow(2).sum(-1, keepdim=True)
+        y_sq = y.pow(2).sum(-1)
+        x_conf = (1 - c * x_sq).clamp_min(1e-6)
+        y_conf = (1 - c * y_sq).clamp_min(1e-6)
+        gram = x @ y.t()
+        if model == "poincare":
+            diff = x_sq + y_sq - 2 * gram
+            z = 2 * c * diff / (x_conf * y_conf)
+            near = diff <= tol * (x_sq + y_sq)
+        else:
+            norm = x_conf.rsqrt() * y_conf.rsqrt()
+            z = (1 - c * gram) * norm - 1
+            near = z <= tol * norm
+    i, j = near.nonzero(as_tuple=True)
+    if i.numel():
+        z = z.index_put((i, j), _cdist_exact_excess(x[i], y[j], model, c))
+    return z
+
+def _cdist_distance_torch(z, c):
+    """z -> acosh(1 + z) / √c = log1p(z + √(z(z + 2))) / √c (같은 점 z = 0 의 그래디언트는 0)"""
+    positive = z > 0
+    safe = torch.where(positive, z, torch.ones_like(z))
+    dist = torch.log1p(safe + (safe * (safe + 2)).sqrt())
+    return torch.where(positive, dist, torch.zeros_like(z)) / c ** 0.5
+
+def _cdist_torch(x, y, model, c, k, chunk_size):
+    """행 묶음 단위 텐서 연산 경로 (CUDA 등)"""
+    rows = chunk_size or max(1, (1 << 22) // max(y.size(0), 1))
+    dists, indices = [], []
+    for chunk in x.split(rows):
+        z = _cdist_excess_torch(chunk, y, model, c)
+        if k is not None:
+            z, idx = z.topk(k, dim=1, largest=False)
+            indices.append(idx)
+        dists.append(_cdist_distance_torch(z, c))
+    dist = torch.cat(dists) if dists else x.new_empty(0, y.size(0) if k is None else k)
+    if k is None:
+        return dist
+    return dist, (torch.cat(indices) if indices else torch.empty(0, k, dtype=torch.long, device=x.device))
+
+def cdist(x, y, model="poincare", c=1.0, k=None, chunk_size=0):
+    """쌍별 측지 거리 x [N, D] × y [M, D] -> [N, M]
+
+    교차항은 행 묶음마다 GEMM 한 번이고 노름 항은 rank-1 보정으로 더한다.
+    k 를 주면 [N, M] 을 만들지 않고 묶음마다 가장 가까운 k 개만 남겨 (거리 [N, k], 색인 [N, k]) 를 돌려준다.
+    model 은 'poincare', 'lorentz' (<x,x>_L = 1/c 인 쌍곡면 좌표), 'klein'.
+    """
+    if model not in ("poincare", "lorentz", "klein"):
+        raise ValueError(f"model must be 'poincare', 'lorentz' or 'klein', got '{model}'")
+    if x.is_cuda or y.is_cuda:
+        return _cdist_torch(x, y, model, c, k, chunk_size)
+    if k is None:
+        return _library.call("cdist", x, y, model, c, chunk_size)
+    return _library.call("cdist_topk", x, y, k, model, c, chunk_size)
 
 def predict_dynamic_curvature(features, weight, bias, base_curvature=1.0, 
                              min_curvature=1e-6, max_curvature=1e6):
     try:
-        if _has_cuda and hasattr(_C, 'dynamic_curvature_prediction_cuda') and features.is_cuda:
-            from ._C import dynamic_curvature_prediction_cuda
-            return dynamic_curvature_prediction_cuda(features, weight, bias, base_curvature, 
-                                                   min_curvature, max_curvature)
+        if features.is_cuda and hasattr(_library.extension, 'dynamic_curvature_prediction_cuda'):
+            return _library.extension.dynamic_curvature_prediction_cuda(features, weight, bias, base_curvature,
+                                                                        min_curvature, max_curvature)
         else:
             logits = torch.mm(features, weight.t()) + bias
             curvatures = base_curvature * torch.exp(torch.clamp(logits, -20.0, 20.0))
@@ -192,38 +327,16 @@ def dynamic_curvature_pred(features, weight, bias, base_curvature=1.0):
     return predict_dynamic_curvature(features, weight, bias, base_curvature)
 
 def dynamic_mobius_add(u, v, curvatures):
-    try:
-        if _has_cuda and hasattr(_C, 'dynamic_mobius_add_cuda') and u.is_cuda:
-            from ._C import dynamic_mobius_add_cuda
-            return dynamic_mobius_add_cuda(u, v, curvatures)
-        else:
-            batch_size = u.size(0)
-            result = torch.zeros_like(u)
-            for b in range(batch_size):
-                c_b = max(1e-6, min(curvatures[b].item(), 1e6))
-                result[b] = mobius_add(u[b:b+1], v[b:b+1], c_b)[0]
-            return result
-    except Exception:
-        batch_size = u.size(0)
-        result = torch.zeros_like(u)
-        for b in range(batch_size):
-            c_b = max(1e-6, min(curvatures[b].item(), 1e6))
-            result[b] = mobius_add(u[b:b+1], v[b:b+1], c_b)[0]
-        return result
+    """행마다 다른 곡률 curvatures[b] 로 u ⊕ v 를 한 번의 배치 연산으로 계산"""
+    if u.is_cuda:
+        return mobius_add(u, v, curvatures.clamp(1e-6, 1e6))
+    return _library.call("dynamic_mobius_add", u, v, curvatures)
 
 def dynamic_poincare_layer(u, v, curvatures, t=0.5):
-    try:
-        if _has_cuda and hasattr(_C, 'dynamic_poincare_layer_cuda') and u.is_cuda:
-            from ._C import dynamic_poincare_layer_cuda
-            return dynamic_poincare_layer_cuda(u, v, curvatures, t)
-        else:
-            tv = t * v
-            one_minus_t_u = (1.0 - t) * u
-            return dynamic_mobius_add(one_minus_t_u, tv, curvatures)
-    except Exception:
-        tv = t * v
-        one_minus_t_u = (1.0 - t) * u
-        return dynamic_mobius_add(one_minus_t_u, tv, curvatures)
+    """((1-t)·u) ⊕_c (t·v), c 는 배치별 곡률 [B] / [B,1]"""
+    if u.is_cuda:
+        return dynamic_mobius_add((1.0 - t) * u, t * v, curvatures)
+    return _library.call("dynamic_poincare_layer", u, v, curvatures, t)
 
 def boundary_penalty(x, curvature, epsilon=0.01):
     norm = torch.norm(x, 2, dim=-1)
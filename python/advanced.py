@@ -3,6 +3,8 @@ Reality Stone Advanced Features Python API
 최신 하이퍼볼릭 신경망 기법들을 포함한 통합 고급 기능 모듈
 """
 
+import functools
+import math
 import torch
 import torch.nn as nn
 import torch.nn.functional as F
@@ -11,15 +13,10 @@ from dataclasses import dataclass
 from typing import Optional, List, Tuple, Union
 import warnings
 
-# C++ 확장 모듈 import (fallback 포함)
-try:
-    import reality_stone._C as _C
-    HAS_CUDA = hasattr(_C, 'mobius_add_cuda')
-except ImportError:
-    _C = None
-    HAS_CUDA = False
+from . import library as _library
 
-_has_cuda = torch.cuda.is_available()
+# C++ 확장은 처음 쓸 때 불러온다 (bool(_C) 는 확장을 쓸 수 있는지)
+_C = _library.extension
 
 class AdvancedConfig:
     """고급 기능 설정 클래스"""
@@ -72,7 +69,7 @@ class DynamicCurvaturePrediction(Function):
         ctx.save_for_backward(x, weight, bias)
         ctx.base_curvature = base_curvature
         
-        if x.is_cuda and _has_cuda:
+        if x.is_cuda and _library.has_cuda():
             return dynamic_curvature_prediction_cuda(x, weight, bias, base_curvature)
         else:
             return dynamic_curvature_prediction_cpu(x, weight, bias, base_curvature)
@@ -88,22 +85,25 @@ class DynamicMobiusAdd(Function):
     
     @staticmethod
     def forward(ctx, u, v, curvatures):
-        if not _C:
-            # Fallback: 첫 번째 곡률값 사용
-            from . import mobius_add
-            return mobius_add(u, v, curvatures[0].item())
-            
         ctx.save_for_backward(u, v, curvatures)
-        
-        if u.is_cuda and _has_cuda:
-            return dynamic_mobius_add_cuda(u, v, curvatures)
-        else:
-            return dynamic_mobius_add_cpu(u, v, curvatures)
+        if not _C or u.is_cuda:
+            # Fallback: 배치별 곡률을 [B,1] 로 브로드캐스트해 한 번에 계산
+            from . import _mobius_add_broadcast
+            return _mobius_add_broadcast(u, v, curvatures.clamp(1e-6, 1e6))
+        return _C.dynamic_mobius_add_cpu(u, v, curvatures)
     
     @staticmethod
     def backward(ctx, grad_output):
-        # autograd로 처리
-        return None, None, None
+        # 텐서 연산 경로로 다시 계산해 u, v, 곡률의 그래디언트를 구한다
+        from . import _mobius_add_broadcast
+        u, v, curvatures = ctx.saved_tensors
+        with torch.enable_grad():
+            inputs = [t.detach().requires_grad_(need)
+                      for t, need in zip((u, v, curvatures), ctx.needs_input_grad)]
+            out = _mobius_add_broadcast(inputs[0], inputs[1], inputs[2].clamp(1e-6, 1e6))
+            wanted = [t for t in inputs if t.requires_grad]
+            grads = iter(torch.autograd.grad(out, wanted, grad_output) if wanted else ())
+        return tuple(next(grads) if need else None for need in ctx.needs_input_grad)
 
 # ===============================
 # Hyperbolic Regularization
@@ -125,7 +125,7 @@ class HyperbolicRegularization(Function):
         ctx.curvature = curvature
         ctx.lambdas = (lambda_boundary, lambda_curvature, lambda_geodesic)
         
-        if x.is_cuda and _has_cuda:
+        if x.is_cuda and _library.has_cuda():
             return combined_regularization_cuda(x, weights, curvature, 
                                               lambda_boundary, lambda_curvature, lambda_geodesic)
         else:
@@ -153,7 +153,7 @@ class GeodesicActivation(Function):
         ctx.save_for_backward(input, anchors, t_values, weights)
         ctx.curvature = curvature
         
-        if input.is_cuda and _has_cuda:
+        if input.is_cuda and _library.has_cuda():
             return geodesic_activation_cuda(input, anchors, t_values, weights, curvature)
         else:
             return geodesic_activation_cpu(input, anchors, t_values, weights, curvature)
@@ -175,7 +175,7 @@ class EinsteinMidpoint(Function):
         ctx.save_for_backward(points, weights)
         ctx.curvature = curvature
         
-        if points.is_cuda and _has_cuda:
+        if points.is_cuda and _library.has_cuda():
             return einstein_midpoint_cuda(points, weights, curvature)
         else:
             return einstein_midpoint_cpu(points, weights, curvature)
@@ -184,34 +184,29 @@ class EinsteinMidpoint(Function):
     def backward(ctx, grad_output):
         return None, None, None
 
+def _einstein_midpoint_torch(points, weights, curvature):
+    """exp_0(∑ₖ wₖ·log_0(xₖ)) 를 [B, K, D] 브로드캐스트 텐서 연산으로 계산"""
+    sqrt_c = curvature ** 0.5
+    w = (weights.unsqueeze(0) if weights.dim() == 1 else weights).unsqueeze(-1).to(points.dtype)
+    norm = torch.norm(points, p=2, dim=-1, keepdim=True)
+    coeff = torch.atanh(torch.clamp(sqrt_c * norm, -0.99, 0.99)) / (sqrt_c * norm + 1e-7)
+    weighted_log_sum = (w * coeff * points).sum(dim=1)
+    log_norm = torch.norm(weighted_log_sum, p=2, dim=-1, keepdim=True)
+    tanh_arg = torch.clamp(sqrt_c * log_norm, -88.0, 88.0)
+    return torch.tanh(tanh_arg) / (sqrt_c * log_norm + 1e-7) * weighted_log_sum
+
 # ===============================
 # Fused Operations
 # ===============================
 
-class HyperbolicLinearFused(Function):
-    """퓨즈드 하이퍼볼릭 선형 레이어"""
-    
-    @staticmethod
-    def forward(ctx, input, weight, bias, curvature):
-        if not _C:
-            # Fallback: 단계별 수행
-            from . import mobius_add
-            
-            # 간단한 선형 변환
-            linear_result = torch.mm(input, weight.t()) + bias
-            return linear_result
-            
-        ctx.save_for_backward(input, weight, bias)
-        ctx.curvature = curvature
-        
-        if input.is_cuda and _has_cuda:
-            return hyperbolic_linear_fused_cuda(input, weight, bias, curvature)
-        else:
-            return hyperbolic_linear_fused_cpu(input, weight, bias, curvature)
-    
-    @staticmethod
-    def backward(ctx, grad_output):
-        return None, None, None, None
+def _hyperbolic_linear_torch(input, weight, bias, curvature):
+    """log_0 → linear → exp_0 텐서 연산 경로 (곡률은 스칼라 또는 [B] / [B,1] 텐서)"""
+    sqrt_c = torch.sqrt(curvature.reshape(-1, 1).to(input.dtype))
+    norm = torch.norm(input, p=2, dim=-1, keepdim=True)
+    log_coeff = torch.atanh(torch.clamp(sqrt_c * norm, -0.99, 0.99)) / (sqrt_c * norm + 1e-7)
+    linear_result = torch.addmm(bias, log_coeff * input, weight.t())
+    result_norm = torch.norm(linear_result, p=2, dim=-1, keepdim=True)
+    return torch.tanh(sqrt_c * result_norm) / (sqrt_c * result_norm + 1e-7) * linear_result
 
 class TransformRegularizeFused(Function):
     """변환-정규화 퓨즈드 연산"""
@@ -233,7 +228,7 @@ class TransformRegularizeFused(Function):
         ctx.curvature = curvature
         ctx.reg_lambda = reg_lambda
         
-        if input.is_cuda and _has_cuda:
+        if input.is_cuda and _library.has_cuda():
             return transform_regularize_fused_cuda(input, curvature, reg_lambda)
         else:
             return transform_regularize_fused_cpu(input, curvature, reg_lambda)
@@ -261,7 +256,9 @@ def predict_dynamic_curvature(x: torch.Tensor,
     Returns:
         torch.Tensor: 예측된 곡률값들 [B]
     """
-    return DynamicCurvaturePrediction.apply(x, weight, bias, base_curvature)
+    # 텐서 연산만 사용해 곡률 예측기도 학습되도록 그래프에 남긴다
+    logits = torch.clamp(F.linear(x, weight, bias), -20.0, 20.0)
+    return torch.clamp(base_curvature * torch.exp(logits), 1e-6, 1e6).squeeze(-1)
 
 def dynamic_mobius_add(u: torch.Tensor, 
                       v: torch.Tensor, 
@@ -270,11 +267,13 @@ def dynamic_mobius_add(u: torch.Tensor,
     
     Args:
         u, v: 입력 텐서들 [B, D]
-        curvatures: 배치별 곡률값들 [B]
+        curvatures: 배치별 곡률값들 [B] 또는 [B, 1]
         
     Returns:
         torch.Tensor: u ⊕_c v 결과 [B, D]
     """
+    if _library.enabled() and not u.is_cuda:
+        return _library.call("dynamic_mobius_add", u, v, curvatures)
     return DynamicMobiusAdd.apply(u, v, curvatures)
 
 def hyperbolic_regularization(x: torch.Tensor,
@@ -303,11 +302,11 @@ def geodesic_activation(
     curvature: float = 1.0
 ) -> torch.Tensor:
     """측지선 기반 활성화 함수"""
-    if _C is None:
+    if not _C:
         warnings.warn("C++ extension not available, using tanh activation")
         return torch.tanh(x)
     
-    if HAS_CUDA and x.is_cuda:
+    if x.is_cuda and _library.has_cuda():
         anchors = torch.randn(num_anchors, x.size(-1), device=x.device) * 0.3
         t_params = torch.full((num_anchors,), 0.5, device=x.device)
         weights = torch.ones(num_anchors, device=x.device) / num_anchors
@@ -316,6 +315,40 @@ def geodesic_activation(
         warnings.warn("CUDA not available for geodesic activation")
         return torch.tanh(x)
 
+def _multi_geodesic_mixing_torch(x, anchors, t_values, weights, curvature):
+    """다중 측지선 혼합 텐서 연산 경로 ([B, K] 를 한 번에)"""
+    t = torch.sigmoid(t_values)
+    w = torch.softmax(weights, dim=0)
+    norm_sq = (x * x).sum(dim=1, keepdim=True)
+    geodesic_scale = t / (1.0 + curvature * t * t * norm_sq)
+    mix = w * torch.exp(-torch.cdist(x, anchors))
+    scale = (mix * geodesic_scale).sum(dim=1, keepdim=True) / (mix.sum(dim=1, keepdim=True) + 1e-7)
+    return scale * x
+
+def multi_geodesic_mixing(x: torch.Tensor,
+                          anchors: torch.Tensor,
+                          t_values: torch.Tensor,
+                          weights: torch.Tensor,
+                          curvature: float = 1.0) -> torch.Tensor:
+    """앵커 기반 다중 측지선 혼합
+    
+    h_b = ∑ₖ w_k·e^{-|x_b - a_k|}·γ_k(x_b) / ∑ₖ w_k·e^{-|x_b - a_k|},
+    γ_k 는 원점에서 sigmoid(t_k)·x_b 까지의 측지선 점
+    
+    Args:
+        x: 입력 텐서 [B, D]
+        anchors: 앵커 포인트 [K, D]
+        t_values: 측지선 파라미터 [K] (sigmoid 로 [0, 1] 에 매핑)
+        weights: 앵커 가중치 로짓 [K] (softmax 로 정규화)
+        curvature: 곡률값
+        
+    Returns:
+        torch.Tensor: 혼합 결과 [B, D]
+    """
+    if _C and not x.is_cuda:
+        return _library.call("multi_geodesic_mixing", x, anchors, t_values, weights, curvature)
+    return _multi_geodesic_mixing_torch(x, anchors, t_values, weights, curvature)
+
 def einstein_midpoint(points: torch.Tensor,
                      weights: torch.Tensor,
                      curvature: float) -> torch.Tensor:
@@ -323,13 +356,15 @@ def einstein_midpoint(points: torch.Tensor,
     
     Args:
         points: 포인트들 [B, K, D]
-        weights: 가중치들 [K]
+        weights: 가중치들 [K] (배치 공유) 또는 [B, K] (배치별)
         curvature: 곡률값
         
     Returns:
         torch.Tensor: Einstein 중점 [B, D]
     """
-    return EinsteinMidpoint.apply(points, weights, curvature)
+    if _C and not points.is_cuda:
+        return _library.call("einstein_midpoint", points, weights, curvature)
+    return _einstein_midpoint_torch(points, weights, curvature)
 
 def hyperbolic_linear_fused(input: torch.Tensor,
                            weight: torch.Tensor,
@@ -343,12 +378,18 @@ def hyperbolic_linear_fused(input: torch.Tensor,
         input: 입력 텐서 [B, D_in]
         weight: 가중치 [D_out, D_in]
         bias: 바이어스 [D_out]
-        curvature: 곡률값
+        curvature: 곡률값 (float, 스칼라 텐서 또는 배치별 [B] / [B, 1] 텐서)
         
     Returns:
         torch.Tensor: 변환된 텐서 [B, D_out]
+
+    곡률 텐서는 호스트로 꺼내지 않으므로 (.item() 없음) 디바이스 동기화가 없고
+    곡률 예측기까지 그래디언트가 흐른다.
     """
-    return HyperbolicLinearFused.apply(input, weight, bias, curvature)
+    curvature = torch.as_tensor(curvature, dtype=input.dtype, device=input.device)
+    if _C and not input.is_cuda:
+        return _library.call("hyperbolic_linear_fused", input, weight, bias, curvature)
+    return _hyperbolic_linear_torch(input, weight, bias, curvature)
 
 def transform_regularize_fused(input: torch.Tensor,
                               curvature: float,
@@ -412,7 +453,7 @@ def benchmark_advanced_features(input: torch.Tensor,
     if not _C:
         return BenchmarkResult(0.0, 0.0, 1.0, 0)
     
-    if input.is_cuda and _has_cuda:
+    if input.is_cuda and _library.has_cuda():
         return benchmark_fused_vs_unfused_cuda(input, weight, curvature, num_iterations)
     else:
         return benchmark_fused_vs_unfused_cpu(input, weight, curvature, num_iterations)
@@ -423,20 +464,20 @@ def chebyshev_approximation(x: torch.Tensor,
                            order: int = 10, 
                            curvature: float = 1.0) -> torch.Tensor:
     """체비셰프 다항식을 이용한 하이퍼볼릭 함수 근사"""
-    if _C is None:
+    if not _C:
         warnings.warn("C++ extension not available, using PyTorch fallback")
         return torch.tanh(torch.sqrt(torch.tensor(curvature)) * x)
     
-    if HAS_CUDA and x.is_cuda:
+    if x.is_cuda and _library.has_cuda():
         return _C.chebyshev_approximation_cuda(x, order, curvature)
     else:
-        return _C.chebyshev_approximation_cpu(x, order, curvature)
+        return _library.call("chebyshev_approximation", x, order, curvature)
 
 def chebyshev_distance(x: torch.Tensor, 
                       y: torch.Tensor, 
                       curvature: float = 1.0) -> torch.Tensor:
     """체비셰프 거리 계산 (하이퍼볼릭 공간)"""
-    if _C is None:
+    if not _C:
         warnings.warn("C++ extension not available, using PyTorch fallback")
         diff = torch.abs(x - y)
         cheb_dist = torch.max(diff, dim=-1).values
@@ -444,153 +485,363 @@ def chebyshev_distance(x: torch.Tensor,
         scaled_dist = torch.clamp(sqrt_c * cheb_dist, 0.0, 0.99)
         return (1.0 / sqrt_c) * torch.atanh(scaled_dist)
     
-    if HAS_CUDA and x.is_cuda:
+    if x.is_cuda and _library.has_cuda():
         return _C.chebyshev_distance_cuda(x, y, curvature)
     else:
-        return _C.chebyshev_distance_cpu(x, y, curvature)
+        return _library.call("chebyshev_distance", x, y, curvature)
+
+def _chebyshev_nodes_torch(n, device):
+    k = torch.arange(n, dtype=torch.float32, device=device)
+    return torch.cos((2 * k + 1) * torch.pi / (2 * n))
 
 def chebyshev_nodes(n: int, device: torch.device = torch.device('cpu')) -> torch.Tensor:
     """체비셰프 점들 생성"""
-    if _C is None:
+    if not _C:
         warnings.warn("C++ extension not available, using PyTorch fallback")
-        k = torch.arange(n, dtype=torch.float32, device=device)
-        return torch.cos((2 * k + 1) * torch.pi / (2 * n))
+        return _chebyshev_nodes_torch(n, device)
     
     return _C.chebyshev_nodes_cpu(n, device)
 
 def fast_chebyshev_transform(values: torch.Tensor) -> torch.Tensor:
     """고속 체비셰프 변환"""
-    if _C is None:
+    if not _C:
         warnings.warn("C++ extension not available, using PyTorch fallback")
         return torch.fft.dct(values, type=1, norm='ortho')
     
-    if HAS_CUDA and values.is_cuda:
+    if values.is_cuda and _library.has_cuda():
         return _C.fast_chebyshev_transform_cuda(values)
     else:
         return _C.fast_chebyshev_transform_cpu(values)
 
+@functools.lru_cache(maxsize=None)
+def _chebyshev_derivative_operator(n):
+    """계수 행벡터에 곱하는 미분 연산자 [n, n-1]: b_k = (2/c_k) Σ_{j>k, j-k 홀수} j·a_j (c_0 = 2)"""
+    j = torch.arange(n, dtype=torch.float64).unsqueeze(1)
+    k = torch.arange(n - 1, dtype=torch.float64).unsqueeze(0)
+    operator = torch.where((j > k) & ((j - k) % 2 == 1), 2 * j, torch.zeros(()))
+    operator[:, 0] *= 0.5
+    return operator
+
+@functools.lru_cache(maxsize=None)
+def _chebyshev_integral_operator(n):
+    """계수 행벡터에 곱하는 적분 연산자 [n, n+1]: B_k = (c_{k-1}·a_{k-1} - a_{k+1}) / 2k (B_0 은 적분 상수)"""
+    operator = torch.zeros(n, n + 1, dtype=torch.float64)
+    k = torch.arange(1, n + 1, dtype=torch.float64)
+    operator[torch.arange(n), torch.arange(1, n + 1)] = 1.0 / (2 * k)
+    operator[0, 1] = 1.0
+    if n > 2:
+        operator[torch.arange(2, n), torch.arange(1, n - 1)] = -1.0 / (2 * k[:n - 2])
+    return operator
+
+def _chebyshev_basis(x, n):
+    """T_k(x), k < n 를 마지막 축에 쌓은 행렬 [..., n]"""
+    x = torch.clamp(x, -1.0 + 1e-6, 1.0 - 1e-6)
+    k = torch.arange(n, dtype=x.dtype, device=x.device)
+    return torch.cos(torch.acos(x).unsqueeze(-1) * k)
+
+def _inverse_chebyshev_transform_torch(coeffs, eval_points):
+    """coeffs [..., n] 를 eval_points 에서 평가: 결과 모양은 coeffs.shape[:-1] + eval_points.shape"""
+    basis = _chebyshev_basis(eval_points.reshape(-1).to(coeffs.dtype), coeffs.size(-1))
+    result = torch.matmul(coeffs, basis.t())
+    return result.reshape(*coeffs.shape[:-1], *eval_points.shape)
+
+def _chebyshev_derivative_torch(coeffs):
+    n = coeffs.size(-1)
+    if n <= 1:
+        return coeffs.new_zeros(*coeffs.shape[:-1], 1)
+    return torch.matmul(coeffs, _chebyshev_derivative_operator(n).to(coeffs.device, coeffs.dtype))
+
+def _chebyshev_integral_torch(coeffs, constant=0.0):
+    result = torch.matmul(coeffs, _chebyshev_integral_operator(coeffs.size(-1)).to(coeffs.device, coeffs.dtype))
+    result[..., 0] += constant
+    return result
+
 def inverse_chebyshev_transform(coeffs: torch.Tensor, 
                                eval_points: torch.Tensor = None) -> torch.Tensor:
-    """역 체비셰프 변환"""
-    if _C is None:
-        warnings.warn("C++ extension not available, using PyTorch fallback")
-        if eval_points is None:
-            return torch.fft.idct(coeffs, type=1, norm='ortho')
-        
-        order = coeffs.size(-1) - 1
-        x = torch.clamp(eval_points, -1.0 + 1e-6, 1.0 - 1e-6)
-        result = torch.zeros(coeffs.size(0), x.size(0), 
-                           dtype=coeffs.dtype, device=coeffs.device)
-        
-        for k in range(order + 1):
-            T_k = torch.cos(k * torch.acos(x))
-            result += coeffs[:, k:k+1] * T_k.unsqueeze(0)
-        
-        return result
-    
+    """역 체비셰프 변환: coeffs [..., n] 를 eval_points (기본값: n 개의 체비셰프 점) 에서 평가"""
     if eval_points is None:
-        eval_points = chebyshev_nodes(coeffs.size(-1), coeffs.device)
+        eval_points = _chebyshev_nodes_torch(coeffs.size(-1), coeffs.device)
+    
+    if not _C:
+        warnings.warn("C++ extension not available, using PyTorch fallback")
+        return _inverse_chebyshev_transform_torch(coeffs, eval_points)
     
-    if HAS_CUDA and coeffs.is_cuda:
+    if coeffs.is_cuda and _library.has_cuda():
         return _C.inverse_chebyshev_transform_cuda(coeffs, eval_points)
     else:
         return _C.inverse_chebyshev_transform_cpu(coeffs, eval_points)
 
 def chebyshev_derivative(coeffs: torch.Tensor) -> torch.Tensor:
-    """체비셰프 다항식의 해석적 미분"""
-    if _C is None:
+    """체비셰프 다항식의 해석적 미분: [..., n] → [..., n-1]"""
+    if not _C:
         warnings.warn("C++ extension not available, using PyTorch fallback")
-        n = coeffs.size(-1)
-        if n <= 1:
-            return torch.zeros(coeffs.size(0), 1, dtype=coeffs.dtype, device=coeffs.device)
-        
-        d_coeffs = torch.zeros(coeffs.size(0), n - 1, dtype=coeffs.dtype, device=coeffs.device)
-        for k in range(n - 2, -1, -1):
-            if k == n - 2:
-                d_coeffs[:, k] = 2 * (k + 1) * coeffs[:, k + 1]
-            else:
-                d_coeffs[:, k] = d_coeffs[:, k + 2] + 2 * (k + 1) * coeffs[:, k + 1]
-        
-        return d_coeffs
+        return _chebyshev_derivative_torch(coeffs)
     
-    if HAS_CUDA and coeffs.is_cuda:
+    if coeffs.is_cuda and _library.has_cuda():
         return _C.chebyshev_derivative_cuda(coeffs)
     else:
         return _C.chebyshev_derivative_cpu(coeffs)
 
 def chebyshev_integral(coeffs: torch.Tensor, constant: float = 0.0) -> torch.Tensor:
-    """체비셰프 다항식의 해석적 적분"""
-    if _C is None:
+    """체비셰프 다항식의 해석적 적분: [..., n] → [..., n+1], 상수항은 constant"""
+    if not _C:
         warnings.warn("C++ extension not available, using PyTorch fallback")
-        n = coeffs.size(-1)
-        i_coeffs = torch.zeros(coeffs.size(0), n + 1, dtype=coeffs.dtype, device=coeffs.device)
-        i_coeffs[:, 0] = constant
-        
-        for k in range(n):
-            if k == 0:
-                i_coeffs[:, 1] += coeffs[:, 0]
-            else:
-                i_coeffs[:, k + 1] += coeffs[:, k] / (2 * (k + 1))
-                if k > 1:
-                    i_coeffs[:, k - 1] -= coeffs[:, k] / (2 * (k - 1))
-        
-        return i_coeffs
+        return _chebyshev_integral_torch(coeffs, constant)
     
-    if HAS_CUDA and coeffs.is_cuda:
+    if coeffs.is_cuda and _library.has_cuda():
         return _C.chebyshev_integral_cuda(coeffs, constant)
     else:
         return _C.chebyshev_integral_cpu(coeffs, constant)
 
 # ===== 라플라스-벨트라미 관련 함수들 =====
 
-def hyperbolic_laplacian(f: torch.Tensor, curvature: float = 1.0) -> torch.Tensor:
-    """하이퍼볼릭 라플라시안 계산"""
-    if _C is None:
-        warnings.warn("C++ extension not available, using PyTorch fallback")
-        return torch.zeros_like(f)
+def _euclidean_derivatives(fn, x):
+    """스칼라장 fn 의 ∇u 와 Δu = tr(∇²u) 를 autograd 로 계산 (D 번의 배치 역전파)"""
+    keep_graph = x.requires_grad
+    with torch.enable_grad():
+        x = x if keep_graph else x.detach().requires_grad_()
+        u = fn(x)
+        grad, = torch.autograd.grad(u.sum(), x, create_graph=True)
+        laplacian = torch.zeros_like(u)
+        for d in range(x.size(-1) if grad.requires_grad else 0):   # ∇u 가 상수면 Δu = 0
+            second, = torch.autograd.grad(grad[..., d].sum(), x, create_graph=keep_graph,
+                                          retain_graph=True, allow_unused=True)
+            if second is not None:
+                laplacian = laplacian + second[..., d]
+    if not keep_graph:
+        grad, laplacian = grad.detach(), laplacian.detach()
+    return grad, laplacian
+
+def _poincare_laplace_beltrami(x, grad, euclidean_laplacian, curvature):
+    """Δ_H u = (1-c|x|²)²/4 · Δu + (D-2)·c·(1-c|x|²)/2 · <x, ∇u>"""
+    conformal = 1.0 - curvature * (x * x).sum(dim=-1)
+    return (0.25 * conformal ** 2 * euclidean_laplacian
+            + 0.5 * (x.size(-1) - 2) * curvature * conformal * (x * grad).sum(dim=-1))
+
+def hyperbolic_laplacian(f: torch.Tensor,
+                         curvature: float = 1.0,
+                         fn=None,
+                         derivatives=None) -> torch.Tensor:
+    """포인카레 계량의 라플라스-벨트라미 연산자 Δ_H
+    
+    Args:
+        f: 점들 [..., D] (포인카레 볼 내부)
+        curvature: 곡률값
+        fn: 스칼라장 u(x) ([..., D] -> [...]). 주어지면 ∇u, Δu 를 autograd 로 구한다
+        derivatives: x -> (∇u [..., D], Δu [...]) 를 직접 주는 함수 (2차 미분을 해석적으로 아는 경우)
+        
+    Returns:
+        torch.Tensor: fn / derivatives 가 없으면 좌표 함수들의 Δ_H [..., D], 있으면 Δ_H u [...]
+    """
+    if fn is not None or derivatives is not None:
+        grad, euclidean_laplacian = derivatives(f) if derivatives is not None else _euclidean_derivatives(fn, f)
+        return _poincare_laplace_beltrami(f, grad, euclidean_laplacian, curvature)
     
-    if HAS_CUDA and f.is_cuda:
+    if f.is_cuda and _library.has_cuda():
         return _C.hyperbolic_laplacian_cuda(f, curvature)
-    else:
-        return _C.hyperbolic_laplacian_cpu(f, curvature)
+    if _C and not f.is_cuda:
+        return _library.call("hyperbolic_laplacian", f, curvature)
+    # 좌표 함수 u = x_d: Δu = 0, ∇u = e_d
+    norm_sq = (f * f).sum(dim=-1, keepdim=True)
+    return 0.5 * (f.size(-1) - 2) * curvature * (1.0 - curvature * norm_sq) * f
 
-def heat_kernel(x: torch.Tensor, t: float, curvature: float = 1.0) -> torch.Tensor:
-    """열 핵 계산"""
-    if _C is None:
-        warnings.warn("C++ extension not available, using PyTorch fallback")
-        return torch.exp(-torch.norm(x, dim=-1, keepdim=True) ** 2 / (4 * t))
+def heat_kernel(x: torch.Tensor,
+                t: Union[float, torch.Tensor],
+                curvature: float = 1.0) -> torch.Tensor:
+    """열 핵 계산
     
-    if HAS_CUDA and x.is_cuda:
+    Args:
+        x: 점들 [..., D]
+        t: 확산 시각 (float) 또는 시각들 [T] (양수)
+        curvature: 곡률값
+        
+    Returns:
+        torch.Tensor: [..., D], t 가 텐서이면 [T, ..., D] (|x|² 는 모든 시각이 공유)
+    """
+    multi = torch.is_tensor(t) or isinstance(t, (list, tuple))
+    if not _C or (multi and x.is_cuda):
+        from . import _heat_kernel_torch
+        times = torch.as_tensor(t if multi else [t], dtype=torch.float64, device=x.device)
+        result = _heat_kernel_torch(x, times, curvature)
+        return result if multi else result[0]
+    if multi:
+        return _library.call("heat_kernel_times", x, torch.as_tensor(t, dtype=torch.float64), curvature)
+    
+    if x.is_cuda and _library.has_cuda():
         return _C.heat_kernel_cuda(x, t, curvature)
     else:
-        return _C.heat_kernel_cpu(x, t, curvature)
+        return _library.call("heat_kernel", x, t, curvature)
 
 def laplace_beltrami_eigen(manifold_points: torch.Tensor, 
-                          curvature: float = 1.0) -> Tuple[torch.Tensor, torch.Tensor]:
-    """라플라스-벨트라미 고유값 분해"""
-    if _C is None:
-        warnings.warn("C++ extension not available, using PyTorch fallback")
-        n = manifold_points.size(0)
-        eigenvals = torch.ones(min(n, 100), dtype=manifold_points.dtype, 
-                             device=manifold_points.device)
-        eigenvecs = torch.eye(n, min(n, 100), dtype=manifold_points.dtype, 
-                            device=manifold_points.device)
-        return eigenvals, eigenvecs
-    
-    if HAS_CUDA and manifold_points.is_cuda:
+                          curvature: float = 1.0,
+                          k: int = 100,
+                          num_neighbors: int = 16) -> Tuple[torch.Tensor, torch.Tensor]:
+    """라플라스-벨트라미 고유값 분해 (kNN 그래프 라플라시안의 가장 작은 k 개 고유쌍)
+    
+    Args:
+        manifold_points: 포인트들 [n, D]
+        curvature: 곡률값
+        k: 구할 고유쌍 수
+        num_neighbors: kNN 그래프의 이웃 수 (0 이하이면 완전 그래프)
+        
+    Returns:
+        Tuple[torch.Tensor, torch.Tensor]: 오름차순 고유값 [k], 고유벡터 [n, k]
+    """
+    if manifold_points.is_cuda and _library.has_cuda():
         return _C.laplace_beltrami_eigen_cuda(manifold_points, curvature)
-    else:
-        return _C.laplace_beltrami_eigen_cpu(manifold_points, curvature)
+    if _C and not manifold_points.is_cuda:
+        return _C.laplace_beltrami_eigen_cpu(manifold_points, curvature, k, num_neighbors)
+    return _graph_laplacian_eigen_torch(_knn_graph_torch(manifold_points, curvature, num_neighbors), k)
+
+def knn_graph(points: torch.Tensor,
+              curvature: float = 1.0,
+              num_neighbors: int = 16,
+              sigma: float = 1.0) -> torch.Tensor:
+    """측지선 kNN 가우시안 그래프
+    
+    W_ij = (w_ij + w_ji) / 2, w_ij = exp(-d(x_i, x_j)² / (2σ²)) (j 가 i 의 kNN 일 때).
+    거리는 행 패널 단위로만 계산하므로 n×n 행렬을 만들지 않는다.
+    
+    Returns:
+        torch.Tensor: 대칭 희소 CSR [n, n] (num_neighbors <= 0 또는 >= n-1 이면 조밀한 완전 그래프)
+    """
+    if _C and not points.is_cuda:
+        return _C.knn_graph_cpu(points, curvature, num_neighbors, sigma)
+    return _knn_graph_torch(points, curvature, num_neighbors, sigma)
+
+def _knn_graph_torch(points, curvature, num_neighbors, sigma=1.0):
+    """knn_graph_cpu 의 텐서 연산 경로"""
+    n = points.size(0)
+    if num_neighbors <= 0 or num_neighbors >= n - 1:
+        distances = _geodesic_distance_block_torch(points, points, curvature, 0)
+        return torch.exp(-distances ** 2 / (2 * sigma ** 2))
+    tile = max(1, min(1024, (1 << 24) // n))
+    distances, neighbors = [], []
+    for start in range(0, n, tile):
+        block = _geodesic_distance_block_torch(points[start:start + tile], points, curvature, start)
+        block.diagonal(start).fill_(float('inf'))
+        d, idx = block.topk(num_neighbors, dim=1, largest=False, sorted=False)
+        distances.append(d)
+        neighbors.append(idx)
+    half = 0.5 * torch.exp(-torch.cat(distances) ** 2 / (2 * sigma ** 2)).reshape(-1)
+    rows = torch.arange(n, device=points.device).repeat_interleave(num_neighbors)
+    cols = torch.cat(neighbors).reshape(-1)
+    indices = torch.stack([torch.cat([rows, cols]), torch.cat([cols, rows])])
+    return torch.sparse_coo_tensor(indices, torch.cat([half, half]), (n, n)).coalesce().to_sparse_csr()
+
+def _graph_laplacian_eigen_torch(weights, k):
+    """graph_laplacian_eigen_cpu 의 텐서 연산 경로 (큰 그래프는 torch.lobpcg)"""
+    n = weights.size(0)
+    k = min(k, n)
+    degree = weights @ torch.ones(n, dtype=weights.dtype, device=weights.device)
+    if n <= 2 * min(n, max(2 * k + 1, k + 32)):
+        dense = weights if weights.layout == torch.strided else weights.to_dense()
+        eigenvalues, eigenvectors = torch.linalg.eigh(torch.diag(degree) - dense)
+        return eigenvalues[:k], eigenvectors[:, :k]
+    coo = weights.to_sparse_coo()
+    diag = torch.arange(n, device=weights.device)
+    laplacian = torch.sparse_coo_tensor(
+        torch.cat([coo.indices(), torch.stack([diag, diag])], dim=1),
+        torch.cat([-coo.values(), degree]), (n, n)).coalesce()
+    return torch.lobpcg(laplacian, k=k, largest=False)
+
+def kmeans(points: torch.Tensor,
+           num_clusters: int,
+           max_iter: int = 100,
+           tol: float = 1e-4,
+           batch_size: int = 0,
+           seed: int = 0) -> Tuple[torch.Tensor, torch.Tensor]:
+    """k-means++ 초기화 + 배치 거리 할당 (GEMM + argmin)
+    
+    Args:
+        points: 포인트들 [n, D]
+        num_clusters: 클러스터 수
+        max_iter: 최대 반복 수 (중심 이동의 제곱합이 tol × 평균 분산 이하이면 조기 종료)
+        tol: 수렴 허용치
+        batch_size: 0 보다 크면 미니배치 갱신 (중심별 누적 평균)
+        seed: 초기화와 미니배치 샘플링의 시드
+        
+    Returns:
+        Tuple[torch.Tensor, torch.Tensor]: 라벨 [n], 중심 [num_clusters, D]
+    """
+    if _C and not points.is_cuda:
+        return _C.kmeans_cpu(points, num_clusters, max_iter, tol, batch_size, seed)
+    return _kmeans_torch(points, num_clusters, max_iter, tol, batch_size, seed)
+
+def _squared_distances(x, x_norm_sq, centroids):
+    return (x_norm_sq[:, None] + (centroids * centroids).sum(1) - 2 * x @ centroids.t()).clamp_min(0)
+
+def _kmeans_torch(points, num_clusters, max_iter=100, tol=1e-4, batch_size=0, seed=0):
+    """kmeans_cpu 의 텐서 연산 경로"""
+    x = points.float() if points.dtype in (torch.float16, torch.bfloat16) else points
+    n = x.size(0)
+    x_norm_sq = (x * x).sum(1)
+    generator = torch.Generator(device=x.device).manual_seed(seed)
+    centroids = x.new_empty(num_clusters, x.size(1))
+    centroids[0] = x[torch.randint(n, (1,), generator=generator, device=x.device)]
+    min_dist_sq = _squared_distances(x, x_norm_sq, centroids[:1]).squeeze(1)
+    for c in range(1, num_clusters):
+        if min_dist_sq.sum() > 0:
+            idx = torch.multinomial(min_dist_sq, 1, generator=generator)
+        else:
+            idx = torch.randint(n, (1,), generator=generator, device=x.device)
+        centroids[c] = x[idx]
+        min_dist_sq = torch.minimum(min_dist_sq, _squared_distances(x, x_norm_sq, centroids[c:c + 1]).squeeze(1))
+    
+    threshold = tol * x.var(0).mean().item() if n > 1 else 0.0
+    seen = x.new_zeros(num_clusters)
+    for _ in range(max_iter):
+        if 0 < batch_size < n:
+            idx = torch.randint(n, (batch_size,), generator=generator, device=x.device)
+            xb, nb = x[idx], x_norm_sq[idx]
+        else:
+            xb, nb = x, x_norm_sq
+        labels = _squared_distances(xb, nb, centroids).argmin(1)
+        sums = torch.zeros_like(centroids).index_add_(0, labels, xb)
+        counts = x.new_zeros(num_clusters).index_add_(0, labels, x.new_ones(xb.size(0)))
+        if 0 < batch_size < n:
+            seen += counts
+            step = (sums - counts[:, None] * centroids) / seen.clamp_min(1)[:, None]
+            updated = centroids + step
+        else:
+            updated = torch.where(counts[:, None] > 0, sums / counts.clamp_min(1)[:, None], centroids)
+        shift = (updated - centroids).pow(2).sum().item()
+        centroids = updated
+        if shift <= threshold:
+            break
+    return _squared_distances(x, x_norm_sq, centroids).argmin(1), centroids.to(points.dtype)
+
+def spectral_clustering(points: torch.Tensor,
+                        num_clusters: int,
+                        curvature: float = 1.0,
+                        num_neighbors: int = 16,
+                        max_iter: int = 100,
+                        tol: float = 1e-4,
+                        batch_size: int = 0,
+                        seed: int = 0) -> torch.Tensor:
+    """하이퍼볼릭 스펙트럴 클러스터링
+    
+    kNN 그래프 라플라시안의 가장 작은 num_clusters 개 고유벡터로
+    임베딩한 뒤 k-means++ 를 돌린다. 인자는 laplace_beltrami_eigen 과 kmeans 참고.
+    
+    Returns:
+        torch.Tensor: 클러스터 라벨 [n]
+    """
+    if _C and not points.is_cuda:
+        return _C.spectral_clustering_cpu(points, num_clusters, curvature, num_neighbors,
+                                          max_iter, tol, batch_size, seed)
+    _, eigenvectors = laplace_beltrami_eigen(points, curvature, num_clusters, num_neighbors)
+    return _kmeans_torch(eigenvectors, num_clusters, max_iter, tol, batch_size, seed)[0]
 
 def spectral_graph_conv(x: torch.Tensor, 
                        laplacian: torch.Tensor, 
                        weight: torch.Tensor) -> torch.Tensor:
     """스펙트럴 그래프 컨볼루션"""
-    if _C is None:
+    if not _C:
         warnings.warn("C++ extension not available, using PyTorch fallback")
         return torch.mm(torch.mm(laplacian, x), weight)
     
-    if HAS_CUDA and x.is_cuda:
+    if x.is_cuda and _library.has_cuda():
         return _C.spectral_graph_conv_cuda(x, laplacian, weight)
     else:
         return _C.spectral_graph_conv_cpu(x, laplacian, weight)
@@ -598,98 +849,248 @@ def spectral_graph_conv(x: torch.Tensor,
 def solve_diffusion_equation(initial_condition: torch.Tensor,
                            time_step: float,
                            num_steps: int,
-                           curvature: float = 1.0) -> torch.Tensor:
-    """확산 방정식 해결"""
-    if _C is None:
-        warnings.warn("C++ extension not available, using PyTorch fallback")
-        current = initial_condition.clone()
-        for _ in range(num_steps):
-            current = current * (1 - time_step * curvature)
-        return current
+                           curvature: float = 1.0,
+                           times: Optional[torch.Tensor] = None) -> torch.Tensor:
+    """확산 방정식 du/dt = Δ_H u 의 정확해 (비용은 num_steps 와 무관)
     
-    if HAS_CUDA and initial_condition.is_cuda:
-        return _C.solve_diffusion_equation_cuda(initial_condition, time_step, num_steps, curvature)
-    else:
-        return _C.solve_diffusion_equation_cpu(initial_condition, time_step, num_steps, curvature)
+    Args:
+        initial_condition: 초기 점들 [..., D]
+        time_step, num_steps: t = time_step·num_steps 에서의 해를 반환
+        curvature: 곡률값
+        times: 주어지면 여러 시각 [T] 의 해를 한 번에 [T, ..., D] 로 반환
+    """
+    if times is None:
+        if initial_condition.is_cuda and _library.has_cuda():
+            return _C.solve_diffusion_equation_cuda(initial_condition, time_step, num_steps, curvature)
+        if _C and not initial_condition.is_cuda:
+            return _C.solve_diffusion_equation_cpu(initial_condition, time_step, num_steps, curvature)
+        times = torch.tensor([time_step * num_steps])
+        return _diffusion_closed_form_torch(initial_condition, times, curvature)[0]
+    times = torch.as_tensor(times, dtype=torch.float64)
+    if _C and not initial_condition.is_cuda:
+        return _C.solve_diffusion_equation_cpu(initial_condition, times, curvature)
+    return _diffusion_closed_form_torch(initial_condition, times, curvature)
+
+def _diffusion_closed_form_torch(initial_condition, times, curvature):
+    """u(t) = u0 / sqrt(q·(1 - c|u0|²) + c|u0|²), q = exp(-(D-2)·c·t)"""
+    a = 0.5 * (initial_condition.size(-1) - 2) * curvature
+    t = times.to(initial_condition).reshape((-1,) + (1,) * initial_condition.dim())
+    cs0 = curvature * (initial_condition * initial_condition).sum(dim=-1, keepdim=True)
+    q = torch.exp(-2 * a * t)
+    return initial_condition * torch.rsqrt((q * (1 - cs0) + cs0).clamp_min(1e-6))
+
+def graph_diffusion(weights: torch.Tensor,
+                    initial_condition: torch.Tensor,
+                    times: torch.Tensor,
+                    order: int = 0,
+                    eigenpairs: Optional[Tuple[torch.Tensor, torch.Tensor]] = None) -> torch.Tensor:
+    """그래프 열 확산 u(t) = exp(-tL)·u0, L = D - W 를 여러 시각에서 한 번에
+    
+    Args:
+        weights: 가중치 행렬 W [n, n] (knn_graph 의 희소 CSR 또는 조밀)
+        initial_condition: 초기 신호 [n, ...]
+        times: 확산 시각들 [T]
+        order: 체비셰프 전개 차수 (0 이면 t·λ_max 로 자동 결정)
+        eigenpairs: (고유값 [k], 고유벡터 [n, k]). 주어지면 고유기저로 계산
+                    (laplace_beltrami_eigen 결과를 재사용, k < n 이면 저주파 근사)
+        
+    Returns:
+        torch.Tensor: [T, n, ...]
+    """
+    times = torch.as_tensor(times, dtype=torch.float64).reshape(-1)
+    if eigenpairs is not None:
+        eigenvalues, eigenvectors = eigenpairs
+        if _C and not eigenvectors.is_cuda:
+            return _C.spectral_diffusion_cpu(eigenvalues, eigenvectors, initial_condition, times)
+        u0 = initial_condition.reshape(eigenvectors.size(0), -1)
+        decay = torch.exp(-times.to(eigenvalues)[:, None] * eigenvalues)
+        out = eigenvectors @ (decay[:, :, None] * (eigenvectors.t() @ u0))
+        return out.reshape((-1,) + initial_condition.shape)
+    if _C and not weights.is_cuda:
+        return _C.graph_diffusion_cpu(weights, initial_condition, times, order)
+    return _graph_diffusion_torch(weights, initial_condition, times, order)
+
+def _graph_diffusion_torch(weights, initial_condition, times, order=0):
+    """graph_diffusion_cpu 의 텐서 연산 경로"""
+    n = weights.size(0)
+    u0 = initial_condition.reshape(n, -1)
+    degree = weights @ torch.ones(n, dtype=u0.dtype, device=u0.device)
+    a = max(degree.max().item(), 1e-12)
+    tau = a * times.max().item()
+    if order <= 0:
+        order = int(math.ceil(tau + 6.0 * math.sqrt(tau))) + 16
+    angles = (2 * torch.arange(order + 1, dtype=torch.float64) + 1) * (math.pi / (2 * (order + 1)))
+    values = torch.exp(-(a * times)[:, None] * (torch.cos(angles) + 1))
+    k = torch.arange(order + 1, dtype=torch.float64)
+    scale = torch.full((order + 1,), 2.0 / (order + 1), dtype=torch.float64)
+    scale[0] = 1.0 / (order + 1)
+    coeffs = ((values @ torch.cos(k[:, None] * angles).t()) * scale).to(u0)
+    
+    apply = lambda v: (degree / a - 1)[:, None] * v - (weights @ v) / a
+    prev, curr = u0, apply(u0)
+    out = coeffs[:, 0, None, None] * prev + coeffs[:, 1, None, None] * curr
+    for i in range(2, order + 1):
+        prev, curr = curr, 2 * apply(curr) - prev
+        out = out + coeffs[:, i, None, None] * curr
+    return out.reshape((-1,) + initial_condition.shape)
 
 def geodesic_distance_matrix(points: torch.Tensor, 
-                           curvature: float = 1.0) -> torch.Tensor:
-    """지오데식 거리 행렬 계산"""
-    if _C is None:
-        warnings.warn("C++ extension not available, using PyTorch fallback")
-        return torch.cdist(points, points)
+                           curvature: float = 1.0,
+                           out: Optional[torch.Tensor] = None,
+                           callback=None,
+                           tile_size: int = 1024) -> Optional[torch.Tensor]:
+    """지오데식 거리 행렬 계산 (행 타일 단위, 교차항은 GEMM)
     
-    if HAS_CUDA and points.is_cuda:
+    Args:
+        points: 포인트들 [n, D]
+        curvature: 곡률값
+        out: 결과를 기록할 [n, n] 텐서. torch.from_file(..., shared=True) 로 만든
+             메모리 매핑 텐서를 주면 전체 행렬이 RAM 에 올라오지 않는다
+        callback: callback(row_start, tile) 로 [tile_size, n] 행 타일을 순서대로 받는다.
+                  주어지면 행렬을 만들지 않고 None 을 반환
+        tile_size: 한 번에 계산할 행 수
+        
+    Returns:
+        torch.Tensor: 거리 행렬 [n, n] (callback 사용 시 None)
+    """
+    if callback is not None:
+        n = points.size(0)
+        for start in range(0, n, tile_size):
+            rows = points[start:start + tile_size]
+            if _C and not points.is_cuda:
+                tile = _C.geodesic_distance_block_cpu(rows, points, curvature, start)
+            else:
+                tile = _geodesic_distance_block_torch(rows, points, curvature, start)
+            callback(start, tile)
+        return None
+    
+    if points.is_cuda and _library.has_cuda() and out is None:
         return _C.geodesic_distance_matrix_cuda(points, curvature)
-    else:
-        return _C.geodesic_distance_matrix_cpu(points, curvature)
+    if _C and not points.is_cuda:
+        if out is None:
+            return _C.geodesic_distance_matrix_cpu(points, curvature)
+        return _C.geodesic_distance_matrix_out_cpu(points, curvature, out, tile_size)
+    
+    result = out if out is not None else points.new_empty(points.size(0), points.size(0))
+    for start in range(0, points.size(0), tile_size):
+        rows = points[start:start + tile_size]
+        result[start:start + rows.size(0)].copy_(_geodesic_distance_block_torch(rows, points, curvature, start))
+    return result
+
+def _geodesic_distance_block_torch(rows, cols, curvature, diagonal_offset=-1):
+    """geodesic_distance_block_cpu 의 텐서 연산 경로"""
+    x_norm_sq = (rows * rows).sum(dim=1, keepdim=True)
+    y_norm_sq = (cols * cols).sum(dim=1)
+    diff_sq = (x_norm_sq + y_norm_sq - 2 * rows @ cols.t()).clamp_min(0)
+    ratio = 1 + 2 * diff_sq / ((1 - x_norm_sq) * (1 - y_norm_sq) + 1e-7)
+    block = torch.acosh(ratio.clamp(1 + 1e-7, 1e6)) / curvature ** 0.5
+    if diagonal_offset >= 0:
+        idx = torch.arange(block.size(0), device=block.device)
+        keep = idx + diagonal_offset < block.size(1)
+        block[idx[keep], idx[keep] + diagonal_offset] = 0
+    return block
 
 def spectral_normalize(adjacency_matrix: torch.Tensor) -> torch.Tensor:
     """스펙트럴 정규화"""
-    if _C is None:
+    if not _C:
         warnings.warn("C++ extension not available, using PyTorch fallback")
         row_sums = adjacency_matrix.sum(dim=1, keepdim=True)
         return adjacency_matrix / (row_sums + 1e-6)
     
-    if HAS_CUDA and adjacency_matrix.is_cuda:
+    if adjacency_matrix.is_cuda and _library.has_cuda():
         return _C.spectral_normalize_cuda(adjacency_matrix)
     else:
         return _C.spectral_normalize_cpu(adjacency_matrix)
 
 # ===== FFT 및 리만 기하학 관련 함수들 =====
 
-def hyperbolic_fft(x: torch.Tensor, curvature: float = 1.0) -> torch.Tensor:
-    """하이퍼볼릭 FFT"""
-    if _C is None:
+def hyperbolic_fft(x: torch.Tensor, curvature: float = 1.0, max_l: int = 20) -> torch.Tensor:
+    """하이퍼볼릭 FFT: 구면 조화 계수 [B, (max_l+1)²] (CUDA 커널은 max_l=20 고정)"""
+    if not _C:
         warnings.warn("C++ extension not available, using PyTorch fallback")
         return torch.fft.fft(x.float()).real
     
-    if HAS_CUDA and x.is_cuda:
+    if x.is_cuda and _library.has_cuda():
         return _C.hyperbolic_fft_cuda(x, curvature)
     else:
-        return _C.hyperbolic_fft_cpu(x, curvature)
+        return _library.call("hyperbolic_fft", x, curvature, max_l)
+
+@functools.lru_cache(maxsize=None)
+def _harmonic_tables(l_max):
+    """정규화된 르장드르 점화 계수와 출력 열 (l² + l + m) 의 모으기 색인 (l_max 별 캐시)
+
+    P̄_m^m = diag[m]·sin^m θ,  P̄_l^m = a[l, m]·(cos θ·P̄_{l-1}^m - b[l, m]·P̄_{l-2}^m)  (m < l)
+    """
+    m = torch.arange(l_max + 1, dtype=torch.float64)
+    diag = torch.cat([torch.ones(1, dtype=torch.float64),
+                      torch.cumprod(-torch.sqrt((2 * m[1:] + 1) / (2 * m[1:])), 0)]) / math.sqrt(4 * math.pi)
+    l = m.unsqueeze(1)
+    valid = m.unsqueeze(0) < l
+    zero = torch.zeros(())
+    a = torch.where(valid, torch.sqrt((4 * l * l - 1).clamp_min(0) / (l * l - m * m).clamp_min(1)), zero)
+    b = torch.where(valid, torch.sqrt(((l - 1) ** 2 - m * m).clamp_min(0) / (4 * (l - 1) ** 2 - 1).abs()), zero)
+    degree = torch.arange(l_max + 1).repeat_interleave(2 * torch.arange(l_max + 1) + 1)
+    order = torch.cat([torch.arange(-d, d + 1) for d in range(l_max + 1)])
+    return diag, a, b, degree * (l_max + 1) + order.abs(), order + l_max
+
+def _spherical_harmonics_torch(theta_phi, l_max):
+    """실수 정규직교 구면 조화 함수 [..., 2] → [..., (l_max+1)²] (m 축으로 브로드캐스트한 점화)"""
+    diag, a, b, legendre_index, trig_index = _harmonic_tables(l_max)
+    options = dict(dtype=theta_phi.dtype, device=theta_phi.device)
+    diag, a, b = diag.to(**options), a.to(**options), b.to(**options)
+    theta, phi = theta_phi[..., 0:1], theta_phi[..., 1:2]
+    cos_theta = torch.cos(theta)
+    powers = torch.cat([torch.ones_like(theta), torch.sin(theta).expand(*theta.shape[:-1], l_max)], dim=-1)
+    sectoral = diag * torch.cumprod(powers, dim=-1)
+    onehot = torch.eye(l_max + 1, **options)
+    prev, rows = torch.zeros_like(sectoral), []
+    for l in range(l_max + 1):
+        current = sectoral * onehot[l]
+        if l > 0:
+            current = current + a[l] * (cos_theta * rows[-1] - b[l] * prev)
+            prev = rows[-1]
+        rows.append(current)
+    legendre = torch.stack(rows, dim=-2).flatten(-2)
+    mphi = phi * torch.arange(1, l_max + 1, **options)
+    trig = torch.cat([math.sqrt(2) * torch.sin(mphi).flip(-1), torch.ones_like(phi),
+                      math.sqrt(2) * torch.cos(mphi)], dim=-1)
+    return (legendre.index_select(-1, legendre_index.to(theta_phi.device))
+            * trig.index_select(-1, trig_index.to(theta_phi.device)))
 
 def spherical_harmonics(theta_phi: torch.Tensor, l_max: int) -> torch.Tensor:
-    """구면 조화 함수 계산"""
-    if _C is None:
+    """실수 정규직교 구면 조화 함수: [..., 2] (θ, φ) → [..., (l_max+1)²], 열 번호 l² + l + m"""
+    if not _C:
         warnings.warn("C++ extension not available, using PyTorch fallback")
-        theta = theta_phi[:, 0]
-        phi = theta_phi[:, 1]
-        result = torch.zeros(theta_phi.size(0), (l_max + 1) ** 2, 
-                           dtype=theta_phi.dtype, device=theta_phi.device)
-        for l in range(l_max + 1):
-            for m in range(-l, l + 1):
-                idx = l * l + l + m
-                if idx < result.size(1):
-                    result[:, idx] = torch.cos(l * theta) * torch.cos(m * phi)
-        return result
-    
-    if HAS_CUDA and theta_phi.is_cuda:
-        return _C.spherical_harmonics_cuda(theta_phi, l_max)
+        return _spherical_harmonics_torch(theta_phi, l_max)
+    
+    flat = theta_phi.reshape(-1, 2)
+    if theta_phi.is_cuda and _library.has_cuda():
+        result = _C.spherical_harmonics_cuda(flat, l_max)
     else:
-        return _C.spherical_harmonics_cpu(theta_phi, l_max)
+        result = _library.call("spherical_harmonics", flat, l_max)
+    return result.reshape(*theta_phi.shape[:-1], result.size(-1))
 
 def fast_spherical_conv(f: torch.Tensor, 
                        g: torch.Tensor, 
                        curvature: float = 1.0) -> torch.Tensor:
     """빠른 구면 컨볼루션"""
-    if _C is None:
+    if not _C:
         warnings.warn("C++ extension not available, using PyTorch fallback")
         return f * g  # 요소별 곱
     
-    if HAS_CUDA and f.is_cuda:
+    if f.is_cuda and _library.has_cuda():
         return _C.fast_spherical_conv_cuda(f, g, curvature)
     else:
         return _C.fast_spherical_conv_cpu(f, g, curvature)
 
 def ricci_curvature(metric_tensor: torch.Tensor) -> torch.Tensor:
     """리치 곡률 계산"""
-    if _C is None:
+    if not _C:
         warnings.warn("C++ extension not available, using PyTorch fallback")
         return torch.full((metric_tensor.size(0),), -1.0, 
                         dtype=metric_tensor.dtype, device=metric_tensor.device)
     
-    if HAS_CUDA and metric_tensor.is_cuda:
+    if metric_tensor.is_cuda and _library.has_cuda():
         return _C.ricci_curvature_cuda(metric_tensor)
     else:
         return _C.ricci_curvature_cpu(metric_tensor)
@@ -698,11 +1099,11 @@ def parallel_transport(v: torch.Tensor,
                       path: torch.Tensor, 
                       curvature: float = 1.0) -> torch.Tensor:
     """평행 이동"""
-    if _C is None:
+    if not _C:
         warnings.warn("C++ extension not available, using PyTorch fallback")
         return v  # 동일 변환
     
-    if HAS_CUDA and v.is_cuda:
+    if v.is_cuda and _library.has_cuda():
         return _C.parallel_transport_cuda(v, path, curvature)
     else:
         return _C.parallel_transport_cpu(v, path, curvature)
@@ -712,11 +1113,11 @@ def geodesic_flow(x: torch.Tensor,
                  t: float, 
                  curvature: float = 1.0) -> torch.Tensor:
     """지오데식 플로우"""
-    if _C is None:
+    if not _C:
         warnings.warn("C++ extension not available, using PyTorch fallback")
         return x + t * v  # 선형 이동
     
-    if HAS_CUDA and x.is_cuda:
+    if x.is_cuda and _library.has_cuda():
         return _C.geodesic_flow_cuda(x, v, t, curvature)
     else:
         return _C.geodesic_flow_cpu(x, v, t, curvature)
@@ -725,13 +1126,13 @@ def riemannian_gradient(euclidean_grad: torch.Tensor,
                        x: torch.Tensor, 
                        curvature: float = 1.0) -> torch.Tensor:
     """리만 그래디언트 변환"""
-    if _C is None:
+    if not _C:
         warnings.warn("C++ extension not available, using PyTorch fallback")
         point_norm_sq = torch.sum(x * x, dim=1, keepdim=True)
         conformal_factor = torch.pow(1 - curvature * point_norm_sq, 2) / 4.0
         return euclidean_grad * conformal_factor
     
-    if HAS_CUDA and euclidean_grad.is_cuda:
+    if euclidean_grad.is_cuda and _library.has_cuda():
         return _C.riemannian_gradient_cuda(euclidean_grad, x, curvature)
     else:
         return _C.riemannian_gradient_cpu(euclidean_grad, x, curvature)
@@ -741,11 +1142,11 @@ def geodesic_sgd_step(x: torch.Tensor,
                      lr: float, 
                      curvature: float = 1.0) -> torch.Tensor:
     """지오데식 SGD 스텝"""
-    if _C is None:
+    if not _C:
         warnings.warn("C++ extension not available, using PyTorch fallback")
         return x - lr * grad  # 일반 SGD
     
-    if HAS_CUDA and x.is_cuda:
+    if x.is_cuda and _library.has_cuda():
         return _C.geodesic_sgd_step_cuda(x, grad, lr, curvature)
     else:
         return _C.geodesic_sgd_step_cpu(x, grad, lr, curvature)
@@ -754,7 +1155,7 @@ def hyperbolic_wavelet_decomposition(signal: torch.Tensor,
                                    num_levels: int, 
                                    curvature: float = 1.0) -> torch.Tensor:
     """하이퍼볼릭 웨이블릿 분해"""
-    if _C is None:
+    if not _C:
         warnings.warn("C++ extension not available, using PyTorch fallback")
         coeffs = torch.zeros_like(signal)
         current = signal.clone()
@@ -765,7 +1166,7 @@ def hyperbolic_wavelet_decomposition(signal: torch.Tensor,
         
         return coeffs
     
-    if HAS_CUDA and signal.is_cuda:
+    if signal.is_cuda and _library.has_cuda():
         return _C.hyperbolic_wavelet_decomposition_cuda(signal, num_levels, curvature)
     else:
         return _C.hyperbolic_wavelet_decomposition_cpu(signal, num_levels, curvature)
@@ -774,11 +1175,11 @@ def frequency_domain_filter(signal: torch.Tensor,
                            filter_coeffs: torch.Tensor, 
                            curvature: float = 1.0) -> torch.Tensor:
     """주파수 도메인 필터링"""
-    if _C is None:
+    if not _C:
         warnings.warn("C++ extension not available, using PyTorch fallback")
         return signal * filter_coeffs.unsqueeze(0)
     
-    if HAS_CUDA and signal.is_cuda:
+    if signal.is_cuda and _library.has_cuda():
         return _C.frequency_domain_filter_cuda(signal, filter_coeffs, curvature)
     else:
         return _C.frequency_domain_filter_cpu(signal, filter_coeffs, curvature)
@@ -788,20 +1189,20 @@ def frequency_domain_filter(signal: torch.Tensor,
 def hyperbolic_regularization(
     x: torch.Tensor,
     weights: torch.Tensor,
-    curvature: float,
+    curvature: Union[float, torch.Tensor],
     lambda_boundary: float = 1.0,
     lambda_curvature: float = 0.1,
     lambda_geodesic: float = 0.01
 ) -> torch.Tensor:
     """하이퍼볼릭 정규화 (경계, 곡률, 측지선 분산 포함)"""
-    if _C is None:
+    if not _C:
         warnings.warn("C++ extension not available, using simplified regularization")
         boundary_loss = torch.sum(torch.clamp(torch.norm(x, dim=-1) - 0.95, min=0) ** 2)
         curvature_loss = torch.mean((curvature - 1.0) ** 2)
         geodesic_loss = torch.var(torch.norm(x, dim=-1))
         return lambda_boundary * boundary_loss + lambda_curvature * curvature_loss + lambda_geodesic * geodesic_loss
     
-    if HAS_CUDA and x.is_cuda:
+    if x.is_cuda and _library.has_cuda():
         return _C.combined_reg(x, weights, curvature, lambda_boundary, lambda_curvature, lambda_geodesic)
     else:
         warnings.warn("CUDA not available, using CPU fallback for regularization")
@@ -809,11 +1210,11 @@ def hyperbolic_regularization(
 
 def dynamic_curvature_prediction(x: torch.Tensor, base_curvature: float = 1.0) -> torch.Tensor:
     """동적 곡률 예측"""
-    if _C is None:
+    if not _C:
         warnings.warn("C++ extension not available, using constant curvature")
         return torch.full((x.size(0), 1), base_curvature, device=x.device)
     
-    if HAS_CUDA and x.is_cuda:
+    if x.is_cuda and _library.has_cuda():
         features = torch.norm(x, 2, dim=-1, keepdim=True)
         weight = torch.randn(1, 1, device=x.device) * 0.1
         bias = torch.zeros(1, device=x.device)
@@ -829,7 +1230,7 @@ def fused_hyperbolic_linear(
     curvature: float = 1.0
 ) -> torch.Tensor:
     """융합된 하이퍼볼릭 선형 변환"""
-    if _C is None:
+    if not _C:
         warnings.warn("C++ extension not available, using standard operations")
         linear_out = F.linear(x, weight, bias)
         return torch.tanh(linear_out * torch.sqrt(torch.tensor(curvature)))
@@ -885,17 +1286,17 @@ def create_advanced_config(
 def get_available_features() -> dict:
     """사용 가능한 고급 기능들 확인"""
     features = {
-        "c_extension": _C is not None,
-        "cuda_support": HAS_CUDA,
+        "c_extension": bool(_C),
+        "cuda_support": _library.has_cuda(),
         "regularization": True,
-        "dynamic_curvature": HAS_CUDA,
-        "fused_ops": _C is not None,
-        "geodesic_activation": HAS_CUDA,
-        "chebyshev_approximation": _C is not None,
-        "laplace_beltrami": _C is not None,
-        "hyperbolic_fft": _C is not None,
-        "spherical_harmonics": _C is not None,
-        "riemannian_geometry": _C is not None
+        "dynamic_curvature": _library.has_cuda(),
+        "fused_ops": bool(_C),
+        "geodesic_activation": _library.has_cuda(),
+        "chebyshev_approximation": bool(_C),
+        "laplace_beltrami": bool(_C),
+        "hyperbolic_fft": bool(_C),
+        "spherical_harmonics": bool(_C),
+        "riemannian_geometry": bool(_C)
     }
     
     return features
@@ -909,7 +1310,7 @@ def benchmark_advanced_features(
     """고급 기능들의 성능 벤치마크"""
     results = {}
     
-    if _C is not None:
+    if _C:
         # 체비셰프 근사 벤치마크
         import time
         start_time = time.time()
@@ -0,0 +1,517 @@
+"""
+Reality Stone Nearest-Neighbour Index
+포인카레 / 로렌츠 점 집합 위의 최근접 이웃 인덱스 (정확: VP-트리, 근사: HNSW)
+"""
+
+import math
+import torch
+import warnings
+from typing import List, Tuple
+
+from . import library as _library
+
+# C++ 확장은 처음 쓸 때 불러온다 (bool(_C) 는 확장을 쓸 수 있는지)
+_C = _library.extension
+
+MODELS = ("poincare", "lorentz")
+
+
+def _pairwise_distance_torch(queries, points, model, c):
+    """[Q, D] × [N, D] 측지 거리 행렬 (float64, fallback 용)"""
+    q, p = queries.double(), points.double()
+    sqrt_c = c ** 0.5
+    if model == "poincare":
+        diff = torch.cdist(q, p, compute_mode="donot_use_mm_for_euclid_dist").pow(2)
+        denom = ((1 - c * q.pow(2).sum(-1, keepdim=True)) * (1 - c * p.pow(2).sum(-1))).clamp_min(1e-15)
+        return torch.acosh(1 + 2 * c * diff / denom) / sqrt_c
+    inner = q[:, :1] * p[:, 0] - q[:, 1:] @ p[:, 1:].t()
+    return torch.acosh((c * inner).clamp_min(1.0)) / sqrt_c
+
+
+def _grow(tensor, rows, fill):
+    """용량이 rows 보다 작으면 두 배씩 늘린 새 텐서로 복사"""
+    if tensor.size(0) >= rows:
+        return tensor
+    grown = torch.full((max(rows, 2 * tensor.size(0), 1024),) + tuple(tensor.shape[1:]), fill,
+                       dtype=tensor.dtype)
+    grown[:tensor.size(0)] = tensor
+    return grown
+
+
+class VPTreeIndex:
+    """정확한 k-최근접 이웃 / 반경 질의 인덱스
+
+    points [N, D] 위에 VP-트리를 만들고 삼각 부등식으로 가지치기한 배치 질의를 한다.
+      poincare: d = acosh(1 + 2c|x-y|² / ((1-c|x|²)(1-c|y|²))) / √c
+      lorentz : d = acosh(c·<x,y>_L) / √c,  <x,y>_L = x0·y0 - Σ xi·yi,  <x,x>_L = 1/c
+    트리는 CPU 에 두고, 결과는 쿼리와 같은 장치로 돌려준다. save / load 로 저장할 수 있다.
+    """
+
+    def __init__(self, points: torch.Tensor, model: str = "poincare", c: float = 1.0,
+                 leaf_size: int = 16, seed: int = 0):
+        if model not in MODELS:
+            raise ValueError(f"model must be one of {MODELS}, got '{model}'")
+        self.model = model
+        self.c = float(c)
+        self.leaf_size = int(leaf_size)
+        points = points.detach().cpu()
+        if not _C:
+            warnings.warn("C++ extension not available, using brute-force PyTorch fallback")
+            self.order = torch.arange(points.size(0))
+            self.bounds = None
+        else:
+            self.order, self.bounds = _C.vp_tree_build_cpu(points, model, self.c, self.leaf_size, seed)
+        # 노드가 연속 구간이 되도록 트리 순서로 정렬해 보관
+        self.points = points[self.order].contiguous()
+
+    def __len__(self) -> int:
+        return self.points.size(0)
+
+    def _prepare(self, queries):
+        single = queries.dim() == 1
+        q = queries.detach().cpu().reshape(-1, self.points.size(1))
+        return q, single
+
+    def search(self, queries: torch.Tensor, k: int) -> Tuple[torch.Tensor, torch.Tensor]:
+        """정확한 k-최근접 이웃: (거리 [Q, k], 색인 [Q, k]), 거리 오름차순
+
+        점이 k 개보다 적으면 남는 자리는 거리 inf, 색인 -1.
+        """
+        q, single = self._prepare(queries)
+        if not _C or self.bounds is None:
+            distances, indices = self._search_torch(q, k)
+        else:
+            distances, indices = _C.vp_tree_knn_cpu(self.points, self.order, self.bounds, q, k,
+                                                   self.model, self.c, self.leaf_size)
+        distances = distances.to(device=queries.device, dtype=queries.dtype)
+        indices = indices.to(queries.device)
+        return (distances[0], indices[0]) if single else (distances, indices)
+
+    def radius_search(self, queries: torch.Tensor,
+                      radius: float) -> Tuple[List[torch.Tensor], List[torch.Tensor]]:
+        """거리 ≤ radius 인 모든 점: 쿼리별 (거리, 색인) 텐서 리스트, 거리 오름차순"""
+        q, single = self._prepare(queries)
+        if not _C or self.bounds is None:
+            offsets, distances, indices = self._radius_torch(q, radius)
+        else:
+            offsets, distances, indices = _C.vp_tree_radius_cpu(self.points, self.order, self.bounds, q,
+                                                                float(radius), self.model, self.c,
+                                                                self.leaf_size)
+        counts = (offsets[1:] - offsets[:-1]).tolist()
+        distances = list(distances.to(device=queries.device, dtype=queries.dtype).split(counts))
+        indices = list(indices.to(queries.device).split(counts))
+        return (distances[0], indices[0]) if single else (distances, indices)
+
+    def _search_torch(self, q, k):
+        dist = _pairwise_distance_torch(q, self.points, self.model, self.c)
+        kk = min(k, dist.size(1))
+        values, positions = dist.topk(kk, dim=1, largest=False)
+        distances = torch.full((q.size(0), k), float("inf"), dtype=torch.float64)
+        indices = torch.full((q.size(0), k), -1, dtype=torch.long)
+        distances[:, :kk] = values
+        indices[:, :kk] = self.order[positions]
+        return distances, indices
+
+    def _radius_torch(self, q, radius):
+        dist = _pairwise_distance_torch(q, self.points, self.model, self.c)
+        values, positions = dist.sort(dim=1)
+        mask = values <= radius
+        offsets = torch.cat([torch.zeros(1, dtype=torch.long), mask.sum(1).cumsum(0)])
+        return offsets, values[mask], self.order[positions[mask]]
+
+    def state_dict(self) -> dict:
+        return {
+            "model": self.model,
+            "c": self.c,
+            "leaf_size": self.leaf_size,
+            "points": self.points,
+            "order": self.order,
+            "bounds": self.bounds,
+        }
+
+    def save(self, path) -> None:
+        """인덱스를 파일로 저장 (torch.save)"""
+        torch.save(self.state_dict(), path)
+
+    @classmethod
+    def from_state_dict(cls, state: dict) -> "VPTreeIndex":
+        index = cls.__new__(cls)
+        index.model = state["model"]
+        index.c = float(state["c"])
+        index.leaf_size = int(state["leaf_size"])
+        index.points = state["points"]
+        index.order = state["order"]
+        index.bounds = state["bounds"]
+        return index
+
+    @classmethod
+    def load(cls, path) -> "VPTreeIndex":
+        """save 로 저장한 인덱스 불러오기 (다시 빌드하지 않음)"""
+        return cls.from_state_dict(torch.load(path, map_location="cpu"))
+
+
+class HNSWIndex:
+    """근사 k-최근접 이웃 그래프 인덱스 (HNSW)
+
+    포인카레 / 로렌츠 측지 거리 위의 계층 그래프. add 로 점을 계속 더할 수 있고 (노드 병렬 삽입),
+    search 는 탐색 폭 ef 로 정확도와 지연 시간을 조절한다. 결과 색인은 add 순서의 노드 번호.
+      M               : 위층 이웃 수 (층 0 은 2M)
+      ef_construction : 삽입 시 탐색 폭
+      ef              : 질의 기본 탐색 폭
+    그래프는 CPU 텐서로 두고, save / load 로 저장한다 (load(mmap=True) 는 파일을 메모리 매핑).
+    """
+
+    def __init__(self, dim: int, model: str = "poincare", c: float = 1.0, M: int = 16,
+                 ef_construction: int = 200, ef: int = 64, seed: int = 0,
+                 dtype: torch.dtype = torch.float32):
+        if model not in MODELS:
+            raise ValueError(f"model must be one of {MODELS}, got '{model}'")
+        if M < 2:
+            raise ValueError(f"M must be at least 2, got {M}")
+        self.dim = int(dim)
+        self.model = model
+        self.c = float(c)
+        self.M = int(M)
+        self.ef_construction = int(ef_construction)
+        self.ef = int(ef)
+        self.count = 0
+        self.entry_point = -1
+        self.upper_rows = 0
+        self.generator = torch.Generator().manual_seed(seed)
+        self.points = torch.empty(0, self.dim, dtype=dtype)
+        self.levels = torch.empty(0, dtype=torch.long)
+        self.upper_start = torch.empty(0, dtype=torch.long)
+        self.graph0 = torch.empty(0, 2 * self.M, dtype=torch.int32)
+        self.upper = torch.empty(0, self.M, dtype=torch.int32)
+
+    def __len__(self) -> int:
+        return self.count
+
+    def _draw_levels(self, n):
+        """층 ~ floor(-ln U / ln M) (위층일수록 노드가 M 배씩 줄어든다)"""
+        u = torch.rand(n, generator=self.generator, dtype=torch.float64).clamp_min(1e-300)
+        return (-u.log() / math.log(self.M)).floor().long()
+
+    def add(self, points: torch.Tensor) -> torch.Tensor:
+        """점 [N, D] 를 삽입하고 새 노드 번호 [N] 를 반환"""
+        points = points.detach().cpu().reshape(-1, self.dim).to(self.points.dtype)
+        n = points.size(0)
+        start, end = self.count, self.count + n
+        levels = self._draw_levels(n)
+        upper_start = self.upper_rows + torch.cumsum(levels, 0) - levels
+        rows = self.upper_rows + int(levels.sum())
+
+        self.points = _grow(self.points, end, 0)
+        self.levels = _grow(self.levels, end, 0)
+        self.upper_start = _grow(self.upper_start, end, 0)
+        self.graph0 = _grow(self.graph0, end, -1)
+        self.upper = _grow(self.upper, rows, -1)
+        self.points[start:end] = points
+        self.levels[start:end] = levels
+        self.upper_start[start:end] = upper_start
+
+        if _C and n > 0:
+            self.entry_point = _C.hnsw_insert_cpu(self.points, self.levels, self.upper_start, self.graph0,
+                                                  self.upper, start, end, self.entry_point,
+                                                  self.ef_construction, self.model, self.c)
+        elif n > 0 and self.entry_point < 0:
+            warnings.warn("C++ extension not available, using brute-force PyTorch fallback")
+            self.entry_point = start
+        self.count = end
+        self.upper_rows = rows
+        return torch.arange(start, end)
+
+    def search(self, queries: torch.Tensor, k: int,
+               ef: int = None) -> Tuple[torch.Tensor, torch.Tensor]:
+        """근사 k-최근접 이웃: (거리 [Q, k], 노드 번호 [Q, k]), 거리 오름차순
+
+        ef (기본 self.ef) 가 클수록 재현율이 오르고 느려진다. 찾은 노드가 k 개보다 적으면 inf / -1.
+        """
+        single = queries.dim() == 1
+        q = queries.detach().cpu().reshape(-1, self.dim)
+        if not _C:
+            distances, indices = self._search_torch(q, k)
+        else:
+            distances, indices = _C.hnsw_search_cpu(self.points, self.levels, self.upper_start, self.graph0,
+                                                    self.upper, self.entry_point, q, k,
+                                                    self.ef if ef is None else int(ef), self.model, self.c)
+        distances = distances.to(device=queries.device, dtype=queries.dtype)
+        indices = indices.to(queries.device)
+        return (distances[0], indices[0]) if single else (distances, indices)
+
+    def _search_torch(self, q, k):
+        dist = _pairwise_distance_torch(q, self.points[:self.count], self.model, self.c)
+        kk = min(k, dist.size(1))
+        distances = torch.full((q.size(0), k), float("inf"), dtype=torch.float64)
+        indices = torch.full((q.size(0), k), -1, dtype=torch.long)
+        distances[:, :kk], indices[:, :kk] = dist.topk(kk, dim=1, largest=False)
+        return distances, indices
+
+    def state_dict(self) -> dict:
+        n = self.count
+        return {
+            "model": self.model,
+            "c": self.c,
+            "M": self.M,
+            "ef_construction": self.ef_construction,
+            "ef": self.ef,
+            "entry_point": self.entry_point,
+            "generator": self.generator.get_state(),
+            "points": self.points[:n].clone(),
+            "levels": self.levels[:n].clone(),
+            "upper_start": self.upper_start[:n].clone(),
+            "graph0": self.graph0[:n].clone(),
+            "upper": self.upper[:self.upper_rows].clone(),
+        }
+
+    def save(self, path) -> None:
+        """인덱스를 파일로 저장 (torch.save, 용량 여유분은 빼고)"""
+        torch.save(self.state_dict(), path)
+
+    @classmethod
+    def from_state_dict(cls, state: dict) -> "HNSWIndex":
+        points = state["points"]
+        index = cls(points.size(1), state["model"], state["c"], state["M"], state["ef_construction"],
+                    state["ef"], dtype=points.dtype)
+        index.generator.set_state(state["generator"])
+        index.entry_point = int(state["entry_point"])
+        index.count = points.size(0)
+        index.upper_rows = state["upper"].size(0)
+        index.points = points
+        index.levels = state["levels"]
+        index.upper_start = state["upper_start"]
+        index.graph0 = state["graph0"]
+        index.upper = state["upper"]
+        return index
+
+    @classmethod
+    def load(cls, path, mmap: bool = False) -> "HNSWIndex":
+        """save 로 저장한 인덱스 불러오기. mmap=True 면 텐서를 파일에서 직접 매핑한다"""
+        return cls.from_state_dict(torch.load(path, map_location="cpu", mmap=mmap))
+
+
+def _assign(vectors, codebooks, chunk=65536):
+    """부분 공간별 가장 가까운 중심 번호: vectors [N, D], codebooks [M, K, ds] -> [N, M] uint8"""
+    if _C:
+        return _C.pq_encode_cpu(vectors, codebooks)
+    M, _, ds = codebooks.shape
+    c_sq = codebooks.pow(2).sum(-1).unsqueeze(1)
+    parts = [torch.baddbmm(c_sq, part.reshape(-1, M, ds).transpose(0, 1), codebooks.transpose(1, 2),
+                           alpha=-2).argmin(-1).t() for part in vectors.split(chunk)]
+    return torch.cat(parts).to(torch.uint8) if parts else torch.empty(0, M, dtype=torch.uint8)
+
+
+def _kmeans(vectors, num_subspaces, k, iters, generator):
+    """부분 공간별 k-평균 (Lloyd): vectors [n, D] -> 중심 [M, k, ds]. 빈 군집은 이전 중심 유지"""
+    n = vectors.size(0)
+    data = vectors.reshape(n, num_subspaces, -1).transpose(0, 1)
+    M, _, ds = data.shape
+    centroids = data[:, torch.randperm(n, generator=generator)[:k]].contiguous()
+    for _ in range(iters):
+        assign = _assign(vectors, centroids).t().long()
+        sums = torch.zeros_like(centroids).scatter_add_(1, assign.unsqueeze(-1).expand(-1, -1, ds), data)
+        counts = torch.zeros(M, k, dtype=data.dtype).scatter_add_(1, assign, torch.ones_like(data[..., 0]))
+        centroids = torch.where((counts > 0).unsqueeze(-1), sums / counts.clamp_min(1).unsqueeze(-1), centroids)
+    return centroids
+
+
+class QuantizedPoincareStore:
+    """양자화된 포인카레 임베딩 저장소 (반지름 스칼라 양자화 + 방향 곱 양자화)
+
+    점 x = r·u 를 쌍곡 반지름 ρ = 2·artanh(√c·r)/√c 의 단계 번호 1 바이트와 단위 방향 u 의 부분 공간별
+    중심 번호 num_subspaces 바이트로 저장한다 (D=64, 8 부분 공간이면 점당 9 바이트, fp32 의 1/28).
+    반지름 단계는 학습 데이터 ρ 의 분위수라 경계 근처에 몰린 점들도 고르게 구분된다.
+    search 는 쿼리별 조회표 [M, K] 로 코드에서 바로 근사 거리를 계산해 후보를 고르고, 원래 좌표
+    (keep_vectors=True 로 보관했거나 search 에 넘긴 vectors, 예: 메모리 매핑 텐서) 가 있으면 정확한 거리로 다시 정렬한다.
+    """
+
+    def __init__(self, dim: int, c: float = 1.0, num_subspaces: int = 8, num_centroids: int = 256,
+                 radius_levels: int = 256, keep_vectors: bool = False):
+        if dim % num_subspaces != 0:
+            raise ValueError(f"dim ({dim}) must be divisible by num_subspaces ({num_subspaces})")
+        if not 1 <= num_centroids <= 256 or not 2 <= radius_levels <= 256:
+            raise ValueError("num_centroids must be in [1, 256] and radius_levels in [2, 256]")
+        self.dim = int(dim)
+        self.c = float(c)
+        self.num_subspaces = int(num_subspaces)
+        self.num_centroids = int(num_centroids)
+        self.num_radius_levels = int(radius_levels)
+        self.keep_vectors = keep_vectors
+        self.count = 0
+        self.codebooks = None
+        self.radius_levels = None
+        self.rho_levels = None
+        self.codes = torch.empty(0, self.num_subspaces, dtype=torch.uint8)
+        self.radius_codes = torch.empty(0, dtype=torch.uint8)
+        self.vectors = torch.empty(0, self.dim) if keep_vectors else None
+
+    def __len__(self) -> int:
+        return self.count
+
+    @property
+    def is_trained(self) -> bool:
+        return self.codebooks is not None
+
+    @property
+    def nbytes(self) -> int:
+        """코드와 코드북이 차지하는 바이트 수 (보관한 원래 좌표 제외)"""
+        n = self.count * (self.num_subspaces + 1)
+        if self.is_trained:
+            n += self.codebooks.numel() * 4 + self.radius_levels.numel() * 4
+        return n
+
+    def _split(self, points):
+        """쌍곡 반지름 ρ [N] 와 단위 방향 [N, D]"""
+        x = points.detach().cpu().reshape(-1, self.dim).float()
+        sqrt_c = self.c ** 0.5
+        norm = x.norm(dim=1)
+        rho = 2 * torch.atanh((sqrt_c * norm).clamp_max(1 - 1e-7)) / sqrt_c
+        return rho, x / norm.clamp_min(1e-12).unsqueeze(1)
+
+    def train(self, points: torch.Tensor, iters: int = 20, sample: int = 65536,
+              seed: int = 0) -> "QuantizedPoincareStore":
+        """최대 sample 개의 점으로 반지름 단계와 방향 코드북 학습"""
+        generator = torch.Generator().manual_seed(seed)
+        points = points.detach().cpu().reshape(-1, self.dim)
+        if points.size(0) > sample:
+            points = points[torch.randperm(points.size(0), generator=generator)[:sample]]
+        rho, direction = self._split(points)
+        quantiles = torch.linspace(0, 1, self.num_radius_levels, dtype=torch.float64)
+        levels = torch.quantile(rho.double(), quantiles).unique()
+        sqrt_c = self.c ** 0.5
+        self.radius_levels = (torch.tanh(sqrt_c * levels / 2) / sqrt_c).float()
+        self.rho_levels = levels.float()
+        k = min(self.num_centroids, points.size(0))
+        self.codebooks = _kmeans(direction, self.num_subspaces, k, iters, generator)
+        return self
+
+    def encode(self, points: torch.Tensor) -> Tuple[torch.Tensor, torch.Tensor]:
+        """점 [N, D] -> (방향 코드 [N, M] uint8, 반지름 코드 [N] uint8)"""
+        if not self.is_trained:
+            raise RuntimeError("store is not trained; call train() or add() first")
+        rho, direction = self._split(points)
+        levels = self.rho_levels
+        radius_codes = torch.bucketize(rho, (levels[1:] + levels[:-1]) / 2).to(torch.uint8)
+        return _assign(direction, self.codebooks), radius_codes
+
+    def add(self, points: torch.Tensor) -> torch.Tensor:
+        """점 [N, D] 를 인코딩해 추가하고 번호 [N] 를 반환 (학습 전이면 이 점들로 먼저 학습)"""
+        points = points.detach().cpu().reshape(-1, self.dim)
+        if not self.is_trained:
+            self.train(points)
+        codes, radius_codes = self.encode(points)
+        start, end = self.count, self.count + points.size(0)
+        self.codes = _grow(self.codes, end, 0)
+        self.radius_codes = _grow(self.radius_codes, end, 0)
+        self.codes[start:end] = codes
+        self.radius_codes[start:end] = radius_codes
+        if self.keep_vectors:
+            self.vectors = _grow(self.vectors, end, 0)
+            self.vectors[start:end] = points
+        self.count = end
+        return torch.arange(start, end)
+
+    def decode(self, ids: torch.Tensor = None) -> torch.Tensor:
+        """코드에서 복원한 근사 점 [n, D] (ids 가 없으면 전체)"""
+        codes = self.codes[:self.count] if ids is None else self.codes[ids]
+        radius_codes = self.radius_codes[:self.count] if ids is None else self.radius_codes[ids]
+        parts = [self.codebooks[m][codes[:, m].long()] for m in range(self.num_subspaces)]
+        direction = torch.cat(parts, dim=1)
+        direction = direction / direction.norm(dim=1, keepdim=True).clamp_min(1e-12)
+        return direction * self.radius_levels[radius_codes.long()].unsqueeze(1)
+
+    def search(self, queries: torch.Tensor, k: int, rerank: int = None,
+               vectors: torch.Tensor = None) -> Tuple[torch.Tensor, torch.Tensor]:
+        """근사 k-최근접 이웃: (거리 [Q, k], 번호 [Q, k]), 거리 오름차순
+
+        원래 좌표가 있으면 코드로 rerank 개 (기본 4k) 후보를 고른 뒤 정확한 거리로 다시 정렬하고,
+        없으면 근사 거리를 그대로 돌려준다. 점이 k 개보다 적으면 inf / -1.
+        """
+        single = queries.dim() == 1
+        q = queries.detach().cpu().reshape(-1, self.dim)
+        vectors = vectors if vectors is not None else (self.vectors[:self.count] if self.keep_vectors else None)
+        candidates = k if vectors is None else max(k, 4 * k if rerank is None else int(rerank))
+        if not self.is_trained:
+            distances = torch.full((q.size(0), candidates), float("inf"), dtype=torch.float64)
+            indices = torch.full((q.size(0), candidates), -1, dtype=torch.long)
+        elif not _C:
+            distances, indices = self._search_torch(q, candidates)
+        else:
+            distances, indices = _C.pq_search_cpu(self.codes[:self.count], self.radius_codes[:self.count],
+                                                  self.codebooks, self.radius_levels, q, candidates, self.c)
+        if vectors is not None:
+            distances, indices = self._rerank(q, vectors, indices, k)
+        distances = distances.to(device=queries.device, dtype=queries.dtype)
+        indices = indices.to(queries.device)
+        return (distances[0], indices[0]) if single else (distances, indices)
+
+    def _rerank(self, q, vectors, candidates, k):
+        """후보의 정확한 포인카레 거리로 다시 정렬해 k 개"""
+        valid = candidates >= 0
+        x = q.double().unsqueeze(1)
+        y = vectors[candidates.clamp_min(0)].double()
+        c = self.c
+        denom = ((1 - c * x.pow(2).sum(-1)) * (1 - c * y.pow(2).sum(-1))).clamp_min(1e-15)
+        exact = torch.acosh(1 + 2 * c * (x - y).pow(2).sum(-1) / denom) / c ** 0.5
+        exact = exact.masked_fill(~valid, float("inf"))
+        distances, order = exact.topk(k, dim=1, largest=False)
+        return distances, candidates.gather(1, order)
+
+    def _search_torch(self, q, k):
+        c = self.c
+        x = q.float()
+        xn = x.norm(dim=1, keepdim=True)
+        _, direction = self._split(x)
+        parts = direction.view(-1, self.num_subspaces, self.dim // self.num_subspaces).transpose(0, 1)
+        lut = torch.bmm(parts, self.codebooks.transpose(1, 2))
+        codes = self.codes[:self.count].long()
+        centroid_sq = self.codebooks.pow(2).sum(-1)
+        norm_sq = sum(centroid_sq[m][codes[:, m]] for m in range(self.num_subspaces))
+        ip = sum(lut[m][:, codes[:, m]] for m in range(self.num_subspaces)) / norm_sq.clamp_min(1e-12).sqrt()
+        r = self.radius_levels[self.radius_codes[:self.count].long()].unsqueeze(0)
+        sq = (xn.pow(2) + r.pow(2) - 2 * xn * r * ip).clamp_min(0)
+        key = 1 + 2 * c * sq / ((1 - c * xn.pow(2)) * (1 - c * r.pow(2))).clamp_min(1e-6)
+        kk = min(k, key.size(1))
+        distances = torch.full((q.size(0), k), float("inf"), dtype=torch.float64)
+        indices = torch.full((q.size(0), k), -1, dtype=torch.long)
+        values, indices[:, :kk] = key.topk(kk, dim=1, largest=False)
+        distances[:, :kk] = torch.acosh(values.double()) / c ** 0.5
+        return distances, indices
+
+    def state_dict(self) -> dict:
+        n = self.count
+        return {
+            "dim": self.dim,
+            "c": self.c,
+            "num_subspaces": self.num_subspaces,
+            "num_centroids": self.num_centroids,
+            "num_radius_levels": self.num_radius_levels,
+            "codebooks": self.codebooks,
+            "radius_levels": self.radius_levels,
+            "rho_levels": self.rho_levels,
+            "codes": self.codes[:n].clone(),
+            "radius_codes": self.radius_codes[:n].clone(),
+            "vectors": self.vectors[:n].clone() if self.keep_vectors else None,
+        }
+
+    def save(self, path) -> None:
+        """코드북과 코드를 파일로 저장 (torch.save)"""
+        torch.save(self.state_dict(), path)
+
+    @classmethod
+    def from_state_dict(cls, state: dict) -> "QuantizedPoincareStore":
+        store = cls(state["dim"], state["c"], state["num_subspaces"], state["num_centroids"],
+                    state["num_radius_levels"], keep_vectors=state["vectors"] is not None)
+        store.codebooks = state["codebooks"]
+        store.radius_levels = state["radius_levels"]
+        store.rho_levels = state["rho_levels"]
+        store.codes = state["codes"]
+        store.radius_codes = state["radius_codes"]
+        store.vectors = state["vectors"]
+        store.count = store.codes.size(0)
+        return store
+
+    @classmethod
+    def load(cls, path, mmap: bool = False) -> "QuantizedPoincareStore":
+        """save 로 저장한 저장소 불러오기. mmap=True 면 코드를 파일에서 직접 매핑한다"""
+        return cls.from_state_dict(torch.load(path, map_location="cpu", mmap=mmap))
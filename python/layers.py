@@ -12,7 +12,7 @@ import math
 from .advanced import (
     AdvancedConfig, 
     predict_dynamic_curvature, dynamic_mobius_add,
-    hyperbolic_regularization, geodesic_activation, einstein_midpoint,
+    hyperbolic_regularization, geodesic_activation, einstein_midpoint, multi_geodesic_mixing,
     hyperbolic_linear_fused, transform_regularize_fused, fix_mnist_nan
 )
 
@@ -84,11 +84,10 @@ class HyperbolicLinearAdvanced(nn.Module):
             torch.Tensor: 출력 텐서 [B, D_out]
         """
         if self.config.enable_dynamic_curvature:
-            curvatures = self.dynamic_curvature(x)
-            # 배치별 동적 곡률 사용 (간단화: 평균 사용)
-            curvature = curvatures.mean().item()
+            # 배치별 동적 곡률 [B] 을 그대로 사용 (디바이스/그래프 밖으로 꺼내지 않음)
+            curvature = self.dynamic_curvature(x)
         else:
-            curvature = self.curvature.item()
+            curvature = self.curvature
             
         # Fused 연산 사용
         if self.config.enable_fused_ops:
@@ -108,7 +107,8 @@ class HyperbolicLinearAdvanced(nn.Module):
         if not self.config.enable_regularization:
             return torch.tensor(0.0, device=x.device)
             
-        curvature = self.curvature.item() if hasattr(self, 'curvature') else self.config.base_curvature
+        # 고정 곡률이면 등록된 curvature 버퍼 텐서를 그대로 넘긴다 (.item() 동기화 없음)
+        curvature = getattr(self, 'curvature', self.config.base_curvature)
         
         return hyperbolic_regularization(
             x, self.weight, curvature,
@@ -142,7 +142,7 @@ class GeodesicActivationLayer(nn.Module):
         Returns:
             torch.Tensor: 활성화된 텐서 [B, D]
         """
-        return geodesic_activation(x, self.anchors, self.t_values, self.anchor_weights, self.curvature)
+        return multi_geodesic_mixing(x, self.anchors, self.t_values, self.anchor_weights, self.curvature)
 
 class RegularizedHyperbolicLayer(nn.Module):
     """정규화가 적용된 하이퍼볼릭 레이어"""
@@ -262,11 +262,11 @@ class DynamicCurvatureMLP(nn.Module):
         # 동적 곡률 예측
         curvatures = self.curvature_predictor(x)
         
-        # 첫 번째 레이어 (동적 곡률 사용)
-        h1 = hyperbolic_linear_fused(x, self.weight1, self.bias1, curvatures.mean().item())
+        # 첫 번째 레이어 (샘플별 동적 곡률 사용)
+        h1 = hyperbolic_linear_fused(x, self.weight1, self.bias1, curvatures)
         
         # 두 번째 레이어
-        output = hyperbolic_linear_fused(h1, self.weight2, self.bias2, curvatures.mean().item())
+        output = hyperbolic_linear_fused(h1, self.weight2, self.bias2, curvatures)
         
         return output
 
@@ -296,6 +296,64 @@ class FusedHyperbolicLayer(nn.Module):
         """
         return hyperbolic_linear_fused(x, self.weight, self.bias, self.curvature)
 
+class HyperbolicEmbedding(nn.Module):
+    """포인카레 공 / 로렌츠 쌍곡면 위의 임베딩 테이블
+
+    sparse=True 면 역전파가 조회한 행만 담은 희소 그래디언트를 내고, reality_stone.optim 의
+    RiemannianSGD / RiemannianAdagrad 가 건드린 행만 지수 사상으로 갱신한다.
+
+        emb = HyperbolicEmbedding(num_nodes, 10)
+        opt = RiemannianAdagrad([emb.param_group()], lr=0.1)
+    """
+
+    def __init__(self,
+                 num_embeddings: int,
+                 embedding_dim: int,
+                 manifold: str = "poincare",
+                 curvature: float = 1.0,
+                 init_range: float = 1e-3,
+                 sparse: bool = True):
+        super().__init__()
+        if manifold not in ("poincare", "lorentz"):
+            raise ValueError(f"manifold must be 'poincare' or 'lorentz', got {manifold!r}")
+        self.num_embeddings = num_embeddings
+        self.embedding_dim = embedding_dim
+        self.manifold = manifold
+        self.curvature = curvature
+        self.sparse = sparse
+
+        # 로렌츠 점은 시간 성분 x0 를 하나 더 가진다
+        width = embedding_dim + 1 if manifold == "lorentz" else embedding_dim
+        self.weight = nn.Parameter(torch.empty(num_embeddings, width))
+        self.reset_parameters(init_range)
+
+    @torch.no_grad()
+    def reset_parameters(self, init_range: float = 1e-3):
+        """원점 근처 균등 초기화 (로렌츠는 x0 = sqrt(1/c + |xs|²) 로 쌍곡면에 올린다)"""
+        if self.manifold == "poincare":
+            nn.init.uniform_(self.weight, -init_range, init_range)
+        else:
+            space = self.weight[:, 1:]
+            nn.init.uniform_(space, -init_range, init_range)
+            self.weight[:, 0] = (1.0 / self.curvature + space.pow(2).sum(-1)).sqrt()
+
+    def param_group(self) -> dict:
+        """이 테이블의 다양체 / 곡률을 담은 리만 최적화기용 파라미터 그룹"""
+        return {"params": [self.weight], "manifold": self.manifold, "c": self.curvature}
+
+    def forward(self, indices: torch.Tensor) -> torch.Tensor:
+        """
+        Args:
+            indices: 행 번호 텐서 [*]
+        Returns:
+            torch.Tensor: 임베딩 [*, D] (로렌츠는 D = embedding_dim + 1)
+        """
+        return F.embedding(indices, self.weight, sparse=self.sparse)
+
+    def extra_repr(self) -> str:
+        return (f"{self.num_embeddings}, {self.embedding_dim}, manifold={self.manifold}, "
+                f"curvature={self.curvature}, sparse={self.sparse}")
+
 # ===============================
 # Convenience Factory Functions
 # ===============================
@@ -0,0 +1,336 @@
+"""
+Reality Stone torch.library Ops
+_C 커널을 reality_stone:: 네임스페이스의 custom op 로 등록 (스키마, fake 구현, autograd) 해
+torch.compile 이 그래프를 끊지 않고 하이퍼볼릭 모델 전체를 추적하게 한다.
+
+    out = torch.ops.reality_stone.mobius_add(x, y, 1.0)
+
+import 은 부작용이 없다: _C 는 처음 쓸 때 불러오고 (extension), 커널 심볼은 처음 조회할 때 캐시하며,
+op 등록은 첫 call() 또는 register() 에서 한 번만 한다. 첫 호출이 torch.compile 추적 중이어도
+register() 는 추적하지 않고 그 자리에서 실행되므로 (assume_constant_result) 미리 불러 둘 필요가 없다.
+
+torch.library.custom_op 가 없는 torch (< 2.4) 나 C++ 확장이 없으면 등록하지 않고,
+call() 은 _C 커널을 직접 부른다 (커널 자체가 autograd 를 지원한다).
+"""
+
+import importlib
+import threading
+from typing import Callable, NamedTuple, Optional, Tuple
+
+import torch
+
+NAMESPACE = "reality_stone"
+
+
+class _Extension:
+    """지연 로드되는 _C 확장
+
+    bool(extension) 은 확장을 불러올 수 있는지, extension.<name> 은 _C.<name> 이다.
+    모듈은 처음 쓸 때 import 하고, 조회한 심볼은 인스턴스 속성으로 캐시해 다음부터 바로 찾는다.
+    """
+
+    def __init__(self):
+        self._module = None
+        self._loaded = False
+        self._lock = threading.Lock()
+
+    def load(self):
+        """_C 모듈 (불러올 수 없으면 None)"""
+        if not self._loaded:
+            with self._lock:
+                if not self._loaded:
+                    try:
+                        self._module = importlib.import_module(f"{__package__}._C")
+                    except ImportError:
+                        self._module = None
+                    self._loaded = True
+        return self._module
+
+    def __bool__(self):
+        return self.load() is not None
+
+    def __getattr__(self, name):
+        module = self.load()
+        if module is None:
+            raise AttributeError(f"{__package__}._C is not available (requested '{name}')")
+        value = getattr(module, name)
+        setattr(self, name, value)
+        return value
+
+
+extension = _Extension()
+
+
+def enabled():
+    """custom op 를 쓸 수 있는지 (torch >= 2.4 이고 확장이 있을 때)"""
+    return hasattr(torch.library, "custom_op") and bool(extension)
+
+
+def has_cuda():
+    """확장이 CUDA 커널과 함께 빌드되었는지 (CUDA 장치는 조사하지 않는다)"""
+    return hasattr(extension, "mobius_add_cuda")
+
+
+class _OpSpec(NamedTuple):
+    """custom op 하나의 정의
+
+    name: op 이름 (torch.ops.reality_stone.<name>)
+    args: 스키마 인자 목록
+    fake: 출력 모양 함수 (FakeTensor / meta 입력으로 호출된다)
+    differentiable: 그래디언트를 받는 인자 번호
+    returns: 스키마 반환형
+    kernel: _C 커널 이름 (<kernel>_cpu / <kernel>_cuda, 기본은 name)
+    backward_kernel: 전용 역전파 커널 (<name>_backward op 로 등록, 없으면 커널의 autograd 경로로 재계산)
+    """
+    name: str
+    args: str
+    fake: Callable
+    differentiable: Tuple[int, ...]
+    returns: str = "Tensor"
+    kernel: Optional[str] = None
+    backward_kernel: Optional[str] = None
+
+
+# ===== fake (출력 모양) 함수 =====
+
+def _like(x, *args):
+    return torch.empty_like(x)
+
+
+def _last_dim(delta):
+    def fake(x, *args):
+        return x.new_empty(x.shape[:-1] + (x.size(-1) + delta,))
+    return fake
+
+
+def _pair(x, y, *args):
+    """쌍 연산 (x, y): 브로드캐스트한 모양, 승격된 dtype"""
+    return x.new_empty(torch.broadcast_shapes(x.shape, y.shape), dtype=torch.result_type(x, y))
+
+
+def _pair_column(x, y, *args):
+    """쌍 연산의 행마다 스칼라 하나 (브로드캐스트한 모양의 마지막 차원이 1)"""
+    shape = torch.broadcast_shapes(x.shape, y.shape)
+    return x.new_empty(shape[:-1] + (1,), dtype=torch.result_type(x, y))
+
+
+def _harmonics(x, *args):
+    """구면 조화 계수 [B, (l_max + 1)²] (l_max 는 마지막 인자)"""
+    return x.new_empty(x.size(0), (args[-1] + 1) ** 2)
+
+
+_SPECS = (
+    # 레이어 (전용 역전파 커널)
+    _OpSpec("poincare_ball_forward", "Tensor u, Tensor v, float c, float t", _pair, (0, 1),
+            backward_kernel="poincare_ball_backward"),
+    _OpSpec("lorentz_forward", "Tensor u, Tensor v, float c, float t", _pair, (0, 1),
+            backward_kernel="lorentz_backward"),
+    _OpSpec("klein_forward", "Tensor u, Tensor v, float c, float t", _pair, (0, 1),
+            backward_kernel="klein_backward"),
+    # 뫼비우스 연산 (곡률 텐서 [B] / [B, 1] 은 *_batched)
+    _OpSpec("mobius_add", "Tensor x, Tensor y, float c", _pair, (0, 1)),
+    _OpSpec("mobius_add_batched", "Tensor x, Tensor y, Tensor c", _pair, (0, 1, 2), kernel="mobius_add"),
+    _OpSpec("mobius_scalar", "Tensor x, float c, float r", _like, (0,)),
+    _OpSpec("mobius_scalar_batched", "Tensor x, Tensor c, float r", _like, (0, 1), kernel="mobius_scalar"),
+    # 모델 간 변환
+    _OpSpec("poincare_to_lorentz", "Tensor x, float c", _last_dim(1), (0,)),
+    _OpSpec("lorentz_to_poincare", "Tensor x, float c", _last_dim(-1), (0,)),
+    _OpSpec("poincare_to_klein", "Tensor x, float c", _like, (0,)),
+    _OpSpec("klein_to_poincare", "Tensor x, float c", _like, (0,)),
+    _OpSpec("lorentz_to_klein", "Tensor x, float c", _last_dim(-1), (0,)),
+    _OpSpec("klein_to_lorentz", "Tensor x, float c", _last_dim(1), (0,)),
+    # 로렌츠 / 클라인 연산
+    _OpSpec("lorentz_add", "Tensor x, Tensor y, float c", _pair, (0, 1)),
+    _OpSpec("lorentz_scalar", "Tensor x, float c, float r", _like, (0,)),
+    _OpSpec("lorentz_inner", "Tensor x, Tensor y", _pair_column, (0, 1)),
+    _OpSpec("lorentz_distance", "Tensor x, Tensor y, float c", _pair_column, (0, 1)),
+    _OpSpec("klein_add", "Tensor x, Tensor y, float c", _pair, (0, 1)),
+    _OpSpec("klein_scalar", "Tensor x, float c, float r", _like, (0,)),
+    _OpSpec("klein_distance", "Tensor x, Tensor y, float c", _pair_column, (0, 1)),
+    # 동적 곡률
+    _OpSpec("dynamic_mobius_add", "Tensor u, Tensor v, Tensor curvatures", _pair, (0, 1, 2)),
+    _OpSpec("dynamic_poincare_layer", "Tensor u, Tensor v, Tensor curvatures, float t", _pair, (0, 1, 2)),
+    # 스펙트럴 / 체비셰프
+    _OpSpec("chebyshev_approximation", "Tensor x, int order, float curvature", _like, (0,)),
+    _OpSpec("chebyshev_distance", "Tensor x, Tensor y, float curvature",
+            lambda x, *args: x.new_empty(x.shape[:-1]), (0, 1)),
+    _OpSpec("hyperbolic_laplacian", "Tensor f, float curvature", _like, (0,)),
+    _OpSpec("heat_kernel", "Tensor x, float t, float curvature", _like, (0,)),
+    _OpSpec("heat_kernel_times", "Tensor x, Tensor times, float curvature",
+            lambda x, times, *args: x.new_empty((times.numel(),) + x.shape), (0,), kernel="heat_kernel"),
+    _OpSpec("hyperbolic_fft", "Tensor x, float curvature, int max_l", _harmonics, (0,)),
+    _OpSpec("inverse_hyperbolic_fft", "Tensor coeffs, float curvature", lambda x, *args: x.new_empty(x.size(0), 3), (0,)),
+    _OpSpec("spherical_harmonics", "Tensor theta_phi, int l_max", _harmonics, (0,)),
+    # 쌍별 거리
+    _OpSpec("cdist", "Tensor x, Tensor y, str model, float curvature, int chunk_size",
+            lambda x, y, *args: x.new_empty(x.size(0), y.size(0)), (0, 1)),
+    _OpSpec("cdist_topk", "Tensor x, Tensor y, int k, str model, float curvature, int chunk_size",
+            lambda x, y, k, *args: (x.new_empty(x.size(0), k), x.new_empty(x.size(0), k, dtype=torch.long)),
+            (0, 1), returns="(Tensor, Tensor)"),
+    # 퓨즈드 레이어 연산
+    _OpSpec("hyperbolic_linear_fused", "Tensor input, Tensor weight, Tensor bias, Tensor curvature",
+            lambda x, weight, *args: x.new_empty(x.size(0), weight.size(0)), (0, 1, 2, 3)),
+    _OpSpec("einstein_midpoint", "Tensor points, Tensor weights, float curvature",
+            lambda points, *args: points.new_empty(points.size(0), points.size(-1)), (0, 1)),
+    _OpSpec("multi_geodesic_mixing", "Tensor x, Tensor anchors, Tensor t_values, Tensor weights, float curvature",
+            _like, (0, 1, 2, 3)),
+)
+
+SPECS = {spec.name: spec for spec in _SPECS}
+
+
+def kernel(name, device):
+    """장치에 맞는 _C 커널 (<name>_cuda / <name>_cpu)"""
+    if device.type == "cuda":
+        fn = getattr(extension, f"{name}_cuda", None)
+        if fn is None:
+            raise RuntimeError(f"reality_stone::{name} has no CUDA kernel in this build")
+        return fn
+    return getattr(extension, f"{name}_cpu")
+
+
+def _device(args):
+    return next(a.device for a in args if isinstance(a, torch.Tensor))
+
+
+def _recompute_backward(spec, grads, needs, args):
+    """커널을 autograd 경로로 다시 실행해 필요한 입력의 그래디언트만 구한다
+
+    register_autograd 의 backward 에서 (custom op 밖에서) 부르므로 autograd 가 그대로 동작한다.
+    create_graph 로 불리면 원래 입력 위에서 다시 계산해 2차 미분도 커널의 autograd 경로를 따르고,
+    torch.compile 추적 중에는 커널의 텐서 연산 경로가 aten op 로 기록된다.
+    그래디언트를 받은 출력이나 필요한 입력이 그래프에 연결되지 않으면 0 으로 채우지 않고 오류를 낸다.
+    """
+    create_graph = torch.is_grad_enabled()
+    wanted = [i for i, need in zip(spec.differentiable, needs) if need]
+    with torch.enable_grad():
+        inputs = list(args)
+        if not create_graph:
+            for i in wanted:
+                inputs[i] = args[i].detach().requires_grad_()
+        outputs = kernel(spec.kernel or spec.name, _device(args))(*inputs)
+        outputs = outputs if isinstance(outputs, (tuple, list)) else (outputs,)
+        # 정수 출력 (cdist_topk 의 인덱스 등) 은 미분 대상이 아니다
+        pairs = [(out, grad) for out, grad in zip(outputs, grads)
+                 if grad is not None and out.is_floating_point()]
+        if not pairs:
+            return [None] * len(needs)
+        for k, (out, _) in enumerate(pairs):
+            if not out.requires_grad:
+                raise RuntimeError(f"{NAMESPACE}::{spec.name}: 출력 {k} 가 autograd 그래프에 연결되지 않아 "
+                                   "그래디언트를 재계산할 수 없음 (커널의 autograd 경로 확인)")
+        result = torch.autograd.grad([out for out, _ in pairs], [inputs[i] for i in wanted],
+                                     [grad for _, grad in pairs], allow_unused=True,
+                                     create_graph=create_graph)
+    found = dict(zip(wanted, result))
+    for i in wanted:
+        if found[i] is None:
+            raise RuntimeError(f"{NAMESPACE}::{spec.name}: 인자 {i} 가 커널의 autograd 그래프에 쓰이지 않아 "
+                               "그래디언트를 구할 수 없음")
+    return [found[i] if need else None for i, need in zip(spec.differentiable, needs)]
+
+
+def _register(spec):
+    qualname = f"{NAMESPACE}::{spec.name}"
+    kernel_name = spec.kernel or spec.name
+
+    def forward_impl(*args):
+        return kernel(kernel_name, _device(args))(*args)
+
+    op = torch.library.custom_op(qualname, forward_impl, mutates_args=(),
+                                 schema=f"({spec.args}) -> {spec.returns}")
+    op.register_fake(spec.fake)
+
+    backward_op = None
+    if spec.backward_kernel is not None:
+        # 전용 역전파 커널 op: (출력 그래디언트, 순전파 인자) -> 미분 가능한 입력별 그래디언트
+        def backward_impl(grad, *args):
+            # 커널은 승격된 dtype 으로 계산하므로 fake 와 같이 입력 dtype 으로 돌려준다
+            result = kernel(spec.backward_kernel, _device(args))(grad, *args)
+            return [g.to(args[i].dtype) for i, g in zip(spec.differentiable, result)]
+
+        def backward_fake(grad, *args):
+            return [torch.empty_like(args[i]) for i in spec.differentiable]
+
+        def double_backward(ctx, *grads):
+            raise RuntimeError(f"{qualname}_backward: 전용 역전파 커널은 2차 미분을 지원하지 않음")
+
+        backward_op = torch.library.custom_op(f"{qualname}_backward", backward_impl, mutates_args=(),
+                                              schema=f"(Tensor grad, {spec.args}) -> Tensor[]")
+        backward_op.register_fake(backward_fake)
+        backward_op.register_autograd(double_backward)
+
+    def setup_context(ctx, inputs, output):
+        ctx.tensor_positions = [i for i, a in enumerate(inputs) if isinstance(a, torch.Tensor)]
+        ctx.save_for_backward(*(inputs[i] for i in ctx.tensor_positions))
+        ctx.constants = [None if isinstance(a, torch.Tensor) else a for a in inputs]
+
+    def backward(ctx, *grads):
+        args = list(ctx.constants)
+        for i, tensor in zip(ctx.tensor_positions, ctx.saved_tensors):
+            args[i] = tensor
+        needs = [bool(ctx.needs_input_grad[i]) for i in spec.differentiable]
+        result = [None] * len(args)
+        if not any(needs):
+            return tuple(result)
+        if backward_op is not None:
+            input_grads = backward_op(grads[0], *args)
+        else:
+            input_grads = _recompute_backward(spec, grads, needs, args)
+        for i, need, grad in zip(spec.differentiable, needs, input_grads):
+            if need:
+                result[i] = grad
+        return tuple(result)
+
+    op.register_autograd(backward, setup_context=setup_context)
+
+
+_OPS = {}
+_register_lock = threading.Lock()
+
+
+def _run_at_trace_time(fn):
+    """torch.compile 추적 중에는 fn 을 추적하지 않고 실행해 결과를 상수로 쓴다 (잠금, import 포함)
+
+    torch.compiler.assume_constant_result 가 붙이는 표시와 같다. 그 함수는 torch._dynamo 를 import 하므로
+    (수 초) 패키지 import 가 느려지지 않게 표시만 직접 붙인다.
+    """
+    fn._dynamo_marked_constant = True
+    return fn
+
+
+def _is_compiling():
+    """torch.compile 이 추적 중인지 (torch.compiler.is_compiling 이 없는 torch 는 False)"""
+    is_compiling = getattr(getattr(torch, "compiler", None), "is_compiling", None)
+    return is_compiling is not None and is_compiling()
+
+
+@_run_at_trace_time
+def register():
+    """모든 op 를 reality_stone:: 에 등록 (한 번만, 쓸 수 없으면 False)"""
+    if _OPS:
+        return True
+    if not enabled():
+        return False
+    with _register_lock:
+        if not _OPS:
+            for spec in _SPECS:
+                _register(spec)
+            namespace = getattr(torch.ops, NAMESPACE)
+            _OPS.update((spec.name, getattr(namespace, spec.name)) for spec in _SPECS)
+    return True
+
+
+def call(name, *args):
+    """reality_stone::<name> op 호출 (등록할 수 없으면 _C 커널 직접 호출)"""
+    if _is_compiling():
+        # 추적 중에는 _OPS 를 읽지 않는다 (추적 도중 register() 가 _OPS 를 채우면 그 가드가 바로 깨진다)
+        op = getattr(getattr(torch.ops, NAMESPACE), name) if register() else None
+    else:
+        op = _OPS.get(name)
+        if op is None and register():
+            op = _OPS[name]
+    if op is not None:
+        return op(*args)
+    spec = SPECS[name]
+    return kernel(spec.kernel or spec.name, _device(args))(*args)
@@ -0,0 +1,400 @@
+"""
+Reality Stone Riemannian Optimizers
+포인카레 / 로렌츠 파라미터용 리만 SGD / Adam / Adagrad
+파라미터 그룹마다 다양체 (manifold) 와 곡률 (c) 을 지정하고, 한 그룹의 모든 텐서를 한 번의 다중 텐서 스텝으로 갱신한다.
+SGD / Adagrad 는 희소 행 그래디언트 (HyperbolicEmbedding(sparse=True)) 를 받아 건드린 행만 갱신한다.
+"""
+
+import torch
+from torch.optim import Optimizer
+
+from . import library as _library
+
+# C++ 확장은 처음 쓸 때 불러온다 (bool(_C) 는 확장을 쓸 수 있는지)
+_C = _library.extension
+
+MANIFOLDS = ("poincare", "lorentz", "euclidean")
+
+_EPS = 1e-6
+_BOUNDARY_EPS = 1e-5
+_MIN_NORM = 1e-15
+
+
+def _check_manifold(manifold, c):
+    if manifold not in MANIFOLDS:
+        raise ValueError(f"manifold must be one of {MANIFOLDS}, got {manifold!r}")
+    if c <= 0:
+        raise ValueError(f"curvature must be positive, got {c}")
+
+
+# ===== 행 단위 기하 연산 (fallback: [R, D] 행 묶음) =====
+
+def _minkowski(a, b):
+    """<a, b>_L = a0·b0 - Σ ai·bi"""
+    return a[:, :1] * b[:, :1] - (a[:, 1:] * b[:, 1:]).sum(-1, keepdim=True)
+
+
+def _conformal(x, c):
+    """λ_x = 2 / (1 - c|x|²)"""
+    return 2 / (1 - c * x.pow(2).sum(-1, keepdim=True)).clamp_min(_EPS)
+
+
+def _project(x, u, manifold, c):
+    if manifold == "lorentz":
+        return u - c * _minkowski(x, u) * x
+    return u
+
+
+def _riemannian_grad(x, g, manifold, c):
+    """(리만 그래디언트, 두 번째 모멘트에 곱할 계량 배율)"""
+    if manifold == "poincare":
+        lam_sq = _conformal(x, c).pow(2)
+        return g / lam_sq, lam_sq
+    if manifold == "lorentz":
+        return _project(x, torch.cat([-g[:, :1], g[:, 1:]], dim=1), manifold, c), 1.0
+    return g, 1.0
+
+
+def _expmap(x, u, manifold, c):
+    sqrt_c = c ** 0.5
+    if manifold == "poincare":
+        u_norm = u.norm(dim=-1, keepdim=True)
+        arg = (sqrt_c * _conformal(x, c) * u_norm / 2).clamp_max(15.0)
+        w = torch.tanh(arg) / (sqrt_c * u_norm).clamp_min(_MIN_NORM) * u
+        xw = (x * w).sum(-1, keepdim=True)
+        x2 = x.pow(2).sum(-1, keepdim=True)
+        w2 = w.pow(2).sum(-1, keepdim=True)
+        denom = (1 + 2 * c * xw + c * c * x2 * w2).clamp_min(_EPS)
+        y = ((1 + 2 * c * xw + c * w2) * x + (1 - c * x2) * w) / denom
+        max_norm = (1 - _BOUNDARY_EPS) / sqrt_c
+        return y * (max_norm / y.norm(dim=-1, keepdim=True).clamp_min(max_norm))
+    if manifold == "lorentz":
+        u_norm = (-_minkowski(u, u)).clamp_min(0).sqrt()
+        arg = (sqrt_c * u_norm).clamp_max(50.0)
+        scale = torch.where(u_norm > _MIN_NORM, torch.sinh(arg) / (sqrt_c * u_norm).clamp_min(_MIN_NORM),
+                            torch.ones_like(u_norm))
+        y = torch.cosh(arg) * x + scale * u
+        space = y[:, 1:]
+        return torch.cat([(1 / c + space.pow(2).sum(-1, keepdim=True)).sqrt(), space], dim=1)
+    return x + u
+
+
+def _transport(x, y, v, manifold, c):
+    if manifold == "poincare":
+        # (λ_x / λ_y)·gyr[y, -x] v
+        y2 = y.pow(2).sum(-1, keepdim=True)
+        x2 = x.pow(2).sum(-1, keepdim=True)
+        yx = -(y * x).sum(-1, keepdim=True)
+        yv = (y * v).sum(-1, keepdim=True)
+        xv = -(x * v).sum(-1, keepdim=True)
+        a = -c * c * yv * x2 + c * xv + 2 * c * c * yx * xv
+        b = -c * c * xv * y2 - c * yv
+        d = (1 + 2 * c * yx + c * c * y2 * x2).clamp_min(_MIN_NORM)
+        return _conformal(x, c) / _conformal(y, c) * (v + 2 * (a * y - b * x) / d)
+    if manifold == "lorentz":
+        coef = _minkowski(y, v) / (1 / c + _minkowski(x, y)).clamp_min(_MIN_NORM)
+        return _project(y, v - coef * (x + y), manifold, c)
+    return v
+
+
+# ===== 다중 텐서 스텝 =====
+
+def _width(t):
+    return t.shape[-1] if t.dim() > 0 else 1
+
+
+def _row_batches(params):
+    """마지막 차원 길이가 같은 텐서끼리 묶은 {D: [index]}"""
+    batches = {}
+    for i, p in enumerate(params):
+        if p.numel() > 0:
+            batches.setdefault(_width(p), []).append(i)
+    return batches
+
+
+def _gather(tensors, idx, width):
+    return torch.cat([tensors[i].reshape(-1, width) for i in idx])
+
+
+def _scatter(tensors, idx, rows):
+    """[R, D] 행 묶음을 원래 텐서들에 한 번에 되돌려 쓴다"""
+    targets = [tensors[i] for i in idx]
+    chunks = rows.split([t.numel() // rows.size(1) for t in targets])
+    torch._foreach_copy_(targets, [chunk.reshape(t.shape) for chunk, t in zip(chunks, targets)])
+
+
+def _adam_torch(params, grads, exp_avgs, exp_avg_sqs, steps, lr, beta1, beta2, eps, weight_decay, manifold, c):
+    """riemannian_adam_step_cpu 와 같은 갱신 (같은 폭의 텐서를 이어 붙여 한 번에 계산)"""
+    for width, idx in _row_batches(params).items():
+        counts = [params[i].numel() // width for i in idx]
+        x = _gather(params, idx, width)
+        g = _gather(grads, idx, width) + weight_decay * x
+        repeats = torch.tensor(counts, device=x.device)
+        bias1 = x.new_tensor([1 - beta1 ** steps[i] for i in idx]).repeat_interleave(repeats).unsqueeze(1)
+        bias2 = x.new_tensor([1 - beta2 ** steps[i] for i in idx]).repeat_interleave(repeats).unsqueeze(1)
+        r, metric = _riemannian_grad(x, g, manifold, c)
+        m = beta1 * _gather(exp_avgs, idx, width) + (1 - beta1) * r
+        v = beta2 * _gather(exp_avg_sqs, idx, width) + (1 - beta2) * metric * r * r
+        u = _project(x, -lr * (m / bias1) / ((v / bias2).sqrt() + eps), manifold, c)
+        y = _expmap(x, u, manifold, c)
+        _scatter(exp_avgs, idx, _transport(x, y, m, manifold, c))
+        _scatter(exp_avg_sqs, idx, v)
+        _scatter(params, idx, y)
+
+
+def _sgd_torch(params, grads, momentum_buffers, lr, momentum, weight_decay, manifold, c):
+    """riemannian_sgd_step_cpu 와 같은 갱신"""
+    for width, idx in _row_batches(params).items():
+        x = _gather(params, idx, width)
+        r, _ = _riemannian_grad(x, _gather(grads, idx, width) + weight_decay * x, manifold, c)
+        if momentum != 0:
+            r = r + momentum * _gather(momentum_buffers, idx, width)
+        y = _expmap(x, -lr * r, manifold, c)
+        if momentum != 0:
+            _scatter(momentum_buffers, idx, _transport(x, y, r, manifold, c))
+        _scatter(params, idx, y)
+
+
+def _adagrad_rows(x, g, acc, lr, eps, manifold, c):
+    """Adagrad 행 갱신: (새 점, 새 행 누적값 [R])"""
+    r, metric = _riemannian_grad(x, g, manifold, c)
+    if manifold == "lorentz":
+        norm_sq = (-_minkowski(r, r)).clamp_min(0)
+    else:
+        norm_sq = metric * r.pow(2).sum(-1, keepdim=True)
+    acc = acc.unsqueeze(1) + norm_sq
+    return _expmap(x, -lr * r / (acc.sqrt() + eps), manifold, c), acc.squeeze(1)
+
+
+def _adagrad_torch(params, grads, sums, lr, eps, weight_decay, manifold, c):
+    """riemannian_adagrad_step_cpu 와 같은 갱신"""
+    for width, idx in _row_batches(params).items():
+        x = _gather(params, idx, width)
+        acc = torch.cat([sums[i].reshape(-1) for i in idx])
+        y, acc = _adagrad_rows(x, _gather(grads, idx, width) + weight_decay * x, acc, lr, eps, manifold, c)
+        _scatter(sums, idx, acc.unsqueeze(1))
+        _scatter(params, idx, y)
+
+
+def _coalesced_rows(grad):
+    """희소 행 그래디언트 -> (서로 다른 행 번호 [K], 합친 그래디언트 [K, D])"""
+    grad = grad.coalesce()
+    return grad.indices()[0], grad.values()
+
+
+def _sparse_sgd_torch(param, indices, values, lr, weight_decay, manifold, c):
+    """sparse_riemannian_sgd_step_cpu 와 같은 갱신 (indices 는 coalesce 된 행 번호)"""
+    x = param.index_select(0, indices)
+    r, _ = _riemannian_grad(x, values + weight_decay * x, manifold, c)
+    param.index_copy_(0, indices, _expmap(x, -lr * r, manifold, c))
+
+
+def _sparse_adagrad_torch(param, acc, indices, values, lr, eps, weight_decay, manifold, c):
+    """sparse_riemannian_adagrad_step_cpu 와 같은 갱신 (indices 는 coalesce 된 행 번호)"""
+    x = param.index_select(0, indices)
+    y, rows = _adagrad_rows(x, values + weight_decay * x, acc.index_select(0, indices), lr, eps, manifold, c)
+    acc.index_copy_(0, indices, rows)
+    param.index_copy_(0, indices, y)
+
+
+def _use_fused(params, fused):
+    """C++ 다중 텐서 커널을 쓸 수 있는지 (CPU, float / double, 연속 텐서)"""
+    if fused is False or not _C:
+        return False
+    return all(p.device.type == "cpu" and p.dtype in (torch.float32, torch.float64) and p.is_contiguous()
+               for p in params)
+
+
+def _sparse_grad(p):
+    if p.dim() != 2 or p.grad.sparse_dim() != 1:
+        raise RuntimeError("sparse gradients are supported only for [N, D] embedding tables")
+    return p.grad
+
+
+class _RiemannianOptimizer(Optimizer):
+    """그룹의 파라미터를 (device, dtype) 별로 모아 한 번의 스텝 함수 호출로 넘기는 공통 부분
+
+    희소 그래디언트를 받는 파라미터는 텐서마다 _sparse_step 으로 건드린 행만 갱신한다.
+    """
+
+    _supports_sparse = False
+
+    def __init__(self, params, defaults, fused):
+        _check_manifold(defaults["manifold"], defaults["c"])
+        self.fused = fused
+        super().__init__(params, defaults)
+
+    def add_param_group(self, param_group):
+        super().add_param_group(param_group)
+        group = self.param_groups[-1]
+        _check_manifold(group["manifold"], group["c"])
+
+    def _buckets(self, group):
+        """그래디언트가 있는 파라미터를 (device, dtype, 희소 여부) 별로 나눈 목록들"""
+        buckets = {}
+        for p in group["params"]:
+            if p.grad is None:
+                continue
+            if p.grad.is_sparse and not self._supports_sparse:
+                raise RuntimeError(f"{type(self).__name__} does not support sparse gradients, "
+                                   "use RiemannianSGD or RiemannianAdagrad")
+            buckets.setdefault((p.device, p.dtype, p.grad.is_sparse), []).append(p)
+        return buckets.values()
+
+    @torch.no_grad()
+    def step(self, closure=None):
+        loss = None
+        if closure is not None:
+            with torch.enable_grad():
+                loss = closure()
+        for group in self.param_groups:
+            for params in self._buckets(group):
+                if params[0].grad.is_sparse:
+                    for p in params:
+                        self._sparse_step(group, p, _sparse_grad(p))
+                else:
+                    self._step_group(group, params)
+        return loss
+
+
+class RiemannianSGD(_RiemannianOptimizer):
+    """리만 SGD (+ 모멘텀)
+
+    x ← exp_x(-lr·(grad_R + momentum·buf)), 모멘텀 버퍼는 새 점으로 평행 이동된다.
+    grad_R 은 포인카레에서 grad / λ_x², 로렌츠에서 쌍곡면 접공간으로 사영한 그래디언트.
+    희소 행 그래디언트는 모멘텀 없이 건드린 행만 갱신한다.
+
+    Args:
+        params: 파라미터 또는 파라미터 그룹 (그룹마다 manifold / c 를 따로 줄 수 있다)
+        manifold: "poincare" | "lorentz" | "euclidean" (마지막 차원이 점 좌표)
+        c: 곡률
+        fused: None 이면 가능할 때 C++ 다중 텐서 커널, False 면 PyTorch 구현
+    """
+
+    _supports_sparse = True
+
+    def __init__(self, params, lr, momentum=0.0, weight_decay=0.0, manifold="poincare", c=1.0, fused=None):
+        if lr < 0:
+            raise ValueError(f"Invalid learning rate: {lr}")
+        if momentum < 0:
+            raise ValueError(f"Invalid momentum value: {momentum}")
+        defaults = dict(lr=lr, momentum=momentum, weight_decay=weight_decay, manifold=manifold, c=c)
+        super().__init__(params, defaults, fused)
+
+    def _sparse_step(self, group, p, grad):
+        if group["momentum"] != 0:
+            raise RuntimeError("RiemannianSGD does not support momentum with sparse gradients")
+        args = (group["lr"], group["weight_decay"], group["manifold"], group["c"])
+        if _use_fused([p], self.fused):
+            _C.sparse_riemannian_sgd_step_cpu(p, grad._indices()[0], grad._values(), *args)
+        else:
+            _sparse_sgd_torch(p, *_coalesced_rows(grad), *args)
+
+    def _step_group(self, group, params):
+        grads = [p.grad.contiguous() for p in params]
+        buffers = []
+        if group["momentum"] != 0:
+            for p in params:
+                state = self.state[p]
+                if "momentum_buffer" not in state:
+                    state["momentum_buffer"] = torch.zeros_like(p, memory_format=torch.contiguous_format)
+                buffers.append(state["momentum_buffer"])
+        args = (group["lr"], group["momentum"], group["weight_decay"], group["manifold"], group["c"])
+        if _use_fused(params, self.fused):
+            _C.riemannian_sgd_step_cpu(params, grads, buffers, *args)
+        else:
+            _sgd_torch(params, grads, buffers, *args)
+
+
+class RiemannianAdam(_RiemannianOptimizer):
+    """리만 Adam
+
+    grad_R 의 1차 모멘트와 (계량 노름 기준) 2차 모멘트로 방향 u = -lr·m̂ / (√v̂ + eps) 를 만들고
+    x ← exp_x(u), 1차 모멘트는 x 에서 새 점으로 평행 이동한다. 포인카레에서 2차 모멘트는 λ_x²·grad_R² 로 쌓여
+    lr 이 측지 거리 단위의 보폭이 된다.
+
+    Args:
+        params: 파라미터 또는 파라미터 그룹 (그룹마다 manifold / c 를 따로 줄 수 있다)
+        manifold: "poincare" | "lorentz" | "euclidean" (마지막 차원이 점 좌표)
+        c: 곡률
+        fused: None 이면 가능할 때 C++ 다중 텐서 커널, False 면 PyTorch 구현
+    """
+
+    def __init__(self, params, lr=1e-3, betas=(0.9, 0.999), eps=1e-8, weight_decay=0.0,
+                 manifold="poincare", c=1.0, fused=None):
+        if lr < 0:
+            raise ValueError(f"Invalid learning rate: {lr}")
+        if not 0.0 <= betas[0] < 1.0 or not 0.0 <= betas[1] < 1.0:
+            raise ValueError(f"Invalid beta parameters: {betas}")
+        defaults = dict(lr=lr, betas=betas, eps=eps, weight_decay=weight_decay, manifold=manifold, c=c)
+        super().__init__(params, defaults, fused)
+
+    def _step_group(self, group, params):
+        grads = [p.grad.contiguous() for p in params]
+        exp_avgs, exp_avg_sqs, steps = [], [], []
+        for p in params:
+            state = self.state[p]
+            if not state:
+                state["step"] = 0
+                state["exp_avg"] = torch.zeros_like(p, memory_format=torch.contiguous_format)
+                state["exp_avg_sq"] = torch.zeros_like(p, memory_format=torch.contiguous_format)
+            state["step"] += 1
+            exp_avgs.append(state["exp_avg"])
+            exp_avg_sqs.append(state["exp_avg_sq"])
+            steps.append(state["step"])
+        beta1, beta2 = group["betas"]
+        args = (steps, group["lr"], beta1, beta2, group["eps"], group["weight_decay"], group["manifold"], group["c"])
+        if _use_fused(params, self.fused):
+            _C.riemannian_adam_step_cpu(params, grads, exp_avgs, exp_avg_sqs, *args)
+        else:
+            _adam_torch(params, grads, exp_avgs, exp_avg_sqs, *args)
+
+
+class RiemannianAdagrad(_RiemannianOptimizer):
+    """리만 Adagrad (행마다 스칼라 누적값)
+
+    sum_row += |grad_R|²_x (리만 노름), x ← exp_x(-lr·grad_R / (√sum_row + eps)).
+    누적값은 점 (행) 마다 하나라 [N, D] 임베딩 테이블의 상태가 [N] 이다.
+    희소 행 그래디언트는 중복 행을 합친 뒤 건드린 행의 점과 누적값만 갱신한다.
+
+    Args:
+        params: 파라미터 또는 파라미터 그룹 (그룹마다 manifold / c 를 따로 줄 수 있다)
+        manifold: "poincare" | "lorentz" | "euclidean" (마지막 차원이 점 좌표)
+        c: 곡률
+        fused: None 이면 가능할 때 C++ 커널, False 면 PyTorch 구현
+    """
+
+    _supports_sparse = True
+
+    def __init__(self, params, lr=1e-2, eps=1e-10, weight_decay=0.0, initial_accumulator_value=0.0,
+                 manifold="poincare", c=1.0, fused=None):
+        if lr < 0:
+            raise ValueError(f"Invalid learning rate: {lr}")
+        if initial_accumulator_value < 0:
+            raise ValueError(f"Invalid initial_accumulator_value value: {initial_accumulator_value}")
+        defaults = dict(lr=lr, eps=eps, weight_decay=weight_decay,
+                        initial_accumulator_value=initial_accumulator_value, manifold=manifold, c=c)
+        super().__init__(params, defaults, fused)
+
+    def _sum(self, group, p):
+        state = self.state[p]
+        if "sum" not in state:
+            state["sum"] = torch.full(p.shape[:-1], group["initial_accumulator_value"], dtype=p.dtype, device=p.device)
+        return state["sum"]
+
+    def _step_group(self, group, params):
+        grads = [p.grad.contiguous() for p in params]
+        sums = [self._sum(group, p) for p in params]
+        args = (group["lr"], group["eps"], group["weight_decay"], group["manifold"], group["c"])
+        if _use_fused(params, self.fused):
+            _C.riemannian_adagrad_step_cpu(params, grads, sums, *args)
+        else:
+            _adagrad_torch(params, grads, sums, *args)
+
+    def _sparse_step(self, group, p, grad):
+        acc = self._sum(group, p)
+        args = (group["lr"], group["eps"], group["weight_decay"], group["manifold"], group["c"])
+        if _use_fused([p], self.fused):
+            _C.sparse_riemannian_adagrad_step_cpu(p, acc, grad._indices()[0], grad._values(), *args)
+        else:
+            _sparse_adagrad_torch(p, acc, *_coalesced_rows(grad), *args)
@@ -11,6 +11,8 @@ from dataclasses import dataclass
 from typing import Dict, List, Tuple
 from contextlib import contextmanager
 
+from . import library as _library
+
 @dataclass
 class OptimizationConfig:
     """성능 최적화 설정"""
@@ -176,6 +178,8 @@ class OptimizedModel(nn.Module):
         # PyTorch 2.0 컴파일 (선택적)
         if self.config.use_torch_compile:
             try:
+                # custom op 를 추적 전에 등록해 두어야 그래프가 끊기지 않는다
+                _library.register()
                 self.compiled_model = torch.compile(
                     self.model, 
                     mode=self.config.compile_mode
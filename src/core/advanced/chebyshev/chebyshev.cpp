@@ -1,8 +1,17 @@
 #include <torch/extension.h>
 #include <ATen/ATen.h>
+#include <ATen/OpMathType.h>
+#include <ATen/Parallel.h>
 #include <advanced/chebyshev/chebyshev.h>
-#include <vector>
+#include <utils/cpu_kernels.h>
+#include <algorithm>
 #include <cmath>
+#include <map>
+#include <mutex>
+#include <tuple>
+#include <vector>
+
+namespace utils = reality_stone::utils;
 
 namespace reality_stone::advanced {
 
@@ -45,6 +54,117 @@ float get_dynamic_clamp_limit_cpu(float curvature) {
     return base_limit;
 }
 
+namespace {
+
+enum class SeriesFunction { Tanh };
+
+/**
+ * 함수별 체비셰프 계수표 (함수, 차수, 곡률) 마다 한 번만 계산해 재사용
+ * tanh(√c·x) 는 |√c·x| ≤ L (get_dynamic_scale_limit_cpu) 구간을 u = √c·x / L ∈ [-1, 1] 로 옮겨
+ * f(u) = tanh(L·u) 를 order + 1 개의 체비셰프 점에서 보간한다. 표는 double 로 두어 장치와 무관하다.
+ */
+const std::vector<double>& series_coefficients(SeriesFunction fn, int order, float curvature) {
+    static std::mutex mutex;
+    static std::map<std::tuple<SeriesFunction, int, float>, std::vector<double>> cache;
+    std::lock_guard<std::mutex> lock(mutex);
+    auto [it, inserted] = cache.try_emplace({ fn, order, curvature });
+    if (inserted) {
+        const int n = order + 1;
+        const double scale = get_dynamic_scale_limit_cpu(curvature);
+        std::vector<double> values(n);
+        for (int j = 0; j < n; ++j) {
+            const double u = std::cos((2 * j + 1) * M_PI / (2 * n));
+            switch (fn) {
+                case SeriesFunction::Tanh: values[j] = std::tanh(scale * u); break;
+            }
+        }
+        auto& coeffs = it->second;
+        coeffs.assign(n, 0.0);
+        for (int k = 0; k < n; ++k) {
+            double sum = 0.0;
+            for (int j = 0; j < n; ++j) sum += values[j] * std::cos(k * (2 * j + 1) * M_PI / (2 * n));
+            coeffs[k] = (k == 0 ? 1.0 : 2.0) * sum / n;
+        }
+    }
+    return it->second;
+}
+
+/**
+ * Clenshaw 점화로 Σ_k a_k·T_k(u) 평가 (T_k 를 따로 만들지 않음)
+ * b_k = a_k + 2u·b_{k+1} - b_{k+2},  결과 = a_0 + u·b_1 - b_2
+ * T 는 스칼라 (원소 커널) 또는 torch::Tensor (미분 가능한 경로)
+ */
+template <typename T, typename Coeffs>
+T clenshaw(const Coeffs& a, int64_t n, const T& u) {
+    T b1 = 0 * u;
+    T b2 = 0 * u;
+    for (int64_t k = n - 1; k >= 1; --k) {
+        T b0 = a[k] + 2 * u * b1 - b2;
+        b2 = b1;
+        b1 = b0;
+    }
+    return a[0] + u * b1 - b2;
+}
+
+/**
+ * u = clamp(scale·x, -1, 1) 에서 계수표를 한 번의 원소 패스로 평가
+ * 홀함수면 T_{2k+1}(u) 가 t = 2u² - 1 에 대해 같은 세 항 점화를 따르므로 홀수 계수만으로 점화 횟수를 절반으로 줄인다:
+ *   b_k = c_k + 2t·b_{k+1} - b_{k+2},  Σ c_k·T_{2k+1}(u) = u·(b_0 - b_1)   (일반: Σ a_k·T_k(u) = b_0 - u·b_1)
+ * 원소는 고정 길이 묶음으로 나눠 각 점화 단계가 묶음 전체에 대한 단순 루프가 되게 한다 (자동 벡터화).
+ */
+torch::Tensor evaluate_series_cpu(const torch::Tensor& x, const std::vector<double>& coeffs, double scale, bool odd) {
+    const int64_t n = static_cast<int64_t>(coeffs.size());
+    if (utils::requires_grad({ x })) {
+        return clenshaw<torch::Tensor>(coeffs, n, torch::clamp(x * scale, -1.0, 1.0));
+    }
+
+    auto input = x.contiguous();
+    auto result = torch::empty_like(input);
+    AT_DISPATCH_FLOATING_TYPES_AND2(at::kHalf, at::kBFloat16, input.scalar_type(), "chebyshev_approximation_cpu", [&] {
+        using acc_t = at::opmath_type<scalar_t>;
+        std::vector<acc_t> c;
+        for (int64_t k = odd ? 1 : 0; k < n; k += odd ? 2 : 1) c.push_back(static_cast<acc_t>(coeffs[k]));
+        const int64_t K = static_cast<int64_t>(c.size());
+        const acc_t s = static_cast<acc_t>(scale);
+        const scalar_t* in = input.data_ptr<scalar_t>();
+        scalar_t* out = result.data_ptr<scalar_t>();
+        at::parallel_for(0, input.numel(), utils::row_grain_size(K), [&](int64_t begin, int64_t end) {
+            constexpr int64_t kChunk = 256;
+            acc_t u[kChunk], t2[kChunk], b1[kChunk], b2[kChunk];
+            for (int64_t i0 = begin; i0 < end; i0 += kChunk) {
+                const int64_t len = std::min(kChunk, end - i0);
+                for (int64_t j = 0; j < len; ++j) {
+                    u[j] = std::clamp(s * static_cast<acc_t>(in[i0 + j]), acc_t(-1), acc_t(1));
+                    t2[j] = odd ? 4 * u[j] * u[j] - 2 : 2 * u[j];
+                    b1[j] = 0;
+                    b2[j] = 0;
+                }
+                for (int64_t k = K - 1; k >= 0; --k) {
+                    const acc_t ck = c[k];
+                    for (int64_t j = 0; j < len; ++j) {
+                        const acc_t b0 = ck + t2[j] * b1[j] - b2[j];
+                        b2[j] = b1[j];
+                        b1[j] = b0;
+                    }
+                }
+                for (int64_t j = 0; j < len; ++j) {
+                    const acc_t value = odd ? u[j] * (b1[j] - b2[j]) : b1[j] - u[j] * b2[j];
+                    out[i0 + j] = static_cast<scalar_t>(value);
+                }
+            }
+        });
+    });
+    return result;
+}
+
+// tanh(√c·x) 근사: |√c·x| > L 이면 ±tanh(L) 근처로 포화
+torch::Tensor approximate_tanh_cpu(const torch::Tensor& x, int order, float curvature) {
+    const auto& coeffs = series_coefficients(SeriesFunction::Tanh, order, curvature);
+    return evaluate_series_cpu(x, coeffs, std::sqrt(curvature) / get_dynamic_scale_limit_cpu(curvature), /*odd=*/true);
+}
+
+} // namespace
+
 // ChebyshevApproximator 클래스 구현
 ChebyshevApproximator::ChebyshevApproximator(int order, float base_curvature) 
     : order(order), base_curvature(base_curvature) {
@@ -52,8 +172,8 @@ ChebyshevApproximator::ChebyshevApproximator(int order, float base_curvature)
     // 체비셰프 점들 미리 계산
     cheb_nodes = generate_nodes(order + 1, torch::kCPU);
     
-    // 캐시 초기화
-    coeffs_cache = torch::zeros({order + 1}, torch::kFloat32);
+    // 기본 곡률의 tanh 계수표 (전역 캐시와 공유)
+    coeffs_cache = torch::tensor(series_coefficients(SeriesFunction::Tanh, order, base_curvature), torch::kFloat64);
 }
 
 torch::Tensor ChebyshevApproximator::approximate_tanh(
@@ -63,29 +183,7 @@ torch::Tensor ChebyshevApproximator::approximate_tanh(
     if (x.is_cuda()) {
         return chebyshev_approximation_cuda(x, order, curvature);
     }
-    
-    // CPU 구현: tanh(√c * x)를 체비셰프 급수로 근사
-    // 동적 곡률 제한 해제: 클리핑 범위 확장
-    float dynamic_limit = get_dynamic_limit_cpu(curvature);
-    auto x_clamped = torch::clamp(x, -dynamic_limit, dynamic_limit);
-    
-    auto sqrt_c = std::sqrt(curvature);
-    auto scaled_x = sqrt_c * x_clamped;
-    
-    auto result = torch::zeros_like(x);
-    
-    // 체비셰프 다항식 T_n(x) = cos(n * arccos(x))
-    for (int n = 1; n <= order; n += 2) {  // 홀수 항만 (tanh는 홀함수)
-        auto T_n = torch::cos(n * torch::acos(x_clamped));
-        
-        // tanh(x)의 체비셰프 계수 근사
-        float coeff = std::pow(-1.0f, (n-1)/2) * 4.0f / (M_PI * (n*n - 0.25f));
-        result += coeff * T_n;
-    }
-    
-    // 동적 곡률 제한 해제: 결과 클리핑 범위 확장
-    float clamp_limit = get_dynamic_clamp_limit_cpu(curvature);
-    return torch::clamp(result, -clamp_limit, clamp_limit);  // 확장된 그래디언트 클리핑
+    return approximate_tanh_cpu(x, order, curvature);
 }
 
 torch::Tensor ChebyshevApproximator::compute_distance(
@@ -132,39 +230,25 @@ torch::Tensor ChebyshevApproximator::fast_transform(const torch::Tensor& values)
 }
 
 torch::Tensor ChebyshevApproximator::compute_coefficients(const torch::Tensor& func_values) {
+    // func_values [..., n]: 체비셰프 점 x_j = cos((2j+1)π/(2n)) 에서의 함숫값 -> 계수 [..., order + 1]
+    // 이산 코사인 합 Σ_j f(x_j)·T_k(x_j) 를 선행 차원 전체에 행렬 곱 한 번으로
     auto n = func_values.size(-1);
-    auto device = func_values.device();
-    auto coeffs = torch::zeros({order + 1}, torch::TensorOptions().dtype(torch::kFloat32).device(device));
-    auto nodes = generate_nodes(n, device);
-    
-    for (int k = 0; k <= order; ++k) {
-        auto T_k = torch::cos(k * torch::acos(nodes));
-        auto coeff_sum = torch::sum(func_values * T_k);
-        
-        if (k == 0) {
-            coeffs.index({k}) = coeff_sum / n;
-        } else {
-            coeffs.index({k}) = 2.0f * coeff_sum / n;
-        }
-    }
-    
-    return coeffs;
+    auto dtype = at::promote_types(func_values.scalar_type(), torch::kFloat32);
+    auto options = func_values.options().dtype(dtype);
+    auto angles = (2 * torch::arange(n, options) + 1) * (M_PI / (2 * n));
+    auto k = torch::arange(order + 1, options).unsqueeze(1);
+    auto basis = torch::cos(k * angles.unsqueeze(0));  // T_k(x_j) [order + 1, n]
+    auto scale = torch::full({order + 1}, 2.0 / n, options);
+    scale[0] = 1.0 / n;
+    return torch::matmul(func_values.to(dtype), basis.t()) * scale;
 }
 
 torch::Tensor ChebyshevApproximator::evaluate_polynomial(
     const torch::Tensor& coeffs,
     const torch::Tensor& x
 ) {
-    auto order = coeffs.size(-1) - 1;
     auto x_clamped = torch::clamp(x, -1.0f + 1e-6f, 1.0f - 1e-6f);
-    auto result = torch::zeros_like(x);
-    
-    for (int k = 0; k <= order; ++k) {
-        auto T_k = torch::cos(k * torch::acos(x_clamped));
-        result += coeffs.index({k}) * T_k;
-    }
-    
-    return result;
+    return clenshaw<torch::Tensor>(coeffs, coeffs.size(-1), x_clamped);
 }
 
 // 편의 함수들 구현
@@ -173,8 +257,10 @@ torch::Tensor chebyshev_approximation_cpu(
     int order,
     float curvature
 ) {
-    static ChebyshevApproximator approximator(order, curvature);
-    return approximator.approximate_tanh(x, curvature);
+    if (x.is_cuda()) {
+        return chebyshev_approximation_cuda(x, order, curvature);
+    }
+    return approximate_tanh_cpu(x, order, curvature);
 }
 
 torch::Tensor chebyshev_distance_cpu(
@@ -219,66 +305,63 @@ torch::Tensor fast_chebyshev_transform_cpu(const torch::Tensor& values) {
     return approximator.fast_transform(values);
 }
 
+namespace {
+
+// 계수 행벡터에 곱하는 미분 연산자 [n, n-1]: b_k = (2/c_k) Σ_{j>k, j-k 홀수} j·a_j (c_0 = 2)
+torch::Tensor derivative_operator(int64_t n, const torch::TensorOptions& options) {
+    auto op = torch::zeros({n, n - 1}, torch::kFloat64);
+    auto acc = op.accessor<double, 2>();
+    for (int64_t j = 1; j < n; ++j) {
+        for (int64_t k = j - 1; k >= 0; k -= 2) {
+            acc[j][k] = k == 0 ? j : 2.0 * j;
+        }
+    }
+    return op.to(options);
+}
+
+// 계수 행벡터에 곱하는 적분 연산자 [n, n+1]: B_k = (c_{k-1}·a_{k-1} - a_{k+1}) / 2k (B_0 은 적분 상수)
+torch::Tensor integral_operator(int64_t n, const torch::TensorOptions& options) {
+    auto op = torch::zeros({n, n + 1}, torch::kFloat64);
+    auto acc = op.accessor<double, 2>();
+    for (int64_t k = 1; k <= n; ++k) {
+        acc[k - 1][k] = (k == 1 ? 2.0 : 1.0) / (2.0 * k);
+        if (k + 1 < n) acc[k + 1][k] = -1.0 / (2.0 * k);
+    }
+    return op.to(options);
+}
+
+} // namespace
+
 torch::Tensor inverse_chebyshev_transform_cpu(
     const torch::Tensor& coeffs,
     const torch::Tensor& eval_points
 ) {
-    auto order = coeffs.size(-1) - 1;
-    auto x = torch::clamp(eval_points, -1.0f + 1e-6f, 1.0f - 1e-6f);
-    auto result = torch::zeros_like(x);
+    // 결과 모양: coeffs.shape[:-1] + eval_points.shape
+    auto x = torch::clamp(eval_points.reshape({-1}).to(coeffs.scalar_type()), -1.0 + 1e-6, 1.0 - 1e-6);
+    auto k = torch::arange(coeffs.size(-1), coeffs.options());
+    auto basis = torch::cos(torch::acos(x).unsqueeze(-1) * k);
+    auto result = torch::matmul(coeffs, basis.t());
     
-    for (int k = 0; k <= order; ++k) {
-        auto T_k = torch::cos(k * torch::acos(x));
-        result += coeffs.index({k}) * T_k;
-    }
-    
-    return result;
+    auto shape = coeffs.sizes().vec();
+    shape.pop_back();
+    shape.insert(shape.end(), eval_points.sizes().begin(), eval_points.sizes().end());
+    return result.reshape(shape);
 }
 
 torch::Tensor chebyshev_derivative_cpu(const torch::Tensor& coeffs) {
     auto n = coeffs.size(-1);
-    if (n <= 1) return torch::zeros({1}, coeffs.options());
-    
-    auto d_coeffs = torch::zeros({n - 1}, coeffs.options());
-    
-    // 체비셰프 미분 점화식
-    for (int k = n - 2; k >= 0; --k) {
-        if (k == n - 2) {
-            d_coeffs.index({k}) = 2 * (k + 1) * coeffs.index({k + 1});
-        } else {
-            d_coeffs.index({k}) = d_coeffs.index({k + 2}) + 2 * (k + 1) * coeffs.index({k + 1});
-        }
+    if (n <= 1) {
+        auto shape = coeffs.sizes().vec();
+        shape.back() = 1;
+        return torch::zeros(shape, coeffs.options());
     }
-    
-    return d_coeffs;
+    return torch::matmul(coeffs, derivative_operator(n, coeffs.options()));
 }
 
 torch::Tensor chebyshev_integral_cpu(const torch::Tensor& coeffs, float constant) {
-    auto n = coeffs.size(-1);
-    auto int_coeffs = torch::zeros({n + 1}, coeffs.options());
-    
-    int_coeffs.index({0}) = constant;
-    
-    // 체비셰프 적분 공식
-    for (int k = 1; k < n; ++k) {
-        if (k == 1) {
-            if (k + 1 < n) {
-                int_coeffs.index({1}) = coeffs.index({0}) - coeffs.index({2}) / 4.0f;
-            } else {
-                int_coeffs.index({1}) = coeffs.index({0});
-            }
-        } else if (k == n - 1) {
-            int_coeffs.index({k}) = coeffs.index({k - 1}) / (2 * k);
-        } else {
-            int_coeffs.index({k}) = (coeffs.index({k - 1}) - coeffs.index({k + 1})) / (2 * k);
-        }
-    }
-    
-    if (n > 0) {
-        int_coeffs.index({n}) = coeffs.index({n - 1}) / (2 * n);
-    }
-    
-    return int_coeffs;
+    auto result = torch::matmul(coeffs, integral_operator(coeffs.size(-1), coeffs.options()));
+    result.select(-1, 0).add_(constant);
+    return result;
 }
 
 } // namespace reality_stone::advanced
\ No newline at end of file
@@ -2,10 +2,13 @@
 #include <ATen/ATen.h>
 #include <advanced/dynamic_curvature/dynamic_curvature.h>
 #include <ops/mobius.h>
+#include <ops/mobius_coeffs.h>
+#include <utils/cpu_kernels.h>
 #include <vector>
 #include <cmath>
 
 namespace ops = reality_stone::ops;
+namespace utils = reality_stone::utils;
 
 namespace reality_stone::advanced {
 
@@ -54,19 +57,8 @@ torch::Tensor dynamic_mobius_add_cpu(
     const torch::Tensor& v,
     const torch::Tensor& curvatures
 ) {
-    auto batch_size = u.size(0);
-    auto result = torch::zeros_like(u);
-    
-    for (int64_t b = 0; b < batch_size; ++b) {
-        auto u_b = u[b].unsqueeze(0);
-        auto v_b = v[b].unsqueeze(0);
-        float c_b = std::max(1e-6f, std::min(curvatures[b].item<float>(), 1e6f));
-        
-        auto result_b = ops::mobius_add_cpu(u_b, v_b, c_b);
-        result[b] = result_b.squeeze(0);
-    }
-    
-    return result;
+    // 행별 곡률을 [1e-6, 1e6] 로 제한한 뒤 배치 전체를 한 번에 계산
+    return ops::mobius_add_cpu(u, v, torch::clamp(curvatures, 1e-6f, 1e6f));
 }
 
 torch::Tensor dynamic_poincare_layer_cpu(
@@ -75,9 +67,20 @@ torch::Tensor dynamic_poincare_layer_cpu(
     const torch::Tensor& curvatures,
     float t
 ) {
-    auto tv = t * v;
-    auto one_minus_t_u = (1.0f - t) * u;
-    return dynamic_mobius_add_cpu(one_minus_t_u, tv, curvatures);
+    auto clamped = torch::clamp(curvatures, 1e-6f, 1e6f);
+    if (utils::requires_grad({ u, v, clamped })) {
+        return ops::mobius_add_cpu((1.0f - t) * u, t * v, clamped);
+    }
+    // ((1-t)·u) ⊕_c (t·v): 스케일된 불변량으로 계수를 구해 중간 텐서 없이 한 번에 쓴다
+    auto curv = utils::batch_scalar(clamped, utils::row_count(utils::pair_shape(u, v)), "dynamic_poincare_layer_cpu");
+    const float* cp = curv.data_ptr<float>();
+    const float s = 1.0f - t;
+    return utils::pair_combine_cpu(u, v, /*minkowski=*/false,
+        [cp, s, t](int64_t b, auto u2, auto v2, auto uv, auto& coef_u, auto& coef_v) {
+            ops::mobius_add_coeffs(s * s * u2, t * t * v2, s * t * uv, cp[b], coef_u, coef_v);
+            coef_u *= s;
+            coef_v *= t;
+        });
 }
 
 }
\ No newline at end of file
@@ -2,15 +2,83 @@
 #include <ATen/ATen.h>
 #include <advanced/fused_ops/fused_ops.h>
 #include <ops/mobius.h>
+#include <utils/cpu_kernels.h>
 #include <vector>
 #include <cmath>
 #include <chrono>
 
 namespace ops = reality_stone::ops;
+namespace utils = reality_stone::utils;
 
 namespace reality_stone::advanced {
 
-// 함수들은 CUDA 파일에서 구현됨 - CPU/CUDA 공통 구현
-// 중복 정의 에러 방지를 위해 이 파일은 비움
+// hyperbolic_linear_fused / mobius_chain_fused / transform_regularize_fused 는
+// CUDA 파일에서 구현됨 (CPU/CUDA 공통). 여기에는 CPU 전용 커널만 둔다.
 
-} // namespace reality_stone::advanced 
\ No newline at end of file
+namespace {
+    constexpr float kLinearAtanhLimit = 0.99f;
+    constexpr float kLinearEps = 1e-7f;
+
+    // autograd 경로: 곡률 텐서 [B,1] 또는 [1,1] 을 브로드캐스트
+    torch::Tensor hyperbolic_linear_autograd(
+        const torch::Tensor& input,
+        const torch::Tensor& weight,
+        const torch::Tensor& bias,
+        const torch::Tensor& curvature
+    ) {
+        auto sqrt_c = torch::sqrt(curvature.reshape({ -1, 1 }).to(input.scalar_type()));
+        auto norm = torch::norm(input, 2, -1, true);
+        auto log_coeff = torch::atanh(torch::clamp(sqrt_c * norm, -kLinearAtanhLimit, kLinearAtanhLimit))
+            / (sqrt_c * norm + kLinearEps);
+        auto linear_result = torch::addmm(bias, log_coeff * input, weight.t());
+        auto result_norm = torch::norm(linear_result, 2, -1, true);
+        auto exp_coeff = torch::tanh(sqrt_c * result_norm) / (sqrt_c * result_norm + kLinearEps);
+        return exp_coeff * linear_result;
+    }
+}
+
+torch::Tensor hyperbolic_linear_fused_cpu(
+    const torch::Tensor& input,
+    const torch::Tensor& weight,
+    const torch::Tensor& bias,
+    const torch::Tensor& curvature
+) {
+    if (utils::requires_grad({ input, weight, bias, curvature })) {
+        return hyperbolic_linear_autograd(input, weight, bias, curvature);
+    }
+    TORCH_CHECK(input.dim() == 2, "hyperbolic_linear_fused_cpu: 입력은 [B, D_in] 이어야 함");
+    int64_t B = input.size(0), D_out = weight.size(0);
+
+    // log_0 의 계수는 행 스칼라이므로 GEMM 뒤로 옮긴다: (a·x) Wᵀ = a·(x Wᵀ)
+    auto sqrt_c = utils::batch_scalar(curvature, B, "hyperbolic_linear_fused_cpu").sqrt().unsqueeze(1);
+    auto norm = torch::sqrt(utils::row_norm_sq_cpu(input));
+    auto log_coeff = (torch::atanh(torch::clamp(sqrt_c * norm, -kLinearAtanhLimit, kLinearAtanhLimit))
+        / (sqrt_c * norm + kLinearEps)).contiguous();
+    sqrt_c = sqrt_c.to(log_coeff.scalar_type());
+    auto out = torch::mm(input, weight.t().to(input.scalar_type())).contiguous();
+    auto bias_c = bias.to(out.scalar_type()).contiguous();
+
+    // 에필로그: y = a·z + bias, out = tanh(√c|y|) / (√c|y|) · y 를 행마다 한 번에
+    RS_DISPATCH_FLOAT_TYPES(out.scalar_type(), "hyperbolic_linear_fused_cpu", [&] {
+        using acc_t = at::opmath_type<scalar_t>;
+        const acc_t* ap = log_coeff.data_ptr<acc_t>();
+        const acc_t* sp = sqrt_c.data_ptr<acc_t>();
+        scalar_t* op = out.data_ptr<scalar_t>();
+        const scalar_t* bp = bias_c.data_ptr<scalar_t>();
+        at::parallel_for(0, B, utils::row_grain_size(D_out), [&](int64_t begin, int64_t end) {
+            utils::RowScratch<scalar_t> scratch(2, D_out);
+            const acc_t* bb = utils::load_row(bp, scratch.row(1), D_out);
+            for (int64_t b = begin; b < end; ++b) {
+                const acc_t* zb = utils::load_row(op + b * D_out, scratch.row(0), D_out);
+                acc_t* yb = utils::work_row(op + b * D_out, scratch.row(0));
+                utils::row_combine(yb, D_out, ap[b], zb, acc_t(1), bb);
+                acc_t scn = sp[b] * std::sqrt(utils::row_dots<1>({ yb }, { yb }, D_out)[0]);
+                utils::row_scale(yb, D_out, std::tanh(scn) / (scn + kLinearEps), yb);
+                utils::store_row(op + b * D_out, yb, D_out);
+            }
+        });
+    });
+    return out;
+}
+
+} // namespace reality_stone::advanced
@@ -1,9 +1,13 @@
 #include <torch/extension.h>
 #include <ATen/ATen.h>
 #include <advanced/geodesic_activation/geodesic_activation.h>
+#include <utils/cpu_kernels.h>
+#include <algorithm>
 #include <vector>
 #include <cmath>
 
+namespace utils = reality_stone::utils;
+
 namespace reality_stone::advanced {
 
 // CUDA 함수 선언
@@ -51,6 +55,78 @@ torch::Tensor GeodesicActivation::forward(const torch::Tensor& x, float curvatur
     return multi_geodesic_mixing(x, curvature);
 }
 
+namespace {
+    constexpr float kMidpointAtanhLimit = 0.99f;
+    constexpr float kMidpointTanhLimit = 88.0f;
+    constexpr float kMidpointEps = 1e-7f;
+
+    // autograd 경로: [B,K,D] 전체를 브로드캐스트 텐서 연산으로
+    torch::Tensor einstein_midpoint_autograd(
+        const torch::Tensor& points,
+        const torch::Tensor& weights,
+        float curvature
+    ) {
+        float sqrt_c = std::sqrt(curvature);
+        auto w = (weights.dim() == 1 ? weights.unsqueeze(0) : weights).unsqueeze(-1).to(points.scalar_type());
+        auto norm = torch::norm(points, 2, -1, true);
+        auto coeff = torch::atanh(torch::clamp(sqrt_c * norm, -kMidpointAtanhLimit, kMidpointAtanhLimit))
+            / (sqrt_c * norm + kMidpointEps);
+        auto weighted_log_sum = (w * coeff * points).sum(1);
+        auto log_norm = torch::norm(weighted_log_sum, 2, -1, true);
+        auto tanh_arg = torch::clamp(sqrt_c * log_norm, -kMidpointTanhLimit, kMidpointTanhLimit);
+        return torch::tanh(tanh_arg) / (sqrt_c * log_norm + kMidpointEps) * weighted_log_sum;
+    }
+}
+
+torch::Tensor einstein_midpoint_cpu(
+    const torch::Tensor& points,
+    const torch::Tensor& weights,
+    float curvature
+) {
+    TORCH_CHECK(points.dim() == 3, "einstein_midpoint_cpu: points 는 [B, K, D] 이어야 함");
+    int64_t B = points.size(0), K = points.size(1), D = points.size(2);
+    TORCH_CHECK((weights.dim() == 1 && weights.size(0) == K) ||
+        (weights.dim() == 2 && weights.size(0) == B && weights.size(1) == K),
+        "einstein_midpoint_cpu: weights 는 [K] 또는 [B, K] 이어야 함");
+    if (utils::requires_grad({ points, weights })) {
+        return einstein_midpoint_autograd(points, weights, curvature);
+    }
+
+    auto pts = points.contiguous();
+    auto w = weights.to(at::toOpMathType(pts.scalar_type())).contiguous();
+    auto result = torch::empty({ B, D }, pts.options());
+    const int64_t w_stride = weights.dim() == 2 ? K : 0;
+
+    // 배치 병렬, 행마다 log_0 → 가중합 → exp_0 를 누산 버퍼 (fp32, double 은 fp64) 하나로 처리
+    RS_DISPATCH_FLOAT_TYPES(pts.scalar_type(), "einstein_midpoint_cpu", [&] {
+        using acc_t = at::opmath_type<scalar_t>;
+        const acc_t* wp = w.data_ptr<acc_t>();
+        const acc_t sqrt_c = std::sqrt(acc_t(curvature));
+        const acc_t atanh_limit = kMidpointAtanhLimit, tanh_limit = kMidpointTanhLimit;
+        const scalar_t* pp = pts.data_ptr<scalar_t>();
+        scalar_t* op = result.data_ptr<scalar_t>();
+        at::parallel_for(0, B, utils::row_grain_size(K * D), [&](int64_t begin, int64_t end) {
+            utils::RowScratch<scalar_t> scratch(2, D);
+            for (int64_t b = begin; b < end; ++b) {
+                acc_t* acc = utils::work_row(op + b * D, scratch.row(1));
+                std::fill(acc, acc + D, acc_t(0));
+                const acc_t* wb = wp + b * w_stride;
+                for (int64_t k = 0; k < K; ++k) {
+                    const acc_t* xk = utils::load_row(pp + (b * K + k) * D, scratch.row(0), D);
+                    acc_t scn = sqrt_c * std::sqrt(utils::row_dots<1>({ xk }, { xk }, D)[0]);
+                    acc_t coeff = std::atanh(std::clamp(scn, -atanh_limit, atanh_limit)) / (scn + kMidpointEps);
+                    utils::row_combine(acc, D, acc_t(1), acc, wb[k] * coeff, xk);
+                }
+                acc_t scn = sqrt_c * std::sqrt(utils::row_dots<1>({ acc }, { acc }, D)[0]);
+                acc_t exp_coeff = std::tanh(std::clamp(scn, -tanh_limit, tanh_limit)) / (scn + kMidpointEps);
+                utils::row_scale(acc, D, exp_coeff, acc);
+                utils::store_row(op + b * D, acc, D);
+            }
+        });
+    });
+    return result;
+}
+
 torch::Tensor GeodesicActivation::einstein_midpoint(
     const torch::Tensor& points,
     const torch::Tensor& weights,
@@ -59,44 +135,35 @@ torch::Tensor GeodesicActivation::einstein_midpoint(
     if (points.is_cuda()) {
         return einstein_midpoint_cuda(points, weights, curvature);
     }
-    
     // CPU 구현: M_E = exp_0(∑ᵢ wᵢ·log_0(xᵢ))
-    auto batch_size = points.size(0);
-    auto num_points = points.size(1);
-    auto dim = points.size(2);
-    
-    auto result = torch::zeros({batch_size, dim}, points.options());
-    
-    for (int b = 0; b < batch_size; ++b) {
-        auto weighted_log_sum = torch::zeros({dim}, points.options());
-        
-        for (int k = 0; k < num_points; ++k) {
-            auto point = points[b][k];
-            auto weight = weights[k];
-            
-            // 로그 맵 계산: log_0(x)
-            auto norm = torch::norm(point, 2);
-            auto sqrt_c = std::sqrt(curvature);
-            
-            // 안전한 atanh 계산
-            auto atanh_arg = torch::clamp(sqrt_c * norm, -0.99f, 0.99f);
-            auto coeff = torch::atanh(atanh_arg) / (sqrt_c * norm + 1e-7f);
-            
-            auto log_point = coeff * point;
-            weighted_log_sum += weight * log_point;
-        }
-        
-        // 지수 맵 계산: exp_0(weighted_log_sum)
-        auto log_norm = torch::norm(weighted_log_sum, 2);
-        auto sqrt_c = std::sqrt(curvature);
-        
-        auto tanh_arg = torch::clamp(sqrt_c * log_norm, -88.0f, 88.0f);
-        auto exp_coeff = torch::tanh(tanh_arg) / (sqrt_c * log_norm + 1e-7f);
-        
-        result[b] = exp_coeff * weighted_log_sum;
-    }
-    
-    return result;
+    return einstein_midpoint_cpu(points, weights, curvature);
+}
+
+torch::Tensor multi_geodesic_mixing_cpu(
+    const torch::Tensor& input,
+    const torch::Tensor& anchors,
+    const torch::Tensor& t_values,
+    const torch::Tensor& weights,
+    float curvature
+) {
+    TORCH_CHECK(input.dim() == 2 && anchors.dim() == 2 && anchors.size(1) == input.size(1),
+        "multi_geodesic_mixing_cpu: input 은 [B, D], anchors 는 [K, D] 이어야 함");
+    // half/bf16 은 fp32 로 계산 후 입력 타입으로 되돌린다
+    auto dtype = at::promote_types(input.scalar_type(), torch::kFloat32);
+    auto x = input.to(dtype);
+
+    // 앵커별 상수는 한 번만 계산: t_k = sigmoid(t_params), w_k = softmax(weights)
+    auto t = torch::sigmoid(t_values.to(dtype));
+    auto w = torch::softmax(weights.to(dtype), 0);
+
+    // 원점에서 t_k·x 까지의 측지선 점 t_k·x / (1 + c·t_k²|x|²) 은 x 의 행 스칼라배
+    auto norm_sq = (x * x).sum(1, /*keepdim=*/true);
+    auto geodesic_scale = t / (1.0f + curvature * t * t * norm_sq);   // [B, K]
+
+    // 앵커 거리 가중치 w_k·exp(-|x - a_k|), 거리는 GEMM 기반 cdist 로 한 번에
+    auto mix = w * torch::exp(-torch::cdist(x, anchors.to(dtype)));   // [B, K]
+    auto scale = (mix * geodesic_scale).sum(1, /*keepdim=*/true) / (mix.sum(1, /*keepdim=*/true) + 1e-7f);
+    return (scale * x).to(input.scalar_type());
 }
 
 torch::Tensor GeodesicActivation::multi_geodesic_mixing(
@@ -106,43 +173,7 @@ torch::Tensor GeodesicActivation::multi_geodesic_mixing(
     if (input.is_cuda()) {
         return multi_geodesic_mixing_cuda(input, anchors, t_params, weights, curvature);
     }
-    
-    // CPU 구현
-    auto batch_size = input.size(0);
-    auto dim = input.size(1);
-    auto result = torch::zeros_like(input);
-    
-    for (int b = 0; b < batch_size; ++b) {
-        auto input_point = input[b];
-        auto mixed_result = torch::zeros({dim}, input.options());
-        float total_weight = 0.0f;
-        
-        for (int k = 0; k < num_anchors; ++k) {
-            auto anchor = anchors[k];
-            auto t = torch::sigmoid(t_params[k]).item<float>(); // [0,1] 범위로 정규화
-            auto w = torch::softmax(weights, 0)[k].item<float>(); // 가중치 정규화
-            
-            // 측지선 보간: γ(t) = (1-t)·0 ⊕_c t·input
-            // 원점에서 input까지의 측지선에서 t 지점
-            auto scaled_input = t * input_point;
-            
-            // 간단한 Möbius 덧셈 (원점과 scaled_input)
-            auto norm_sq = torch::sum(scaled_input * scaled_input);
-            auto denom = 1.0f + curvature * norm_sq;
-            auto geodesic_point = scaled_input / denom;
-            
-            // 앵커와의 거리 기반 가중치
-            auto dist = torch::norm(input_point - anchor, 2);
-            auto distance_weight = torch::exp(-dist);
-            
-            mixed_result += (w * distance_weight) * geodesic_point;
-            total_weight += (w * distance_weight).item<float>();
-        }
-        
-        result[b] = mixed_result / (total_weight + 1e-7f);
-    }
-    
-    return result;
+    return multi_geodesic_mixing_cpu(input, anchors, t_params, weights, curvature);
 }
 
 } // namespace reality_stone::advanced 
\ No newline at end of file
@@ -1,10 +1,112 @@
 #include <torch/extension.h>
+#include <ATen/Parallel.h>
 #include <advanced/hyperbolic_fft/hyperbolic_fft.h>
+#include <utils/cpu_kernels.h>
 #include <cmath>
 #include <complex>
+#include <memory>
+#include <mutex>
+#include <unordered_map>
+#include <vector>
+
+namespace utils = reality_stone::utils;
 
 namespace reality_stone::advanced {
 
+namespace {
+
+/**
+ * 정규화된 르장드르 함수 P̄_l^m = N_l^m·P_l^m, N_l^m = sqrt((2l+1)/(4π)·(l-m)!/(l+m)!) 의 점화 계수
+ * l_max 마다 한 번만 만들어 재사용 (계승 비는 계수 안에 흡수되어 넘침이 없다)
+ *   P̄_0^0     = 1/sqrt(4π)
+ *   P̄_m^m     = -sqrt((2m+1)/(2m))·sinθ·P̄_{m-1}^{m-1}   (콘던-쇼틀리 위상 포함)
+ *   P̄_{m+1}^m = sqrt(2m+3)·cosθ·P̄_m^m
+ *   P̄_l^m     = a_lm·cosθ·P̄_{l-1}^m - b_lm·P̄_{l-2}^m
+ */
+struct HarmonicTables {
+    std::vector<double> diag;  // [m]
+    std::vector<double> sub;   // [m]
+    std::vector<double> a, b;  // [l(l+1)/2 + m]
+};
+
+const HarmonicTables& harmonic_tables(int l_max) {
+    static std::mutex mutex;
+    static std::unordered_map<int, std::unique_ptr<HarmonicTables>> cache;
+    std::lock_guard<std::mutex> lock(mutex);
+    auto& entry = cache[l_max];
+    if (!entry) {
+        entry = std::make_unique<HarmonicTables>();
+        auto& t = *entry;
+        t.diag.assign(l_max + 1, 0.0);
+        t.sub.assign(l_max + 1, 0.0);
+        t.a.assign((l_max + 1) * (l_max + 2) / 2, 0.0);
+        t.b.assign(t.a.size(), 0.0);
+        for (int m = 0; m <= l_max; ++m) {
+            if (m > 0) t.diag[m] = -std::sqrt((2.0 * m + 1) / (2.0 * m));
+            t.sub[m] = std::sqrt(2.0 * m + 3);
+            for (int l = m + 2; l <= l_max; ++l) {
+                double lm = static_cast<double>(l - m) * (l + m);
+                int idx = l * (l + 1) / 2 + m;
+                t.a[idx] = std::sqrt((2.0 * l - 1) * (2.0 * l + 1) / lm);
+                t.b[idx] = std::sqrt((2.0 * l + 1) * (l + m - 1) * (l - m - 1) / (lm * (2.0 * l - 3)));
+            }
+        }
+    }
+    return *entry;
+}
+
+/**
+ * 실수 구면 조화 함수 전체 (l, m) 를 한 번의 점화로 생성해 store(l² + l + m, 값) 로 넘긴다
+ * m > 0: √2·P̄_l^m·cos(mφ), m < 0: √2·P̄_l^|m|·sin(|m|φ), m = 0: P̄_l^0
+ * T 는 double (행 커널) 또는 torch::Tensor (미분 가능한 경로). O(l_max²)
+ */
+template <typename T, typename Store>
+void real_spherical_harmonics(
+    const HarmonicTables& tables,
+    int l_max,
+    const T& x,
+    const T& sin_theta,
+    const T& cos_phi,
+    const T& sin_phi,
+    const T& one,
+    Store&& store
+) {
+    const double sqrt2 = std::sqrt(2.0);
+    auto emit = [&](int l, int m, const T& p, const T& cm, const T& sm) {
+        if (m == 0) {
+            store(l * l + l, p);
+        } else {
+            store(l * l + l + m, sqrt2 * p * cm);
+            store(l * l + l - m, sqrt2 * p * sm);
+        }
+    };
+    T pmm = one * (1.0 / std::sqrt(4.0 * M_PI));
+    T cm = one;          // cos(mφ)
+    T sm = one * 0.0;    // sin(mφ)
+    for (int m = 0; m <= l_max; ++m) {
+        if (m > 0) {
+            pmm = tables.diag[m] * sin_theta * pmm;
+            T next_cm = cm * cos_phi - sm * sin_phi;
+            sm = sm * cos_phi + cm * sin_phi;
+            cm = next_cm;
+        }
+        emit(m, m, pmm, cm, sm);
+        if (m == l_max) break;
+        T p_prev = pmm;
+        T p_curr = tables.sub[m] * x * pmm;
+        emit(m + 1, m, p_curr, cm, sm);
+        for (int l = m + 2; l <= l_max; ++l) {
+            int idx = l * (l + 1) / 2 + m;
+            T p_next = tables.a[idx] * x * p_curr - tables.b[idx] * p_prev;
+            p_prev = p_curr;
+            p_curr = p_next;
+            emit(l, m, p_curr, cm, sm);
+        }
+    }
+}
+
+} // namespace
+
 // HyperbolicFFT 클래스 구현
 HyperbolicFFT::HyperbolicFFT(float curvature, int max_l) 
     : curvature(curvature), max_l(max_l), cache_valid(false) {
@@ -32,24 +134,10 @@ torch::Tensor HyperbolicFFT::forward_transform(const torch::Tensor& x) {
     
     auto theta_phi = torch::cat({theta, phi}, 1); // [B, 2]
     
-    // 구면 조화 함수 계산
-    auto total_coeffs = (max_l + 1) * (max_l + 1);
-    auto coeffs = torch::zeros({batch_size, total_coeffs}, x.options());
-    
-    for (int l = 0; l <= max_l; ++l) {
-        for (int m = -l; m <= l; ++m) {
-            auto harmonic = compute_spherical_harmonics(theta_phi, l, m); // [B, 1]
-            int idx = l * l + l + m;
-            
-            // 하이퍼볼릭 가중치 적용
-            auto sqrt_c = std::sqrt(curvature);
-            auto hyperbolic_weight = torch::tanh(sqrt_c * r).squeeze(1); // [B]
-            
-            coeffs.select(1, idx) = harmonic.squeeze(1) * hyperbolic_weight;
-        }
-    }
-    
-    return coeffs;
+    // 모든 (l, m) 의 구면 조화 함수 [B, (max_l+1)²] 를 한 번에, 하이퍼볼릭 가중치는 행마다 한 번
+    auto sqrt_c = std::sqrt(curvature);
+    auto hyperbolic_weight = torch::tanh(sqrt_c * r); // [B, 1]
+    return spherical_harmonics_cpu(theta_phi, max_l) * hyperbolic_weight;
 }
 
 torch::Tensor HyperbolicFFT::inverse_transform(const torch::Tensor& coeffs) {
@@ -94,30 +182,8 @@ torch::Tensor HyperbolicFFT::compute_spherical_harmonics(
     int l,
     int m
 ) {
-    auto batch_size = theta_phi.size(0);
-    auto theta = theta_phi.select(1, 0); // [B]
-    auto phi = theta_phi.select(1, 1);   // [B]
-    
-    // Associated Legendre 다항식 계산
-    auto cos_theta = torch::cos(theta);
-    auto legendre = compute_associated_legendre(cos_theta, l, std::abs(m));
-    
-    // 정규화 인수
-    auto factorial_ratio = 1.0f;
-    for (int k = l - std::abs(m) + 1; k <= l + std::abs(m); ++k) {
-        factorial_ratio *= k;
-    }
-    auto normalization = std::sqrt((2 * l + 1) * factorial_ratio / (4 * M_PI));
-    
-    // 구면 조화 함수
-    torch::Tensor result;
-    if (m >= 0) {
-        result = normalization * legendre * torch::cos(m * phi);
-    } else {
-        result = normalization * legendre * torch::sin(std::abs(m) * phi);
-    }
-    
-    return result.unsqueeze(1); // [B, 1]
+    TORCH_CHECK(std::abs(m) <= l, "compute_spherical_harmonics: |m| <= l 이어야 함");
+    return spherical_harmonics_cpu(theta_phi, l).narrow(1, l * l + l + m, 1); // [B, 1]
 }
 
 torch::Tensor HyperbolicFFT::compute_associated_legendre(
@@ -272,8 +338,8 @@ torch::Tensor RiemannianOperator::geodesic_sgd_step(
 }
 
 // 편의 함수들
-torch::Tensor hyperbolic_fft_cpu(const torch::Tensor& x, float curvature) {
-    HyperbolicFFT fft(curvature, 20); // 더 높은 해상도
+torch::Tensor hyperbolic_fft_cpu(const torch::Tensor& x, float curvature, int max_l) {
+    HyperbolicFFT fft(curvature, max_l);
     return fft.forward_transform(x);
 }
 torch::Tensor inverse_hyperbolic_fft_cpu(const torch::Tensor& coeffs, float curvature) {
@@ -284,17 +350,42 @@ torch::Tensor inverse_hyperbolic_fft_cpu(const torch::Tensor& coeffs, float curv
 }
 
 torch::Tensor spherical_harmonics_cpu(const torch::Tensor& theta_phi, int l_max) {
-    HyperbolicFFT fft(1.0f, l_max);
-    auto result = torch::zeros({theta_phi.size(0), (l_max + 1) * (l_max + 1)}, theta_phi.options());
-    
-    for (int l = 0; l <= l_max; ++l) {
-        for (int m = -l; m <= l; ++m) {
-            auto harmonic = fft.compute_spherical_harmonics(theta_phi, l, m);
-            int idx = l * l + l + m;
-            result.select(1, idx) = harmonic.squeeze(1);
-        }
+    TORCH_CHECK(theta_phi.dim() == 2 && theta_phi.size(1) == 2, "spherical_harmonics_cpu: theta_phi 는 [B, 2] 이어야 함");
+    TORCH_CHECK(l_max >= 0, "spherical_harmonics_cpu: l_max 는 0 이상이어야 함");
+    const auto& tables = harmonic_tables(l_max);
+    const int64_t B = theta_phi.size(0);
+    const int64_t N = static_cast<int64_t>(l_max + 1) * (l_max + 1);
+    auto theta = theta_phi.select(1, 0);
+    auto phi = theta_phi.select(1, 1);
+
+    if (utils::requires_grad({ theta_phi })) {
+        // 미분 가능한 경로: 같은 점화를 배치 텐서 연산으로 (열 N 개를 모아 stack)
+        auto x = torch::cos(theta);
+        auto sin_theta = torch::sqrt(torch::clamp_min(1 - x * x, 0));
+        std::vector<torch::Tensor> columns(N);
+        real_spherical_harmonics<torch::Tensor>(tables, l_max, x, sin_theta, torch::cos(phi), torch::sin(phi),
+            torch::ones_like(x), [&](int64_t idx, const torch::Tensor& value) { columns[idx] = value; });
+        return torch::stack(columns, 1);
     }
-    
+
+    // 행마다 스칼라 점화 한 번 (배치는 병렬), 출력 행에 바로 기록
+    auto angles = theta_phi.contiguous();
+    auto result = torch::empty({ B, N }, theta_phi.options());
+    AT_DISPATCH_FLOATING_TYPES(theta_phi.scalar_type(), "spherical_harmonics_cpu", [&] {
+        const scalar_t* in = angles.data_ptr<scalar_t>();
+        scalar_t* out = result.data_ptr<scalar_t>();
+        at::parallel_for(0, B, utils::row_grain_size(N), [&](int64_t begin, int64_t end) {
+            for (int64_t b = begin; b < end; ++b) {
+                const double th = static_cast<double>(in[2 * b]);
+                const double ph = static_cast<double>(in[2 * b + 1]);
+                const double x = std::cos(th);
+                scalar_t* row = out + b * N;
+                real_spherical_harmonics<double>(tables, l_max, x, std::sqrt(std::max(1.0 - x * x, 0.0)),
+                    std::cos(ph), std::sin(ph), 1.0,
+                    [row](int64_t idx, double value) { row[idx] = static_cast<scalar_t>(value); });
+            }
+        });
+    });
     return result;
 }
 
@@ -0,0 +1,392 @@
+#include <torch/extension.h>
+#include <ATen/Parallel.h>
+#include <advanced/index/hnsw.h>
+#include <advanced/index/metric.h>
+#include <algorithm>
+#include <array>
+#include <cmath>
+#include <limits>
+#include <mutex>
+#include <queue>
+#include <vector>
+
+namespace reality_stone::advanced {
+
+namespace {
+
+using detail::Metric;
+
+constexpr double kInf = std::numeric_limits<double>::infinity();
+// 이웃 목록 잠금 개수 (노드 번호로 나눠 쓴다)
+constexpr int64_t kLockStripes = 4096;
+
+// 탐색 후보: key = cosh(√c·d) (작을수록 가깝다)
+struct Candidate {
+    double key;
+    int32_t id;
+    bool operator<(const Candidate& other) const { return key < other.key; }
+    bool operator>(const Candidate& other) const { return key > other.key; }
+};
+
+/**
+ * 방문 표시 (스레드별로 재사용)
+ * 세대 번호를 올려 초기화를 대신하고, 번호가 한 바퀴 돌 때만 전체를 지운다.
+ */
+class VisitedSet {
+public:
+    static VisitedSet& local(int64_t n) {
+        static thread_local VisitedSet visited;
+        visited.reset(n);
+        return visited;
+    }
+
+    bool insert(int32_t id) {
+        if (tags_[id] == generation_) return false;
+        tags_[id] = generation_;
+        return true;
+    }
+
+private:
+    void reset(int64_t n) {
+        if (static_cast<int64_t>(tags_.size()) < n) {
+            tags_.assign(n, 0);
+            generation_ = 0;
+        }
+        if (++generation_ == 0) {
+            std::fill(tags_.begin(), tags_.end(), 0);
+            generation_ = 1;
+        }
+    }
+
+    std::vector<uint32_t> tags_;
+    uint32_t generation_ = 0;
+};
+
+struct LockStripes {
+    std::array<std::mutex, kLockStripes> locks;
+    std::mutex& operator()(int64_t node) { return locks[node % kLockStripes]; }
+};
+
+// 층별 이웃 목록 접근
+struct Graph {
+    int32_t* layer0;
+    int64_t m0;
+    int32_t* upper;
+    int64_t m;
+    const int64_t* levels;
+    const int64_t* upper_start;
+
+    int32_t* links(int64_t node, int64_t layer) const {
+        return layer == 0 ? layer0 + node * m0 : upper + (upper_start[node] + layer - 1) * m;
+    }
+    int64_t capacity(int64_t layer) const { return layer == 0 ? m0 : m; }
+};
+
+/**
+ * 한 dtype 에 대한 HNSW 연산
+ * locks 가 있으면 (삽입 중) 이웃 목록을 읽고 쓸 때 노드 잠금을 잡는다. 두 잠금을 동시에 잡는 일은 없다.
+ */
+template <typename scalar_t>
+struct Searcher {
+    const Metric& metric;
+    const scalar_t* base;
+    Graph graph;
+    int64_t num_nodes;
+    LockStripes* locks = nullptr;
+
+    const scalar_t* point(int64_t node) const { return base + node * metric.D; }
+
+    void to_double(int64_t node, std::vector<double>& out) const {
+        out.resize(metric.D);
+        const scalar_t* p = point(node);
+        for (int64_t d = 0; d < metric.D; ++d) out[d] = static_cast<double>(p[d]);
+    }
+
+    void copy_links(int64_t node, int64_t layer, std::vector<int32_t>& out) const {
+        const int32_t* links = graph.links(node, layer);
+        const int64_t cap = graph.capacity(layer);
+        auto copy = [&] {
+            out.clear();
+            for (int64_t i = 0; i < cap && links[i] >= 0; ++i) out.push_back(links[i]);
+        };
+        if (locks) {
+            std::lock_guard<std::mutex> guard((*locks)(node));
+            copy();
+        } else {
+            copy();
+        }
+    }
+
+    // 위층에서의 탐욕적 1-최근접 하강
+    Candidate greedy(const double* q, double q_factor, Candidate current, int64_t layer,
+                     std::vector<int32_t>& buffer) const {
+        bool changed = true;
+        while (changed) {
+            changed = false;
+            copy_links(current.id, layer, buffer);
+            for (int32_t nb : buffer) {
+                const double key = metric.key(q, q_factor, point(nb));
+                if (key < current.key) {
+                    current = { key, nb };
+                    changed = true;
+                }
+            }
+        }
+        return current;
+    }
+
+    // 한 층에서 폭 ef 의 최선 우선 탐색. 반환은 가까운 순
+    std::vector<Candidate> search_layer(const double* q, double q_factor, const std::vector<Candidate>& entries,
+                                        int64_t ef, int64_t layer, std::vector<int32_t>& buffer) const {
+        VisitedSet& visited = VisitedSet::local(num_nodes);
+        std::priority_queue<Candidate, std::vector<Candidate>, std::greater<Candidate>> frontier;
+        std::priority_queue<Candidate> best;  // 현재 ef 개 중 가장 먼 후보가 top
+        for (const auto& e : entries) {
+            if (!visited.insert(e.id)) continue;
+            frontier.push(e);
+            best.push(e);
+            if (static_cast<int64_t>(best.size()) > ef) best.pop();
+        }
+        while (!frontier.empty()) {
+            const Candidate current = frontier.top();
+            if (static_cast<int64_t>(best.size()) >= ef && current.key > best.top().key) break;
+            frontier.pop();
+            copy_links(current.id, layer, buffer);
+            for (int32_t nb : buffer) {
+                if (!visited.insert(nb)) continue;
+                const double key = metric.key(q, q_factor, point(nb));
+                if (static_cast<int64_t>(best.size()) < ef || key < best.top().key) {
+                    frontier.push({ key, nb });
+                    best.push({ key, nb });
+                    if (static_cast<int64_t>(best.size()) > ef) best.pop();
+                }
+            }
+        }
+        std::vector<Candidate> result(best.size());
+        for (int64_t i = static_cast<int64_t>(result.size()) - 1; i >= 0; --i) {
+            result[i] = best.top();
+            best.pop();
+        }
+        return result;
+    }
+
+    /**
+     * 이웃 선택 휴리스틱 (가까운 순 후보에서 최대 max_links 개)
+     * 이미 고른 이웃 r 이 후보 e 에 쿼리보다 가까우면 (d(e, r) < d(e, q)) e 를 미뤄 방향이 다양한 이웃을 먼저 고른다.
+     * 쌍곡 공간은 나무에 가까워 이 조건으로 대부분이 걸러지므로, 남는 자리는 미룬 후보로 가까운 순으로 채운다
+     * (keepPrunedConnections). 그러지 않으면 그래프가 거의 트리가 되어 재현율이 ef 와 무관하게 묶인다.
+     */
+    std::vector<Candidate> select(const std::vector<Candidate>& sorted, int64_t max_links,
+                                  std::vector<double>& scratch) const {
+        std::vector<Candidate> chosen, pruned;
+        for (const auto& e : sorted) {
+            if (static_cast<int64_t>(chosen.size()) >= max_links) break;
+            to_double(e.id, scratch);
+            const double factor = metric.prepare(scratch.data());
+            bool keep = true;
+            for (const auto& r : chosen) {
+                if (metric.key(scratch.data(), factor, point(r.id)) < e.key) {
+                    keep = false;
+                    break;
+                }
+            }
+            (keep ? chosen : pruned).push_back(e);
+        }
+        for (const auto& e : pruned) {
+            if (static_cast<int64_t>(chosen.size()) >= max_links) break;
+            chosen.push_back(e);
+        }
+        return chosen;
+    }
+
+    // node 의 이웃을 쓰고, 각 이웃에 역방향 연결을 더한다 (가득 차면 휴리스틱으로 다시 고른다)
+    void connect(int32_t node, int64_t layer, const std::vector<Candidate>& neighbors,
+                 std::vector<double>& scratch) const {
+        const int64_t cap = graph.capacity(layer);
+        {
+            std::lock_guard<std::mutex> guard((*locks)(node));
+            int32_t* links = graph.links(node, layer);
+            for (int64_t i = 0; i < cap; ++i) {
+                links[i] = i < static_cast<int64_t>(neighbors.size()) ? neighbors[i].id : -1;
+            }
+        }
+        std::vector<double> owner;
+        std::vector<Candidate> pool;
+        for (const auto& e : neighbors) {
+            std::lock_guard<std::mutex> guard((*locks)(e.id));
+            int32_t* links = graph.links(e.id, layer);
+            int64_t count = 0;
+            while (count < cap && links[count] >= 0) ++count;
+            if (count < cap) {
+                links[count] = node;
+                continue;
+            }
+            to_double(e.id, owner);
+            const double factor = metric.prepare(owner.data());
+            pool.clear();
+            pool.push_back({ e.key, node });
+            for (int64_t i = 0; i < cap; ++i) {
+                pool.push_back({ metric.key(owner.data(), factor, point(links[i])), links[i] });
+            }
+            std::sort(pool.begin(), pool.end());
+            const auto kept = select(pool, cap, scratch);
+            for (int64_t i = 0; i < cap; ++i) {
+                links[i] = i < static_cast<int64_t>(kept.size()) ? kept[i].id : -1;
+            }
+        }
+    }
+};
+
+void check_graph(
+    const torch::Tensor& points,
+    const torch::Tensor& levels,
+    const torch::Tensor& upper_start,
+    const torch::Tensor& graph0,
+    const torch::Tensor& upper
+) {
+    TORCH_CHECK(points.dim() == 2 && points.is_contiguous(), "points must be a contiguous [cap, D] tensor");
+    TORCH_CHECK(levels.scalar_type() == torch::kLong && upper_start.scalar_type() == torch::kLong,
+        "levels / upper_start must be int64");
+    TORCH_CHECK(levels.is_contiguous() && upper_start.is_contiguous(), "levels / upper_start must be contiguous");
+    TORCH_CHECK(graph0.scalar_type() == torch::kInt && upper.scalar_type() == torch::kInt,
+        "graph0 / upper must be int32");
+    TORCH_CHECK(graph0.dim() == 2 && upper.dim() == 2 && graph0.is_contiguous() && upper.is_contiguous(),
+        "graph0 / upper must be contiguous 2-D tensors");
+    TORCH_CHECK(graph0.size(0) >= points.size(0) && levels.numel() >= points.size(0)
+        && upper_start.numel() >= points.size(0), "graph tensors are smaller than points");
+    TORCH_CHECK(points.size(0) <= std::numeric_limits<int32_t>::max(), "too many nodes for int32 links");
+}
+
+Graph make_graph(
+    const torch::Tensor& levels,
+    const torch::Tensor& upper_start,
+    const torch::Tensor& graph0,
+    const torch::Tensor& upper
+) {
+    return Graph{
+        graph0.data_ptr<int32_t>(), graph0.size(1),
+        upper.data_ptr<int32_t>(), upper.size(1),
+        levels.data_ptr<int64_t>(), upper_start.data_ptr<int64_t>()
+    };
+}
+
+} // namespace
+
+int64_t hnsw_insert_cpu(
+    const torch::Tensor& points,
+    const torch::Tensor& levels,
+    const torch::Tensor& upper_start,
+    torch::Tensor graph0,
+    torch::Tensor upper,
+    int64_t begin,
+    int64_t end,
+    int64_t entry_point,
+    int64_t ef_construction,
+    const std::string& model,
+    float curvature
+) {
+    check_graph(points, levels, upper_start, graph0, upper);
+    TORCH_CHECK(0 <= begin && begin <= end && end <= points.size(0), "invalid insertion range");
+    TORCH_CHECK(ef_construction >= 1, "ef_construction must be positive");
+    if (begin == end) return entry_point;
+    if (entry_point < 0) entry_point = begin++;
+
+    const Metric metric(model, curvature, points.size(1));
+    const Graph graph = make_graph(levels, upper_start, graph0, upper);
+    const int64_t* level_ptr = levels.data_ptr<int64_t>();
+    LockStripes locks;
+    std::mutex entry_lock;
+    int64_t entry = entry_point;
+
+    AT_DISPATCH_FLOATING_TYPES(points.scalar_type(), "hnsw_insert_cpu", [&] {
+        Searcher<scalar_t> searcher{ metric, points.data_ptr<scalar_t>(), graph, end, &locks };
+        at::parallel_for(begin, end, 1, [&](int64_t first, int64_t last) {
+            std::vector<double> q, scratch;
+            std::vector<int32_t> buffer;
+            for (int64_t node = first; node < last; ++node) {
+                // 진입점보다 높은 층의 노드는 삽입이 끝날 때까지 진입점을 잠근다
+                std::unique_lock<std::mutex> guard(entry_lock);
+                const int64_t ep = entry;
+                const int64_t top = level_ptr[ep];
+                const int64_t level = level_ptr[node];
+                if (level <= top) guard.unlock();
+
+                searcher.to_double(node, q);
+                const double factor = metric.prepare(q.data());
+                Candidate current{ metric.key(q.data(), factor, searcher.point(ep)), static_cast<int32_t>(ep) };
+                for (int64_t layer = top; layer > level; --layer) {
+                    current = searcher.greedy(q.data(), factor, current, layer, buffer);
+                }
+                std::vector<Candidate> entries{ current };
+                for (int64_t layer = std::min(level, top); layer >= 0; --layer) {
+                    auto found = searcher.search_layer(q.data(), factor, entries, ef_construction, layer, buffer);
+                    // 동시에 삽입된 이웃이 이미 이 노드를 연결했을 수 있다
+                    found.erase(std::remove_if(found.begin(), found.end(),
+                        [node](const Candidate& c) { return c.id == node; }), found.end());
+                    const auto neighbors = searcher.select(found, graph.m, scratch);
+                    searcher.connect(static_cast<int32_t>(node), layer, neighbors, scratch);
+                    if (!found.empty()) entries = std::move(found);
+                }
+                if (level > top) entry = node;
+            }
+        });
+    });
+    return entry;
+}
+
+std::tuple<torch::Tensor, torch::Tensor> hnsw_search_cpu(
+    const torch::Tensor& points,
+    const torch::Tensor& levels,
+    const torch::Tensor& upper_start,
+    const torch::Tensor& graph0,
+    const torch::Tensor& upper,
+    int64_t entry_point,
+    const torch::Tensor& queries,
+    int64_t k,
+    int64_t ef,
+    const std::string& model,
+    float curvature
+) {
+    check_graph(points, levels, upper_start, graph0, upper);
+    TORCH_CHECK(queries.dim() == 2 && queries.size(1) == points.size(1),
+        "queries must be [Q, D] with the same D as the index");
+    TORCH_CHECK(k >= 1, "k must be positive");
+    const int64_t Q = queries.size(0);
+    auto distances = torch::full({ Q, k }, kInf, torch::kFloat64);
+    auto indices = torch::full({ Q, k }, -1, torch::kLong);
+    if (entry_point < 0 || Q == 0) return { distances, indices };
+
+    const Metric metric(model, curvature, points.size(1));
+    const Graph graph = make_graph(levels, upper_start, graph0, upper);
+    const int64_t top = levels.data_ptr<int64_t>()[entry_point];
+    const int64_t width = std::max(ef, k);
+    auto q_data = queries.to(torch::kFloat64).contiguous();
+
+    AT_DISPATCH_FLOATING_TYPES(points.scalar_type(), "hnsw_search_cpu", [&] {
+        const Searcher<scalar_t> searcher{ metric, points.data_ptr<scalar_t>(), graph, points.size(0) };
+        const double* qs = q_data.data_ptr<double>();
+        double* out_d = distances.data_ptr<double>();
+        int64_t* out_i = indices.data_ptr<int64_t>();
+        at::parallel_for(0, Q, 1, [&](int64_t first, int64_t last) {
+            std::vector<int32_t> buffer;
+            for (int64_t qi = first; qi < last; ++qi) {
+                const double* q = qs + qi * metric.D;
+                const double factor = metric.prepare(q);
+                Candidate current{ metric.key(q, factor, searcher.point(entry_point)),
+                                   static_cast<int32_t>(entry_point) };
+                for (int64_t layer = top; layer > 0; --layer) {
+                    current = searcher.greedy(q, factor, current, layer, buffer);
+                }
+                const auto found = searcher.search_layer(q, factor, { current }, width, 0, buffer);
+                const int64_t count = std::min<int64_t>(k, found.size());
+                for (int64_t j = 0; j < count; ++j) {
+                    out_d[qi * k + j] = metric.distance(found[j].key);
+                    out_i[qi * k + j] = found[j].id;
+                }
+            }
+        });
+    });
+    return { distances, indices };
+}
+
+} // namespace reality_stone::advanced
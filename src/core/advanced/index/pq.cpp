@@ -0,0 +1,243 @@
+#include <torch/extension.h>
+#include <ATen/Parallel.h>
+#include <advanced/index/pq.h>
+#include <config/constant.h>
+#include <algorithm>
+#include <cmath>
+#include <limits>
+#include <utility>
+#include <vector>
+
+namespace config = reality_stone::config;
+
+namespace reality_stone::advanced {
+
+namespace {
+
+// 한 번에 모든 쿼리를 훑는 점 묶음 (코드가 L1 에 머무는 크기)
+constexpr int64_t kScanBlock = 256;
+// 조회표 한 행의 길이 (코드북이 더 작으면 0 으로 채운다)
+constexpr int64_t kCodebookSize = 256;
+
+/**
+ * 묶음 [start, stop) 의 Σ_m table[m][code[m]]
+ * 부분 공간을 바깥 루프로 두어 점마다의 덧셈이 서로 독립이 되게 한다 (덧셈 지연이 겹친다).
+ * kM > 0 이면 부분 공간 수를 컴파일 시간에 고정한다.
+ */
+template <int64_t kM>
+void lookup_sums(const float* table, const uint8_t* codes, int64_t M, int64_t start, int64_t stop, float* out) {
+    const int64_t count = kM > 0 ? kM : M;
+    const int64_t n = stop - start;
+    const uint8_t* block = codes + start * count;
+    std::fill(out, out + n, 0.0f);
+    for (int64_t m = 0; m < count; ++m) {
+        const float* row = table + m * kCodebookSize;
+        for (int64_t i = 0; i < n; ++i) out[i] += row[block[i * count + m]];
+    }
+}
+
+using LookupFn = void (*)(const float*, const uint8_t*, int64_t, int64_t, int64_t, float*);
+
+LookupFn lookup_for(int64_t M) {
+    switch (M) {
+        case 4: return lookup_sums<4>;
+        case 8: return lookup_sums<8>;
+        case 16: return lookup_sums<16>;
+        case 32: return lookup_sums<32>;
+        default: return lookup_sums<0>;
+    }
+}
+
+// 코드북 [M, K, ds] 를 f32 [M, kCodebookSize, ds] 로 (남는 중심은 0)
+torch::Tensor padded_codebooks(const torch::Tensor& codebooks) {
+    auto books = codebooks.to(torch::kFloat32);
+    const int64_t K = books.size(1);
+    if (K < kCodebookSize) books = at::constant_pad_nd(books, { 0, 0, 0, kCodebookSize - K });
+    return books.contiguous();
+}
+
+void check_codebooks(const torch::Tensor& codebooks) {
+    TORCH_CHECK(codebooks.dim() == 3 && codebooks.size(1) >= 1 && codebooks.size(1) <= kCodebookSize,
+        "codebooks must be [M, K <= 256, ds]");
+}
+
+// 점수가 작은 k 개를 유지하는 최대 힙 (top 이 현재 가장 큰 점수)
+class TopK {
+public:
+    explicit TopK(int64_t k = 0) : k_(k) { items_.reserve(k); }
+
+    float threshold() const {
+        return static_cast<int64_t>(items_.size()) < k_ ? std::numeric_limits<float>::infinity() : items_.front().first;
+    }
+
+    void push(float score, int64_t id) {
+        if (static_cast<int64_t>(items_.size()) < k_) {
+            items_.emplace_back(score, id);
+            std::push_heap(items_.begin(), items_.end());
+        } else if (score < items_.front().first) {
+            std::pop_heap(items_.begin(), items_.end());
+            items_.back() = { score, id };
+            std::push_heap(items_.begin(), items_.end());
+        }
+    }
+
+    const std::vector<std::pair<float, int64_t>>& items() const { return items_; }
+
+private:
+    int64_t k_;
+    std::vector<std::pair<float, int64_t>> items_;
+};
+
+} // namespace
+
+std::tuple<torch::Tensor, torch::Tensor> pq_search_cpu(
+    const torch::Tensor& codes,
+    const torch::Tensor& radius_codes,
+    const torch::Tensor& codebooks,
+    const torch::Tensor& radius_levels,
+    const torch::Tensor& queries,
+    int64_t k,
+    float curvature
+) {
+    TORCH_CHECK(codes.dim() == 2 && codes.scalar_type() == torch::kByte, "codes must be uint8 [N, M]");
+    TORCH_CHECK(radius_codes.dim() == 1 && radius_codes.scalar_type() == torch::kByte
+        && radius_codes.size(0) == codes.size(0), "radius_codes must be uint8 [N]");
+    check_codebooks(codebooks);
+    TORCH_CHECK(codebooks.size(0) == codes.size(1), "codebooks must have one book per code column");
+    TORCH_CHECK(radius_levels.dim() == 1 && radius_levels.numel() <= 256, "radius_levels must be [L <= 256]");
+    TORCH_CHECK(queries.dim() == 2 && queries.size(1) == codebooks.size(0) * codebooks.size(2),
+        "queries must be [Q, M * ds]");
+    TORCH_CHECK(k >= 1, "k must be positive");
+    TORCH_CHECK(curvature > 0.0f, "curvature must be positive");
+
+    const int64_t N = codes.size(0);
+    const int64_t M = codes.size(1);
+    const int64_t Q = queries.size(0);
+    const double c = curvature;
+
+    // 쿼리 상수: |x|, 2c / (1 - c|x|²), 단위 방향 x̂
+    auto q = queries.to(torch::kFloat32).contiguous();
+    auto q_norm = q.norm(2, 1, /*keepdim=*/true);
+    auto q_dir = q / q_norm.clamp_min(config::Constants::EPS);
+    auto q_scale = (2.0 * c) / (1.0 - c * q_norm.pow(2).to(torch::kFloat64)).clamp_min(config::Constants::EPS);
+    // LUT [Q, M, kCodebookSize] = x̂_m · codebooks[m]
+    auto books = padded_codebooks(codebooks);
+    auto lut = at::matmul(q_dir.view({ Q, M, -1 }).transpose(0, 1), books.transpose(1, 2))
+        .transpose(0, 1).contiguous();
+    // |codebooks[m][j]|² [M, K]: 복원한 방향 û 의 노름으로 ip 를 정규화한다
+    auto centroid_sq = books.pow(2).sum(-1).contiguous();
+    // 반지름 단계 표: r², 1 / (1 - c r²)
+    auto r = radius_levels.to(torch::kFloat64).contiguous();
+    auto r_conf = (1.0 - c * r.pow(2)).clamp_min(config::Constants::EPS).reciprocal();
+    auto r_sq_conf = (r.pow(2) * r_conf).to(torch::kFloat32).contiguous();
+    auto r_lin_conf = (2.0 * r * r_conf).to(torch::kFloat32).contiguous();
+    auto r_conf_f = r_conf.to(torch::kFloat32).contiguous();
+
+    auto code_data = codes.contiguous();
+    auto radius_data = radius_codes.contiguous();
+    const uint8_t* code_ptr = code_data.data_ptr<uint8_t>();
+    const uint8_t* rad_ptr = radius_data.data_ptr<uint8_t>();
+    const float* lut_ptr = lut.data_ptr<float>();
+    const float* csq_ptr = centroid_sq.data_ptr<float>();
+    const float* sq_ptr = r_sq_conf.data_ptr<float>();
+    const float* lin_ptr = r_lin_conf.data_ptr<float>();
+    const float* conf_ptr = r_conf_f.data_ptr<float>();
+    const float* qn_ptr = q_norm.data_ptr<float>();
+
+    /**
+     * 점수 s = (|x|² + r² - 2|x|·r·ip) / (1 - c r²) 는 쿼리마다 거리에 대해 단조이므로
+     * 스레드별로 s 가 작은 k 개를 모으고, 마지막에 key = 1 + 2c·s / (1 - c|x|²) 로 거리를 만든다.
+     */
+    const LookupFn lookup = lookup_for(M);
+    const int num_threads = at::get_num_threads();
+    std::vector<std::vector<TopK>> partial(num_threads, std::vector<TopK>(Q, TopK(k)));
+    at::parallel_for(0, N, kScanBlock * 16, [&](int64_t begin, int64_t end) {
+        auto& heaps = partial[at::get_thread_num()];
+        std::vector<float> ip(kScanBlock), inv_norm(kScanBlock);
+        for (int64_t start = begin; start < end; start += kScanBlock) {
+            const int64_t stop = std::min(start + kScanBlock, end);
+            // 쿼리와 무관한 1/|û| 는 묶음마다 한 번만
+            lookup(csq_ptr, code_ptr, M, start, stop, inv_norm.data());
+            for (int64_t i = 0; i < stop - start; ++i) inv_norm[i] = 1.0f / std::sqrt(std::max(inv_norm[i], 1e-12f));
+            for (int64_t qi = 0; qi < Q; ++qi) {
+                const float xn = qn_ptr[qi];
+                const float xn_sq = xn * xn;
+                lookup(lut_ptr + qi * M * kCodebookSize, code_ptr, M, start, stop, ip.data());
+                TopK& heap = heaps[qi];
+                float worst = heap.threshold();
+                for (int64_t i = start; i < stop; ++i) {
+                    const uint8_t level = rad_ptr[i];
+                    const float cos = ip[i - start] * inv_norm[i - start];
+                    const float score = std::max(
+                        xn_sq * conf_ptr[level] + sq_ptr[level] - xn * lin_ptr[level] * cos, 0.0f);
+                    if (score < worst) {
+                        heap.push(score, i);
+                        worst = heap.threshold();
+                    }
+                }
+            }
+        }
+    });
+
+    auto distances = torch::full({ Q, k }, std::numeric_limits<double>::infinity(), torch::kFloat64);
+    auto indices = torch::full({ Q, k }, -1, torch::kLong);
+    double* out_d = distances.data_ptr<double>();
+    int64_t* out_i = indices.data_ptr<int64_t>();
+    const double* scale_ptr = q_scale.data_ptr<double>();
+    const double sqrt_c = std::sqrt(c);
+    at::parallel_for(0, Q, 1, [&](int64_t begin, int64_t end) {
+        std::vector<std::pair<float, int64_t>> merged;
+        for (int64_t qi = begin; qi < end; ++qi) {
+            merged.clear();
+            for (const auto& heaps : partial) {
+                const auto& items = heaps[qi].items();
+                merged.insert(merged.end(), items.begin(), items.end());
+            }
+            const int64_t count = std::min<int64_t>(k, merged.size());
+            std::partial_sort(merged.begin(), merged.begin() + count, merged.end());
+            for (int64_t j = 0; j < count; ++j) {
+                out_d[qi * k + j] = std::acosh(1.0 + scale_ptr[qi] * merged[j].first) / sqrt_c;
+                out_i[qi * k + j] = merged[j].second;
+            }
+        }
+    });
+    return { distances, indices };
+}
+
+torch::Tensor pq_encode_cpu(const torch::Tensor& vectors, const torch::Tensor& codebooks) {
+    check_codebooks(codebooks);
+    const int64_t M = codebooks.size(0);
+    const int64_t K = codebooks.size(1);
+    const int64_t ds = codebooks.size(2);
+    TORCH_CHECK(vectors.dim() == 2 && vectors.size(1) == M * ds, "vectors must be [N, M * ds]");
+    const int64_t N = vectors.size(0);
+    auto x = vectors.to(torch::kFloat32).contiguous();
+    auto books = codebooks.to(torch::kFloat32);
+    // 중심 축으로 연속인 [M, ds, K] 와 |c|² [M, K]: 한 부분 벡터의 K 개 거리를 벡터화해 계산
+    auto books_t = books.transpose(1, 2).contiguous();
+    auto c_sq = books.pow(2).sum(-1).contiguous();
+    auto codes = torch::empty({ N, M }, torch::kByte);
+    const float* x_ptr = x.data_ptr<float>();
+    const float* bt_ptr = books_t.data_ptr<float>();
+    const float* csq_ptr = c_sq.data_ptr<float>();
+    uint8_t* out = codes.data_ptr<uint8_t>();
+    at::parallel_for(0, N, 256, [&](int64_t begin, int64_t end) {
+        std::vector<float> dist(K);
+        for (int64_t i = begin; i < end; ++i) {
+            for (int64_t m = 0; m < M; ++m) {
+                const float* xm = x_ptr + i * M * ds + m * ds;
+                const float* bt = bt_ptr + m * ds * K;
+                std::copy(csq_ptr + m * K, csq_ptr + (m + 1) * K, dist.begin());
+                for (int64_t d = 0; d < ds; ++d) {
+                    const float w = -2.0f * xm[d];
+                    const float* row = bt + d * K;
+                    for (int64_t j = 0; j < K; ++j) dist[j] += w * row[j];
+                }
+                out[i * M + m] = static_cast<uint8_t>(std::min_element(dist.begin(), dist.end()) - dist.begin());
+            }
+        }
+    });
+    return codes;
+}
+
+} // namespace reality_stone::advanced
@@ -0,0 +1,271 @@
+#include <torch/extension.h>
+#include <ATen/Parallel.h>
+#include <advanced/index/vp_tree.h>
+#include <advanced/index/metric.h>
+#include <algorithm>
+#include <cmath>
+#include <limits>
+#include <queue>
+#include <random>
+#include <utility>
+#include <vector>
+
+namespace reality_stone::advanced {
+
+namespace {
+
+using detail::Metric;
+
+constexpr double kInf = std::numeric_limits<double>::infinity();
+// 가지치기 비교의 반올림 여유 (거리 단위)
+constexpr double kPruneSlack = 1e-9;
+
+// 순회 스택 항목: 구간 [lo, hi) 와 그 구간까지 거리의 하한
+struct Frame {
+    int64_t lo;
+    int64_t hi;
+    double lower;
+};
+
+/**
+ * 한 쿼리에 대한 트리 순회
+ * 자식 구간까지 거리의 하한 max(하한 - d_v, d_v - 상한, 0) 이 현재 반경 radius() 보다 크면 건너뛴다.
+ * 가까운 자식을 먼저 방문하고, 스택에서 꺼낼 때 줄어든 반경으로 다시 확인한다.
+ * visit(위치, 거리) 는 방문한 모든 점에 대해 호출된다.
+ */
+template <typename scalar_t, typename Radius, typename Visit>
+void traverse(
+    const scalar_t* points,
+    int64_t N,
+    const double* bounds,
+    int64_t leaf_size,
+    const Metric& metric,
+    const double* q,
+    std::vector<Frame>& stack,
+    Radius&& radius,
+    Visit&& visit
+) {
+    const double q_factor = metric.prepare(q);
+    const int64_t D = metric.D;
+    stack.clear();
+    stack.push_back({ 0, N, 0.0 });
+    while (!stack.empty()) {
+        const auto [lo, hi, lower] = stack.back();
+        stack.pop_back();
+        if (lower - kPruneSlack > radius()) continue;
+
+        if (hi - lo <= leaf_size) {
+            for (int64_t pos = lo; pos < hi; ++pos) visit(pos, metric(q, q_factor, points + pos * D));
+            continue;
+        }
+        const double dv = metric(q, q_factor, points + lo * D);
+        visit(lo, dv);
+
+        const int64_t mid = lo + 1 + (hi - lo - 1) / 2;
+        const double* b = bounds + lo * 4;
+        const double inner = std::max({ b[0] - dv, dv - b[1], 0.0 });
+        const double outer = std::max({ b[2] - dv, dv - b[3], 0.0 });
+        const bool inner_first = inner <= outer;
+        // 나중에 넣은 쪽이 먼저 나온다
+        if (inner_first) {
+            if (mid < hi) stack.push_back({ mid, hi, outer });
+            if (lo + 1 < mid) stack.push_back({ lo + 1, mid, inner });
+        } else {
+            if (lo + 1 < mid) stack.push_back({ lo + 1, mid, inner });
+            if (mid < hi) stack.push_back({ mid, hi, outer });
+        }
+    }
+}
+
+void check_tree(
+    const torch::Tensor& sorted_points,
+    const torch::Tensor& order,
+    const torch::Tensor& bounds,
+    const torch::Tensor& queries,
+    int64_t leaf_size
+) {
+    TORCH_CHECK(sorted_points.dim() == 2, "points must be [N, D]");
+    TORCH_CHECK(queries.dim() == 2 && queries.size(1) == sorted_points.size(1),
+        "queries must be [Q, D] with the same D as the index");
+    TORCH_CHECK(order.numel() == sorted_points.size(0) && bounds.size(0) == sorted_points.size(0) && bounds.size(1) == 4,
+        "order / bounds do not match the indexed points");
+    TORCH_CHECK(leaf_size >= 1, "leaf_size must be positive");
+}
+
+} // namespace
+
+std::tuple<torch::Tensor, torch::Tensor> vp_tree_build_cpu(
+    const torch::Tensor& points,
+    const std::string& model,
+    float curvature,
+    int64_t leaf_size,
+    int64_t seed
+) {
+    TORCH_CHECK(points.dim() == 2, "points must be [N, D]");
+    TORCH_CHECK(leaf_size >= 1, "leaf_size must be positive");
+    const int64_t N = points.size(0);
+    const int64_t D = points.size(1);
+    const Metric metric(model, curvature, D);
+    auto data = points.contiguous();
+    auto order = torch::arange(N, torch::kLong);
+    auto bounds = torch::full({ N, 4 }, std::numeric_limits<double>::quiet_NaN(), torch::kFloat64);
+    int64_t* perm = order.data_ptr<int64_t>();
+    double* bnd = bounds.data_ptr<double>();
+
+    AT_DISPATCH_FLOATING_TYPES(data.scalar_type(), "vp_tree_build_cpu", [&] {
+        const scalar_t* base = data.data_ptr<scalar_t>();
+        std::mt19937_64 rng(static_cast<uint64_t>(seed));
+        std::vector<double> vantage(D);
+        std::vector<std::pair<double, int64_t>> items;  // (vantage 까지 거리, 원래 색인)
+        std::vector<std::pair<int64_t, int64_t>> ranges{ { 0, N } };
+        while (!ranges.empty()) {
+            const int64_t lo = ranges.back().first;
+            const int64_t hi = ranges.back().second;
+            ranges.pop_back();
+            if (hi - lo <= leaf_size) continue;
+
+            // 무작위 vantage 를 구간 맨 앞으로
+            std::swap(perm[lo], perm[std::uniform_int_distribution<int64_t>(lo, hi - 1)(rng)]);
+            const scalar_t* v = base + perm[lo] * D;
+            for (int64_t d = 0; d < D; ++d) vantage[d] = static_cast<double>(v[d]);
+            const double factor = metric.prepare(vantage.data());
+
+            const int64_t count = hi - lo - 1;
+            items.resize(count);
+            at::parallel_for(0, count, 1024, [&](int64_t begin, int64_t end) {
+                for (int64_t i = begin; i < end; ++i) {
+                    const int64_t idx = perm[lo + 1 + i];
+                    items[i] = { metric(vantage.data(), factor, base + idx * D), idx };
+                }
+            });
+
+            // 중앙값으로 안쪽 / 바깥쪽 분할
+            const int64_t mid = lo + 1 + count / 2;
+            const int64_t split = mid - lo - 1;
+            std::nth_element(items.begin(), items.begin() + split, items.end());
+            double* b = bnd + lo * 4;
+            b[0] = kInf; b[1] = -kInf; b[2] = kInf; b[3] = -kInf;
+            for (int64_t i = 0; i < count; ++i) {
+                perm[lo + 1 + i] = items[i].second;
+                const double dist = items[i].first;
+                const int off = i < split ? 0 : 2;
+                b[off] = std::min(b[off], dist);
+                b[off + 1] = std::max(b[off + 1], dist);
+            }
+            ranges.push_back({ lo + 1, mid });
+            ranges.push_back({ mid, hi });
+        }
+    });
+    return { order, bounds };
+}
+
+std::tuple<torch::Tensor, torch::Tensor> vp_tree_knn_cpu(
+    const torch::Tensor& sorted_points,
+    const torch::Tensor& order,
+    const torch::Tensor& bounds,
+    const torch::Tensor& queries,
+    int64_t k,
+    const std::string& model,
+    float curvature,
+    int64_t leaf_size
+) {
+    check_tree(sorted_points, order, bounds, queries, leaf_size);
+    TORCH_CHECK(k >= 1, "k must be positive");
+    const int64_t N = sorted_points.size(0);
+    const int64_t Q = queries.size(0);
+    const Metric metric(model, curvature, sorted_points.size(1));
+    auto data = sorted_points.contiguous();
+    auto q_data = queries.to(torch::kFloat64).contiguous();
+    auto perm = order.to(torch::kLong).contiguous();
+    auto bnd = bounds.to(torch::kFloat64).contiguous();
+    auto distances = torch::full({ Q, k }, kInf, torch::kFloat64);
+    auto indices = torch::full({ Q, k }, -1, torch::kLong);
+
+    AT_DISPATCH_FLOATING_TYPES(data.scalar_type(), "vp_tree_knn_cpu", [&] {
+        const scalar_t* base = data.data_ptr<scalar_t>();
+        const double* qs = q_data.data_ptr<double>();
+        const int64_t* perm_ptr = perm.data_ptr<int64_t>();
+        const double* bnd_ptr = bnd.data_ptr<double>();
+        double* out_d = distances.data_ptr<double>();
+        int64_t* out_i = indices.data_ptr<int64_t>();
+        at::parallel_for(0, Q, 1, [&](int64_t begin, int64_t end) {
+            std::vector<Frame> stack;
+            std::priority_queue<std::pair<double, int64_t>> heap;  // 현재 k 개 중 가장 먼 점이 top
+            for (int64_t qi = begin; qi < end; ++qi) {
+                traverse(base, N, bnd_ptr, leaf_size, metric, qs + qi * metric.D, stack,
+                    [&] { return static_cast<int64_t>(heap.size()) < k ? kInf : heap.top().first; },
+                    [&](int64_t pos, double dist) {
+                        if (static_cast<int64_t>(heap.size()) < k) {
+                            heap.push({ dist, pos });
+                        } else if (dist < heap.top().first) {
+                            heap.pop();
+                            heap.push({ dist, pos });
+                        }
+                    });
+                for (int64_t j = static_cast<int64_t>(heap.size()) - 1; j >= 0; --j) {
+                    out_d[qi * k + j] = heap.top().first;
+                    out_i[qi * k + j] = perm_ptr[heap.top().second];
+                    heap.pop();
+                }
+            }
+        });
+    });
+    return { distances, indices };
+}
+
+std::tuple<torch::Tensor, torch::Tensor, torch::Tensor> vp_tree_radius_cpu(
+    const torch::Tensor& sorted_points,
+    const torch::Tensor& order,
+    const torch::Tensor& bounds,
+    const torch::Tensor& queries,
+    double radius,
+    const std::string& model,
+    float curvature,
+    int64_t leaf_size
+) {
+    check_tree(sorted_points, order, bounds, queries, leaf_size);
+    const int64_t N = sorted_points.size(0);
+    const int64_t Q = queries.size(0);
+    const Metric metric(model, curvature, sorted_points.size(1));
+    auto data = sorted_points.contiguous();
+    auto q_data = queries.to(torch::kFloat64).contiguous();
+    auto perm = order.to(torch::kLong).contiguous();
+    auto bnd = bounds.to(torch::kFloat64).contiguous();
+    std::vector<std::vector<std::pair<double, int64_t>>> hits(Q);
+
+    AT_DISPATCH_FLOATING_TYPES(data.scalar_type(), "vp_tree_radius_cpu", [&] {
+        const scalar_t* base = data.data_ptr<scalar_t>();
+        const double* qs = q_data.data_ptr<double>();
+        const int64_t* perm_ptr = perm.data_ptr<int64_t>();
+        const double* bnd_ptr = bnd.data_ptr<double>();
+        at::parallel_for(0, Q, 1, [&](int64_t begin, int64_t end) {
+            std::vector<Frame> stack;
+            for (int64_t qi = begin; qi < end; ++qi) {
+                auto& found = hits[qi];
+                traverse(base, N, bnd_ptr, leaf_size, metric, qs + qi * metric.D, stack,
+                    [radius] { return radius; },
+                    [&](int64_t pos, double dist) {
+                        if (dist <= radius) found.push_back({ dist, perm_ptr[pos] });
+                    });
+                std::sort(found.begin(), found.end());
+            }
+        });
+    });
+
+    auto offsets = torch::zeros({ Q + 1 }, torch::kLong);
+    int64_t* off = offsets.data_ptr<int64_t>();
+    for (int64_t qi = 0; qi < Q; ++qi) off[qi + 1] = off[qi] + static_cast<int64_t>(hits[qi].size());
+    auto distances = torch::empty({ off[Q] }, torch::kFloat64);
+    auto indices = torch::empty({ off[Q] }, torch::kLong);
+    double* out_d = distances.data_ptr<double>();
+    int64_t* out_i = indices.data_ptr<int64_t>();
+    for (int64_t qi = 0; qi < Q; ++qi) {
+        for (size_t j = 0; j < hits[qi].size(); ++j) {
+            out_d[off[qi] + j] = hits[qi][j].first;
+            out_i[off[qi] + j] = hits[qi][j].second;
+        }
+    }
+    return { offsets, distances, indices };
+}
+
+} // namespace reality_stone::advanced
@@ -1,8 +1,15 @@
 #include <torch/extension.h>
 #include <ATen/ATen.h>
+#include <ATen/CPUGeneratorImpl.h>
 #include <advanced/laplace_beltrami/laplace_beltrami.h>
+#include <advanced/chebyshev/chebyshev.h>
+#include <utils/cpu_kernels.h>
+#include <algorithm>
 #include <vector>
 #include <cmath>
+#include <limits>
+
+namespace utils = reality_stone::utils;
 
 namespace reality_stone::advanced {
 
@@ -24,8 +31,8 @@ std::tuple<torch::Tensor, torch::Tensor> laplace_beltrami_eigen_cuda(
 );
 
 // LaplaceBeltramiOperator 클래스 구현
-LaplaceBeltramiOperator::LaplaceBeltramiOperator(float curvature, int max_eigenvalues)
-    : curvature(curvature), max_eigenvalues(max_eigenvalues), cache_valid(false) {
+LaplaceBeltramiOperator::LaplaceBeltramiOperator(float curvature, int max_eigenvalues, int num_neighbors)
+    : curvature(curvature), max_eigenvalues(max_eigenvalues), num_neighbors(num_neighbors), cache_valid(false) {
     
     // 캐시 초기화
     eigenvalues_cache = torch::zeros({max_eigenvalues}, torch::kFloat32);
@@ -36,42 +43,7 @@ torch::Tensor LaplaceBeltramiOperator::compute_laplacian(const torch::Tensor& f)
     if (f.is_cuda()) {
         return hyperbolic_laplacian_cuda(f, curvature);
     }
-    
-    // CPU 구현: 하이퍼볼릭 라플라시안 Δ_H f
-    // Δ_H f = (1/g) ∂/∂x^i (g^{ij} √g ∂f/∂x^j)
-    // 포인카레 모델에서: Δ_H f = (1-|x|²)² [∂²f/∂x² - 2c·Σᵢ xᵢ·∂f/∂xᵢ]
-    
-    auto batch_size = f.size(0);
-    auto dim = f.size(-1);
-    auto result = torch::zeros_like(f);
-    
-    // 수치 미분을 위한 작은 증분
-    float h = 1e-5f;
-    
-    for (int b = 0; b < batch_size; ++b) {
-        for (int d = 0; d < dim; ++d) {
-            auto f_plus = f.clone();
-            auto f_minus = f.clone();
-            
-            f_plus.index({b, d}) += h;
-            f_minus.index({b, d}) -= h;
-            
-            // 2차 편미분 근사: ∂²f/∂x²
-            auto d2f_dx2 = (f_plus.index({b, d}) - 2 * f.index({b, d}) + f_minus.index({b, d})) / (h * h);
-            
-            // 1차 편미분: ∂f/∂x
-            auto df_dx = (f_plus.index({b, d}) - f_minus.index({b, d})) / (2 * h);
-            
-            // 포인카레 메트릭 계수
-            auto x_norm_sq = torch::sum(f.index({b}) * f.index({b}));
-            auto metric_factor = torch::pow(1.0f - x_norm_sq, 2);
-            
-            // 하이퍼볼릭 라플라시안
-            result.index({b, d}) = metric_factor * (d2f_dx2 - 2 * curvature * f.index({b, d}) * df_dx);
-        }
-    }
-    
-    return result;
+    return hyperbolic_laplacian_cpu(f, curvature);
 }
 
 torch::Tensor LaplaceBeltramiOperator::compute_heat_kernel(
@@ -81,28 +53,14 @@ torch::Tensor LaplaceBeltramiOperator::compute_heat_kernel(
     if (x.is_cuda()) {
         return heat_kernel_cuda(x, t, curvature);
     }
-    
-    // CPU 구현: 열 커널 K_t(x,y) = exp(-t·Δ_H)
-    // 하이퍼볼릭 공간에서의 근사해
-    auto batch_size = x.size(0);
-    auto dim = x.size(-1);
-    auto sqrt_c = std::sqrt(curvature);
-    
-    auto result = torch::zeros_like(x);
-    
-    for (int b = 0; b < batch_size; ++b) {
-        auto x_norm = torch::norm(x.index({b}), 2);
-        
-        // 열 확산 방정식의 근사해
-        // K_t(x) ≈ (4πt)^{-d/2} exp(-|x|²/(4t) - c·t)
-        auto gaussian_factor = std::exp(-x_norm.item<float>() * x_norm.item<float>() / (4 * t));
-        auto hyperbolic_factor = std::exp(-curvature * t);
-        auto normalization = std::pow(4 * M_PI * t, -dim / 2.0f);
-        
-        result.index({b}) = x.index({b}) * gaussian_factor * hyperbolic_factor * normalization;
-    }
-    
-    return result;
+    return heat_kernel_cpu(x, t, curvature);
+}
+
+torch::Tensor LaplaceBeltramiOperator::compute_heat_kernel(
+    const torch::Tensor& x,
+    const torch::Tensor& times
+) {
+    return heat_kernel_cpu(x, times, curvature);
 }
 
 std::tuple<torch::Tensor, torch::Tensor> LaplaceBeltramiOperator::eigen_decomposition(
@@ -113,29 +71,9 @@ std::tuple<torch::Tensor, torch::Tensor> LaplaceBeltramiOperator::eigen_decompos
     }
     
     // CPU 구현: 라플라스-벨트라미 연산자의 고유값 분해
-    auto n_points = manifold_points.size(0);
-    auto dim = manifold_points.size(-1);
-    
-    // 거리 행렬 계산 (직접 구현하여 순환 참조 방지)
-    auto distance_matrix = torch::zeros({n_points, n_points}, manifold_points.options());
-    for (int i = 0; i < n_points; ++i) {
-        for (int j = i + 1; j < n_points; ++j) {
-            auto dist = compute_manifold_distance(manifold_points.index({i}).unsqueeze(0), 
-                                                 manifold_points.index({j}).unsqueeze(0));
-            distance_matrix.index({i, j}) = distance_matrix.index({j, i}) = dist.item<float>();
-        }
-    }
-    
-    // 가우시안 커널로 가중치 행렬 생성
-    float sigma = 1.0f;
-    auto weight_matrix = gaussian_kernel(distance_matrix, sigma);
-    
-    // 그래프 라플라시안 생성: L = D - W
-    auto degree_matrix = torch::diag(torch::sum(weight_matrix, 1));
-    auto laplacian_matrix = degree_matrix - weight_matrix;
-    
-    // 고유값 분해 (torch::linalg_eigh 사용)
-    auto [eigenvalues, eigenvectors] = torch::linalg_eigh(laplacian_matrix);
+    // kNN 희소 그래프 (CSR) + 가장 작은 max_eigenvalues 개 고유쌍만 반복법으로
+    auto weight_matrix = knn_graph_cpu(manifold_points, curvature, num_neighbors);
+    auto [eigenvalues, eigenvectors] = graph_laplacian_eigen_cpu(weight_matrix, max_eigenvalues);
     
     // 결과 캐시
     int max_evals = std::min(max_eigenvalues, static_cast<int>(eigenvalues.size(0)));
@@ -150,48 +88,22 @@ std::tuple<torch::Tensor, torch::Tensor> LaplaceBeltramiOperator::eigen_decompos
 
 torch::Tensor LaplaceBeltramiOperator::spectral_clustering(
     const torch::Tensor& points,
-    int num_clusters
+    int num_clusters,
+    int max_iter,
+    double tol,
+    int64_t batch_size,
+    int64_t seed
 ) {
-    // 스펙트럴 임베딩 수행
-    auto embedded = spectral_embedding(points, num_clusters);
-    
-    // K-means 클러스터링 (간단한 구현)
-    auto n_points = embedded.size(0);
-    auto labels = torch::zeros({n_points}, torch::kLong);
-    
-    // 중심점 랜덤 초기화
-    auto centroids = torch::randn({num_clusters, num_clusters}) * 0.1f;
-    
-    // 반복 클러스터링
-    for (int iter = 0; iter < 100; ++iter) {
-        // 점들을 가장 가까운 중심점에 할당
-        for (int i = 0; i < n_points; ++i) {
-            float min_dist = std::numeric_limits<float>::max();
-            int best_cluster = 0;
-            
-            for (int c = 0; c < num_clusters; ++c) {
-                auto dist = torch::norm(embedded.index({i}) - centroids.index({c}), 2).item<float>();
-                if (dist < min_dist) {
-                    min_dist = dist;
-                    best_cluster = c;
-                }
-            }
-            
-            labels.index({i}) = best_cluster;
-        }
-        
-        // 중심점 업데이트
-        for (int c = 0; c < num_clusters; ++c) {
-            auto mask = (labels == c);
-            auto cluster_points = embedded.index_select(0, torch::nonzero(mask).squeeze());
-            
-            if (cluster_points.size(0) > 0) {
-                centroids.index({c}) = torch::mean(cluster_points, 0);
-            }
-        }
+    // 가장 작은 num_clusters 개 고유벡터로 임베딩 (Ng-Jordan-Weiss).
+    // 상수 벡터를 빼는 spectral_embedding 과 달리 첫 벡터도 쓴다: 그래프가 끊겨 있으면
+    // 고유값 0 의 고유벡터들이 곧 성분 지시 벡터이므로 빠뜨리면 안 된다
+    if (!cache_valid) {
+        eigen_decomposition(points);
     }
+    auto embedded = eigenvectors_cache.narrow(1, 0, std::min<int64_t>(num_clusters, eigenvectors_cache.size(1)));
     
-    return labels;
+    // 임베딩 공간에서 k-means++ (배치 거리 계산, 수렴 시 조기 종료)
+    return std::get<0>(kmeans_cpu(embedded, num_clusters, max_iter, tol, batch_size, seed));
 }
 
 torch::Tensor LaplaceBeltramiOperator::spectral_embedding(
@@ -211,6 +123,18 @@ torch::Tensor LaplaceBeltramiOperator::spectral_embedding(
     return eigenvectors_cache.narrow(1, start_idx, end_idx - start_idx);
 }
 
+torch::Tensor LaplaceBeltramiOperator::spectral_diffusion(
+    const torch::Tensor& points,
+    const torch::Tensor& signal,
+    const torch::Tensor& times
+) {
+    // 캐시된 고유기저로 여러 시각의 확산을 한 번에
+    if (!cache_valid) {
+        eigen_decomposition(points);
+    }
+    return spectral_diffusion_cpu(eigenvalues_cache, eigenvectors_cache, signal, times);
+}
+
 torch::Tensor LaplaceBeltramiOperator::compute_manifold_distance(
     const torch::Tensor& x,
     const torch::Tensor& y
@@ -241,8 +165,20 @@ torch::Tensor hyperbolic_laplacian_cpu(
     const torch::Tensor& f,
     float curvature
 ) {
-    static LaplaceBeltramiOperator op(curvature);
-    return op.compute_laplacian(f);
+    // 포인카레 계량 g = λ²δ, λ = 2 / (1 - c|x|²) 에서
+    // Δ_H u = λ⁻² [Δu + (D-2)·∇(log λ)·∇u],  ∇(log λ) = 2c·x / (1 - c|x|²)
+    // f 의 각 행을 점 x 로 보고 좌표 함수 u = x_d 에 적용하면 (Δu = 0, ∇u = e_d)
+    // Δ_H x = (D-2)·c·(1 - c|x|²) / 2 · x  -> 행마다 스칼라배 한 번 (O(B·D))
+    int64_t D = f.size(-1);
+    const float k = 0.5f * static_cast<float>(D - 2) * curvature;
+    if (utils::requires_grad({ f })) {
+        auto norm_sq = torch::sum(f * f, -1, true);
+        return k * (1.0f - curvature * norm_sq) * f;
+    }
+    auto rows = f.reshape({ -1, D });
+    return utils::row_scale_cpu(rows, [k, curvature](auto norm_sq) {
+        return k * (1.0f - curvature * norm_sq);
+    }).view(f.sizes());
 }
 
 torch::Tensor heat_kernel_cpu(
@@ -250,15 +186,41 @@ torch::Tensor heat_kernel_cpu(
     float t,
     float curvature
 ) {
-    static LaplaceBeltramiOperator op(curvature);
-    return op.compute_heat_kernel(x, t);
+    return heat_kernel_cpu(x, torch::full({ 1 }, t, torch::kFloat64), curvature)[0];
+}
+
+torch::Tensor heat_kernel_cpu(
+    const torch::Tensor& x,
+    const torch::Tensor& times,
+    float curvature
+) {
+    // 열 확산 방정식의 근사해 K_t(x) ≈ (4πt)^{-D/2} exp(-|x|²/(4t) - c·t) · x 를 모든 시각에 대해.
+    // |x|² 는 한 번만 계산하고, 시각별 계수 [T, ..., 1] 는 로그 공간에서 구한 뒤
+    // 브로드캐스트 곱 한 번으로 [T, ...] 를 쓴다 (큰 D 에서 (4πt)^{-D/2} 언더플로 방지)
+    auto t = times.reshape(-1);
+    // 값 검사는 .item() 대신 _assert_async 로 (역전파 재계산이 fake 텐서로 추적될 때도 동작)
+    TORCH_CHECK(t.sym_numel() > 0, "heat_kernel_cpu: times 는 양수여야 함");
+    at::_assert_async((t > 0).all(), "heat_kernel_cpu: times 는 양수여야 함");
+    auto dtype = at::promote_types(x.scalar_type(), torch::kFloat32);
+    auto xf = x.to(dtype).unsqueeze(0);
+    auto tt = t.to(xf.options());
+    for (int64_t i = 1; i < xf.dim(); ++i) {
+        tt = tt.unsqueeze(-1);
+    }
+
+    const double half_dim = 0.5 * static_cast<double>(x.size(-1));
+    auto norm_sq = (xf * xf).sum(-1, true);
+    auto log_factor = -norm_sq / (4 * tt) - curvature * tt - half_dim * torch::log((4 * M_PI) * tt);
+    return (xf * torch::exp(log_factor)).to(x.scalar_type());
 }
 
 std::tuple<torch::Tensor, torch::Tensor> laplace_beltrami_eigen_cpu(
     const torch::Tensor& manifold_points,
-    float curvature
+    float curvature,
+    int num_eigenvalues,
+    int num_neighbors
 ) {
-    static LaplaceBeltramiOperator op(curvature);
+    LaplaceBeltramiOperator op(curvature, num_eigenvalues, num_neighbors);
     return op.eigen_decomposition(manifold_points);
 }
 
@@ -278,35 +240,492 @@ torch::Tensor solve_diffusion_equation_cpu(
     int num_steps,
     float curvature
 ) {
-    auto u = initial_condition.clone();
-    LaplaceBeltramiOperator op(curvature);
-    
-    // 전진 오일러 방법: u_{n+1} = u_n + dt·Δ_H u_n
-    for (int step = 0; step < num_steps; ++step) {
-        auto laplacian_u = op.compute_laplacian(u);
-        u = u + time_step * laplacian_u;
+    // 스텝 수와 무관하게 t = dt·num_steps 에서의 정확해 한 번
+    auto times = torch::full({ 1 }, static_cast<double>(time_step) * num_steps, torch::kFloat64);
+    return solve_diffusion_equation_cpu(initial_condition, times, curvature)[0];
+}
+
+torch::Tensor solve_diffusion_equation_cpu(
+    const torch::Tensor& initial_condition,
+    const torch::Tensor& times,
+    float curvature
+) {
+    // du/dt = Δ_H u = a·(1 - c|u|²)·u, a = (D-2)·c/2 (hyperbolic_laplacian_cpu 의 닫힌 형태)
+    // 방향은 그대로이고 s = |u|² 는 로지스틱 방정식을 따르므로 정확해는
+    // u(t) = u0 / sqrt(q·(1 - c·s0) + c·s0), q = exp(-2at)  (a >= 0 이면 q <= 1 이라 넘침 없음)
+    auto dtype = at::promote_types(initial_condition.scalar_type(), torch::kFloat32);
+    auto u0 = initial_condition.to(dtype).unsqueeze(0);
+    auto t = times.to(u0.options()).reshape(-1);
+    const double a = 0.5 * static_cast<double>(initial_condition.size(-1) - 2) * curvature;
+
+    std::vector<int64_t> shape(u0.dim(), 1);
+    shape[0] = t.size(0);
+    auto q = torch::exp(-2.0 * a * t).view(shape);
+    auto cs0 = curvature * (u0 * u0).sum(-1, true);
+    auto denominator = (q * (1 - cs0) + cs0).clamp_min(config::Constants::EPS);
+    return (u0 * torch::rsqrt(denominator)).to(initial_condition.scalar_type());
+}
+
+torch::Tensor graph_diffusion_cpu(
+    const torch::Tensor& weights,
+    const torch::Tensor& initial_condition,
+    const torch::Tensor& times,
+    int order
+) {
+    TORCH_CHECK(weights.dim() == 2 && weights.size(0) == weights.size(1),
+        "graph_diffusion_cpu: weights 는 정방 행렬 [n, n] 이어야 함");
+    const int64_t n = weights.size(0);
+    TORCH_CHECK(initial_condition.dim() >= 1 && initial_condition.size(0) == n,
+        "graph_diffusion_cpu: initial_condition 의 첫 차원이 n 이 아님");
+    auto dtype = at::promote_types(initial_condition.scalar_type(), torch::kFloat32);
+    auto u0 = initial_condition.to(dtype).reshape({ n, -1 });
+    auto W = weights.to(dtype);
+    auto t = times.to(torch::kFloat64).reshape(-1);
+    const int64_t T = t.size(0);
+    TORCH_CHECK(T > 0 && t.min().item<double>() >= 0, "graph_diffusion_cpu: times 는 비어 있지 않은 음이 아닌 값");
+
+    // L = D - W 의 스펙트럼은 [0, 2a], a = max deg (게르슈고린). L̃ = L/a - I 는 [-1, 1]
+    auto degree = W.mv(torch::ones({ n }, u0.options()));
+    const double a = std::max(degree.max().item<double>(), 1e-12);
+    const double tau = a * t.max().item<double>();
+    if (order <= 0) {
+        // exp(-τ(x+1)) 의 체비셰프 계수는 k ≳ τ + O(√τ) 부터 급격히 줄어든다
+        order = static_cast<int>(std::ceil(tau + 6.0 * std::sqrt(tau))) + 16;
     }
-    
-    return u;
+
+    // exp(-tL) = f_t(L̃), f_t(x) = exp(-t·a·(x + 1)): 체비셰프 점에서의 값 -> 계수 [T, order + 1]
+    ChebyshevApproximator approximator(order);
+    auto angles = (2 * torch::arange(order + 1, torch::kFloat64) + 1) * (M_PI / (2 * (order + 1)));
+    auto values = torch::exp(-(a * t).unsqueeze(1) * (torch::cos(angles) + 1).unsqueeze(0));
+    auto coeffs = approximator.compute_coefficients(values).to(dtype);
+
+    // 점화식 T_{k+1}(L̃)u = 2L̃·T_k(L̃)u - T_{k-1}(L̃)u 는 시각과 무관:
+    // 행렬 곱 order 번을 모든 시각이 공유하고, 시각별로는 계수 × 벡터 (rank-1 갱신) 만
+    auto scaled_degree = (degree / a - 1).unsqueeze(1);
+    auto apply = [&](const torch::Tensor& v) { return scaled_degree * v - W.mm(v) / a; };
+    auto out = torch::zeros({ T, u0.numel() }, u0.options());
+    auto prev = u0;
+    auto curr = apply(u0);
+    out.addr_(coeffs.select(1, 0), prev.reshape(-1));
+    if (order >= 1) out.addr_(coeffs.select(1, 1), curr.reshape(-1));
+    for (int k = 2; k <= order; ++k) {
+        auto next = 2 * apply(curr) - prev;
+        prev = curr;
+        curr = next;
+        out.addr_(coeffs.select(1, k), curr.reshape(-1));
+    }
+
+    std::vector<int64_t> sizes{ T };
+    sizes.insert(sizes.end(), initial_condition.sizes().begin(), initial_condition.sizes().end());
+    return out.view(sizes).to(initial_condition.scalar_type());
+}
+
+torch::Tensor spectral_diffusion_cpu(
+    const torch::Tensor& eigenvalues,
+    const torch::Tensor& eigenvectors,
+    const torch::Tensor& initial_condition,
+    const torch::Tensor& times
+) {
+    const int64_t n = eigenvectors.size(0);
+    TORCH_CHECK(initial_condition.dim() >= 1 && initial_condition.size(0) == n,
+        "spectral_diffusion_cpu: initial_condition 의 첫 차원이 고유벡터의 행 수와 다름");
+    auto dtype = at::promote_types(initial_condition.scalar_type(), torch::kFloat32);
+    auto V = eigenvectors.to(dtype);
+    auto u0 = initial_condition.to(dtype).reshape({ n, -1 });
+    auto t = times.to(dtype).reshape(-1);
+
+    // u(t) = V·diag(e^{-tλ})·Vᵀu0: 사영은 한 번, 시각마다 대각 스케일 후 GEMM 한 번
+    auto projected = V.t().mm(u0);
+    auto decay = torch::exp(-t.unsqueeze(1) * eigenvalues.to(dtype).unsqueeze(0));
+    auto out = torch::matmul(V, decay.unsqueeze(2) * projected.unsqueeze(0));
+
+    std::vector<int64_t> sizes{ t.size(0) };
+    sizes.insert(sizes.end(), initial_condition.sizes().begin(), initial_condition.sizes().end());
+    return out.reshape(sizes).to(initial_condition.scalar_type());
+}
+
+namespace {
+
+/**
+ * rows [R, D] 와 cols [C, D] 사이의 acosh 인자 블록 [R, C] (거리에 대해 단조 증가)
+ * ratio = 1 + 2|x - y|² / ((1 - |x|²)(1 - |y|²)), compute_manifold_distance 와 같은 클램프.
+ * apply_acosh 이면 같은 패스에서 거리 acosh(ratio)/√c 로 바꾼다.
+ */
+torch::Tensor distance_ratio_block(
+    const torch::Tensor& rows,
+    const torch::Tensor& cols,
+    float curvature,
+    int64_t diagonal_offset,
+    bool apply_acosh
+) {
+    TORCH_CHECK(rows.dim() == 2 && cols.dim() == 2 && rows.size(1) == cols.size(1),
+        "geodesic_distance_block_cpu: rows [R, D], cols [C, D] 이어야 함");
+    auto dtype = at::promote_types(rows.scalar_type(), torch::kFloat32);
+    auto x = rows.to(dtype).contiguous();
+    auto y = cols.to(dtype).contiguous();
+    int64_t R = x.size(0), C = y.size(0);
+
+    // |x - y|² = |x|² + |y|² - 2<x, y>, 교차항은 GEMM 한 번
+    auto block = at::mm(x, y.t()).contiguous();
+    auto x_norm_sq = (x * x).sum(1).contiguous();
+    auto y_norm_sq = (y * y).sum(1).contiguous();
+    const double inv_sqrt_c = 1.0 / std::sqrt(static_cast<double>(curvature));
+
+    // 블록 전체에 한 번의 병렬 패스
+    AT_DISPATCH_FLOATING_TYPES(dtype, "geodesic_distance_block_cpu", [&] {
+        scalar_t* bp = block.data_ptr<scalar_t>();
+        const scalar_t* xp = x_norm_sq.data_ptr<scalar_t>();
+        const scalar_t* yp = y_norm_sq.data_ptr<scalar_t>();
+        const scalar_t zero = apply_acosh ? scalar_t(0) : scalar_t(1 + 1e-7);
+        at::parallel_for(0, R, utils::row_grain_size(C), [&](int64_t begin, int64_t end) {
+            for (int64_t i = begin; i < end; ++i) {
+                scalar_t* row = bp + i * C;
+                const scalar_t xi = xp[i];
+                for (int64_t j = 0; j < C; ++j) {
+                    scalar_t diff_sq = std::max<scalar_t>(xi + yp[j] - 2 * row[j], 0);
+                    scalar_t ratio = 1 + 2 * diff_sq / ((1 - xi) * (1 - yp[j]) + scalar_t(1e-7));
+                    ratio = std::min<scalar_t>(std::max<scalar_t>(ratio, 1 + scalar_t(1e-7)), scalar_t(1e6));
+                    row[j] = apply_acosh ? static_cast<scalar_t>(std::acosh(ratio) * inv_sqrt_c) : ratio;
+                }
+                // 같은 점 집합의 대각 성분은 정확히 0 (거리 기준)
+                int64_t diag = i + diagonal_offset;
+                if (diagonal_offset >= 0 && diag < C) row[diag] = zero;
+            }
+        });
+    });
+    return block;
+}
+
+/**
+ * CSR 그래프의 연결 성분 지시 벡터 [성분 수, n] (각 행은 단위 노름)
+ * union-find 로 O(nnz) 한 번. 성분들은 첫 정점의 순서대로.
+ */
+torch::Tensor component_indicators(const torch::Tensor& csr) {
+    const int64_t n = csr.size(0);
+    auto crow = csr.crow_indices().to(torch::kLong).contiguous();
+    auto col = csr.col_indices().to(torch::kLong).contiguous();
+    const int64_t* row_ptr = crow.data_ptr<int64_t>();
+    const int64_t* col_ptr = col.data_ptr<int64_t>();
+
+    std::vector<int64_t> parent(n);
+    for (int64_t i = 0; i < n; ++i) parent[i] = i;
+    auto find = [&](int64_t a) {
+        while (parent[a] != a) {
+            parent[a] = parent[parent[a]];
+            a = parent[a];
+        }
+        return a;
+    };
+    for (int64_t i = 0; i < n; ++i) {
+        for (int64_t e = row_ptr[i]; e < row_ptr[i + 1]; ++e) {
+            int64_t a = find(i), b = find(col_ptr[e]);
+            if (a != b) parent[std::max(a, b)] = std::min(a, b);
+        }
+    }
+
+    std::vector<int64_t> component(n), root_label(n, -1), sizes;
+    for (int64_t i = 0; i < n; ++i) {
+        int64_t root = find(i);
+        if (root_label[root] < 0) {
+            root_label[root] = static_cast<int64_t>(sizes.size());
+            sizes.push_back(0);
+        }
+        component[i] = root_label[root];
+        ++sizes[component[i]];
+    }
+    auto indicators = torch::zeros({ static_cast<int64_t>(sizes.size()), n }, torch::kFloat64);
+    auto acc = indicators.accessor<double, 2>();
+    for (int64_t i = 0; i < n; ++i) {
+        acc[component[i]][i] = 1.0 / std::sqrt(static_cast<double>(sizes[component[i]]));
+    }
+    return indicators;
+}
+
+// 모든 점과 중심 사이의 제곱 거리 [n, k]: |x|² + |c|² - 2<x, c>, 교차항은 GEMM 한 번
+torch::Tensor squared_distances(
+    const torch::Tensor& x,
+    const torch::Tensor& x_norm_sq,
+    const torch::Tensor& centroids
+) {
+    auto c_norm_sq = (centroids * centroids).sum(1);
+    return (x_norm_sq.unsqueeze(1) + c_norm_sq.unsqueeze(0) - 2 * x.mm(centroids.t())).clamp_min_(0);
+}
+
+// k-means++ 초기화: 다음 중심을 가장 가까운 중심까지의 제곱 거리에 비례해 뽑는다
+torch::Tensor kmeans_plus_plus(
+    const torch::Tensor& x,
+    const torch::Tensor& x_norm_sq,
+    int64_t num_clusters,
+    at::Generator& generator
+) {
+    const int64_t n = x.size(0);
+    auto centroids = torch::empty({ num_clusters, x.size(1) }, x.options());
+    auto pick = [&](const torch::Tensor& weights) {
+        if (weights.defined() && weights.sum().item<double>() > 0) {
+            return torch::multinomial(weights, 1, false, generator).item<int64_t>();
+        }
+        return torch::randint(n, { 1 }, generator, x.options().dtype(torch::kLong)).item<int64_t>();
+    };
+    centroids[0].copy_(x[pick(torch::Tensor())]);
+    auto min_dist_sq = squared_distances(x, x_norm_sq, centroids.narrow(0, 0, 1)).squeeze(1);
+    for (int64_t c = 1; c < num_clusters; ++c) {
+        centroids[c].copy_(x[pick(min_dist_sq)]);
+        min_dist_sq = torch::minimum(min_dist_sq, squared_distances(x, x_norm_sq, centroids.narrow(0, c, 1)).squeeze(1));
+    }
+    return centroids;
+}
+
+} // namespace
+
+torch::Tensor geodesic_distance_block_cpu(
+    const torch::Tensor& rows,
+    const torch::Tensor& cols,
+    float curvature,
+    int64_t diagonal_offset
+) {
+    return distance_ratio_block(rows, cols, curvature, diagonal_offset, true).to(rows.scalar_type());
+}
+
+torch::Tensor geodesic_distance_matrix_out_cpu(
+    const torch::Tensor& points,
+    float curvature,
+    torch::Tensor out,
+    int64_t tile_size
+) {
+    int64_t n = points.size(0);
+    TORCH_CHECK(out.dim() == 2 && out.size(0) == n && out.size(1) == n,
+        "geodesic_distance_matrix_out_cpu: out 의 모양이 [n, n] 이 아님");
+    TORCH_CHECK(tile_size > 0, "geodesic_distance_matrix_out_cpu: tile_size 는 양수여야 함");
+    // 행 패널 단위로 계산해 out 에 바로 기록: 추가 메모리는 [tile_size, n] 하나
+    // (out 이 torch.from_file 등으로 매핑된 텐서면 전체 행렬이 RAM 에 올라오지 않는다)
+    for (int64_t start = 0; start < n; start += tile_size) {
+        int64_t rows = std::min(tile_size, n - start);
+        auto panel = geodesic_distance_block_cpu(points.narrow(0, start, rows), points, curvature, start);
+        out.narrow(0, start, rows).copy_(panel);
+    }
+    return out;
 }
 
 torch::Tensor geodesic_distance_matrix_cpu(
     const torch::Tensor& points,
     float curvature
 ) {
-    auto n = points.size(0);
-    auto distance_matrix = torch::zeros({n, n}, points.options());
-    
-    LaplaceBeltramiOperator op(curvature);
-    
-    for (int i = 0; i < n; ++i) {
-        for (int j = i + 1; j < n; ++j) {
-            auto dist = op.compute_manifold_distance(points.index({i}).unsqueeze(0), points.index({j}).unsqueeze(0));
-            distance_matrix.index({i, j}) = distance_matrix.index({j, i}) = dist.item<float>();
+    int64_t n = points.size(0);
+    auto out = torch::empty({ n, n }, points.options());
+    return geodesic_distance_matrix_out_cpu(points, curvature, out, kDistanceTileSize);
+}
+
+torch::Tensor knn_graph_cpu(
+    const torch::Tensor& points,
+    float curvature,
+    int num_neighbors,
+    float sigma
+) {
+    TORCH_CHECK(points.dim() == 2, "knn_graph_cpu: points 는 [n, D] 이어야 함");
+    int64_t n = points.size(0);
+    auto dtype = at::promote_types(points.scalar_type(), torch::kFloat32);
+    const double inv_two_sigma_sq = 1.0 / (2.0 * sigma * sigma);
+    if (num_neighbors <= 0 || num_neighbors >= n - 1) {
+        auto distances = geodesic_distance_matrix_cpu(points, curvature).to(dtype);
+        return torch::exp(-distances * distances * inv_two_sigma_sq);
+    }
+
+    // 행 패널마다 acosh 인자 블록 -> 자기 자신을 뺀 top-k, acosh 는 고른 n·k 개에만.
+    // 패널 하나는 약 2^24 원소로 제한
+    const int64_t k = num_neighbors;
+    const int64_t tile = std::max<int64_t>(1, std::min<int64_t>(kDistanceTileSize, (int64_t(1) << 24) / n));
+    auto distances = torch::empty({ n, k }, points.options().dtype(dtype));
+    auto neighbors = torch::empty({ n, k }, points.options().dtype(torch::kLong));
+    for (int64_t start = 0; start < n; start += tile) {
+        int64_t rows = std::min(tile, n - start);
+        auto block = distance_ratio_block(points.narrow(0, start, rows), points, curvature, -1, false).to(dtype);
+        block.diagonal(start).fill_(std::numeric_limits<double>::infinity());
+        auto [ratio, idx] = block.topk(k, 1, /*largest=*/false, /*sorted=*/false);
+        distances.narrow(0, start, rows).copy_(torch::acosh(ratio) / std::sqrt(curvature));
+        neighbors.narrow(0, start, rows).copy_(idx);
+    }
+
+    // (w_ij + w_ji) / 2 로 대칭화: 양방향 절반 가중치를 COO 로 쌓고 coalesce 가 합친다
+    auto half = (torch::exp(-distances * distances * inv_two_sigma_sq) * 0.5).reshape(-1);
+    auto row_idx = torch::arange(n, neighbors.options()).unsqueeze(1).expand({ n, k }).reshape(-1);
+    auto col_idx = neighbors.reshape(-1);
+    auto indices = torch::stack({ torch::cat({ row_idx, col_idx }), torch::cat({ col_idx, row_idx }) });
+    return torch::sparse_coo_tensor(indices, torch::cat({ half, half }), { n, n })
+        .coalesce()
+        .to_sparse_csr();
+}
+
+std::tuple<torch::Tensor, torch::Tensor> graph_laplacian_eigen_cpu(
+    const torch::Tensor& weights,
+    int64_t k,
+    double tol,
+    int64_t max_restarts
+) {
+    TORCH_CHECK(weights.dim() == 2 && weights.size(0) == weights.size(1),
+        "graph_laplacian_eigen_cpu: weights 는 정방 행렬 [n, n] 이어야 함");
+    TORCH_CHECK(k > 0, "graph_laplacian_eigen_cpu: k 는 양수여야 함");
+    const int64_t n = weights.size(0);
+    k = std::min(k, n);
+    auto out_dtype = at::promote_types(weights.scalar_type(), torch::kFloat32);
+    auto f64 = torch::TensorOptions().dtype(torch::kFloat64);
+    auto W = weights.to(torch::kFloat64);
+    auto degree = W.mv(torch::ones({ n }, f64));
+
+    // 부분공간 크기 m. 그래프가 작으면 조밀 고유값 분해가 더 싸다
+    if (n <= 2 * std::min(n, std::max(2 * k + 1, k + 32))) {
+        auto dense = W.layout() == torch::kStrided ? W : W.to_dense();
+        auto [eigenvalues, eigenvectors] = torch::linalg_eigh(torch::diag(degree) - dense);
+        return std::make_tuple(eigenvalues.narrow(0, 0, k).to(out_dtype),
+                               eigenvectors.narrow(1, 0, k).to(out_dtype));
+    }
+
+    // 고유값 0 의 고유공간은 연결 성분의 지시 벡터들이 정확히 펼친다.
+    // 단일 벡터 란초스는 중복 고유값을 한 방향만 찾으므로 미리 고정 (locking) 하고 직교 여공간에서 푼다
+    auto locked = component_indicators(W.layout() == torch::kStrided ? W.to_sparse_csr() : W);
+    const int64_t num_locked = std::min(locked.size(0), k);
+    if (num_locked == k) {
+        return std::make_tuple(torch::zeros({ k }, f64.dtype(out_dtype)),
+                               locked.narrow(0, 0, k).t().contiguous().to(out_dtype));
+    }
+    const int64_t wanted = k - num_locked;
+    const int64_t m = std::min(n - locked.size(0), std::max(2 * wanted + 1, wanted + 32));
+
+    // L 의 스펙트럼은 [0, 2·max deg] (게르슈고린) 안에 있으므로
+    // A = σI - L 의 가장 큰 고유쌍이 L 의 가장 작은 고유쌍. A 는 행렬-벡터 곱으로만 쓴다
+    const double shift = 2.0 * degree.max().item<double>() + 1e-12;
+    auto apply = [&](const torch::Tensor& v) { return (shift - degree) * v + W.mv(v); };
+
+    // 기저 V 는 행 단위 [m + 1, n] (벡터마다 연속 메모리), AV = A·V
+    auto V = torch::zeros({ m + 1, n }, f64);
+    auto AV = torch::zeros({ m, n }, f64);
+    auto generator = at::make_generator<at::CPUGeneratorImpl>(0);
+    auto random_vector = [&]() { return torch::randn({ n }, generator, f64); };
+    // 고전 그람-슈미트 두 번 (CGS2): 고정된 벡터와 기저에 대해 완전 재직교화
+    auto orthogonalize = [&](torch::Tensor w, int64_t count) {
+        auto basis = V.narrow(0, 0, count);
+        for (int pass = 0; pass < 2; ++pass) {
+            w.sub_(locked.t().mv(locked.mv(w)));
+            w.sub_(basis.t().mv(basis.mv(w)));
+        }
+        return w;
+    };
+
+    auto start = orthogonalize(random_vector(), 0);
+    V[0].copy_(start / start.norm());
+    // 재시작 때 남기는 리츠 벡터 수 (thick restart)
+    const int64_t keep = wanted + (m - wanted) / 2;
+    int64_t kept = 0;
+    torch::Tensor theta, ritz;
+    for (int64_t restart = 0; restart <= max_restarts; ++restart) {
+        // 란초스 확장: V[kept..m] 채우기
+        for (int64_t j = kept; j < m; ++j) {
+            auto w = apply(V[j]);
+            AV[j].copy_(w);
+            w = orthogonalize(w, j + 1);
+            double beta = w.norm().item<double>();
+            if (beta <= 1e-10 * shift) {
+                // 불변 부분공간에 도달: 직교하는 임의 벡터로 계속
+                w = orthogonalize(random_vector(), j + 1);
+                beta = w.norm().item<double>();
+            }
+            V[j + 1].copy_(w / beta);
         }
+
+        // 레일리-리츠: H = V A Vᵀ, 가장 큰 wanted 개 (= L 의 가장 작은 고유쌍)
+        auto basis = V.narrow(0, 0, m);
+        auto H = basis.mm(AV.t());
+        auto [evals, S] = torch::linalg_eigh(0.5 * (H + H.t()));
+        auto top = S.narrow(1, m - wanted, wanted).flip({ 1 });
+        theta = evals.narrow(0, m - wanted, wanted).flip({ 0 });
+        ritz = top.t().mm(basis);
+        auto residual = (top.t().mm(AV) - theta.unsqueeze(1) * ritz).norm(2, { 1 });
+        double max_residual = residual.max().item<double>();
+        if (max_residual <= tol * shift) {
+            break;
+        }
+        if (restart == max_restarts) {
+            TORCH_WARN("graph_laplacian_eigen_cpu: ", max_restarts, " 번 재시작 안에 수렴하지 않음 (최대 잔차 ",
+                       max_residual / shift, ")");
+            break;
+        }
+
+        // 리츠 벡터 keep 개와 다음 크릴로프 벡터 V[m] 으로 재시작 (Krylov-Schur)
+        auto S_keep = S.narrow(1, m - keep, keep).t();
+        V.narrow(0, 0, keep).copy_(S_keep.mm(basis));
+        AV.narrow(0, 0, keep).copy_(S_keep.mm(AV));
+        V[keep].copy_(V[m]);
+        kept = keep;
     }
-    
-    return distance_matrix;
+
+    auto eigenvalues = torch::cat({ torch::zeros({ num_locked }, f64), shift - theta });
+    auto eigenvectors = torch::cat({ locked, ritz }).t().contiguous();
+    return std::make_tuple(eigenvalues.to(out_dtype), eigenvectors.to(out_dtype));
+}
+
+std::tuple<torch::Tensor, torch::Tensor> kmeans_cpu(
+    const torch::Tensor& points,
+    int64_t num_clusters,
+    int64_t max_iter,
+    double tol,
+    int64_t batch_size,
+    int64_t seed
+) {
+    TORCH_CHECK(points.dim() == 2, "kmeans_cpu: points 는 [n, D] 이어야 함");
+    const int64_t n = points.size(0);
+    TORCH_CHECK(num_clusters > 0 && num_clusters <= n, "kmeans_cpu: num_clusters 는 1 이상 n 이하여야 함");
+    auto x = points.to(at::promote_types(points.scalar_type(), torch::kFloat32)).contiguous();
+    auto x_norm_sq = (x * x).sum(1);
+    auto generator = at::make_generator<at::CPUGeneratorImpl>(seed);
+    auto centroids = kmeans_plus_plus(x, x_norm_sq, num_clusters, generator);
+
+    // 중심 이동량의 제곱합이 tol × (차원별 분산의 평균) 이하이면 수렴
+    const double threshold = n > 1 ? tol * x.var(0).mean().item<double>() : 0.0;
+    auto ones = torch::ones({ std::max<int64_t>(batch_size, n) }, x.options());
+    if (batch_size <= 0 || batch_size >= n) {
+        // 로이드 반복: 할당 = GEMM + argmin, 갱신 = index_add 로 클러스터별 합
+        for (int64_t iter = 0; iter < max_iter; ++iter) {
+            auto labels = squared_distances(x, x_norm_sq, centroids).argmin(1);
+            auto sums = torch::zeros_like(centroids).index_add_(0, labels, x);
+            auto counts = torch::zeros({ num_clusters }, x.options()).index_add_(0, labels, ones.narrow(0, 0, n));
+            // 빈 클러스터는 이전 중심을 유지
+            auto updated = torch::where(counts.unsqueeze(1) > 0, sums / counts.clamp_min(1).unsqueeze(1), centroids);
+            double shift = (updated - centroids).pow(2).sum().item<double>();
+            centroids = updated;
+            if (shift <= threshold) break;
+        }
+    } else {
+        // 미니배치: 중심마다 지금까지 할당된 개수로 나눈 학습률 (누적 평균)
+        auto seen = torch::zeros({ num_clusters }, x.options());
+        auto batch_ones = ones.narrow(0, 0, batch_size);
+        for (int64_t iter = 0; iter < max_iter; ++iter) {
+            auto idx = torch::randint(n, { batch_size }, generator, x.options().dtype(torch::kLong));
+            auto xb = x.index_select(0, idx);
+            auto labels = squared_distances(xb, x_norm_sq.index_select(0, idx), centroids).argmin(1);
+            auto sums = torch::zeros_like(centroids).index_add_(0, labels, xb);
+            auto counts = torch::zeros({ num_clusters }, x.options()).index_add_(0, labels, batch_ones);
+            seen += counts;
+            auto step = (sums - counts.unsqueeze(1) * centroids) / seen.clamp_min(1).unsqueeze(1);
+            centroids = centroids + step;
+            if (step.pow(2).sum().item<double>() <= threshold) break;
+        }
+    }
+
+    auto labels = squared_distances(x, x_norm_sq, centroids).argmin(1);
+    return std::make_tuple(labels, centroids.to(points.scalar_type()));
+}
+
+torch::Tensor spectral_clustering_cpu(
+    const torch::Tensor& points,
+    int num_clusters,
+    float curvature,
+    int num_neighbors,
+    int max_iter,
+    double tol,
+    int64_t batch_size,
+    int64_t seed
+) {
+    LaplaceBeltramiOperator op(curvature, num_clusters, num_neighbors);
+    return op.spectral_clustering(points, num_clusters, max_iter, tol, batch_size, seed);
 }
 
 torch::Tensor spectral_normalize_cpu(
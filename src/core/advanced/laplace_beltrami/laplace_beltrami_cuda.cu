@@ -34,7 +34,8 @@ __device__ __forceinline__ float safe_atanh(float x) {
     return atanhf(x);
 }
 
-// 하이퍼볼릭 라플라시안 커널
+// 하이퍼볼릭 라플라시안 커널 (블록 하나가 한 행)
+// CPU 와 같은 닫힌 식 Δ_H x = (D-2)·c·(1 - c|x|²) / 2 · x: |x|² 블록 합산 후 행 스칼라배 한 번
 __global__ void hyperbolic_laplacian_kernel(
     const float* __restrict__ f,        // [B, D]
     float* __restrict__ result,         // [B, D]
@@ -43,43 +44,39 @@ __global__ void hyperbolic_laplacian_kernel(
     int dim
 ) {
     int bid = blockIdx.x;
-    int did = threadIdx.x;
-    
-    if (bid >= batch_size || did >= dim) return;
-    
+    if (bid >= batch_size) return;
+
     const float* f_batch = f + bid * dim;
     float* result_batch = result + bid * dim;
-    
-    __shared__ float norm_squared;
-    
-    // 포인트의 노름 제곱 계산
+
+    __shared__ float warp_sums[MAX_THREADS_PER_BLOCK / WARP_SIZE];
+    __shared__ float scale;
+
+    // |x|²: 스레드별 부분합 -> 워프 합 -> 첫 워프가 워프 합들을 더한다
     float local_norm_sq = 0.0f;
-    for (int d = did; d < dim; d += blockDim.x) {
+    for (int d = threadIdx.x; d < dim; d += blockDim.x) {
         float val = f_batch[d];
         local_norm_sq += val * val;
     }
-    
     local_norm_sq = warp_reduce_sum(local_norm_sq);
-    if (threadIdx.x == 0) {
-        norm_squared = local_norm_sq;
+    const int lane = threadIdx.x % WARP_SIZE;
+    const int warp = threadIdx.x / WARP_SIZE;
+    if (lane == 0) {
+        warp_sums[warp] = local_norm_sq;
     }
     __syncthreads();
-    
-    // 포인카레 모델에서의 하이퍼볼릭 라플라시안
-    // Δ_H f = (1-|x|²)² [∂²f/∂x² - 2c·Σᵢ xᵢ·∂f/∂xᵢ]
-    if (did < dim) {
-        float metric_factor = powf(1.0f - curvature * norm_squared, 2);
-        
-        // 수치 미분 근사
-        float h = 1e-5f;
-        float d2f_dx2 = 0.0f; // 2차 미분 근사
-        float df_dx = 0.0f;   // 1차 미분 근사
-        
-        // 간단한 근사 (실제로는 더 정교한 구현 필요)
-        d2f_dx2 = -curvature * f_batch[did] * f_batch[did];
-        df_dx = f_batch[did];
-        
-        result_batch[did] = metric_factor * (d2f_dx2 - 2.0f * curvature * f_batch[did] * df_dx);
+    if (warp == 0) {
+        const int num_warps = (blockDim.x + WARP_SIZE - 1) / WARP_SIZE;
+        float norm_sq = lane < num_warps ? warp_sums[lane] : 0.0f;
+        norm_sq = warp_reduce_sum(norm_sq);
+        if (lane == 0) {
+            scale = 0.5f * static_cast<float>(dim - 2) * curvature * (1.0f - curvature * norm_sq);
+        }
+    }
+    __syncthreads();
+
+    for (int d = threadIdx.x; d < dim; d += blockDim.x) {
+        result_batch[d] = scale * f_batch[d];
     }
 }
 
@@ -280,15 +277,19 @@ torch::Tensor hyperbolic_laplacian_cuda(
     const torch::Tensor& f,
     float curvature
 ) {
-    auto batch_size = f.size(0);
-    auto dim = f.size(1);
-    auto result = torch::zeros_like(f);
+    // CPU 경로처럼 [..., D] 를 행 [B, D] 로 펴서 계산
+    auto input = f.reshape({ -1, f.size(-1) }).contiguous();
+    auto batch_size = input.size(0);
+    auto dim = input.size(1);
+    auto result = torch::empty_like(input);
     
     const int blocks = static_cast<int>(batch_size);
-    const int threads = static_cast<int>(std::min(static_cast<int64_t>(MAX_THREADS_PER_BLOCK), dim));
+    // 워프 셔플이 전체 마스크를 쓰므로 스레드 수는 워프 단위로 올린다
+    const int64_t warps = (dim + WARP_SIZE - 1) / WARP_SIZE;
+    const int threads = static_cast<int>(std::min<int64_t>(MAX_THREADS_PER_BLOCK, std::max<int64_t>(warps, 1) * WARP_SIZE));
     
     hyperbolic_laplacian_kernel<<<blocks, threads>>>(
-        f.data_ptr<float>(),
+        input.data_ptr<float>(),
         result.data_ptr<float>(),
         curvature,
         static_cast<int>(batch_size),
@@ -296,7 +297,7 @@ torch::Tensor hyperbolic_laplacian_cuda(
     );
     
     cudaDeviceSynchronize();
-    return result;
+    return result.view(f.sizes());
 }
 
 torch::Tensor heat_kernel_cuda(
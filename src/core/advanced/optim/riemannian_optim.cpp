@@ -0,0 +1,552 @@
+#include <torch/extension.h>
+#include <ATen/Dispatch.h>
+#include <ATen/Parallel.h>
+#include <advanced/optim/riemannian_optim.h>
+#include <config/constant.h>
+#include <utils/cpu_kernels.h>
+#include <algorithm>
+#include <cmath>
+#include <vector>
+
+namespace config = reality_stone::config;
+namespace utils = reality_stone::utils;
+
+namespace reality_stone::advanced {
+
+namespace {
+
+// 이보다 짧은 접벡터는 지수 사상 대신 그대로 더한다 (0 으로 나누기 방지)
+constexpr double kMinTangentNorm = 1e-15;
+
+enum class Manifold { Poincare, Lorentz, Euclidean };
+
+Manifold parse_manifold(const std::string& name) {
+    if (name == "poincare") return Manifold::Poincare;
+    if (name == "lorentz") return Manifold::Lorentz;
+    if (name == "euclidean") return Manifold::Euclidean;
+    TORCH_CHECK(false, "manifold must be 'poincare', 'lorentz' or 'euclidean', got '", name, "'");
+    return Manifold::Euclidean;
+}
+
+inline double dot(const double* a, const double* b, int64_t D) {
+    double sum = 0.0;
+    for (int64_t i = 0; i < D; ++i) sum += a[i] * b[i];
+    return sum;
+}
+
+// <a, b>_L = a0·b0 - Σ ai·bi (점은 <x, x>_L = 1/c)
+inline double minkowski(const double* a, const double* b, int64_t D) {
+    return a[0] * b[0] - dot(a + 1, b + 1, D - 1);
+}
+
+/**
+ * 다양체별 행 연산. 모든 버퍼는 길이 D 의 double 작업 행이다.
+ *   gradient : 유클리드 그래디언트 -> 리만 그래디언트 (제자리), 두 번째 모멘트에 곱할 계량 배율 반환
+ *   project  : x 의 접공간으로 사영
+ *   exp      : y = exp_x(u)
+ *   transport: v 를 x 에서 y 로 평행 이동 (제자리)
+ *   norm_sq  : 접벡터의 리만 제곱 노름 (metric 은 gradient 가 돌려준 계량 배율)
+ */
+struct Poincare {
+    double c;
+    double sqrt_c;
+    double max_norm;
+
+    explicit Poincare(double curvature)
+        : c(curvature), sqrt_c(std::sqrt(curvature)), max_norm((1.0 - config::Constants::BOUNDARY_EPS) / std::sqrt(curvature)) {}
+
+    // λ_x = 2 / (1 - c|x|²)
+    double lambda(double x2) const {
+        return 2.0 / std::max(1.0 - c * x2, static_cast<double>(config::Constants::EPS));
+    }
+
+    // 공형 배율: grad / λ², 계량 배율 λ²
+    double gradient(const double* x, double* g, int64_t D) const {
+        const double lam = lambda(dot(x, x, D));
+        const double inv = 1.0 / (lam * lam);
+        for (int64_t i = 0; i < D; ++i) g[i] *= inv;
+        return lam * lam;
+    }
+
+    void project(const double*, double*, int64_t) const {}
+
+    double norm_sq(const double* u, int64_t D, double metric) const { return metric * dot(u, u, D); }
+
+    // exp_x(u) = x ⊕ tanh(√c λ|u| / 2)·u / (√c|u|), 결과는 경계 안쪽으로 자른다
+    void exp(const double* x, const double* u, double* y, int64_t D) const {
+        // 내적 셋을 한 루프에서 (서로 독립인 덧셈 사슬이 겹친다)
+        double x2 = 0.0, xu = 0.0, u2 = 0.0;
+        for (int64_t i = 0; i < D; ++i) {
+            x2 += x[i] * x[i];
+            xu += x[i] * u[i];
+            u2 += u[i] * u[i];
+        }
+        const double u_norm = std::sqrt(u2);
+        if (u_norm < kMinTangentNorm) {
+            std::copy(x, x + D, y);
+            return;
+        }
+        const double arg = std::min(sqrt_c * lambda(x2) * u_norm / 2.0, static_cast<double>(config::Constants::MAX_TANH_ARG));
+        const double scale = std::tanh(arg) / (sqrt_c * u_norm);
+        // 뫼비우스 덧셈 x ⊕ w, w = scale·u
+        const double xw = scale * xu;
+        const double w2 = scale * scale * u2;
+        const double denom = std::max(1.0 + 2.0 * c * xw + c * c * x2 * w2, static_cast<double>(config::Constants::EPS));
+        const double a = (1.0 + 2.0 * c * xw + c * w2) / denom;
+        const double b = (1.0 - c * x2) * scale / denom;
+        for (int64_t i = 0; i < D; ++i) y[i] = a * x[i] + b * u[i];
+        const double y_norm = std::sqrt(dot(y, y, D));
+        if (y_norm > max_norm) {
+            const double shrink = max_norm / y_norm;
+            for (int64_t i = 0; i < D; ++i) y[i] *= shrink;
+        }
+    }
+
+    // P_{x->y}(v) = (λ_x / λ_y)·gyr[y, -x] v
+    void transport(const double* x, const double* y, double* v, int64_t D) const {
+        double y2 = 0.0, x2 = 0.0, yx = 0.0, yv = 0.0, xv = 0.0;
+        for (int64_t i = 0; i < D; ++i) {
+            y2 += y[i] * y[i];
+            x2 += x[i] * x[i];
+            yx -= y[i] * x[i];
+            yv += y[i] * v[i];
+            xv -= x[i] * v[i];
+        }
+        const double cc = c * c;
+        const double a = -cc * yv * x2 + c * xv + 2.0 * cc * yx * xv;
+        const double b = -cc * xv * y2 - c * yv;
+        const double d = std::max(1.0 + 2.0 * c * yx + cc * y2 * x2, kMinTangentNorm);
+        const double ratio = lambda(x2) / lambda(y2);
+        for (int64_t i = 0; i < D; ++i) v[i] = ratio * (v[i] + 2.0 * (a * y[i] - b * x[i]) / d);
+    }
+};
+
+struct Lorentz {
+    double c;
+    double sqrt_c;
+
+    explicit Lorentz(double curvature) : c(curvature), sqrt_c(std::sqrt(curvature)) {}
+
+    // 계량 (-, +, ..., +) 에 대한 그래디언트 (시간 성분 부호 반전) 를 접공간으로 사영
+    double gradient(const double* x, double* g, int64_t D) const {
+        g[0] = -g[0];
+        project(x, g, D);
+        return 1.0;
+    }
+
+    // u - c<x, u>_L·x
+    void project(const double* x, double* u, int64_t D) const {
+        const double inner = c * minkowski(x, u, D);
+        for (int64_t i = 0; i < D; ++i) u[i] -= inner * x[i];
+    }
+
+    double norm_sq(const double* u, int64_t D, double) const { return std::max(-minkowski(u, u, D), 0.0); }
+
+    // exp_x(u) = cosh(√c|u|)·x + sinh(√c|u|)·u / (√c|u|), |u|² = -<u, u>_L. 이후 x0 를 다시 맞춘다
+    void exp(const double* x, const double* u, double* y, int64_t D) const {
+        const double u_norm = std::sqrt(std::max(-minkowski(u, u, D), 0.0));
+        if (u_norm < kMinTangentNorm) {
+            for (int64_t i = 0; i < D; ++i) y[i] = x[i] + u[i];
+        } else {
+            const double arg = std::min(sqrt_c * u_norm, static_cast<double>(config::Constants::LOG_SUM_EXP_THRESHOLD));
+            const double a = std::cosh(arg);
+            const double b = std::sinh(arg) / (sqrt_c * u_norm);
+            for (int64_t i = 0; i < D; ++i) y[i] = a * x[i] + b * u[i];
+        }
+        y[0] = std::sqrt(1.0 / c + dot(y + 1, y + 1, D - 1));
+    }
+
+    // P_{x->y}(v) = v - <y, v>_L / (1/c + <x, y>_L)·(x + y)
+    void transport(const double* x, const double* y, double* v, int64_t D) const {
+        const double coef = minkowski(y, v, D) / std::max(1.0 / c + minkowski(x, y, D), kMinTangentNorm);
+        for (int64_t i = 0; i < D; ++i) v[i] -= coef * (x[i] + y[i]);
+        project(y, v, D);
+    }
+};
+
+struct Euclidean {
+    double gradient(const double*, double*, int64_t) const { return 1.0; }
+    void project(const double*, double*, int64_t) const {}
+    double norm_sq(const double* u, int64_t D, double) const { return dot(u, u, D); }
+    void exp(const double* x, const double* u, double* y, int64_t D) const {
+        for (int64_t i = 0; i < D; ++i) y[i] = x[i] + u[i];
+    }
+    void transport(const double*, const double*, double*, int64_t) const {}
+};
+
+template <typename Fn>
+void with_geometry(Manifold manifold, double c, Fn&& fn) {
+    switch (manifold) {
+        case Manifold::Poincare: fn(Poincare(c)); break;
+        case Manifold::Lorentz: fn(Lorentz(c)); break;
+        case Manifold::Euclidean: fn(Euclidean()); break;
+    }
+}
+
+int64_t row_length(const torch::Tensor& t) {
+    return t.dim() == 0 ? 1 : t.size(-1);
+}
+
+/**
+ * 텐서 목록 전체의 행을 한 번의 parallel_for 로 훑는다 (텐서 경계는 행 누적합으로 찾는다)
+ * fn(tensor index, row in tensor, D, work) 의 work 는 스레드별 double 버퍼 [4·max D]
+ */
+template <typename Fn>
+void parallel_rows(const std::vector<torch::Tensor>& params, Fn&& fn) {
+    const size_t n = params.size();
+    std::vector<int64_t> offsets(n + 1, 0);
+    std::vector<int64_t> dims(n);
+    int64_t max_d = 1;
+    for (size_t t = 0; t < n; ++t) {
+        dims[t] = row_length(params[t]);
+        const int64_t rows = dims[t] == 0 ? 0 : params[t].numel() / dims[t];
+        offsets[t + 1] = offsets[t] + rows;
+        max_d = std::max(max_d, dims[t]);
+    }
+    const int64_t total = offsets[n];
+    if (total == 0) return;
+    at::parallel_for(0, total, utils::row_grain_size(max_d), [&](int64_t begin, int64_t end) {
+        std::vector<double> work(4 * max_d);
+        size_t t = std::upper_bound(offsets.begin(), offsets.end(), begin) - offsets.begin() - 1;
+        for (int64_t row = begin; row < end; ++row) {
+            while (row >= offsets[t + 1]) ++t;
+            fn(t, row - offsets[t], dims[t], work.data());
+        }
+    });
+}
+
+void check_group(const std::vector<torch::Tensor>& params, const std::vector<torch::Tensor>& others, const char* name) {
+    TORCH_CHECK(others.size() == params.size(), name, " must have one tensor per parameter");
+    for (size_t i = 0; i < params.size(); ++i) {
+        TORCH_CHECK(others[i].sizes() == params[i].sizes(), name, "[", i, "] must match the parameter shape");
+        TORCH_CHECK(others[i].scalar_type() == params[i].scalar_type(), name, "[", i, "] must match the parameter dtype");
+        TORCH_CHECK(others[i].is_contiguous(), name, "[", i, "] must be contiguous");
+    }
+}
+
+void check_params(const std::vector<torch::Tensor>& params, Manifold manifold, float curvature) {
+    TORCH_CHECK(curvature > 0.0f, "curvature must be positive");
+    for (size_t i = 0; i < params.size(); ++i) {
+        TORCH_CHECK(params[i].device().is_cpu(), "params[", i, "] must be a CPU tensor");
+        TORCH_CHECK(params[i].is_contiguous(), "params[", i, "] must be contiguous");
+        TORCH_CHECK(params[i].scalar_type() == params[0].scalar_type(), "all params must share one dtype");
+        TORCH_CHECK(manifold != Manifold::Lorentz || row_length(params[i]) >= 2,
+            "lorentz params need at least 2 coordinates in the last dimension");
+    }
+}
+
+template <typename scalar_t>
+std::vector<scalar_t*> pointers(const std::vector<torch::Tensor>& tensors) {
+    std::vector<scalar_t*> out;
+    out.reserve(tensors.size());
+    for (const auto& t : tensors) out.push_back(t.data_ptr<scalar_t>());
+    return out;
+}
+
+/**
+ * Adagrad 한 행: r 은 (weight decay 를 더한) 유클리드 그래디언트로 들어와 덮어쓰인다.
+ * sum += |grad_R|², x ← exp_x(-lr·grad_R / (√sum + eps)). 갱신한 sum 을 돌려준다.
+ */
+template <typename Geometry>
+double adagrad_row(const Geometry& geo, const double* x, double* r, double* y, int64_t D,
+                   double sum, double lr, double eps) {
+    const double metric = geo.gradient(x, r, D);
+    sum += geo.norm_sq(r, D, metric);
+    const double scale = -lr / (std::sqrt(sum) + eps);
+    for (int64_t i = 0; i < D; ++i) r[i] *= scale;
+    geo.exp(x, r, y, D);
+    return sum;
+}
+
+/**
+ * 희소 행 그래디언트를 행 번호로 정렬해 합친 뒤 (coalesce) 서로 다른 행마다 fn 을 병렬로 부른다.
+ * fn(row, grad, work): grad 는 합친 유클리드 그래디언트 [D] (double), work 는 스레드별 버퍼 [3·D]
+ */
+template <typename scalar_t, typename Fn>
+void coalesced_rows(const torch::Tensor& indices, const torch::Tensor& values, int64_t num_rows, Fn&& fn) {
+    const int64_t D = values.size(1);
+    auto idx = indices.reshape({ -1 }).to(torch::kLong).contiguous();
+    const int64_t nnz = idx.numel();
+    if (nnz == 0) return;
+    auto sorted = at::sort(idx, /*stable=*/true, /*dim=*/0, /*descending=*/false);
+    auto rows = std::get<0>(sorted);
+    auto order = std::get<1>(sorted);
+    const int64_t* row_ptr = rows.data_ptr<int64_t>();
+    const int64_t* order_ptr = order.data_ptr<int64_t>();
+    TORCH_CHECK(row_ptr[0] >= 0 && row_ptr[nnz - 1] < num_rows, "sparse gradient row index out of range");
+    // 같은 행이 시작하는 위치
+    std::vector<int64_t> starts;
+    starts.reserve(nnz + 1);
+    for (int64_t j = 0; j < nnz; ++j) {
+        if (j == 0 || row_ptr[j] != row_ptr[j - 1]) starts.push_back(j);
+    }
+    starts.push_back(nnz);
+    const scalar_t* val_ptr = values.data_ptr<scalar_t>();
+    const int64_t segments = static_cast<int64_t>(starts.size()) - 1;
+    at::parallel_for(0, segments, utils::row_grain_size(D), [&](int64_t begin, int64_t end) {
+        std::vector<double> work(4 * D);
+        double* grad = work.data();
+        for (int64_t s = begin; s < end; ++s) {
+            std::fill(grad, grad + D, 0.0);
+            for (int64_t j = starts[s]; j < starts[s + 1]; ++j) {
+                const scalar_t* v = val_ptr + order_ptr[j] * D;
+                for (int64_t i = 0; i < D; ++i) grad[i] += static_cast<double>(v[i]);
+            }
+            fn(row_ptr[starts[s]], grad, work.data() + D);
+        }
+    });
+}
+
+void check_sparse(const torch::Tensor& param, const torch::Tensor& indices, const torch::Tensor& values,
+                  Manifold manifold, float curvature) {
+    TORCH_CHECK(curvature > 0.0f, "curvature must be positive");
+    TORCH_CHECK(param.dim() == 2 && param.device().is_cpu() && param.is_contiguous(),
+        "param must be a contiguous CPU tensor [N, D]");
+    TORCH_CHECK(param.scalar_type() == torch::kFloat32 || param.scalar_type() == torch::kFloat64,
+        "param must be float32 or float64");
+    TORCH_CHECK(values.dim() == 2 && values.size(1) == param.size(1) && values.size(0) == indices.numel(),
+        "values must be [nnz, D] with one row per index");
+    TORCH_CHECK(values.scalar_type() == param.scalar_type(), "values must match the parameter dtype");
+    TORCH_CHECK(manifold != Manifold::Lorentz || param.size(1) >= 2,
+        "lorentz params need at least 2 coordinates in the last dimension");
+}
+
+} // namespace
+
+void riemannian_adam_step_cpu(
+    const std::vector<torch::Tensor>& params,
+    const std::vector<torch::Tensor>& grads,
+    const std::vector<torch::Tensor>& exp_avgs,
+    const std::vector<torch::Tensor>& exp_avg_sqs,
+    const std::vector<int64_t>& steps,
+    double lr,
+    double beta1,
+    double beta2,
+    double eps,
+    double weight_decay,
+    const std::string& manifold,
+    float curvature
+) {
+    const Manifold kind = parse_manifold(manifold);
+    check_params(params, kind, curvature);
+    check_group(params, grads, "grads");
+    check_group(params, exp_avgs, "exp_avgs");
+    check_group(params, exp_avg_sqs, "exp_avg_sqs");
+    TORCH_CHECK(steps.size() == params.size(), "steps must have one entry per parameter");
+    if (params.empty()) return;
+
+    std::vector<double> bias1(params.size()), bias2(params.size());
+    for (size_t t = 0; t < params.size(); ++t) {
+        TORCH_CHECK(steps[t] >= 1, "steps must be positive");
+        bias1[t] = 1.0 - std::pow(beta1, static_cast<double>(steps[t]));
+        bias2[t] = 1.0 - std::pow(beta2, static_cast<double>(steps[t]));
+    }
+
+    AT_DISPATCH_FLOATING_TYPES(params[0].scalar_type(), "riemannian_adam_step_cpu", [&] {
+        auto P = pointers<scalar_t>(params);
+        auto G = pointers<scalar_t>(grads);
+        auto M = pointers<scalar_t>(exp_avgs);
+        auto V = pointers<scalar_t>(exp_avg_sqs);
+        with_geometry(kind, curvature, [&](const auto& geo) {
+            parallel_rows(params, [&](size_t t, int64_t row, int64_t D, double* work) {
+                scalar_t* p = P[t] + row * D;
+                const scalar_t* g = G[t] + row * D;
+                scalar_t* m = M[t] + row * D;
+                scalar_t* v = V[t] + row * D;
+                double* x = work;
+                double* r = work + D;
+                double* u = work + 2 * D;
+                double* y = work + 3 * D;
+                for (int64_t i = 0; i < D; ++i) {
+                    x[i] = static_cast<double>(p[i]);
+                    r[i] = static_cast<double>(g[i]) + weight_decay * x[i];
+                }
+                const double metric = geo.gradient(x, r, D);
+                // 모멘트 갱신과 방향 u = -lr·m̂ / (√v̂ + eps), 두 번째 모멘트는 계량 노름 λ²·r² 로 쌓는다
+                const double step_size = lr / bias1[t];
+                const double inv_bias2 = 1.0 / bias2[t];
+                for (int64_t i = 0; i < D; ++i) {
+                    const double mi = beta1 * static_cast<double>(m[i]) + (1.0 - beta1) * r[i];
+                    const double vi = beta2 * static_cast<double>(v[i]) + (1.0 - beta2) * metric * r[i] * r[i];
+                    v[i] = static_cast<scalar_t>(vi);
+                    r[i] = mi;
+                    u[i] = -step_size * mi / (std::sqrt(vi * inv_bias2) + eps);
+                }
+                geo.project(x, u, D);
+                geo.exp(x, u, y, D);
+                geo.transport(x, y, r, D);
+                for (int64_t i = 0; i < D; ++i) {
+                    p[i] = static_cast<scalar_t>(y[i]);
+                    m[i] = static_cast<scalar_t>(r[i]);
+                }
+            });
+        });
+    });
+}
+
+void riemannian_sgd_step_cpu(
+    const std::vector<torch::Tensor>& params,
+    const std::vector<torch::Tensor>& grads,
+    const std::vector<torch::Tensor>& momentum_buffers,
+    double lr,
+    double momentum,
+    double weight_decay,
+    const std::string& manifold,
+    float curvature
+) {
+    const Manifold kind = parse_manifold(manifold);
+    check_params(params, kind, curvature);
+    check_group(params, grads, "grads");
+    const bool use_momentum = momentum != 0.0;
+    if (use_momentum) check_group(params, momentum_buffers, "momentum_buffers");
+    if (params.empty()) return;
+
+    AT_DISPATCH_FLOATING_TYPES(params[0].scalar_type(), "riemannian_sgd_step_cpu", [&] {
+        auto P = pointers<scalar_t>(params);
+        auto G = pointers<scalar_t>(grads);
+        auto B = use_momentum ? pointers<scalar_t>(momentum_buffers) : std::vector<scalar_t*>();
+        with_geometry(kind, curvature, [&](const auto& geo) {
+            parallel_rows(params, [&](size_t t, int64_t row, int64_t D, double* work) {
+                scalar_t* p = P[t] + row * D;
+                const scalar_t* g = G[t] + row * D;
+                double* x = work;
+                double* r = work + D;
+                double* u = work + 2 * D;
+                double* y = work + 3 * D;
+                for (int64_t i = 0; i < D; ++i) {
+                    x[i] = static_cast<double>(p[i]);
+                    r[i] = static_cast<double>(g[i]) + weight_decay * x[i];
+                }
+                geo.gradient(x, r, D);
+                scalar_t* buf = use_momentum ? B[t] + row * D : nullptr;
+                if (buf) {
+                    for (int64_t i = 0; i < D; ++i) r[i] += momentum * static_cast<double>(buf[i]);
+                }
+                for (int64_t i = 0; i < D; ++i) u[i] = -lr * r[i];
+                geo.exp(x, u, y, D);
+                if (buf) {
+                    geo.transport(x, y, r, D);
+                    for (int64_t i = 0; i < D; ++i) buf[i] = static_cast<scalar_t>(r[i]);
+                }
+                for (int64_t i = 0; i < D; ++i) p[i] = static_cast<scalar_t>(y[i]);
+            });
+        });
+    });
+}
+
+void riemannian_adagrad_step_cpu(
+    const std::vector<torch::Tensor>& params,
+    const std::vector<torch::Tensor>& grads,
+    const std::vector<torch::Tensor>& sums,
+    double lr,
+    double eps,
+    double weight_decay,
+    const std::string& manifold,
+    float curvature
+) {
+    const Manifold kind = parse_manifold(manifold);
+    check_params(params, kind, curvature);
+    check_group(params, grads, "grads");
+    TORCH_CHECK(sums.size() == params.size(), "sums must have one tensor per parameter");
+    for (size_t i = 0; i < params.size(); ++i) {
+        const int64_t D = row_length(params[i]);
+        TORCH_CHECK(sums[i].numel() * D == params[i].numel() && sums[i].is_contiguous()
+            && sums[i].scalar_type() == params[i].scalar_type(), "sums[", i, "] must hold one entry per row");
+    }
+    if (params.empty()) return;
+
+    AT_DISPATCH_FLOATING_TYPES(params[0].scalar_type(), "riemannian_adagrad_step_cpu", [&] {
+        auto P = pointers<scalar_t>(params);
+        auto G = pointers<scalar_t>(grads);
+        auto S = pointers<scalar_t>(sums);
+        with_geometry(kind, curvature, [&](const auto& geo) {
+            parallel_rows(params, [&](size_t t, int64_t row, int64_t D, double* work) {
+                scalar_t* p = P[t] + row * D;
+                const scalar_t* g = G[t] + row * D;
+                double* x = work;
+                double* r = work + D;
+                double* y = work + 2 * D;
+                for (int64_t i = 0; i < D; ++i) {
+                    x[i] = static_cast<double>(p[i]);
+                    r[i] = static_cast<double>(g[i]) + weight_decay * x[i];
+                }
+                scalar_t& sum = S[t][row];
+                sum = static_cast<scalar_t>(adagrad_row(geo, x, r, y, D, static_cast<double>(sum), lr, eps));
+                for (int64_t i = 0; i < D; ++i) p[i] = static_cast<scalar_t>(y[i]);
+            });
+        });
+    });
+}
+
+void sparse_riemannian_sgd_step_cpu(
+    const torch::Tensor& param,
+    const torch::Tensor& indices,
+    const torch::Tensor& values,
+    double lr,
+    double weight_decay,
+    const std::string& manifold,
+    float curvature
+) {
+    const Manifold kind = parse_manifold(manifold);
+    check_sparse(param, indices, values, kind, curvature);
+    auto vals = values.contiguous();
+
+    AT_DISPATCH_FLOATING_TYPES(param.scalar_type(), "sparse_riemannian_sgd_step_cpu", [&] {
+        scalar_t* P = param.data_ptr<scalar_t>();
+        const int64_t D = param.size(1);
+        with_geometry(kind, curvature, [&](const auto& geo) {
+            coalesced_rows<scalar_t>(indices, vals, param.size(0), [&](int64_t row, double* r, double* work) {
+                scalar_t* p = P + row * D;
+                double* x = work;
+                double* y = work + D;
+                for (int64_t i = 0; i < D; ++i) {
+                    x[i] = static_cast<double>(p[i]);
+                    r[i] += weight_decay * x[i];
+                }
+                geo.gradient(x, r, D);
+                for (int64_t i = 0; i < D; ++i) r[i] *= -lr;
+                geo.exp(x, r, y, D);
+                for (int64_t i = 0; i < D; ++i) p[i] = static_cast<scalar_t>(y[i]);
+            });
+        });
+    });
+}
+
+void sparse_riemannian_adagrad_step_cpu(
+    const torch::Tensor& param,
+    const torch::Tensor& sum,
+    const torch::Tensor& indices,
+    const torch::Tensor& values,
+    double lr,
+    double eps,
+    double weight_decay,
+    const std::string& manifold,
+    float curvature
+) {
+    const Manifold kind = parse_manifold(manifold);
+    check_sparse(param, indices, values, kind, curvature);
+    TORCH_CHECK(sum.dim() == 1 && sum.size(0) == param.size(0) && sum.is_contiguous()
+        && sum.scalar_type() == param.scalar_type(), "sum must be [N] with the parameter dtype");
+    auto vals = values.contiguous();
+
+    AT_DISPATCH_FLOATING_TYPES(param.scalar_type(), "sparse_riemannian_adagrad_step_cpu", [&] {
+        scalar_t* P = param.data_ptr<scalar_t>();
+        scalar_t* S = sum.data_ptr<scalar_t>();
+        const int64_t D = param.size(1);
+        with_geometry(kind, curvature, [&](const auto& geo) {
+            coalesced_rows<scalar_t>(indices, vals, param.size(0), [&](int64_t row, double* r, double* work) {
+                scalar_t* p = P + row * D;
+                double* x = work;
+                double* y = work + D;
+                for (int64_t i = 0; i < D; ++i) {
+                    x[i] = static_cast<double>(p[i]);
+                    r[i] += weight_decay * x[i];
+                }
+                S[row] = static_cast<scalar_t>(adagrad_row(geo, x, r, y, D, static_cast<double>(S[row]), lr, eps));
+                for (int64_t i = 0; i < D; ++i) p[i] = static_cast<scalar_t>(y[i]);
+            });
+        });
+    });
+}
+
+} // namespace reality_stone::advanced
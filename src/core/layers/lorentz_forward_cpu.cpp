@@ -1,17 +1,15 @@
 #include <torch/extension.h>
-#include <ops/lorentz.h>
 #include <layers/lorentz.h>
-
-namespace ops = reality_stone::ops;
+#include <layers/geodesic_kernels.h>
+#include <utils/cpu_kernels.h>
 
 namespace reality_stone::layers {
+    // cosh(d·t)·u + sinh(d·t)·v_perp/|v_perp|_L, v_perp = v + <u,v>_L·u
+    // 모든 계수가 Lorentz 내적 세 개의 함수이므로 행 단위 융합 커널로 계산
     torch::Tensor lorentz_forward_cpu(torch::Tensor u, torch::Tensor v, float c, float t) {
-        auto inner = ops::lorentz_inner_cpu(u, v);
-        auto dist = ops::lorentz_distance_cpu(u, v, c);
-        auto v_perp = v + inner * u;
-        auto v_perp_norm = torch::sqrt(-ops::lorentz_inner_cpu(v_perp, v_perp))
-            .clamp_min(1e-8);
-        v_perp = v_perp / v_perp_norm;
-        return torch::cosh(dist * t) * u + torch::sinh(dist * t) * v_perp;
+        return utils::pair_combine_cpu(u, v, /*minkowski=*/true,
+            [c, t](auto uu, auto vv, auto uv, auto& coef_u, auto& coef_v) {
+                lorentz_geodesic_coeffs(uu, vv, uv, c, t, coef_u, coef_v);
+            });
     }
-}
\ No newline at end of file
+}
@@ -1,13 +1,16 @@
 #include <torch/extension.h>
-#include <ops/mobius.h>
 #include <layers/poincare_ball.h>
+#include <layers/geodesic_kernels.h>
+#include <utils/cpu_kernels.h>
 
-namespace ops = reality_stone::ops;
 namespace reality_stone::layers {
+    // u ⊕_c (t ⊗_c ((-u) ⊕_c v)) 의 모든 중간값은 span{u, v} 안에 있으므로
+    // 행마다 |u|², |v|², <u,v> 만 구하면 결과를 A·u + B·v 로 바로 쓸 수 있다.
+    // u, v 는 torch 규칙으로 브로드캐스트하고 (v 가 [1,D] 인 공유 파라미터여도 된다) 모양이 맞지 않으면 오류.
     torch::Tensor poincare_ball_forward_cpu(torch::Tensor u, torch::Tensor v, float c, float t) {
-        auto minus_u = ops::mobius_scalar_cpu(u, c, -1.0f);
-        auto delta = ops::mobius_add_cpu(minus_u, v, c);
-        auto delta_t = ops::mobius_scalar_cpu(delta, c, t);
-        return ops::mobius_add_cpu(u, delta_t, c);
+        return utils::pair_combine_cpu(u, v, /*minkowski=*/false,
+            [c, t](auto u2, auto v2, auto uv, auto& coef_u, auto& coef_v) {
+                poincare_geodesic_coeffs(u2, v2, uv, c, t, coef_u, coef_v);
+            });
     }
-}
\ No newline at end of file
+}
@@ -0,0 +1,284 @@
+#include <torch/extension.h>
+#include <ATen/Parallel.h>
+#include <algorithm>
+#include <cmath>
+#include <limits>
+#include <ops/cdist.h>
+#include <config/constant.h>
+#include <utils/cpu_kernels.h>
+
+namespace config = reality_stone::config;
+namespace utils = reality_stone::utils;
+
+namespace reality_stone::ops {
+    namespace {
+        enum class Model { Poincare, Lorentz, Klein };
+
+        Model parse_model(const std::string& model) {
+            if (model == "poincare") return Model::Poincare;
+            if (model == "lorentz") return Model::Lorentz;
+            if (model == "klein") return Model::Klein;
+            TORCH_CHECK(false, "cdist: model must be 'poincare', 'lorentz' or 'klein', got '", model, "'");
+        }
+
+        /**
+         * GEMM 과 rank-1 보정에 쓸 준비된 피연산자
+         *   rhs      : x @ rhs^T 가 교차항이 되도록 바꾼 y (로렌츠는 공간 성분 부호 반전)
+         *   y        : 원래 좌표의 y (가까운 쌍을 다시 계산할 때 사용)
+         *   x_row    : 행 상수 (poincare: |x|², klein: 1/sqrt(1-c|x|²))
+         *   x_scale  : poincare 의 1/(1-c|x|²)
+         *   y_row, y_scale : 열 쪽 같은 상수
+         */
+        struct Operands {
+            torch::Tensor lhs, rhs, y, x_row, x_scale, y_row, y_scale;
+        };
+
+        Operands prepare(const torch::Tensor& x, const torch::Tensor& y, Model model, float c) {
+            auto dtype = (x.scalar_type() == at::kDouble || y.scalar_type() == at::kDouble)
+                ? at::kDouble : at::kFloat;
+            Operands ops;
+            ops.lhs = x.to(dtype).contiguous();
+            auto yy = y.to(dtype).contiguous();
+            ops.y = yy;
+            if (model == Model::Lorentz) {
+                ops.rhs = torch::cat({yy.narrow(1, 0, 1), -yy.narrow(1, 1, yy.size(1) - 1)}, 1);
+                return ops;
+            }
+            ops.rhs = yy;
+            auto x_sq = ops.lhs.pow(2).sum(1);
+            auto y_sq = yy.pow(2).sum(1);
+            auto x_conf = (1 - c * x_sq).clamp_min(config::Constants::EPS);
+            auto y_conf = (1 - c * y_sq).clamp_min(config::Constants::EPS);
+            if (model == Model::Poincare) {
+                ops.x_row = x_sq;
+                ops.y_row = y_sq;
+                ops.x_scale = x_conf.reciprocal();
+                ops.y_scale = y_conf.reciprocal();
+            } else {
+                ops.x_row = x_conf.rsqrt();
+                ops.y_row = y_conf.rsqrt();
+            }
+            return ops;
+        }
+
+        /**
+         * 한 쌍의 z = A - 1 을 좌표 차 d = y - x 로 다시 계산 (double 누산)
+         * GEMM 의 교차항은 |x|², |y|² 크기의 항끼리 빼므로 z 가 작으면 float32 에서 유효숫자를 잃는다
+         * (1e-4 떨어진 점의 거리가 0). 모델마다 뺄셈이 없는 식을 쓴다
+         *   poincare : z = 2c|d|² / (conf_x conf_y)
+         *   lorentz  : z = c (|d_s|² - d_0²) / 2   (두 점이 <x,x>_L = 1/c 위에 있을 때)
+         *   klein    : sinh² = c (|d|² conf_x + c (x·d)²) / (conf_x conf_y),  z = sinh² / (1 + cosh)
+         */
+        template <typename T>
+        double exact_excess(const T* x, const T* y, int64_t D, Model model, double c) {
+            double xx = 0, dd = 0, xd = 0;
+            for (int64_t k = 0; k < D; ++k) {
+                const double xk = x[k];
+                const double dk = static_cast<double>(y[k]) - xk;
+                xx += xk * xk;
+                dd += dk * dk;
+                xd += xk * dk;
+            }
+            if (model == Model::Lorentz) {
+                const double d0 = static_cast<double>(y[0]) - x[0];
+                return std::max(0.5 * c * (dd - 2 * d0 * d0), 0.0);
+            }
+            const double eps = config::Constants::EPS;
+            const double x_conf = std::max(1 - c * xx, eps);
+            const double y_conf = std::max(1 - c * (xx + 2 * xd + dd), eps);
+            if (model == Model::Poincare) {
+                return 2 * c * dd / (x_conf * y_conf);
+            }
+            const double sinh_sq = c * (dd * x_conf + c * xd * xd) / (x_conf * y_conf);
+            return sinh_sq / (1 + std::sqrt(1 + sinh_sq));
+        }
+
+        /**
+         * 묶음 [rows, M] 의 교차항 G 를 그 자리에서 z = A - 1 (≥ 0, A 는 acosh 의 인자) 로 바꾼다
+         * GEMM 값의 절반 이상 자릿수가 상쇄된 쌍 (z ≤ √ε · 항의 크기) 은 exact_excess 로 다시 계산하므로
+         * 가까운 점의 거리와 top-k 순서가 정확하다. row0 은 묶음 첫 행의 전체 행 번호
+         */
+        void to_excess(torch::Tensor& block, const Operands& ops, Model model, float c, int64_t row0) {
+            const int64_t rows = block.size(0);
+            const int64_t M = block.size(1);
+            const int64_t D = ops.lhs.size(1);
+            AT_DISPATCH_FLOATING_TYPES(block.scalar_type(), "cdist_excess", [&] {
+                using T = scalar_t;
+                T* g = block.data_ptr<T>();
+                const T cc = static_cast<T>(c);
+                const T tol = std::sqrt(std::numeric_limits<T>::epsilon());
+                const T* xp = ops.lhs.data_ptr<T>() + row0 * D;
+                const T* yp = ops.y.data_ptr<T>();
+                const T* xr = model == Model::Lorentz ? nullptr : ops.x_row.data_ptr<T>() + row0;
+                const T* yr = model == Model::Lorentz ? nullptr : ops.y_row.data_ptr<T>();
+                const T* xs = model == Model::Poincare ? ops.x_scale.data_ptr<T>() + row0 : nullptr;
+                const T* ys = model == Model::Poincare ? ops.y_scale.data_ptr<T>() : nullptr;
+                at::parallel_for(0, rows, utils::row_grain_size(M), [&](int64_t begin, int64_t end) {
+                    for (int64_t i = begin; i < end; ++i) {
+                        T* row = g + i * M;
+                        const T* x = xp + i * D;
+                        auto exact = [&](int64_t j) {
+                            return static_cast<T>(exact_excess(x, yp + j * D, D, model, c));
+                        };
+                        if (model == Model::Poincare) {
+                            const T xn = xr[i];
+                            const T scale = 2 * cc * xs[i];
+                            for (int64_t j = 0; j < M; ++j) {
+                                const T diff = xn + yr[j] - 2 * row[j];
+                                row[j] = diff > tol * (xn + yr[j]) ? scale * diff * ys[j] : exact(j);
+                            }
+                        } else if (model == Model::Lorentz) {
+                            for (int64_t j = 0; j < M; ++j) {
+                                const T z = cc * row[j] - T(1);
+                                row[j] = z > tol * cc * std::abs(x[0] * yp[j * D]) ? z : exact(j);
+                            }
+                        } else {
+                            const T xk = xr[i];
+                            for (int64_t j = 0; j < M; ++j) {
+                                const T z = (T(1) - cc * row[j]) * xk * yr[j] - T(1);
+                                row[j] = z > tol * xk * yr[j] ? z : exact(j);
+                            }
+                        }
+                    }
+                });
+            });
+        }
+
+        // z -> acosh(1 + z) / √c = log1p(z + √(z(z + 2))) / √c (제자리, z 가 작아도 정확)
+        void to_distance(torch::Tensor& values, float c) {
+            AT_DISPATCH_FLOATING_TYPES(values.scalar_type(), "cdist_distance", [&] {
+                using T = scalar_t;
+                T* v = values.data_ptr<T>();
+                const T inv_sqrt_c = T(1) / std::sqrt(static_cast<T>(c));
+                at::parallel_for(0, values.numel(), at::internal::GRAIN_SIZE, [&](int64_t begin, int64_t end) {
+                    for (int64_t i = begin; i < end; ++i) {
+                        const T z = v[i];
+                        v[i] = std::log1p(z + std::sqrt(z * (z + T(2)))) * inv_sqrt_c;
+                    }
+                });
+            });
+        }
+
+        int64_t chunk_rows(int64_t chunk_size, int64_t N, int64_t M) {
+            int64_t rows = chunk_size > 0 ? chunk_size
+                : std::max<int64_t>(1, kCdistChunkElements / std::max<int64_t>(M, 1));
+            return std::min<int64_t>(rows, std::max<int64_t>(N, 1));
+        }
+
+        /**
+         * to_distance 의 텐서 연산판
+         * z = 0 (같은 점) 에서는 √(z(z + 2)) 의 기울기가 발산하므로 그 원소만 0 거리 / 0 그래디언트로 둔다
+         */
+        torch::Tensor excess_to_distance(const torch::Tensor& z, float c) {
+            auto positive = z > 0;
+            auto safe = torch::where(positive, z, torch::ones_like(z));
+            auto dist = torch::log1p(safe + (safe * (safe + 2)).sqrt());
+            return torch::where(positive, dist, torch::zeros_like(z)) / std::sqrt(c);
+        }
+
+        /**
+         * autograd 가 필요한 경우의 텐서 연산 경로 (묶음 없이 한 번에)
+         * |d|² 를 GEMM 대신 좌표 차로 계산하는 cdist 로 구해 exact_excess 와 같은 뺄셈 없는 식을 쓰므로
+         * 가까운 점의 거리와 그래디언트가 0 으로 뭉개지지 않는다 (클라인은 같은 점의 푸앵카레 좌표로 계산)
+         */
+        torch::Tensor cdist_autograd(const torch::Tensor& x, const torch::Tensor& y, Model model, float c) {
+            auto xx = x.scalar_type() == at::kDouble ? x : x.to(at::kFloat);
+            auto yy = y.to(xx.scalar_type());
+            // compute_mode 2 = donot_use_mm_for_euclid_dist
+            auto diff_sq = [](const torch::Tensor& a, const torch::Tensor& b) {
+                return torch::cdist(a, b, 2.0, 2).pow(2);
+            };
+            if (model == Model::Lorentz) {
+                const int64_t D = xx.size(1);
+                auto d0 = xx.narrow(1, 0, 1) - yy.narrow(1, 0, 1).t();
+                auto ds = diff_sq(xx.narrow(1, 1, D - 1), yy.narrow(1, 1, D - 1));
+                return excess_to_distance((0.5 * c * (ds - d0.pow(2))).clamp_min(0), c);
+            }
+            if (model == Model::Klein) {
+                auto to_poincare = [c](const torch::Tensor& k) {
+                    auto conf = (1 - c * k.pow(2).sum(1, /*keepdim=*/true)).clamp_min(config::Constants::EPS);
+                    return k / (1 + conf.sqrt());
+                };
+                xx = to_poincare(xx);
+                yy = to_poincare(yy);
+            }
+            auto x_conf = (1 - c * xx.pow(2).sum(1, /*keepdim=*/true)).clamp_min(config::Constants::EPS);
+            auto y_conf = (1 - c * yy.pow(2).sum(1, /*keepdim=*/true)).clamp_min(config::Constants::EPS).t();
+            return excess_to_distance(2 * c * diff_sq(xx, yy) / (x_conf * y_conf), c);
+        }
+
+        void check_inputs(const torch::Tensor& x, const torch::Tensor& y, Model model) {
+            TORCH_CHECK(x.dim() == 2 && y.dim() == 2, "cdist: expected 2-D inputs [N, D] and [M, D]");
+            TORCH_CHECK(x.size(1) == y.size(1), "cdist: dimension mismatch ", x.size(1), " vs ", y.size(1));
+            TORCH_CHECK(model != Model::Lorentz || x.size(1) >= 2,
+                        "cdist: lorentz points need at least 2 coordinates");
+        }
+    }
+
+    torch::Tensor cdist_cpu(
+        const torch::Tensor& x,
+        const torch::Tensor& y,
+        const std::string& model,
+        float c,
+        int64_t chunk_size
+    ) {
+        const Model m = parse_model(model);
+        check_inputs(x, y, m);
+        if (utils::requires_grad({x, y})) {
+            return cdist_autograd(x, y, m, c);
+        }
+        Operands ops = prepare(x, y, m, c);
+        const int64_t N = x.size(0);
+        const int64_t M = y.size(0);
+        auto out = torch::empty({N, M}, ops.lhs.options());
+        if (N == 0 || M == 0) return out;
+        auto rhs_t = ops.rhs.t();
+        const int64_t rows = chunk_rows(chunk_size, N, M);
+        for (int64_t start = 0; start < N; start += rows) {
+            const int64_t len = std::min(rows, N - start);
+            auto block = out.narrow(0, start, len);
+            at::mm_out(block, ops.lhs.narrow(0, start, len), rhs_t);
+            to_excess(block, ops, m, c, start);
+            to_distance(block, c);
+        }
+        return out;
+    }
+
+    std::tuple<torch::Tensor, torch::Tensor> cdist_topk_cpu(
+        const torch::Tensor& x,
+        const torch::Tensor& y,
+        int64_t k,
+        const std::string& model,
+        float c,
+        int64_t chunk_size
+    ) {
+        const Model m = parse_model(model);
+        check_inputs(x, y, m);
+        const int64_t N = x.size(0);
+        const int64_t M = y.size(0);
+        TORCH_CHECK(k >= 0 && k <= M, "cdist: k must be in [0, ", M, "], got ", k);
+        if (utils::requires_grad({x, y})) {
+            auto result = cdist_autograd(x, y, m, c).topk(k, /*dim=*/1, /*largest=*/false);
+            return {std::get<0>(result), std::get<1>(result)};
+        }
+        Operands ops = prepare(x, y, m, c);
+        auto values = torch::empty({N, k}, ops.lhs.options());
+        auto indices = torch::empty({N, k}, x.options().dtype(at::kLong));
+        if (N == 0 || k == 0) return {values, indices};
+        auto rhs_t = ops.rhs.t();
+        const int64_t rows = chunk_rows(chunk_size, N, M);
+        // 묶음 버퍼는 한 번만 할당해 재사용
+        auto buffer = torch::empty({rows, M}, ops.lhs.options());
+        for (int64_t start = 0; start < N; start += rows) {
+            const int64_t len = std::min(rows, N - start);
+            auto block = buffer.narrow(0, 0, len);
+            at::mm_out(block, ops.lhs.narrow(0, start, len), rhs_t);
+            to_excess(block, ops, m, c, start);
+            auto v = values.narrow(0, start, len);
+            auto idx = indices.narrow(0, start, len);
+            at::topk_out(v, idx, block, k, /*dim=*/1, /*largest=*/false, /*sorted=*/true);
+        }
+        to_distance(values, c);
+        return {values, indices};
+    }
+}
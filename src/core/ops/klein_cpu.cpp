@@ -1,30 +1,86 @@
 #include <torch/extension.h>
 #include <cmath>
 #include <ops/klein.h>
+#include <ops/klein_coeffs.h>
 #include <config/constant.h>
 #include <utils/numeric.h>
+#include <utils/cpu_kernels.h>
 
 namespace config = reality_stone::config;
 namespace utils = reality_stone::utils;
 
 namespace reality_stone::ops {
+    namespace {
+        // 행 커널과 autograd 경로가 함께 쓰는 계수 함수 (수식은 ops/klein_coeffs.h)
+        auto klein_distance_fn(float c) {
+            return [c](auto u2, auto v2, auto uv) { return klein_distance_value(u2, v2, uv, c); };
+        }
+
+        auto klein_add_fn(float c) {
+            return [c](auto u2, auto v2, auto uv, auto& coef_u, auto& coef_v) {
+                klein_add_coeffs(u2, v2, uv, c, coef_u, coef_v);
+            };
+        }
+
+        auto klein_scalar_fn(float c, float r) {
+            // 최대 유효 범위 제한 (클라인 모델의 경계는 1/sqrt(c))
+            float max_norm = 1.0f / std::sqrt(c) - config::Constants::BOUNDARY_EPS;
+            return [r, max_norm](auto norm_sq) { return klein_scalar_coeff(norm_sq, r, max_norm); };
+        }
+
+        auto poincare_to_klein_fn(float c) {
+            return [c](auto norm_sq) { return poincare_to_klein_coeff(norm_sq, c); };
+        }
+
+        auto klein_to_poincare_fn(float c) {
+            return [c](auto norm_sq) { return klein_to_poincare_coeff(norm_sq, c); };
+        }
+
+        // Lorentz -> Klein 분모: 시간 성분 x0 ([B,1])
+        torch::Tensor lorentz_to_klein_denom(const torch::Tensor& x) {
+            return x.narrow(1, 0, 1).clamp_min(config::Constants::EPS);
+        }
+
+        // Klein -> Lorentz 시간 성분 1 / √(1 - c|x|²) ([B,1], 공간 성분은 x0·x)
+        torch::Tensor klein_to_lorentz_time(const torch::Tensor& x_norm_sq, float c) {
+            return 1.0f / torch::sqrt(1.0f - c * x_norm_sq).clamp_min(config::Constants::EPS);
+        }
+    }
+
+    torch::Tensor klein_distance_out_cpu(
+        torch::Tensor u,
+        torch::Tensor v,
+        float c,
+        torch::Tensor out
+    ) {
+        if (utils::requires_grad({ u, v })) {
+            return out.copy_(klein_distance_cpu(u, v, c));
+        }
+        return utils::pair_reduce_out_cpu(u, v, /*minkowski=*/false, klein_distance_fn(c), out);
+    }
 
     torch::Tensor klein_distance_cpu(
         torch::Tensor u,
         torch::Tensor v,
         float c
     ) {
-        float sqrtc = std::sqrt(c);
-        auto u_norm_sq = torch::sum(u * u, /*dim=*/1, /*keepdim=*/true);
-        auto v_norm_sq = torch::sum(v * v, /*dim=*/1, /*keepdim=*/true);
-        auto uv = torch::sum(u * v, /*dim=*/1, /*keepdim=*/true);
-        auto numerator = 2 * (u_norm_sq * v_norm_sq - uv * uv);
-        auto denominator = ((1 - c * u_norm_sq) * (1 - c * v_norm_sq))
-            .clamp_min(config::Constants::EPS);
-        auto lambda = torch::sqrt(numerator / denominator);
-        auto two_minus_lambda_sq = (2.0f - lambda).clamp_min(config::Constants::EPS);
-        auto dist = torch::acosh((2.0f + lambda) / two_minus_lambda_sq) / sqrtc;
-        return dist;
+        if (utils::requires_grad({ u, v })) {
+            return utils::pair_reduce_autograd(u, v, /*minkowski=*/false, klein_distance_fn(c));
+        }
+        auto out = torch::empty(utils::pair_reduce_shape(u, v), u.options().dtype(at::result_type(u, v)));
+        return klein_distance_out_cpu(u, v, c, out);
+    }
+
+    torch::Tensor klein_add_out_cpu(
+        torch::Tensor u,
+        torch::Tensor v,
+        float c,
+        torch::Tensor out
+    ) {
+        if (utils::requires_grad({ u, v })) {
+            return out.copy_(klein_add_cpu(u, v, c));
+        }
+        return utils::pair_combine_out_cpu(u, v, /*minkowski=*/false, klein_add_fn(c), out);
     }
 
     torch::Tensor klein_add_cpu(
@@ -32,20 +88,24 @@ namespace reality_stone::ops {
         torch::Tensor v,
         float c
     ) {
-        auto u_norm_sq = torch::sum(u * u, /*dim=*/1, /*keepdim=*/true);
-        auto v_norm_sq = torch::sum(v * v, /*dim=*/1, /*keepdim=*/true);
-        auto u_denom = (1.0f - c * u_norm_sq).clamp_min(config::Constants::EPS);
-        auto v_denom = (1.0f - c * v_norm_sq).clamp_min(config::Constants::EPS);
-
-        // 결과 계산
-        auto result = u / u_denom.sqrt() + v / v_denom.sqrt();
-
-        // 정규화
-        auto result_norm_sq = torch::sum(result * result, /*dim=*/1, /*keepdim=*/true);
-        auto result_denom = (1.0f + torch::sqrt(1.0f + c * result_norm_sq))
-            .clamp_min(config::Constants::EPS);
+        if (utils::requires_grad({ u, v })) {
+            return utils::pair_combine_autograd(u, v, /*minkowski=*/false, klein_add_fn(c));
+        }
+        auto out = torch::empty(utils::pair_shape(u, v), u.options().dtype(at::result_type(u, v)));
+        return klein_add_out_cpu(u, v, c, out);
+    }
 
-        return result / result_denom;
+    torch::Tensor klein_scalar_out_cpu(
+        torch::Tensor u,
+        float c,
+        float r,
+        torch::Tensor out
+    ) {
+        if (utils::requires_grad({ u })) {
+            return out.copy_(klein_scalar_cpu(u, c, r));
+        }
+        // 단위 벡터 방향 × 스케일링된 노름
+        return utils::row_scale_out_cpu(u, klein_scalar_fn(c, r), out);
     }
 
     torch::Tensor klein_scalar_cpu(
@@ -53,72 +113,110 @@ namespace reality_stone::ops {
         float c,
         float r
     ) {
-        // 클라인 모델에서 스칼라 곱셈 구현
-        auto norm = torch::norm(u, 2, /*dim=*/1, /*keepdim=*/true)
-            .clamp_min(config::Constants::EPS);
-
-// 단위 벡터 방향
-        auto u_dir = u / norm;
-
-        // 스케일링된 노름 계산
-        auto scaled_norm = norm * r;
-
-        // 최대 유효 범위 제한 (클라인 모델의 경계는 1/sqrt(c))
-        auto max_norm = 1.0f / std::sqrt(c) - config::Constants::BOUNDARY_EPS;
-        scaled_norm = scaled_norm.clamp_max(max_norm);
+        if (utils::requires_grad({ u })) {
+            return utils::row_scale_autograd(u, klein_scalar_fn(c, r));
+        }
+        return klein_scalar_out_cpu(u, c, r, torch::empty(u.sizes(), u.options()));
+    }
 
-        return u_dir * scaled_norm;
+    torch::Tensor poincare_to_klein_out_cpu(
+        torch::Tensor x,
+        float c,
+        torch::Tensor out
+    ) {
+        if (utils::requires_grad({ x })) {
+            return out.copy_(poincare_to_klein_cpu(x, c));
+        }
+        // 푸앵카레 볼에서 클라인 모델로 변환
+        return utils::row_scale_out_cpu(x, poincare_to_klein_fn(c), out);
     }
 
     torch::Tensor poincare_to_klein_cpu(
         torch::Tensor x,
         float c
     ) {
-        // 푸앵카레 볼에서 클라인 모델로 변환
-        float sqrtc = std::sqrt(c);
-        auto x_norm_sq = torch::sum(x * x, /*dim=*/1, /*keepdim=*/true);
-        auto denom = (1.0f + c * x_norm_sq).clamp_min(config::Constants::EPS);
+        if (utils::requires_grad({ x })) {
+            return utils::row_scale_autograd(x, poincare_to_klein_fn(c));
+        }
+        return poincare_to_klein_out_cpu(x, c, torch::empty(x.sizes(), x.options()));
+    }
 
-        return 2.0f * x / denom;
+    torch::Tensor klein_to_poincare_out_cpu(
+        torch::Tensor x,
+        float c,
+        torch::Tensor out
+    ) {
+        if (utils::requires_grad({ x })) {
+            return out.copy_(klein_to_poincare_cpu(x, c));
+        }
+        // 클라인 모델에서 푸앵카레 볼로 변환
+        return utils::row_scale_out_cpu(x, klein_to_poincare_fn(c), out);
     }
 
     torch::Tensor klein_to_poincare_cpu(
         torch::Tensor x,
         float c
     ) {
-        // 클라인 모델에서 푸앵카레 볼로 변환
-        float sqrtc = std::sqrt(c);
-        auto x_norm_sq = torch::sum(x * x, /*dim=*/1, /*keepdim=*/true);
-        auto denom = (1.0f + torch::sqrt(1.0f - c * x_norm_sq))
-            .clamp_min(config::Constants::EPS);
+        if (utils::requires_grad({ x })) {
+            return utils::row_scale_autograd(x, klein_to_poincare_fn(c));
+        }
+        return klein_to_poincare_out_cpu(x, c, torch::empty(x.sizes(), x.options()));
+    }
 
-        return x / denom;
+    torch::Tensor lorentz_to_klein_out_cpu(
+        torch::Tensor x,
+        float c,
+        torch::Tensor out
+    ) {
+        if (utils::requires_grad({ x })) {
+            return out.copy_(lorentz_to_klein_cpu(x, c));
+        }
+        // 로렌츠 모델에서 클라인 모델로 변환: 공간 성분 xi / 시간 성분 x0
+        auto xi = x.narrow(1, 1, x.size(1) - 1);
+        TORCH_CHECK(out.sizes() == xi.sizes(), "lorentz_to_klein_out_cpu: out 의 모양이 [B, D-1] 이 아님");
+        return at::div_out(out, xi, lorentz_to_klein_denom(x));
     }
 
     torch::Tensor lorentz_to_klein_cpu(
         torch::Tensor x,
         float c
     ) {
-        // 로렌츠 모델에서 클라인 모델로 변환
-        float sqrtc = std::sqrt(c);
-
-        // 로렌츠 좌표에서 시간 성분과 공간 성분 분리
-        auto x0 = x.select(1, 0);
-        auto xi = x.narrow(1, 1, x.size(1) - 1);
+        if (utils::requires_grad({ x })) {
+            return x.narrow(1, 1, x.size(1) - 1) / lorentz_to_klein_denom(x);
+        }
+        auto out = torch::empty({ x.size(0), x.size(1) - 1 }, x.options());
+        return lorentz_to_klein_out_cpu(x, c, out);
+    }
 
-        // 클라인 좌표 계산: xi / x0
-        return xi / x0.unsqueeze(1).clamp_min(config::Constants::EPS);
+    torch::Tensor klein_to_lorentz_out_cpu(
+        torch::Tensor x,
+        float c,
+        torch::Tensor out
+    ) {
+        if (utils::requires_grad({ x })) {
+            return out.copy_(klein_to_lorentz_cpu(x, c));
+        }
+        int64_t D = x.size(1);
+        TORCH_CHECK(out.dim() == 2 && out.size(0) == x.size(0) && out.size(1) == D + 1,
+            "klein_to_lorentz_out_cpu: out 의 모양이 [B, D+1] 이 아님");
+        // 노름은 fp32 (double 은 fp64) 로 누산하고 결과만 out 타입으로 저장
+        auto x0 = klein_to_lorentz_time(utils::row_norm_sq_cpu(x), c);
+        out.narrow(1, 0, 1).copy_(x0);
+        auto out_space = out.narrow(1, 1, D);
+        at::mul_out(out_space, x, x0.to(out.scalar_type()));
+        return out;
     }
 
     torch::Tensor klein_to_lorentz_cpu(
         torch::Tensor x,
         float c
     ) {
-        float sqrtc = std::sqrt(c);
-        auto x_norm_sq = torch::sum(x * x, /*dim=*/1, /*keepdim=*/true);
-        auto x0 = 1.0f / torch::sqrt(1.0f - c * x_norm_sq)
-            .clamp_min(config::Constants::EPS);
-        return torch::cat({ x0, x0 * x }, /*dim=*/1);
+        if (utils::requires_grad({ x })) {
+            auto x0 = klein_to_lorentz_time(torch::sum(x * x, /*dim=*/1, /*keepdim=*/true), c);
+            return torch::cat({ x0, x0 * x }, /*dim=*/1);
+        }
+        auto out = torch::empty({ x.size(0), x.size(1) + 1 }, x.options());
+        return klein_to_lorentz_out_cpu(x, c, out);
     }
 
-}
\ No newline at end of file
+}
@@ -1,20 +1,64 @@
 #include <torch/extension.h>
 #include <cmath>
 #include <ops/lorentz.h>
+#include <ops/lorentz_coeffs.h>
 #include <config/constant.h>
 #include <utils/numeric.h>
+#include <utils/cpu_kernels.h>
 
-namespace config = reality_stone::config;
 namespace utils = reality_stone::utils;
 
 namespace reality_stone::ops {
+    namespace {
+        // 행 커널과 autograd 경로가 함께 쓰는 계수 함수 (수식은 ops/lorentz_coeffs.h)
+        auto lorentz_inner_fn() {
+            return [](auto uu, auto vv, auto uv) { return uv; };
+        }
+
+        auto lorentz_distance_fn(float c) {
+            return [c](auto uu, auto vv, auto uv) { return lorentz_distance_value(uv, c); };
+        }
+
+        auto lorentz_add_fn() {
+            return [](auto uu, auto vv, auto uv, auto& coef_u, auto& coef_v) {
+                lorentz_add_coeffs(uu, vv, uv, coef_u, coef_v);
+            };
+        }
+    }
+
+    torch::Tensor lorentz_inner_out_cpu(
+        torch::Tensor u,
+        torch::Tensor v,
+        torch::Tensor out
+    ) {
+        if (utils::requires_grad({ u, v })) {
+            return out.copy_(lorentz_inner_cpu(u, v));
+        }
+        // time - space 부호, fp32 (double 은 fp64) 누산
+        return utils::pair_reduce_out_cpu(u, v, /*minkowski=*/true, lorentz_inner_fn(), out);
+    }
+
     torch::Tensor lorentz_inner_cpu(
         torch::Tensor u,
         torch::Tensor v
     ) {
-        auto time_part = u.select(1, 0) * v.select(1, 0);
-        auto space_part = (u.narrow(1, 1, u.size(1) - 1) * v.narrow(1, 1, v.size(1) - 1)).sum(1);
-        return (time_part - space_part).unsqueeze(1);
+        if (utils::requires_grad({ u, v })) {
+            return utils::pair_reduce_autograd(u, v, /*minkowski=*/true, lorentz_inner_fn());
+        }
+        auto out = torch::empty(utils::pair_reduce_shape(u, v), u.options().dtype(at::result_type(u, v)));
+        return lorentz_inner_out_cpu(u, v, out);
+    }
+
+    torch::Tensor lorentz_distance_out_cpu(
+        torch::Tensor u,
+        torch::Tensor v,
+        float c,
+        torch::Tensor out
+    ) {
+        if (utils::requires_grad({ u, v })) {
+            return out.copy_(lorentz_distance_cpu(u, v, c));
+        }
+        return utils::pair_reduce_out_cpu(u, v, /*minkowski=*/true, lorentz_distance_fn(c), out);
     }
 
     torch::Tensor lorentz_distance_cpu(
@@ -22,9 +66,23 @@ namespace reality_stone::ops {
         torch::Tensor v,
         float c
     ) {
-        auto inner = -lorentz_inner_cpu(u, v);
-        inner = inner.clamp_min(1.0f + config::Constants::EPS);
-        return torch::acosh(inner) / std::sqrt(c);
+        if (utils::requires_grad({ u, v })) {
+            return utils::pair_reduce_autograd(u, v, /*minkowski=*/true, lorentz_distance_fn(c));
+        }
+        auto out = torch::empty(utils::pair_reduce_shape(u, v), u.options().dtype(at::result_type(u, v)));
+        return lorentz_distance_out_cpu(u, v, c, out);
+    }
+
+    torch::Tensor lorentz_add_out_cpu(
+        torch::Tensor u,
+        torch::Tensor v,
+        float c,
+        torch::Tensor out
+    ) {
+        if (utils::requires_grad({ u, v })) {
+            return out.copy_(lorentz_add_cpu(u, v, c));
+        }
+        return utils::pair_combine_out_cpu(u, v, /*minkowski=*/true, lorentz_add_fn(), out);
     }
 
     torch::Tensor lorentz_add_cpu(
@@ -32,14 +90,32 @@ namespace reality_stone::ops {
         torch::Tensor v,
         float c
     ) {
-        float sqrtc = std::sqrt(c);
-        auto uv_inner = lorentz_inner_cpu(u, v);
-        auto v_perp = v + uv_inner * u;
-        auto norm_v_perp = torch::sqrt(-lorentz_inner_cpu(v_perp, v_perp));
-        norm_v_perp = norm_v_perp.clamp_min(config::Constants::EPS);
-        auto cos_theta = torch::cosh(norm_v_perp);
-        auto sin_theta = torch::sinh(norm_v_perp);
-        return cos_theta * u + sin_theta * v_perp / norm_v_perp;
+        if (utils::requires_grad({ u, v })) {
+            return utils::pair_combine_autograd(u, v, /*minkowski=*/true, lorentz_add_fn());
+        }
+        auto out = torch::empty(utils::pair_shape(u, v), u.options().dtype(at::result_type(u, v)));
+        return lorentz_add_out_cpu(u, v, c, out);
+    }
+
+    torch::Tensor lorentz_scalar_out_cpu(
+        torch::Tensor u,
+        float c,
+        float r,
+        torch::Tensor out
+    ) {
+        if (utils::requires_grad({ u })) {
+            return out.copy_(lorentz_scalar_cpu(u, c, r));
+        }
+        TORCH_CHECK(out.sizes() == u.sizes(), "lorentz_scalar_out_cpu: out 의 모양이 입력과 다름");
+        // 행별 스칼라는 누산 타입 [B,1] 로 먼저 모두 계산한 뒤 out 에 쓴다 (out 이 u 여도 된다)
+        auto time_comp = u.narrow(1, 0, 1).to(at::toOpMathType(u.scalar_type()));
+        auto space_comp = u.narrow(1, 1, u.size(1) - 1);
+        torch::Tensor scale, scaled_time;
+        lorentz_scalar_coeffs(time_comp, utils::row_norm_sq_cpu(space_comp), r, scale, scaled_time);
+        auto out_space = out.narrow(1, 1, u.size(1) - 1);
+        at::mul_out(out_space, space_comp, scale.to(out.scalar_type()));
+        out.narrow(1, 0, 1).copy_(scaled_time);
+        return out;
     }
 
     torch::Tensor lorentz_scalar_cpu(
@@ -47,41 +123,69 @@ namespace reality_stone::ops {
         float c,
         float r
     ) {
-        auto time_comp = u.select(1, 0);
-        auto space_comp = u.narrow(1, 1, u.size(1) - 1);
-        auto norm = torch::sqrt(
-            torch::pow(space_comp, 2).sum(1) /
-            (torch::pow(time_comp, 2) - config::Constants::EPS)
-        ).unsqueeze(1);
-        auto theta = torch::atanh(norm.clamp_max(1.0f - config::Constants::BOUNDARY_EPS)) * r;
-        auto scale = torch::tanh(theta) / norm.clamp_min(config::Constants::EPS);
-        auto scaled_space = space_comp * scale;
-        auto scaled_time = torch::sqrt(1.0f + torch::pow(scaled_space, 2).sum(1)).unsqueeze(1);
-        return torch::cat({ scaled_time, scaled_space }, 1);
+        if (utils::requires_grad({ u })) {
+            auto space_comp = u.narrow(1, 1, u.size(1) - 1);
+            torch::Tensor scale, scaled_time;
+            lorentz_scalar_coeffs(u.narrow(1, 0, 1), torch::sum(space_comp * space_comp, 1, true), r, scale, scaled_time);
+            return torch::cat({ scaled_time, space_comp * scale }, 1);
+        }
+        return lorentz_scalar_out_cpu(u, c, r, torch::empty(u.sizes(), u.options()));
+    }
+
+    torch::Tensor poincare_to_lorentz_out_cpu(
+        torch::Tensor x,
+        float c,
+        torch::Tensor out
+    ) {
+        if (utils::requires_grad({ x })) {
+            return out.copy_(poincare_to_lorentz_cpu(x, c));
+        }
+        int64_t D = x.size(1);
+        TORCH_CHECK(out.dim() == 2 && out.size(0) == x.size(0) && out.size(1) == D + 1,
+            "poincare_to_lorentz_out_cpu: out 의 모양이 [B, D+1] 이 아님");
+        torch::Tensor x0, space_scale;
+        poincare_to_lorentz_coeffs(utils::row_norm_sq_cpu(x), c, x0, space_scale);
+        out.narrow(1, 0, 1).copy_(x0);
+        auto out_space = out.narrow(1, 1, D);
+        at::mul_out(out_space, x, space_scale.to(out.scalar_type()));
+        return out;
     }
 
     torch::Tensor poincare_to_lorentz_cpu(
         torch::Tensor x,
         float c
     ) {
-        float sqrtc = std::sqrt(c);
-        auto x_norm_sq = torch::sum(x * x, /*dim=*/1, /*keepdim=*/true);
-        auto denom = (1.0f - c * x_norm_sq).clamp_min(config::Constants::EPS);
-        auto x0 = (1.0f + c * x_norm_sq) / denom;
-        auto xi = (2.0f * x) / denom;
-        return torch::cat({ x0, xi }, /*dim=*/1) / sqrtc;
+        if (utils::requires_grad({ x })) {
+            torch::Tensor x0, space_scale;
+            poincare_to_lorentz_coeffs(torch::sum(x * x, /*dim=*/1, /*keepdim=*/true), c, x0, space_scale);
+            return torch::cat({ x0, space_scale * x }, /*dim=*/1);
+        }
+        auto out = torch::empty({ x.size(0), x.size(1) + 1 }, x.options());
+        return poincare_to_lorentz_out_cpu(x, c, out);
+    }
+
+    torch::Tensor lorentz_to_poincare_out_cpu(
+        torch::Tensor x,
+        float c,
+        torch::Tensor out
+    ) {
+        if (utils::requires_grad({ x })) {
+            return out.copy_(lorentz_to_poincare_cpu(x, c));
+        }
+        auto xi = x.narrow(1, 1, x.size(1) - 1);
+        TORCH_CHECK(out.sizes() == xi.sizes(), "lorentz_to_poincare_out_cpu: out 의 모양이 [B, D-1] 이 아님");
+        // √c·xi / (√c·x0 + 1)
+        return at::mul_out(out, xi, lorentz_to_poincare_coeff(x.narrow(1, 0, 1), c));
     }
 
     torch::Tensor lorentz_to_poincare_cpu(
         torch::Tensor x,
         float c
     ) {
-
-        float sqrtc = std::sqrt(c);
-        auto x_scaled = x * sqrtc;
-        auto x0 = x_scaled.select(1, 0);
-        auto xi = x_scaled.narrow(1, 1, x_scaled.size(1) - 1);
-        auto denom = (x0 + 1.0f).unsqueeze(1).clamp_min(config::Constants::EPS);
-        return xi / denom;
+        if (utils::requires_grad({ x })) {
+            return lorentz_to_poincare_coeff(x.narrow(1, 0, 1), c) * x.narrow(1, 1, x.size(1) - 1);
+        }
+        auto out = torch::empty({ x.size(0), x.size(1) - 1 }, x.options());
+        return lorentz_to_poincare_out_cpu(x, c, out);
     }
-}
\ No newline at end of file
+}
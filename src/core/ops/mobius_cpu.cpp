@@ -1,24 +1,76 @@
 #include <torch/extension.h>
 #include <cmath>
 #include <ops/mobius.h>
+#include <ops/mobius_coeffs.h>
 #include <config/constant.h>
+#include <utils/cpu_kernels.h>
 
 namespace config = reality_stone::config;
+namespace utils = reality_stone::utils;
 
 namespace reality_stone::ops {
+    namespace {
+        // 행별 곡률 (행마다 하나) 또는 원소 1개 -> 결과 모양 sizes 에 브로드캐스트되는 [..., 1]
+        torch::Tensor curvature_column(const torch::Tensor& c, std::vector<int64_t> sizes, at::ScalarType dtype) {
+            // 역전파 재계산은 torch.compile 의 심볼릭 모양으로도 불리므로 sym_numel 을 쓴다
+            int64_t rows = utils::row_count(sizes);
+            const c10::SymInt numel = c.sym_numel();
+            TORCH_CHECK(numel == rows || numel == 1,
+                "곡률 텐서의 원소 수는 배치 크기 ", rows, " 또는 1 이어야 함 (현재 ", numel, ")");
+            sizes.back() = 1;
+            return (numel == 1 ? c.reshape({ 1 }) : c.reshape(sizes)).to(dtype);
+        }
+
+        // 행 커널과 autograd 경로가 함께 쓰는 계수 함수 (C 는 float 또는 곡률 열 텐서)
+        template <typename C>
+        auto mobius_add_fn(C c) {
+            return [c](auto u2, auto v2, auto uv, auto& coef_u, auto& coef_v) {
+                mobius_add_coeffs(u2, v2, uv, c, coef_u, coef_v);
+            };
+        }
+
+        template <typename S>
+        auto mobius_scalar_fn(S sqrtc, float r) {
+            return [sqrtc, r](auto norm_sq) { return mobius_scalar_coeff(norm_sq, sqrtc, r); };
+        }
+    }
+
+    torch::Tensor mobius_add_out_cpu(
+        torch::Tensor u,
+        torch::Tensor v,
+        float c,
+        torch::Tensor out
+    ) {
+        if (utils::requires_grad({ u, v })) {
+            return out.copy_(mobius_add_cpu(u, v, c));
+        }
+        // ((1 + 2c<u,v> + c|v|²)·u + (1 - c|u|²)·v) / (1 + 2c<u,v> + c²|u|²|v|²)
+        return utils::pair_combine_out_cpu(u, v, /*minkowski=*/false, mobius_add_fn(c), out);
+    }
+
     torch::Tensor mobius_add_cpu(
         torch::Tensor u,
         torch::Tensor v,
         float c
     ) {
-        auto u2 = torch::sum(u * u, /*dim=*/1, /*keepdim=*/true);
-        auto v2 = torch::sum(v * v, /*dim=*/1, /*keepdim=*/true);
-        auto uv = torch::sum(u * v, /*dim=*/1, /*keepdim=*/true);
-        float c2 = c * c;
-        auto num_u = (1 + 2 * c * uv + c * v2) * u;
-        auto num_v = (1 - c * u2) * v;
-        auto denom = (1 + 2 * c * uv + c2 * u2 * v2).clamp_min(config::Constants::MIN_DENOMINATOR);
-        return (num_u + num_v) / denom;
+        if (utils::requires_grad({ u, v })) {
+            return utils::pair_combine_autograd(u, v, /*minkowski=*/false, mobius_add_fn(c));
+        }
+        auto out = torch::empty(utils::pair_shape(u, v), u.options().dtype(at::result_type(u, v)));
+        return mobius_add_out_cpu(u, v, c, out);
+    }
+
+    torch::Tensor mobius_scalar_out_cpu(
+        torch::Tensor u,
+        float c,
+        float r,
+        torch::Tensor out
+    ) {
+        if (utils::requires_grad({ u })) {
+            return out.copy_(mobius_scalar_cpu(u, c, r));
+        }
+        // tanh(r·atanh(√c|u|)) / (√c|u|) · u
+        return utils::row_scale_out_cpu(u, mobius_scalar_fn(std::sqrt(c), r), out);
     }
 
     torch::Tensor mobius_scalar_cpu(
@@ -26,14 +78,69 @@ namespace reality_stone::ops {
         float c,
         float r
     ) {
-        // norms: (B,1)
-        auto norm = torch::norm(u, 2, /*dim=*/1, /*keepdim=*/true).clamp_min(config::Constants::EPS);
-        float sqrtc = std::sqrt(c);
-        auto scn = (sqrtc * norm).clamp_min(config::Constants::EPS)
-            .clamp_max(1.0f - config::Constants::BOUNDARY_EPS);
-        auto alpha = torch::atanh(scn);
-        auto beta = torch::tanh(r * alpha);
-        return (beta / (sqrtc * norm)) * u;
+        if (utils::requires_grad({ u })) {
+            return utils::row_scale_autograd(u, mobius_scalar_fn(std::sqrt(c), r));
+        }
+        return mobius_scalar_out_cpu(u, c, r, torch::empty(u.sizes(), u.options()));
+    }
+
+    torch::Tensor mobius_add_out_cpu(
+        torch::Tensor u,
+        torch::Tensor v,
+        torch::Tensor c,
+        torch::Tensor out
+    ) {
+        if (utils::requires_grad({ u, v, c })) {
+            return out.copy_(mobius_add_cpu(u, v, c));
+        }
+        // 행 b 는 곡률 c[b] 로 계산, 행별 .item() 없이 한 번의 배치 커널
+        auto curv = utils::batch_scalar(c, utils::row_count(utils::pair_shape(u, v)), "mobius_add_out_cpu");
+        const float* cp = curv.data_ptr<float>();
+        return utils::pair_combine_out_cpu(u, v, /*minkowski=*/false,
+            [cp](int64_t b, auto u2, auto v2, auto uv, auto& coef_u, auto& coef_v) {
+                mobius_add_coeffs(u2, v2, uv, cp[b], coef_u, coef_v);
+            }, out);
+    }
+
+    torch::Tensor mobius_add_cpu(
+        torch::Tensor u,
+        torch::Tensor v,
+        torch::Tensor c
+    ) {
+        if (utils::requires_grad({ u, v, c })) {
+            auto curv = curvature_column(c, utils::pair_shape(u, v), u.scalar_type());
+            return utils::pair_combine_autograd(u, v, /*minkowski=*/false, mobius_add_fn(curv));
+        }
+        auto out = torch::empty(utils::pair_shape(u, v), u.options().dtype(at::result_type(u, v)));
+        return mobius_add_out_cpu(u, v, c, out);
+    }
+
+    torch::Tensor mobius_scalar_out_cpu(
+        torch::Tensor u,
+        torch::Tensor c,
+        float r,
+        torch::Tensor out
+    ) {
+        if (utils::requires_grad({ u, c })) {
+            return out.copy_(mobius_scalar_cpu(u, c, r));
+        }
+        auto sqrtc = utils::batch_scalar(c, u.size(0), "mobius_scalar_out_cpu").sqrt();
+        const float* sp = sqrtc.data_ptr<float>();
+        return utils::row_scale_out_cpu(u, [sp, r](int64_t b, auto norm_sq) {
+            return mobius_scalar_coeff(norm_sq, sp[b], r);
+        }, out);
+    }
+
+    torch::Tensor mobius_scalar_cpu(
+        torch::Tensor u,
+        torch::Tensor c,
+        float r
+    ) {
+        if (utils::requires_grad({ u, c })) {
+            auto sqrtc = curvature_column(c, u.sizes().vec(), u.scalar_type()).sqrt();
+            return utils::row_scale_autograd(u, mobius_scalar_fn(sqrtc, r));
+        }
+        return mobius_scalar_out_cpu(u, c, r, torch::empty(u.sizes(), u.options()));
     }
 
-}
\ No newline at end of file
+}
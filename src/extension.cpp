@@ -4,6 +4,7 @@
 #include <ops/mobius.h>
 #include <ops/lorentz.h>
 #include <ops/klein.h>
+#include <ops/cdist.h>
 #include <layers/poincare_ball.h>
 #include <layers/lorentz.h>
 #include <layers/klein.h>
@@ -18,6 +19,10 @@
 #include <advanced/chebyshev/chebyshev.h>
 #include <advanced/laplace_beltrami/laplace_beltrami.h>
 #include <advanced/hyperbolic_fft/hyperbolic_fft.h>
+#include <advanced/index/vp_tree.h>
+#include <advanced/index/hnsw.h>
+#include <advanced/index/pq.h>
+#include <advanced/optim/riemannian_optim.h>
 
 namespace utils = reality_stone::utils;
 namespace ops = reality_stone::ops;
@@ -26,8 +31,13 @@ namespace advanced = reality_stone::advanced;
 
 PYBIND11_MODULE(TORCH_EXTENSION_NAME, m) {
     // ===== CPU 기본 연산 =====
-    m.def("mobius_add_cpu", &ops::mobius_add_cpu, "Möbius add CPU");
-    m.def("mobius_scalar_cpu", &ops::mobius_scalar_cpu, "Möbius scalar CPU");
+    m.def("mobius_add_cpu", py::overload_cast<torch::Tensor, torch::Tensor, float>(&ops::mobius_add_cpu), "Möbius add CPU");
+    m.def("mobius_scalar_cpu", py::overload_cast<torch::Tensor, float, float>(&ops::mobius_scalar_cpu), "Möbius scalar CPU");
+    // 배치별 곡률 텐서 c: [B] / [B,1]
+    m.def("mobius_add_cpu", py::overload_cast<torch::Tensor, torch::Tensor, torch::Tensor>(&ops::mobius_add_cpu), "Möbius add CPU (per-sample curvature)");
+    m.def("mobius_scalar_cpu", py::overload_cast<torch::Tensor, torch::Tensor, float>(&ops::mobius_scalar_cpu), "Möbius scalar CPU (per-sample curvature)");
+    m.def("dynamic_mobius_add_cpu", &advanced::dynamic_mobius_add_cpu, "Dynamic Möbius add CPU");
+    m.def("dynamic_poincare_layer_cpu", &advanced::dynamic_poincare_layer_cpu, "Dynamic Poincare layer CPU");
     
     // ===== CPU 레이어 =====
     m.def("poincare_ball_forward_cpu", &layers::poincare_ball_forward_cpu, "Poincare forward CPU");
@@ -52,11 +62,35 @@ PYBIND11_MODULE(TORCH_EXTENSION_NAME, m) {
     m.def("lorentz_to_klein_cpu", &ops::lorentz_to_klein_cpu, "L2K CPU");
     m.def("klein_to_lorentz_cpu", &ops::klein_to_lorentz_cpu, "K2L CPU");
 
+    // ===== CPU out= 변형 (호출자 버퍼에 기록) =====
+    m.def("mobius_add_out_cpu", py::overload_cast<torch::Tensor, torch::Tensor, float, torch::Tensor>(&ops::mobius_add_out_cpu), "Möbius add CPU (out)");
+    m.def("mobius_scalar_out_cpu", py::overload_cast<torch::Tensor, float, float, torch::Tensor>(&ops::mobius_scalar_out_cpu), "Möbius scalar CPU (out)");
+    m.def("mobius_add_out_cpu", py::overload_cast<torch::Tensor, torch::Tensor, torch::Tensor, torch::Tensor>(&ops::mobius_add_out_cpu), "Möbius add CPU (out, per-sample curvature)");
+    m.def("mobius_scalar_out_cpu", py::overload_cast<torch::Tensor, torch::Tensor, float, torch::Tensor>(&ops::mobius_scalar_out_cpu), "Möbius scalar CPU (out, per-sample curvature)");
+    m.def("lorentz_add_out_cpu", &ops::lorentz_add_out_cpu, "Lorentz add CPU (out)");
+    m.def("lorentz_scalar_out_cpu", &ops::lorentz_scalar_out_cpu, "Lorentz scalar CPU (out)");
+    m.def("lorentz_inner_out_cpu", &ops::lorentz_inner_out_cpu, "Lorentz inner CPU (out)");
+    m.def("lorentz_distance_out_cpu", &ops::lorentz_distance_out_cpu, "Lorentz distance CPU (out)");
+    m.def("poincare_to_lorentz_out_cpu", &ops::poincare_to_lorentz_out_cpu, "P2L CPU (out)");
+    m.def("lorentz_to_poincare_out_cpu", &ops::lorentz_to_poincare_out_cpu, "L2P CPU (out)");
+    m.def("klein_add_out_cpu", &ops::klein_add_out_cpu, "Klein add CPU (out)");
+    m.def("klein_scalar_out_cpu", &ops::klein_scalar_out_cpu, "Klein scalar CPU (out)");
+    m.def("klein_distance_out_cpu", &ops::klein_distance_out_cpu, "Klein distance CPU (out)");
+    m.def("poincare_to_klein_out_cpu", &ops::poincare_to_klein_out_cpu, "P2K CPU (out)");
+    m.def("klein_to_poincare_out_cpu", &ops::klein_to_poincare_out_cpu, "K2P CPU (out)");
+    m.def("lorentz_to_klein_out_cpu", &ops::lorentz_to_klein_out_cpu, "L2K CPU (out)");
+    m.def("klein_to_lorentz_out_cpu", &ops::klein_to_lorentz_out_cpu, "K2L CPU (out)");
+
     // ===== 고급 기능 - Fused Operations (CPU/CUDA 공용) =====
     m.def("fused_linear", &advanced::hyperbolic_linear_fused, "Fused hyperbolic linear");
+    m.def("hyperbolic_linear_fused_cpu", &advanced::hyperbolic_linear_fused_cpu, "Fused hyperbolic linear CPU (tensor curvature)");
     m.def("fused_mobius_chain", &advanced::mobius_chain_fused, "Fused Möbius chain");
     m.def("fused_transform_reg", &advanced::transform_regularize_fused, "Fused transform+reg");
 
+    // ===== 고급 기능 - Geodesic Activation (CPU) =====
+    m.def("einstein_midpoint_cpu", &advanced::einstein_midpoint_cpu, "Batched Einstein midpoint CPU");
+    m.def("multi_geodesic_mixing_cpu", &advanced::multi_geodesic_mixing_cpu, "Multi geodesic mixing CPU");
+
     // ===== 정규화 함수들 (CPU 버전만) =====
     m.def("boundary_penalty", &advanced::boundary_penalty_cpu, "Boundary penalty CPU");
     m.def("curvature_penalty", &advanced::curvature_adaptive_penalty_cpu, "Curvature penalty CPU");
@@ -74,15 +108,45 @@ PYBIND11_MODULE(TORCH_EXTENSION_NAME, m) {
 
     // ===== 새로 추가된 라플라스-벨트라미 기능들 =====
     m.def("hyperbolic_laplacian_cpu", &advanced::hyperbolic_laplacian_cpu, "Hyperbolic Laplacian CPU");
-    m.def("heat_kernel_cpu", &advanced::heat_kernel_cpu, "Heat kernel CPU");
-    m.def("laplace_beltrami_eigen_cpu", &advanced::laplace_beltrami_eigen_cpu, "Laplace-Beltrami eigendecomposition CPU");
+    m.def("heat_kernel_cpu", py::overload_cast<const torch::Tensor&, float, float>(&advanced::heat_kernel_cpu),
+        "Heat kernel CPU");
+    m.def("heat_kernel_cpu", py::overload_cast<const torch::Tensor&, const torch::Tensor&, float>(&advanced::heat_kernel_cpu),
+        "Heat kernel CPU (times [T])");
+    m.def("laplace_beltrami_eigen_cpu", &advanced::laplace_beltrami_eigen_cpu, "Laplace-Beltrami eigendecomposition CPU (kNN graph, top-k)",
+        py::arg("manifold_points"), py::arg("curvature") = 1.0f, py::arg("num_eigenvalues") = 100,
+        py::arg("num_neighbors") = advanced::kGraphNeighbors);
+    m.def("knn_graph_cpu", &advanced::knn_graph_cpu, "Sparse geodesic kNN Gaussian graph CPU",
+        py::arg("points"), py::arg("curvature") = 1.0f, py::arg("num_neighbors") = advanced::kGraphNeighbors,
+        py::arg("sigma") = 1.0f);
+    m.def("graph_laplacian_eigen_cpu", &advanced::graph_laplacian_eigen_cpu, "Smallest graph Laplacian eigenpairs CPU (Lanczos)",
+        py::arg("weights"), py::arg("k"), py::arg("tol") = 1e-6, py::arg("max_restarts") = 1000);
+    m.def("kmeans_cpu", &advanced::kmeans_cpu, "k-means++ with batched assignment CPU",
+        py::arg("points"), py::arg("num_clusters"), py::arg("max_iter") = 100, py::arg("tol") = 1e-4,
+        py::arg("batch_size") = 0, py::arg("seed") = 0);
+    m.def("spectral_clustering_cpu", &advanced::spectral_clustering_cpu, "Spectral clustering CPU",
+        py::arg("points"), py::arg("num_clusters"), py::arg("curvature") = 1.0f,
+        py::arg("num_neighbors") = advanced::kGraphNeighbors, py::arg("max_iter") = 100, py::arg("tol") = 1e-4,
+        py::arg("batch_size") = 0, py::arg("seed") = 0);
     m.def("spectral_graph_conv_cpu", &advanced::spectral_graph_conv_cpu, "Spectral graph convolution CPU");
-    m.def("solve_diffusion_equation_cpu", &advanced::solve_diffusion_equation_cpu, "Solve diffusion equation CPU");
+    m.def("solve_diffusion_equation_cpu",
+        py::overload_cast<const torch::Tensor&, float, int, float>(&advanced::solve_diffusion_equation_cpu),
+        "Solve diffusion equation CPU");
+    m.def("solve_diffusion_equation_cpu",
+        py::overload_cast<const torch::Tensor&, const torch::Tensor&, float>(&advanced::solve_diffusion_equation_cpu),
+        "Solve diffusion equation CPU (times [T])");
+    m.def("graph_diffusion_cpu", &advanced::graph_diffusion_cpu, "Graph heat diffusion via Chebyshev expansion CPU",
+        py::arg("weights"), py::arg("initial_condition"), py::arg("times"), py::arg("order") = 0);
+    m.def("spectral_diffusion_cpu", &advanced::spectral_diffusion_cpu, "Graph heat diffusion in an eigenbasis CPU");
     m.def("geodesic_distance_matrix_cpu", &advanced::geodesic_distance_matrix_cpu, "Geodesic distance matrix CPU");
+    m.def("geodesic_distance_matrix_out_cpu", &advanced::geodesic_distance_matrix_out_cpu, "Geodesic distance matrix CPU (out, tiled)",
+        py::arg("points"), py::arg("curvature"), py::arg("out"), py::arg("tile_size") = advanced::kDistanceTileSize);
+    m.def("geodesic_distance_block_cpu", &advanced::geodesic_distance_block_cpu, "Geodesic distance block CPU",
+        py::arg("rows"), py::arg("cols"), py::arg("curvature") = 1.0f, py::arg("diagonal_offset") = -1);
     m.def("spectral_normalize_cpu", &advanced::spectral_normalize_cpu, "Spectral normalization CPU");
 
     // ===== 새로 추가된 FFT 및 리만 기하학 기능들 =====
-    m.def("hyperbolic_fft_cpu", &advanced::hyperbolic_fft_cpu, "Hyperbolic FFT CPU");
+    m.def("hyperbolic_fft_cpu", &advanced::hyperbolic_fft_cpu, "Hyperbolic FFT CPU",
+        py::arg("x"), py::arg("curvature") = 1.0f, py::arg("max_l") = 20);
     m.def("inverse_hyperbolic_fft_cpu", &advanced::inverse_hyperbolic_fft_cpu, "Inverse hyperbolic FFT CPU");
     m.def("spherical_harmonics_cpu", &advanced::spherical_harmonics_cpu, "Spherical harmonics CPU");
     m.def("fast_spherical_conv_cpu", &advanced::fast_spherical_conv_cpu, "Fast spherical convolution CPU");
@@ -94,6 +158,58 @@ PYBIND11_MODULE(TORCH_EXTENSION_NAME, m) {
     m.def("hyperbolic_wavelet_decomposition_cpu", &advanced::hyperbolic_wavelet_decomposition_cpu, "Hyperbolic wavelet decomposition CPU");
     m.def("frequency_domain_filter_cpu", &advanced::frequency_domain_filter_cpu, "Frequency domain filter CPU");
 
+    // ===== 쌍별 거리 =====
+    m.def("cdist_cpu", &ops::cdist_cpu, "Chunked pairwise geodesic distances CPU",
+        py::arg("x"), py::arg("y"), py::arg("model") = "poincare", py::arg("curvature") = 1.0f,
+        py::arg("chunk_size") = 0);
+    m.def("cdist_topk_cpu", &ops::cdist_topk_cpu, "Chunked pairwise distances with fused top-k CPU",
+        py::arg("x"), py::arg("y"), py::arg("k"), py::arg("model") = "poincare", py::arg("curvature") = 1.0f,
+        py::arg("chunk_size") = 0);
+
+    // ===== 최근접 이웃 인덱스 =====
+    m.def("vp_tree_build_cpu", &advanced::vp_tree_build_cpu, "Build a VP-tree over Poincare/Lorentz points CPU",
+        py::arg("points"), py::arg("model") = "poincare", py::arg("curvature") = 1.0f,
+        py::arg("leaf_size") = advanced::kVPTreeLeafSize, py::arg("seed") = 0);
+    m.def("vp_tree_knn_cpu", &advanced::vp_tree_knn_cpu, "Exact k-nearest neighbours in a VP-tree CPU",
+        py::arg("sorted_points"), py::arg("order"), py::arg("bounds"), py::arg("queries"), py::arg("k"),
+        py::arg("model") = "poincare", py::arg("curvature") = 1.0f, py::arg("leaf_size") = advanced::kVPTreeLeafSize);
+    m.def("vp_tree_radius_cpu", &advanced::vp_tree_radius_cpu, "Radius search in a VP-tree CPU",
+        py::arg("sorted_points"), py::arg("order"), py::arg("bounds"), py::arg("queries"), py::arg("radius"),
+        py::arg("model") = "poincare", py::arg("curvature") = 1.0f, py::arg("leaf_size") = advanced::kVPTreeLeafSize);
+    m.def("hnsw_insert_cpu", &advanced::hnsw_insert_cpu, "Insert nodes into an HNSW graph CPU",
+        py::arg("points"), py::arg("levels"), py::arg("upper_start"), py::arg("graph0"), py::arg("upper"),
+        py::arg("begin"), py::arg("end"), py::arg("entry_point"), py::arg("ef_construction") = 200,
+        py::arg("model") = "poincare", py::arg("curvature") = 1.0f);
+    m.def("hnsw_search_cpu", &advanced::hnsw_search_cpu, "Approximate k-nearest neighbours in an HNSW graph CPU",
+        py::arg("points"), py::arg("levels"), py::arg("upper_start"), py::arg("graph0"), py::arg("upper"),
+        py::arg("entry_point"), py::arg("queries"), py::arg("k"), py::arg("ef") = 64,
+        py::arg("model") = "poincare", py::arg("curvature") = 1.0f);
+    m.def("pq_search_cpu", &advanced::pq_search_cpu, "Approximate k-NN scan over quantised Poincare codes CPU",
+        py::arg("codes"), py::arg("radius_codes"), py::arg("codebooks"), py::arg("radius_levels"),
+        py::arg("queries"), py::arg("k"), py::arg("curvature") = 1.0f);
+    m.def("pq_encode_cpu", &advanced::pq_encode_cpu, "Product-quantisation encoding CPU",
+        py::arg("vectors"), py::arg("codebooks"));
+
+    // ===== 리만 최적화 =====
+    m.def("riemannian_adam_step_cpu", &advanced::riemannian_adam_step_cpu, "Fused multi-tensor Riemannian Adam step CPU",
+        py::arg("params"), py::arg("grads"), py::arg("exp_avgs"), py::arg("exp_avg_sqs"), py::arg("steps"),
+        py::arg("lr"), py::arg("beta1"), py::arg("beta2"), py::arg("eps"), py::arg("weight_decay"),
+        py::arg("manifold") = "poincare", py::arg("curvature") = 1.0f);
+    m.def("riemannian_sgd_step_cpu", &advanced::riemannian_sgd_step_cpu, "Fused multi-tensor Riemannian SGD step CPU",
+        py::arg("params"), py::arg("grads"), py::arg("momentum_buffers"), py::arg("lr"), py::arg("momentum"),
+        py::arg("weight_decay"), py::arg("manifold") = "poincare", py::arg("curvature") = 1.0f);
+    m.def("riemannian_adagrad_step_cpu", &advanced::riemannian_adagrad_step_cpu, "Fused multi-tensor Riemannian Adagrad step CPU",
+        py::arg("params"), py::arg("grads"), py::arg("sums"), py::arg("lr"), py::arg("eps"), py::arg("weight_decay"),
+        py::arg("manifold") = "poincare", py::arg("curvature") = 1.0f);
+    m.def("sparse_riemannian_sgd_step_cpu", &advanced::sparse_riemannian_sgd_step_cpu,
+        "Riemannian SGD step on the rows touched by a sparse gradient CPU",
+        py::arg("param"), py::arg("indices"), py::arg("values"), py::arg("lr"), py::arg("weight_decay"),
+        py::arg("manifold") = "poincare", py::arg("curvature") = 1.0f);
+    m.def("sparse_riemannian_adagrad_step_cpu", &advanced::sparse_riemannian_adagrad_step_cpu,
+        "Riemannian Adagrad step on the rows touched by a sparse gradient CPU",
+        py::arg("param"), py::arg("sum"), py::arg("indices"), py::arg("values"), py::arg("lr"), py::arg("eps"),
+        py::arg("weight_decay"), py::arg("manifold") = "poincare", py::arg("curvature") = 1.0f);
+
 #ifdef WITH_CUDA
     // ===== CUDA 기본 연산 =====
     m.def("mobius_add_cuda", &ops::mobius_add_cuda, "Möbius add CUDA");
@@ -60,7 +60,7 @@ private:
     int order;
     float base_curvature;
     torch::Tensor cheb_nodes;  // 체비셰프 점들
-    torch::Tensor coeffs_cache; // 캐시된 계수들
+    torch::Tensor coeffs_cache; // base_curvature 의 tanh 계수표 (전역 캐시와 공유)
     
     // 내부 도구 함수들
     torch::Tensor generate_nodes(int n, torch::Device device);
@@ -74,7 +74,7 @@ private:
  * 편의 함수들 (절차적 인터페이스)
  */
 
-// 체비셰프 근사 (메인 함수)
+// 체비셰프 근사 (메인 함수): tanh(√c·x) 를 (차수, 곡률) 별로 캐시된 계수표와 Clenshaw 점화로 평가
 torch::Tensor chebyshev_approximation_cpu(
     const torch::Tensor& x,
     int order = 10,
@@ -16,6 +16,18 @@ namespace reality_stone::advanced {
         float curvature
     );
     
+    /**
+     * 텐서 곡률 하이퍼볼릭 선형 레이어 (CPU)
+     * curvature 는 스칼라 텐서 또는 배치별 [B] / [B,1] 이며 .item() 으로 꺼내지 않는다.
+     * 그래디언트가 필요하면 곡률까지 미분 가능한 텐서 연산 경로를 쓴다.
+     */
+    torch::Tensor hyperbolic_linear_fused_cpu(
+        const torch::Tensor& input,
+        const torch::Tensor& weight,
+        const torch::Tensor& bias,
+        const torch::Tensor& curvature
+    );
+    
     /**
      * 융합 Möbius 덧셈 체인
      */
@@ -31,8 +31,8 @@ namespace reality_stone::advanced {
          * M_E(x₁, ..., xₙ; w₁, ..., wₙ) = exp_0(∑ᵢ wᵢ·log_0(xᵢ))
          */
         torch::Tensor einstein_midpoint(
-            const torch::Tensor& points,   // [K, D]
-            const torch::Tensor& weights,  // [K]
+            const torch::Tensor& points,   // [B, K, D]
+            const torch::Tensor& weights,  // [K] 또는 [B, K]
             float curvature
         );
         
@@ -50,6 +50,29 @@ namespace reality_stone::advanced {
         torch::Tensor& get_weights() { return weights; }
     };
     
+    /**
+     * 배치 Einstein 중점 (CPU)
+     * points [B, K, D], weights [K] (공유) 또는 [B, K] (배치별) -> [B, D]
+     */
+    torch::Tensor einstein_midpoint_cpu(
+        const torch::Tensor& points,
+        const torch::Tensor& weights,
+        float curvature
+    );
+    
+    /**
+     * 다중 측지선 혼합 (CPU)
+     * softmax / sigmoid 는 한 번만 계산하고 [B, K] 전체를 배치 텐서 연산으로 평가
+     * input [B, D], anchors [K, D], t_values [K], weights [K] -> [B, D]
+     */
+    torch::Tensor multi_geodesic_mixing_cpu(
+        const torch::Tensor& input,
+        const torch::Tensor& anchors,
+        const torch::Tensor& t_values,
+        const torch::Tensor& weights,
+        float curvature
+    );
+    
     // CUDA 함수 선언
     torch::Tensor geodesic_activation_cuda(
         const torch::Tensor& input,
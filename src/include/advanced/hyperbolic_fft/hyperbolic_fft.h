@@ -155,12 +155,18 @@ private:
     );
 };
 
+// 구면 조화 계수 [B, (max_l+1)²]
 torch::Tensor hyperbolic_fft_cpu(
     const torch::Tensor& x,
-    float curvature = 1.0f
+    float curvature = 1.0f,
+    int max_l = 20
 );
 torch::Tensor inverse_hyperbolic_fft_cpu(const torch::Tensor& coeffs, float curvature);
 
+/**
+ * 정규직교 실수 구면 조화 함수 전체 [B, (l_max+1)²], 열 번호 l² + l + m
+ * 세 항 점화로 모든 P̄_l^m 을 한 번에 (O(B·l_max²)), 점화 계수는 l_max 마다 캐시
+ */
 torch::Tensor spherical_harmonics_cpu(
     const torch::Tensor& theta_phi,
     int l_max
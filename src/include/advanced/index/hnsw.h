@@ -0,0 +1,59 @@
+#pragma once
+
+#include <torch/extension.h>
+#include <string>
+#include <tuple>
+
+namespace reality_stone::advanced {
+
+/**
+ * 포인카레 / 로렌츠 측지 거리 위의 HNSW 근사 최근접 이웃 그래프
+ *   poincare: d = acosh(1 + 2c|x-y|² / ((1-c|x|²)(1-c|y|²))) / √c
+ *   lorentz : d = acosh(c·<x,y>_L) / √c,  <x,y>_L = x0·y0 - Σ xi·yi,  <x,x>_L = 1/c
+ *
+ * 그래프는 텐서로 표현되고 호출자가 용량을 관리한다 (저장 / 불러오기가 그대로 가능):
+ *   points [cap, D]       : 노드 좌표 (노드 번호 = 삽입 순서)
+ *   levels [cap] int64    : 노드의 최상위 층
+ *   upper_start [cap] i64 : 층 l ≥ 1 의 이웃 목록은 upper 의 행 upper_start[n] + l - 1
+ *   graph0 [cap, M0] i32  : 층 0 이웃 목록, upper [R, M] i32 : 위층 이웃 목록 (빈 칸은 -1)
+ * 층 0 은 최대 M0 (보통 2M), 위층은 최대 M 개의 이웃을 갖는다.
+ */
+
+/**
+ * 노드 [begin, end) 를 그래프에 삽입 (노드 병렬, 이웃 목록은 노드별 잠금)
+ * 새 노드의 points / levels / upper_start 는 미리 채우고 이웃 목록은 -1 로 비워 둬야 한다.
+ * entry_point 가 -1 이면 빈 그래프. 반환: 새 진입점 (가장 높은 층의 노드)
+ */
+int64_t hnsw_insert_cpu(
+    const torch::Tensor& points,
+    const torch::Tensor& levels,
+    const torch::Tensor& upper_start,
+    torch::Tensor graph0,
+    torch::Tensor upper,
+    int64_t begin,
+    int64_t end,
+    int64_t entry_point,
+    int64_t ef_construction = 200,
+    const std::string& model = "poincare",
+    float curvature = 1.0f
+);
+
+/**
+ * 배치 근사 k-최근접 이웃 (쿼리 병렬). 층 0 의 탐색 폭은 max(ef, k)
+ * 반환: (거리 [Q, k] f64 오름차순, 노드 번호 [Q, k] int64). 찾은 노드가 k 개보다 적으면 inf / -1 로 채운다.
+ */
+std::tuple<torch::Tensor, torch::Tensor> hnsw_search_cpu(
+    const torch::Tensor& points,
+    const torch::Tensor& levels,
+    const torch::Tensor& upper_start,
+    const torch::Tensor& graph0,
+    const torch::Tensor& upper,
+    int64_t entry_point,
+    const torch::Tensor& queries,
+    int64_t k,
+    int64_t ef = 64,
+    const std::string& model = "poincare",
+    float curvature = 1.0f
+);
+
+} // namespace reality_stone::advanced
@@ -0,0 +1,71 @@
+#pragma once
+
+#include <torch/extension.h>
+#include <algorithm>
+#include <cmath>
+#include <string>
+
+namespace reality_stone::advanced::detail {
+
+enum class Model { Poincare, Lorentz };
+
+inline Model parse_model(const std::string& model) {
+    if (model == "poincare") return Model::Poincare;
+    TORCH_CHECK(model == "lorentz", "model must be 'poincare' or 'lorentz', got '", model, "'");
+    return Model::Lorentz;
+}
+
+/**
+ * 인덱스들이 공유하는 측지 거리 (double 누산)
+ * 쿼리 q 는 double 로 변환된 좌표이고, 포인카레는 쿼리 쪽 상수 1 - c|q|² 를 prepare 로 한 번만 계산한다.
+ * key 는 cosh(√c·d) 로 거리에 대해 단조 증가하므로 순서 비교에는 acosh 없이 key 를 쓴다.
+ *   poincare: key = 1 + 2c|q-p|² / ((1-c|q|²)(1-c|p|²))
+ *   lorentz : key = c·<q,p>_L
+ */
+struct Metric {
+    Model model;
+    double c;
+    double sqrt_c;
+    int64_t D;
+
+    Metric(const std::string& name, float curvature, int64_t dim)
+        : model(parse_model(name)), c(curvature), sqrt_c(std::sqrt(static_cast<double>(curvature))), D(dim) {
+        TORCH_CHECK(curvature > 0.0f, "curvature must be positive");
+    }
+
+    double prepare(const double* q) const {
+        if (model == Model::Lorentz) return 0.0;
+        double norm = 0.0;
+        for (int64_t d = 0; d < D; ++d) norm += q[d] * q[d];
+        return 1.0 - c * norm;
+    }
+
+    template <typename scalar_t>
+    double key(const double* q, double q_factor, const scalar_t* p) const {
+        if (model == Model::Poincare) {
+            double diff = 0.0, norm = 0.0;
+            for (int64_t d = 0; d < D; ++d) {
+                const double v = static_cast<double>(p[d]);
+                const double e = q[d] - v;
+                diff += e * e;
+                norm += v * v;
+            }
+            const double denom = std::max(q_factor * (1.0 - c * norm), 1e-15);
+            return 1.0 + 2.0 * c * diff / denom;
+        }
+        double inner = q[0] * static_cast<double>(p[0]);
+        for (int64_t d = 1; d < D; ++d) inner -= q[d] * static_cast<double>(p[d]);
+        return std::max(c * inner, 1.0);
+    }
+
+    double distance(double key_value) const {
+        return std::acosh(std::max(key_value, 1.0)) / sqrt_c;
+    }
+
+    template <typename scalar_t>
+    double operator()(const double* q, double q_factor, const scalar_t* p) const {
+        return distance(key(q, q_factor, p));
+    }
+};
+
+} // namespace reality_stone::advanced::detail
@@ -0,0 +1,35 @@
+#pragma once
+
+#include <torch/extension.h>
+#include <tuple>
+
+namespace reality_stone::advanced {
+
+/**
+ * 양자화된 포인카레 점 위의 근사 k-최근접 이웃 스캔 (비대칭 거리, 쿼리는 원래 좌표)
+ * 점 y = r·u 는 반지름 코드 하나와 방향 u 의 곱 양자화 (PQ) 코드 M 개로 저장된다.
+ *   codes [N, M] uint8         : 부분 공간 m 의 중심 번호 (D = M·ds)
+ *   radius_codes [N] uint8     : 반지름 단계 번호
+ *   codebooks [M, K, ds] f32   : 방향 부분 벡터의 중심
+ *   radius_levels [L] f32      : 단계별 유클리드 반지름 r
+ * |x - y|² = |x|² + r² - 2|x|·r·(x̂·u) 이고 x̂·u ≈ Σ_m LUT[m][codes[m]] / |û| 이다. LUT 는 쿼리마다 [M, K] 로 한 번,
+ * 복원한 방향 û = concat_m codebooks[m][codes[m]] 의 노름은 점 묶음마다 한 번 만든다.
+ * 반환: (근사 거리 [Q, k] f64 오름차순, 색인 [Q, k] int64). 점이 k 개보다 적으면 inf / -1 로 채운다.
+ */
+std::tuple<torch::Tensor, torch::Tensor> pq_search_cpu(
+    const torch::Tensor& codes,
+    const torch::Tensor& radius_codes,
+    const torch::Tensor& codebooks,
+    const torch::Tensor& radius_levels,
+    const torch::Tensor& queries,
+    int64_t k,
+    float curvature = 1.0f
+);
+
+/**
+ * 곱 양자화 인코딩: 부분 공간마다 가장 가까운 (유클리드) 중심 번호
+ * vectors [N, M·ds], codebooks [M, K <= 256, ds] -> codes [N, M] uint8
+ */
+torch::Tensor pq_encode_cpu(const torch::Tensor& vectors, const torch::Tensor& codebooks);
+
+} // namespace reality_stone::advanced
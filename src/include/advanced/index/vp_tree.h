@@ -0,0 +1,62 @@
+#pragma once
+
+#include <torch/extension.h>
+#include <string>
+#include <tuple>
+
+namespace reality_stone::advanced {
+
+// VP-트리 잎 구간의 기본 최대 길이
+constexpr int64_t kVPTreeLeafSize = 16;
+
+/**
+ * 포인카레 / 로렌츠 점 집합 위의 VP-트리 (정확한 측지 거리, 삼각 부등식으로 가지치기)
+ *   poincare: d = acosh(1 + 2c|x-y|² / ((1-c|x|²)(1-c|y|²))) / √c
+ *   lorentz : d = acosh(c·<x,y>_L) / √c,  <x,y>_L = x0·y0 - Σ xi·yi,  <x,x>_L = 1/c
+ *
+ * 트리는 텐서 두 개로 표현된다 (저장 / 불러오기가 그대로 가능):
+ *   order [N] int64   : 원래 색인의 순열. 노드 [lo, hi) 는 이 순열의 연속 구간
+ *   bounds [N, 4] f64 : 구간 [lo, hi) 의 vantage 점은 위치 lo 이고, 나머지는 vantage 까지의 거리로
+ *                       안쪽 [lo+1, mid) / 바깥쪽 [mid, hi) 으로 나뉜다 (mid = lo + 1 + (hi-lo-1)/2).
+ *                       bounds[lo] = (안쪽 최소, 안쪽 최대, 바깥쪽 최소, 바깥쪽 최대) 거리
+ * 구간 길이가 leaf_size 이하이면 잎 (전수 비교). 질의 함수의 points 는 order 순으로 정렬된 점 (points[order]).
+ */
+std::tuple<torch::Tensor, torch::Tensor> vp_tree_build_cpu(
+    const torch::Tensor& points,
+    const std::string& model = "poincare",
+    float curvature = 1.0f,
+    int64_t leaf_size = kVPTreeLeafSize,
+    int64_t seed = 0
+);
+
+/**
+ * 정확한 k-최근접 이웃 (쿼리 병렬)
+ * 반환: (거리 [Q, k] f64 오름차순, 원래 색인 [Q, k] int64). 점이 k 개보다 적으면 inf / -1 로 채운다.
+ */
+std::tuple<torch::Tensor, torch::Tensor> vp_tree_knn_cpu(
+    const torch::Tensor& sorted_points,
+    const torch::Tensor& order,
+    const torch::Tensor& bounds,
+    const torch::Tensor& queries,
+    int64_t k,
+    const std::string& model = "poincare",
+    float curvature = 1.0f,
+    int64_t leaf_size = kVPTreeLeafSize
+);
+
+/**
+ * 반경 질의: 거리 ≤ radius 인 모든 점 (쿼리별 거리 오름차순)
+ * 반환: (offsets [Q+1], 거리 [nnz] f64, 원래 색인 [nnz] int64). 쿼리 q 의 결과는 [offsets[q], offsets[q+1])
+ */
+std::tuple<torch::Tensor, torch::Tensor, torch::Tensor> vp_tree_radius_cpu(
+    const torch::Tensor& sorted_points,
+    const torch::Tensor& order,
+    const torch::Tensor& bounds,
+    const torch::Tensor& queries,
+    double radius,
+    const std::string& model = "poincare",
+    float curvature = 1.0f,
+    int64_t leaf_size = kVPTreeLeafSize
+);
+
+} // namespace reality_stone::advanced
@@ -44,13 +44,17 @@ torch::Tensor spectral_normalize_cuda(
     const torch::Tensor& adjacency_matrix
 );
 
+// kNN 그래프의 기본 이웃 수 (0 이하이면 완전 그래프)
+constexpr int kGraphNeighbors = 16;
+
 /**
  * 라플라스-벨트라미 연산자 클래스
  * 하이퍼볼릭 공간에서의 스펙트럴 분석을 위한 도구
  */
 class LaplaceBeltramiOperator {
 public:
-    LaplaceBeltramiOperator(float curvature = 1.0f, int max_eigenvalues = 100);
+    LaplaceBeltramiOperator(float curvature = 1.0f, int max_eigenvalues = 100,
+                            int num_neighbors = kGraphNeighbors);
     
     // 하이퍼볼릭 라플라시안 계산
     torch::Tensor compute_laplacian(const torch::Tensor& f);
@@ -61,15 +65,25 @@ public:
         float t
     );
     
+    // 여러 시각 times [T] 의 열 커널 [T, ...]
+    torch::Tensor compute_heat_kernel(
+        const torch::Tensor& x,
+        const torch::Tensor& times
+    );
+    
     // 고유값 분해
     std::tuple<torch::Tensor, torch::Tensor> eigen_decomposition(
         const torch::Tensor& manifold_points
     );
     
-    // 스펙트럴 클러스터링
+    // 스펙트럴 클러스터링 (임베딩 + k-means++, batch_size > 0 이면 미니배치)
     torch::Tensor spectral_clustering(
         const torch::Tensor& points,
-        int num_clusters
+        int num_clusters,
+        int max_iter = 100,
+        double tol = 1e-4,
+        int64_t batch_size = 0,
+        int64_t seed = 0
     );
     
     // 스펙트럴 임베딩
@@ -78,6 +92,13 @@ public:
         int embed_dim
     );
     
+    // 캐시된 고유기저로 점 위의 신호 [n, ...] 를 여러 시각 [T] 에 확산 -> [T, n, ...]
+    torch::Tensor spectral_diffusion(
+        const torch::Tensor& points,
+        const torch::Tensor& signal,
+        const torch::Tensor& times
+    );
+    
     // 그래프 라플라시안 (그래프 신경망용)
     torch::Tensor graph_laplacian(
         const torch::Tensor& adjacency_matrix
@@ -98,6 +119,7 @@ public:
 private:
     float curvature;
     int max_eigenvalues;
+    int num_neighbors;
     torch::Tensor eigenvalues_cache;
     torch::Tensor eigenvectors_cache;
     bool cache_valid;
@@ -107,7 +129,7 @@ private:
  * 편의 함수들 (절차적 인터페이스)
  */
 
-// 하이퍼볼릭 라플라시안
+// 하이퍼볼릭 라플라시안: f 의 각 행 (점 x) 에서 좌표 함수의 Δ_H, 닫힌 형태 O(B·D)
 torch::Tensor hyperbolic_laplacian_cpu(
     const torch::Tensor& f,
     float curvature = 1.0f
@@ -120,10 +142,70 @@ torch::Tensor heat_kernel_cpu(
     float curvature = 1.0f
 );
 
-// 고유값 분해
+// 여러 시각 times [T] (양수) 의 열 커널 [T, ...]: |x|² 는 모든 시각이 공유
+torch::Tensor heat_kernel_cpu(
+    const torch::Tensor& x,
+    const torch::Tensor& times,
+    float curvature = 1.0f
+);
+
+// 고유값 분해: kNN 그래프 라플라시안의 가장 작은 num_eigenvalues 개 고유쌍
 std::tuple<torch::Tensor, torch::Tensor> laplace_beltrami_eigen_cpu(
     const torch::Tensor& manifold_points,
-    float curvature = 1.0f
+    float curvature = 1.0f,
+    int num_eigenvalues = 100,
+    int num_neighbors = kGraphNeighbors
+);
+
+/**
+ * 측지선 kNN 가우시안 그래프 W (희소 CSR [n, n], 대칭)
+ * 거리는 행 패널 단위로만 계산하므로 메모리는 O(tile·n + n·k).
+ * W_ij = (w_ij + w_ji) / 2, w_ij = exp(-d²/(2σ²)) (j 가 i 의 kNN 일 때)
+ * num_neighbors <= 0 또는 >= n - 1 이면 조밀한 완전 그래프를 반환
+ */
+torch::Tensor knn_graph_cpu(
+    const torch::Tensor& points,
+    float curvature = 1.0f,
+    int num_neighbors = kGraphNeighbors,
+    float sigma = 1.0f
+);
+
+/**
+ * 그래프 라플라시안 L = D - W 의 가장 작은 k 개 고유쌍 (오름차순)
+ * W 는 희소 CSR 또는 조밀 텐서. 재시작 Lanczos (Krylov-Schur) 로 행렬-벡터 곱만 사용.
+ * 작은 그래프는 조밀 eigh 로 바로 푼다.
+ */
+std::tuple<torch::Tensor, torch::Tensor> graph_laplacian_eigen_cpu(
+    const torch::Tensor& weights,
+    int64_t k,
+    double tol = 1e-6,
+    int64_t max_restarts = 1000
+);
+
+/**
+ * k-means++ 초기화 + 배치 거리 (GEMM) 로이드 반복
+ * 중심 이동의 제곱합이 tol × 평균 분산 이하이면 조기 종료.
+ * batch_size > 0 이면 미니배치 갱신 (중심별 누적 평균). 반환: (라벨 [n], 중심 [k, D])
+ */
+std::tuple<torch::Tensor, torch::Tensor> kmeans_cpu(
+    const torch::Tensor& points,
+    int64_t num_clusters,
+    int64_t max_iter = 100,
+    double tol = 1e-4,
+    int64_t batch_size = 0,
+    int64_t seed = 0
+);
+
+// 스펙트럴 클러스터링: kNN 그래프 임베딩 위의 k-means++
+torch::Tensor spectral_clustering_cpu(
+    const torch::Tensor& points,
+    int num_clusters,
+    float curvature = 1.0f,
+    int num_neighbors = kGraphNeighbors,
+    int max_iter = 100,
+    double tol = 1e-4,
+    int64_t batch_size = 0,
+    int64_t seed = 0
 );
 
 // 스펙트럴 그래프 컨볼루션
@@ -133,7 +215,7 @@ torch::Tensor spectral_graph_conv_cpu(
     const torch::Tensor& weight
 );
 
-// 확산 방정식 해법
+// 확산 방정식 해법: du/dt = Δ_H u 의 t = time_step·num_steps 에서의 정확해 (스텝 수와 무관한 비용)
 torch::Tensor solve_diffusion_equation_cpu(
     const torch::Tensor& initial_condition,
     float time_step,
@@ -141,12 +223,63 @@ torch::Tensor solve_diffusion_equation_cpu(
     float curvature = 1.0f
 );
 
+// 여러 시각 times [T] 에서의 정확해 [T, ...]
+torch::Tensor solve_diffusion_equation_cpu(
+    const torch::Tensor& initial_condition,
+    const torch::Tensor& times,
+    float curvature = 1.0f
+);
+
+/**
+ * 그래프 열 확산 u(t) = exp(-tL)·u0, L = D - W (W 는 희소 CSR 또는 조밀)
+ * exp(-tL) 의 체비셰프 전개 (ChebyshevApproximator 계수). 행렬-벡터 곱 order 번을
+ * 모든 시각이 공유하므로 비용은 시각 수와 거의 무관. order <= 0 이면 t·λ_max 로 자동 결정.
+ * initial_condition [n, ...], times [T] -> [T, n, ...]
+ */
+torch::Tensor graph_diffusion_cpu(
+    const torch::Tensor& weights,
+    const torch::Tensor& initial_condition,
+    const torch::Tensor& times,
+    int order = 0
+);
+
+// 고유쌍 (eigenvalues [k], eigenvectors [n, k]) 으로 u(t) = V·e^{-tΛ}·Vᵀ·u0 -> [T, n, ...]
+torch::Tensor spectral_diffusion_cpu(
+    const torch::Tensor& eigenvalues,
+    const torch::Tensor& eigenvectors,
+    const torch::Tensor& initial_condition,
+    const torch::Tensor& times
+);
+
+// 거리 행렬의 기본 행 타일 크기
+constexpr int64_t kDistanceTileSize = 1024;
+
 // 측지선 거리 계산 (더 정확한 방법)
 torch::Tensor geodesic_distance_matrix_cpu(
     const torch::Tensor& points,
     float curvature = 1.0f
 );
 
+// 행 패널 단위로 out [n, n] 에 기록 (메모리 매핑된 out 도 가능)
+torch::Tensor geodesic_distance_matrix_out_cpu(
+    const torch::Tensor& points,
+    float curvature,
+    torch::Tensor out,
+    int64_t tile_size = kDistanceTileSize
+);
+
+/**
+ * rows [R, D] 와 cols [C, D] 사이의 거리 블록 [R, C]
+ * 교차항은 GEMM, 나머지는 한 번의 병렬 패스.
+ * diagonal_offset >= 0 이면 (i, i + diagonal_offset) 성분을 0 으로 둔다 (같은 점 집합의 타일).
+ */
+torch::Tensor geodesic_distance_block_cpu(
+    const torch::Tensor& rows,
+    const torch::Tensor& cols,
+    float curvature = 1.0f,
+    int64_t diagonal_offset = -1
+);
+
 // 스펙트럴 정규화
 torch::Tensor spectral_normalize_cpu(
     const torch::Tensor& adjacency_matrix
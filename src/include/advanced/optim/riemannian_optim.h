@@ -0,0 +1,88 @@
+#pragma once
+
+#include <torch/extension.h>
+#include <string>
+#include <vector>
+
+namespace reality_stone::advanced {
+
+/**
+ * 다중 텐서 리만 최적화 스텝 (모든 텐서의 모든 행을 한 번의 병렬 루프로 제자리 갱신)
+ * 텐서는 마지막 차원을 점 좌표로 보는 행 [*, D] 묶음이고, 텐서마다 D 가 달라도 된다.
+ * manifold:
+ *   poincare : 리만 그래디언트 g·(1-c|x|²)²/4, 지수 사상 x ⊕ tanh(√c λ|u|/2)·u/(√c|u|),
+ *              모멘트는 자이레이션 (λ_x/λ_y)·gyr[y, -x] 로 평행 이동
+ *   lorentz  : <x,x>_L = 1/c 쌍곡면, 접공간 사영 후 cosh / sinh 지수 사상,
+ *              모멘트는 v - <y,v>_L / (1/c + <x,y>_L)·(x + y) 로 평행 이동
+ *   euclidean: 일반 갱신
+ * 모든 텐서는 같은 dtype (float / double) 의 연속 텐서여야 한다.
+ */
+
+// Adam: steps[i] 는 i 번째 텐서의 (이번 스텝을 포함한) 스텝 수 (편향 보정용)
+void riemannian_adam_step_cpu(
+    const std::vector<torch::Tensor>& params,
+    const std::vector<torch::Tensor>& grads,
+    const std::vector<torch::Tensor>& exp_avgs,
+    const std::vector<torch::Tensor>& exp_avg_sqs,
+    const std::vector<int64_t>& steps,
+    double lr,
+    double beta1,
+    double beta2,
+    double eps,
+    double weight_decay,
+    const std::string& manifold = "poincare",
+    float curvature = 1.0f
+);
+
+// SGD (+ 모멘텀). momentum == 0 이면 momentum_buffers 는 비워 둔다
+void riemannian_sgd_step_cpu(
+    const std::vector<torch::Tensor>& params,
+    const std::vector<torch::Tensor>& grads,
+    const std::vector<torch::Tensor>& momentum_buffers,
+    double lr,
+    double momentum,
+    double weight_decay,
+    const std::string& manifold = "poincare",
+    float curvature = 1.0f
+);
+
+// Adagrad: sums[i] 는 행마다 하나인 리만 그래디언트 제곱 노름 누적 (shape = params[i].shape[:-1])
+void riemannian_adagrad_step_cpu(
+    const std::vector<torch::Tensor>& params,
+    const std::vector<torch::Tensor>& grads,
+    const std::vector<torch::Tensor>& sums,
+    double lr,
+    double eps,
+    double weight_decay,
+    const std::string& manifold = "poincare",
+    float curvature = 1.0f
+);
+
+/**
+ * 희소 행 그래디언트 스텝 (임베딩 테이블 [N, D])
+ * indices [nnz] 의 중복 행은 정렬 후 합쳐 (coalesce) 한 번만 갱신하고, 건드린 행만 지수 사상으로 옮긴다.
+ * values [nnz, D] 는 행별 유클리드 그래디언트이며, weight_decay 도 건드린 행에만 적용된다.
+ */
+void sparse_riemannian_sgd_step_cpu(
+    const torch::Tensor& param,
+    const torch::Tensor& indices,
+    const torch::Tensor& values,
+    double lr,
+    double weight_decay,
+    const std::string& manifold = "poincare",
+    float curvature = 1.0f
+);
+
+void sparse_riemannian_adagrad_step_cpu(
+    const torch::Tensor& param,
+    const torch::Tensor& sum,
+    const torch::Tensor& indices,
+    const torch::Tensor& values,
+    double lr,
+    double eps,
+    double weight_decay,
+    const std::string& manifold = "poincare",
+    float curvature = 1.0f
+);
+
+} // namespace reality_stone::advanced
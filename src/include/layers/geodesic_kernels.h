@@ -0,0 +1,160 @@
+#pragma once
+#include <torch/extension.h>
+#include <config/constant.h>
+#include <utils/dual.h>
+#include <ops/mobius_coeffs.h>
+#include <utils/cpu_kernels.h>
+
+/**
+ * 측지선 보간 레이어의 행 단위 계수
+ *
+ * Poincaré / Lorentz / Klein 레이어의 출력은 모두 행마다 out = A·u + B·v 형태이고,
+ * A, B 는 세 개의 스칼라 불변량 (s0, s1, s2) = (<u,u>, <v,v>, <u,v>) 의 함수다.
+ * 계수 함수를 실수 (float / double) 와 ad::Dual<3> 에 대해 템플릿으로 작성해 forward 와
+ * backward (정확한 vector-Jacobian product) 가 같은 수식을 공유한다.
+ */
+namespace reality_stone::layers {
+    namespace ad = reality_stone::utils::ad;
+
+    // u ⊕_c (t ⊗_c ((-u) ⊕_c v)), 입력: |u|², |v|², <u,v>
+    template <typename T>
+    inline void poincare_geodesic_coeffs(T u2, T v2, T uv, float c, float t, T& coef_u, T& coef_v) {
+        const float sqrtc = std::sqrt(c);
+
+        // (-1) ⊗_c u = s1·u
+        T s1 = ops::mobius_scalar_coeff(u2, sqrtc, -1.0f);
+
+        // delta = (s1·u) ⊕_c v = alpha·u + beta·v
+        T alpha, beta;
+        ops::mobius_add_coeffs(s1 * s1 * u2, v2, s1 * uv, c, alpha, beta);
+        alpha = alpha * s1;
+
+        // t ⊗_c delta = gamma·u + delta_v·v
+        T d2 = alpha * alpha * u2 + 2.0f * alpha * beta * uv + beta * beta * v2;
+        T s2 = ops::mobius_scalar_coeff(d2, sqrtc, t);
+        T gamma = s2 * alpha, delta_v = s2 * beta;
+
+        // u ⊕_c w, w = gamma·u + delta_v·v
+        T w2 = gamma * gamma * u2 + 2.0f * gamma * delta_v * uv + delta_v * delta_v * v2;
+        T uw = gamma * u2 + delta_v * uv;
+        T au, aw;
+        ops::mobius_add_coeffs(u2, w2, uw, c, au, aw);
+        coef_u = au + aw * gamma;
+        coef_v = aw * delta_v;
+    }
+
+    // lorentz_forward_cpu 와 같은 수식, 입력: <u,u>_L, <v,v>_L, <u,v>_L (time - space 부호)
+    template <typename T>
+    inline void lorentz_geodesic_coeffs(T uu, T vv, T uv, float c, float t, T& coef_u, T& coef_v) {
+        namespace config = reality_stone::config;
+        T dist = ad::acosh(ad::clamp_min(-uv, 1.0f + config::Constants::EPS)) / std::sqrt(c);
+        // v_perp = v + <u,v>_L·u, <v_perp,v_perp>_L = vv + 2·uv² + uv²·uu
+        T perp_sq = vv + 2.0f * uv * uv + uv * uv * uu;
+        T perp_norm = ad::clamp_min(ad::sqrt(-perp_sq), 1e-8f);
+        T cosh_d = ad::cosh(dist * t);
+        T sinh_d = ad::sinh(dist * t);
+        coef_u = cosh_d + sinh_d * uv / perp_norm;
+        coef_v = sinh_d / perp_norm;
+    }
+
+    // klein_forward_cpu 와 같은 수식 (Klein -> Poincaré -> 측지선 -> Klein), 입력: |u|², |v|², <u,v>
+    template <typename T>
+    inline void klein_geodesic_coeffs(T u2, T v2, T uv, float c, float t, T& coef_u, T& coef_v) {
+        namespace config = reality_stone::config;
+        T alpha_u = 1.0f / ad::clamp_min(1.0f + ad::sqrt(1.0f - c * u2), config::Constants::EPS);
+        T alpha_v = 1.0f / ad::clamp_min(1.0f + ad::sqrt(1.0f - c * v2), config::Constants::EPS);
+
+        T pa, pb;
+        poincare_geodesic_coeffs(alpha_u * alpha_u * u2, alpha_v * alpha_v * v2,
+            alpha_u * alpha_v * uv, c, t, pa, pb);
+        T a = pa * alpha_u, b = pb * alpha_v;
+
+        T r2 = a * a * u2 + 2.0f * a * b * uv + b * b * v2;
+        T beta = 2.0f / ad::clamp_min(1.0f + c * r2, config::Constants::EPS);
+        T k2 = beta * beta * r2;
+
+        // 경계 안쪽으로 스케일 (max_norm_sq / |k|² 가 1 이상이면 그대로)
+        float max_norm_sq = 1.0f / c - 1e-6f;
+        T ratio = max_norm_sq / ad::clamp_min(k2, 1e-8f);
+        T scale = ad::value(ratio) < 1.0f ? ad::sqrt(ratio) : T(1.0f);
+
+        coef_u = scale * beta * a;
+        coef_v = scale * beta * b;
+    }
+
+    /**
+     * out = A·u + B·v 형태 레이어의 정확한 backward
+     *
+     * grad_u = A·g + (g·u)·∂A/∂u + (g·v)·∂B/∂u, grad_v 도 같은 방식.
+     * minkowski 가 true 이면 불변량을 time - space 부호의 Lorentz 내적으로 계산한다.
+     * u, v 는 forward 와 같이 브로드캐스트하고 (pair_shape), 그래디언트는 각 입력의 모양으로 합친다.
+     * half/bf16 입력은 행 단위로 fp32 로 변환해 누산하고 (double 은 fp64) 그래디언트는 입력 타입으로 저장한다.
+     */
+    template <typename CoeffFn>
+    inline std::tuple<torch::Tensor, torch::Tensor> geodesic_backward_cpu(
+        torch::Tensor grad_output,
+        torch::Tensor u,
+        torch::Tensor v,
+        bool minkowski,
+        CoeffFn coeff_fn
+    ) {
+        auto dtype = at::result_type(u, v);
+        auto sizes = utils::pair_shape(u, v);
+        TORCH_CHECK(grad_output.sizes() == at::IntArrayRef(sizes),
+            "geodesic_backward_cpu: grad_output 의 모양 ", grad_output.sizes(), " 이 결과 모양 ", sizes, " 과 다름");
+        auto u_sizes = u.sizes().vec(), v_sizes = v.sizes().vec();
+        grad_output = utils::pair_rows(grad_output, sizes, dtype);
+        u = utils::pair_rows(u, sizes, dtype);
+        v = utils::pair_rows(v, sizes, dtype);
+        int64_t B = u.size(0), D = u.size(1);
+        auto grad_u = torch::empty_like(u);
+        auto grad_v = torch::empty_like(v);
+
+        RS_DISPATCH_FLOAT_TYPES(u.scalar_type(), "geodesic_backward_cpu", [&] {
+            const scalar_t* gp = grad_output.data_ptr<scalar_t>();
+            const scalar_t* up = u.data_ptr<scalar_t>();
+            const scalar_t* vp = v.data_ptr<scalar_t>();
+            scalar_t* gup = grad_u.data_ptr<scalar_t>();
+            scalar_t* gvp = grad_v.data_ptr<scalar_t>();
+            using acc_t = at::opmath_type<scalar_t>;
+            using Dual3 = ad::Dual<3, acc_t>;
+
+            at::parallel_for(0, B, utils::row_grain_size(D), [&](int64_t begin, int64_t end) {
+                utils::RowScratch<scalar_t> scratch(5, D);
+                for (int64_t b = begin; b < end; ++b) {
+                    const acc_t* gb = utils::load_row(gp + b * D, scratch.row(0), D);
+                    const acc_t* ub = utils::load_row(up + b * D, scratch.row(1), D);
+                    const acc_t* vb = utils::load_row(vp + b * D, scratch.row(2), D);
+                    auto s = utils::pair_invariants(ub, vb, D, minkowski);
+                    auto proj = utils::row_dots<2>({ gb, gb }, { ub, vb }, D);
+                    const acc_t gu = proj[0], gv = proj[1];
+
+                    Dual3 A, Bc;
+                    coeff_fn(Dual3::variable(s[0], 0), Dual3::variable(s[1], 1), Dual3::variable(s[2], 2), A, Bc);
+
+                    // ∂s0/∂u = 2·J·u, ∂s1/∂v = 2·J·v, ∂s2/∂u = J·v, ∂s2/∂v = J·u
+                    acc_t ku_u = acc_t(2) * (gu * A.grad[0] + gv * Bc.grad[0]);
+                    acc_t kv_v = acc_t(2) * (gu * A.grad[1] + gv * Bc.grad[1]);
+                    acc_t k_cross = gu * A.grad[2] + gv * Bc.grad[2];
+
+                    acc_t* gub = utils::work_row(gup + b * D, scratch.row(3));
+                    acc_t* gvb = utils::work_row(gvp + b * D, scratch.row(4));
+                    if (minkowski) {
+                        // J = diag(1, -1, ..., -1): 공간 성분은 부호 반전 후 시간 성분만 보정
+                        utils::row_combine(gub, D, A.val, gb, -ku_u, ub, -k_cross, vb);
+                        utils::row_combine(gvb, D, Bc.val, gb, -kv_v, vb, -k_cross, ub);
+                        gub[0] = A.val * gb[0] + ku_u * ub[0] + k_cross * vb[0];
+                        gvb[0] = Bc.val * gb[0] + kv_v * vb[0] + k_cross * ub[0];
+                    } else {
+                        utils::row_combine(gub, D, A.val, gb, ku_u, ub, k_cross, vb);
+                        utils::row_combine(gvb, D, Bc.val, gb, kv_v, vb, k_cross, ub);
+                    }
+                    utils::store_row(gup + b * D, gub, D);
+                    utils::store_row(gvp + b * D, gvb, D);
+                }
+            });
+        });
+        // 브로드캐스트된 입력은 펼친 차원의 그래디언트를 합쳐 원래 모양으로
+        return std::make_tuple(at::sum_to(grad_u.view(sizes), u_sizes), at::sum_to(grad_v.view(sizes), v_sizes));
+    }
+}
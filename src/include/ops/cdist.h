@@ -0,0 +1,39 @@
+#pragma once
+#include <torch/extension.h>
+#include <string>
+#include <tuple>
+
+namespace reality_stone::ops {
+    // 행 묶음 하나가 차지하는 최대 원소 수 (chunk_size = 0 이면 rows = max(1, 이 값 / M))
+    constexpr int64_t kCdistChunkElements = int64_t(1) << 22;
+
+    /**
+     * 쌍별 측지 거리 [N, M] (x [N, D], y [M, D])
+     * 교차항은 GEMM 한 번이고 나머지는 행 / 열 상수의 rank-1 보정이다. acosh 의 인자 A 는
+     *   poincare: 1 + 2c·(|x|² + |y|² - 2x·y) / ((1-c|x|²)(1-c|y|²))
+     *   lorentz : c·<x,y>_L,  <x,y>_L = x0·y0 - Σ xi·yi  (점은 <x,x>_L = 1/c)
+     *   klein   : (1 - c·x·y) / sqrt((1-c|x|²)(1-c|y|²))
+     * 이고 거리는 acosh(max(A, 1)) / √c. 행 묶음 단위로 GEMM 결과 위에서 바로 변환한다.
+     */
+    torch::Tensor cdist_cpu(
+        const torch::Tensor& x,
+        const torch::Tensor& y,
+        const std::string& model = "poincare",
+        float c = 1.0f,
+        int64_t chunk_size = 0
+    );
+
+    /**
+     * 행마다 가장 가까운 k 개: (거리 [N, k] 오름차순, 색인 [N, k])
+     * A 는 거리에 대해 단조이므로 묶음마다 A 로 top-k 를 고르고 고른 값에만 acosh 를 적용한다.
+     * 추가 메모리는 묶음 하나 [rows, M].
+     */
+    std::tuple<torch::Tensor, torch::Tensor> cdist_topk_cpu(
+        const torch::Tensor& x,
+        const torch::Tensor& y,
+        int64_t k,
+        const std::string& model = "poincare",
+        float c = 1.0f,
+        int64_t chunk_size = 0
+    );
+}
@@ -34,6 +34,46 @@ namespace reality_stone::ops {
         float c
     );
 
+    // 호출자가 준 out 에 결과 기록 (모양이 같은 연산은 out 이 입력이면 in-place)
+    torch::Tensor klein_add_out_cpu(
+        torch::Tensor u,
+        torch::Tensor v,
+        float c,
+        torch::Tensor out
+    );
+    torch::Tensor klein_scalar_out_cpu(
+        torch::Tensor u,
+        float c,
+        float r,
+        torch::Tensor out
+    );
+    torch::Tensor klein_distance_out_cpu(
+        torch::Tensor u,
+        torch::Tensor v,
+        float c,
+        torch::Tensor out
+    );
+    torch::Tensor poincare_to_klein_out_cpu(
+        torch::Tensor x,
+        float c,
+        torch::Tensor out
+    );
+    torch::Tensor klein_to_poincare_out_cpu(
+        torch::Tensor x,
+        float c,
+        torch::Tensor out
+    );
+    torch::Tensor lorentz_to_klein_out_cpu(
+        torch::Tensor x,
+        float c,
+        torch::Tensor out
+    );
+    torch::Tensor klein_to_lorentz_out_cpu(
+        torch::Tensor x,
+        float c,
+        torch::Tensor out
+    );
+
 #ifdef WITH_CUDA
     // CUDA 버전 선언
     torch::Tensor klein_add_cuda(
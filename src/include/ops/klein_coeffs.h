@@ -0,0 +1,60 @@
+#pragma once
+#include <cmath>
+#include <config/constant.h>
+#include <utils/dual.h>
+
+/**
+ * Klein 연산의 행 단위 계수
+ *
+ * 거리, 덧셈, 스칼라 곱, Poincaré <-> Klein 변환은 모두 |u|², |v|², <u,v> 만의 함수다.
+ * mobius_coeffs.h 와 같이 실수 (float / double) 와 행 불변량 텐서 ([..., 1], autograd 경로) 에 대해
+ * 쓸 수 있도록 템플릿으로 작성해 행 커널과 autograd 경로가 같은 수식을 쓴다.
+ */
+namespace reality_stone::ops {
+    namespace ad = reality_stone::utils::ad;
+
+    // d_K(u, v), λ² = 2(|u|²|v|² - <u,v>²) / ((1 - c|u|²)(1 - c|v|²))
+    template <typename T>
+    inline T klein_distance_value(T u2, T v2, T uv, float c) {
+        namespace config = reality_stone::config;
+        T numerator = 2.0f * (u2 * v2 - uv * uv);
+        T denominator = ad::clamp_min((1.0f - c * u2) * (1.0f - c * v2), config::Constants::EPS);
+        T lambda = ad::sqrt(numerator / denominator);
+        T two_minus_lambda = ad::clamp_min(2.0f - lambda, config::Constants::EPS);
+        return ad::acosh((2.0f + lambda) / two_minus_lambda) / std::sqrt(c);
+    }
+
+    // klein_add 의 계수 (A, B): a·u + b·v 를 그 노름으로 정규화
+    template <typename T>
+    inline void klein_add_coeffs(T u2, T v2, T uv, float c, T& coef_u, T& coef_v) {
+        namespace config = reality_stone::config;
+        T a = 1.0f / ad::sqrt(ad::clamp_min(1.0f - c * u2, config::Constants::EPS));
+        T b = 1.0f / ad::sqrt(ad::clamp_min(1.0f - c * v2, config::Constants::EPS));
+        T result_norm_sq = a * a * u2 + 2.0f * a * b * uv + b * b * v2;
+        T result_denom = ad::clamp_min(1.0f + ad::sqrt(1.0f + c * result_norm_sq), config::Constants::EPS);
+        coef_u = a / result_denom;
+        coef_v = b / result_denom;
+    }
+
+    // klein_scalar 의 스케일 계수: 노름을 r 배 하되 경계 1/√c 안쪽 max_norm 에서 자른다
+    template <typename T>
+    inline T klein_scalar_coeff(T norm_sq, float r, float max_norm) {
+        namespace config = reality_stone::config;
+        T norm = ad::clamp_min(ad::sqrt(norm_sq), config::Constants::EPS);
+        return ad::clamp_max(norm * r, max_norm) / norm;
+    }
+
+    // Poincaré -> Klein 스케일 계수 2 / (1 + c|x|²)
+    template <typename T>
+    inline T poincare_to_klein_coeff(T norm_sq, float c) {
+        namespace config = reality_stone::config;
+        return 2.0f / ad::clamp_min(1.0f + c * norm_sq, config::Constants::EPS);
+    }
+
+    // Klein -> Poincaré 스케일 계수 1 / (1 + √(1 - c|x|²))
+    template <typename T>
+    inline T klein_to_poincare_coeff(T norm_sq, float c) {
+        namespace config = reality_stone::config;
+        return 1.0f / ad::clamp_min(1.0f + ad::sqrt(1.0f - c * norm_sq), config::Constants::EPS);
+    }
+}
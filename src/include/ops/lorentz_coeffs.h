@@ -0,0 +1,61 @@
+#pragma once
+#include <cmath>
+#include <config/constant.h>
+#include <utils/dual.h>
+
+/**
+ * Lorentz 연산의 행 단위 계수
+ *
+ * 쌍 연산의 입력은 time - space 부호의 Lorentz 내적 <u,u>_L, <v,v>_L, <u,v>_L,
+ * 스칼라 곱과 변환의 입력은 시간 성분과 공간 성분 노름 제곱이다.
+ * mobius_coeffs.h 와 같이 실수 (float / double) 와 행 불변량 텐서 ([..., 1], autograd 경로) 에 대해
+ * 쓸 수 있도록 템플릿으로 작성해 행 커널과 autograd 경로가 같은 수식을 쓴다.
+ */
+namespace reality_stone::ops {
+    namespace ad = reality_stone::utils::ad;
+
+    // d_L(u, v) = acosh(-<u,v>_L) / √c
+    template <typename T>
+    inline T lorentz_distance_value(T uv, float c) {
+        namespace config = reality_stone::config;
+        return ad::acosh(ad::clamp_min(-uv, 1.0f + config::Constants::EPS)) / std::sqrt(c);
+    }
+
+    // lorentz_add 의 계수: v_perp = v + <u,v>_L·u 이므로 cosh(n)·u + sinh(n)/n·v_perp = A·u + B·v
+    template <typename T>
+    inline void lorentz_add_coeffs(T uu, T vv, T uv, T& coef_u, T& coef_v) {
+        namespace config = reality_stone::config;
+        T perp_sq = vv + 2.0f * uv * uv + uv * uv * uu;
+        T norm_v_perp = ad::clamp_min(ad::sqrt(-perp_sq), config::Constants::EPS);
+        T sin_ratio = ad::sinh(norm_v_perp) / norm_v_perp;
+        coef_u = ad::cosh(norm_v_perp) + sin_ratio * uv;
+        coef_v = sin_ratio;
+    }
+
+    // lorentz_scalar 의 공간 스케일과 새 시간 성분: 공간 노름 n 을 tanh(r·atanh(n)) 으로 옮긴다
+    template <typename T>
+    inline void lorentz_scalar_coeffs(T time, T space_sq, float r, T& scale, T& scaled_time) {
+        namespace config = reality_stone::config;
+        T norm = ad::sqrt(space_sq / (time * time - config::Constants::EPS));
+        T theta = ad::atanh(ad::clamp_max(norm, 1.0f - config::Constants::BOUNDARY_EPS)) * r;
+        scale = ad::tanh(theta) / ad::clamp_min(norm, config::Constants::EPS);
+        scaled_time = ad::sqrt(1.0f + scale * scale * space_sq);
+    }
+
+    // Poincaré -> Lorentz: 시간 성분 (1 + c|x|²) / ((1 - c|x|²)√c), 공간 스케일 2 / ((1 - c|x|²)√c)
+    template <typename T>
+    inline void poincare_to_lorentz_coeffs(T norm_sq, float c, T& time, T& space_scale) {
+        namespace config = reality_stone::config;
+        T denom = ad::clamp_min(1.0f - c * norm_sq, config::Constants::EPS) * std::sqrt(c);
+        time = (1.0f + c * norm_sq) / denom;
+        space_scale = 2.0f / denom;
+    }
+
+    // Lorentz -> Poincaré 공간 스케일 √c / (√c·x0 + 1)
+    template <typename T>
+    inline T lorentz_to_poincare_coeff(T time, float c) {
+        namespace config = reality_stone::config;
+        float sqrtc = std::sqrt(c);
+        return sqrtc / ad::clamp_min(time * sqrtc + 1.0f, config::Constants::EPS);
+    }
+}
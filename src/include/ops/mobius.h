@@ -12,6 +12,42 @@ namespace reality_stone::ops {
         float c,
         float r
     );
+    // 호출자가 준 out 에 결과 기록 (out 이 입력이면 in-place)
+    torch::Tensor mobius_add_out_cpu(
+        torch::Tensor u,
+        torch::Tensor v,
+        float c,
+        torch::Tensor out
+    );
+    torch::Tensor mobius_scalar_out_cpu(
+        torch::Tensor u,
+        float c,
+        float r,
+        torch::Tensor out
+    );
+    // 배치별 곡률: c 는 [B], [B,1] 또는 원소 1개 (브로드캐스트)
+    torch::Tensor mobius_add_cpu(
+        torch::Tensor u,
+        torch::Tensor v,
+        torch::Tensor c
+    );
+    torch::Tensor mobius_scalar_cpu(
+        torch::Tensor u,
+        torch::Tensor c,
+        float r
+    );
+    torch::Tensor mobius_add_out_cpu(
+        torch::Tensor u,
+        torch::Tensor v,
+        torch::Tensor c,
+        torch::Tensor out
+    );
+    torch::Tensor mobius_scalar_out_cpu(
+        torch::Tensor u,
+        torch::Tensor c,
+        float r,
+        torch::Tensor out
+    );
 #ifdef WITH_CUDA
 // u ⊕_c v
     torch::Tensor mobius_add_cuda(
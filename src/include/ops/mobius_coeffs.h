@@ -0,0 +1,33 @@
+#pragma once
+#include <config/constant.h>
+#include <utils/dual.h>
+
+/**
+ * Möbius 연산의 행 단위 계수
+ *
+ * u ⊕_c v = A·u + B·v, r ⊗_c x = s·x 에서 A, B, s 는 |u|², |v|², <u,v> 만의 함수다.
+ * 실수 (float / double), utils::ad::Dual, 행 불변량 텐서 ([..., 1], autograd 경로) 모두에 대해
+ * 쓸 수 있도록 템플릿으로 작성한다. 곡률 c / √c 는 float 또는 배치별 곡률 열 텐서다.
+ */
+namespace reality_stone::ops {
+    namespace ad = reality_stone::utils::ad;
+
+    // r ⊗_c x 의 스케일 계수 (clamp 규칙은 mobius_scalar_cpu 와 동일)
+    template <typename T, typename S>
+    inline T mobius_scalar_coeff(T norm_sq, S sqrtc, float r) {
+        namespace config = reality_stone::config;
+        T norm = ad::clamp_min(ad::sqrt(ad::clamp_min(norm_sq, 0.0f)), config::Constants::EPS);
+        T scn = ad::clamp_max(ad::clamp_min(sqrtc * norm, config::Constants::EPS),
+            1.0f - config::Constants::BOUNDARY_EPS);
+        return ad::tanh(r * ad::atanh(scn)) / (sqrtc * norm);
+    }
+
+    // u ⊕_c v 의 계수 (A, B)
+    template <typename T, typename C>
+    inline void mobius_add_coeffs(T u2, T v2, T uv, C c, T& coef_u, T& coef_v) {
+        namespace config = reality_stone::config;
+        T denom = ad::clamp_min(1.0f + 2.0f * c * uv + c * c * u2 * v2, config::Constants::MIN_DENOMINATOR);
+        coef_u = (1.0f + 2.0f * c * uv + c * v2) / denom;
+        coef_v = (1.0f - c * u2) / denom;
+    }
+}
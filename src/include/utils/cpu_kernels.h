@@ -0,0 +1,404 @@
+#pragma once
+#include <torch/extension.h>
+#include <ATen/Dispatch.h>
+#include <ATen/ExpandUtils.h>
+#include <ATen/OpMathType.h>
+#include <ATen/Parallel.h>
+#include <ATen/cpu/vec/vec.h>
+#include <c10/util/accumulate.h>
+#include <array>
+#include <initializer_list>
+#include <algorithm>
+#include <type_traits>
+#include <utility>
+#include <vector>
+
+// float / double / half / bfloat16 저장 타입 디스패치 (누산은 fp32, double 은 fp64)
+#define RS_DISPATCH_FLOAT_TYPES(TYPE, NAME, ...)                          \
+    AT_DISPATCH_SWITCH(TYPE, NAME,                                         \
+        AT_DISPATCH_CASE(at::ScalarType::Float, __VA_ARGS__)               \
+        AT_DISPATCH_CASE(at::ScalarType::Double, __VA_ARGS__)              \
+        AT_DISPATCH_CASE(at::ScalarType::Half, __VA_ARGS__)                \
+        AT_DISPATCH_CASE(at::ScalarType::BFloat16, __VA_ARGS__))
+
+namespace reality_stone::utils {
+    // 스칼라 계수 인자는 템플릿 추론에서 빼고 행 타입을 따르게 한다
+    template <typename T>
+    struct nondeduced { using type = T; };
+    template <typename T>
+    using nondeduced_t = typename nondeduced<T>::type;
+
+    // 한 행의 길이가 D 일 때 at::parallel_for 에 넘길 배치 grain 크기
+    inline int64_t row_grain_size(int64_t D) {
+        return std::max<int64_t>(1, at::internal::GRAIN_SIZE / std::max<int64_t>(D, 1));
+    }
+
+    /**
+     * 저장 타입 행 <-> 누산 타입 (at::opmath_type) 작업 행
+     * float / double 이면 복사 없이 원본 포인터를 그대로 쓰고, half/bf16 이면 스레드별 fp32 버퍼로 변환
+     */
+    template <typename scalar_t>
+    inline const at::opmath_type<scalar_t>* load_row(
+        const scalar_t* src, at::opmath_type<scalar_t>* buf, int64_t D
+    ) {
+        if constexpr (std::is_same_v<scalar_t, at::opmath_type<scalar_t>>) {
+            return src;
+        } else {
+            at::vec::convert(src, buf, D);
+            return buf;
+        }
+    }
+
+    template <typename scalar_t>
+    inline at::opmath_type<scalar_t>* work_row(scalar_t* dst, at::opmath_type<scalar_t>* buf) {
+        if constexpr (std::is_same_v<scalar_t, at::opmath_type<scalar_t>>) {
+            return dst;
+        } else {
+            return buf;
+        }
+    }
+
+    template <typename scalar_t>
+    inline void store_row(scalar_t* dst, const at::opmath_type<scalar_t>* src, int64_t D) {
+        if constexpr (!std::is_same_v<scalar_t, at::opmath_type<scalar_t>>) {
+            at::vec::convert(src, dst, D);
+        }
+    }
+
+    /**
+     * 행 변환용 스레드별 작업 공간
+     * 버퍼는 스레드마다 한 번 할당해 호출 간에 재사용하고 (줄어들지 않음), float / double 이면 쓰지 않는다.
+     */
+    template <typename scalar_t>
+    class RowScratch {
+        using acc_t = at::opmath_type<scalar_t>;
+
+    public:
+        RowScratch(int64_t rows, int64_t D) : D_(D) {
+            if constexpr (!std::is_same_v<scalar_t, acc_t>) {
+                auto& storage = thread_storage();
+                if (static_cast<int64_t>(storage.size()) < rows * D) storage.resize(rows * D);
+                data_ = storage.data();
+            }
+        }
+        acc_t* row(int64_t i) const { return data_ ? data_ + i * D_ : nullptr; }
+
+    private:
+        static std::vector<acc_t>& thread_storage() {
+            static thread_local std::vector<acc_t> storage;
+            return storage;
+        }
+        acc_t* data_ = nullptr;
+        int64_t D_;
+    };
+
+    /**
+     * autograd 그래프가 필요한 호출인지 확인
+     * 행 커널은 data_ptr 로 직접 쓰므로 그래디언트가 필요하면 미분 가능한 텐서 연산 경로를 써야 한다.
+     */
+    inline bool requires_grad(std::initializer_list<torch::Tensor> tensors) {
+        if (!at::GradMode::is_enabled()) return false;
+        for (const auto& t : tensors) {
+            if (t.requires_grad()) return true;
+        }
+        return false;
+    }
+
+    /**
+     * 행 단위 함수 호출
+     * fn 이 행 번호를 첫 인자로 받으면 함께 넘긴다 (배치별 곡률 등 행마다 다른 상수용)
+     */
+    template <typename Fn, typename... Args>
+    inline decltype(auto) call_row_fn(Fn& fn, int64_t b, Args&&... args) {
+        if constexpr (std::is_invocable_v<Fn&, int64_t, Args...>) {
+            return fn(b, std::forward<Args>(args)...);
+        } else {
+            return fn(std::forward<Args>(args)...);
+        }
+    }
+
+    // 배치별 스칼라 인자 ([B], [B,1] 또는 원소 1개) 를 연속 fp32 [B] 로 정리 (입력과 저장소를 공유할 수 있으므로 읽기 전용)
+    inline torch::Tensor batch_scalar(const torch::Tensor& values, int64_t B, const char* name) {
+        auto flat = values.detach().reshape({ -1 }).to(torch::kFloat32).contiguous();
+        TORCH_CHECK(flat.numel() == B || flat.numel() == 1,
+            name, ": 배치별 값의 개수는 ", B, " 또는 1 이어야 함 (현재 ", flat.numel(), ")");
+        return flat.numel() == B ? flat : flat.expand({ B }).contiguous();
+    }
+
+    // out 인자 검사: 모양이 같아야 하고, 비연속이면 연속 임시 버퍼에 쓴 뒤 복사
+    inline torch::Tensor out_buffer(const torch::Tensor& out, at::IntArrayRef sizes, const char* name) {
+        TORCH_CHECK(out.sizes() == sizes, name, ": out 의 모양 ", out.sizes(), " 이 결과 모양 ", sizes, " 과 다름");
+        return out.is_contiguous() ? out : torch::empty(sizes, out.options());
+    }
+
+    inline torch::Tensor finish_out(torch::Tensor& out, const torch::Tensor& buffer) {
+        if (!buffer.is_same(out)) out.copy_(buffer);
+        return out;
+    }
+
+    /**
+     * 쌍 연산 (u, v) 의 결과 모양
+     * torch 브로드캐스트 규칙 (at::infer_size) 을 따르고 마지막 차원이 행 길이 D 다.
+     * 예: [B,D]⊕[1,D], [D]⊕[B,D], [N,B,D]⊕[B,D]. 맞지 않는 모양은 여기서 오류.
+     */
+    inline std::vector<int64_t> pair_shape(const torch::Tensor& u, const torch::Tensor& v) {
+        TORCH_CHECK(u.dim() >= 1 && v.dim() >= 1,
+            "pair 연산: 입력은 1차원 이상이어야 함 (현재 ", u.dim(), ", ", v.dim(), "차원)");
+        return at::infer_size(u.sizes(), v.sizes());
+    }
+
+    // 행별 축약 결과 모양: 마지막 차원만 1 로 (keepdim)
+    inline std::vector<int64_t> pair_reduce_shape(const torch::Tensor& u, const torch::Tensor& v) {
+        auto sizes = pair_shape(u, v);
+        sizes.back() = 1;
+        return sizes;
+    }
+
+    // 결과 모양의 행 개수 (마지막 차원을 뺀 나머지의 곱)
+    inline int64_t row_count(at::IntArrayRef sizes) {
+        return c10::multiply_integers(sizes.begin(), sizes.end() - 1);
+    }
+
+    // 피연산자를 결과 모양으로 펼쳐 연속 [rows, D] 로 (이미 그 모양이면 복사 없음)
+    inline torch::Tensor pair_rows(const torch::Tensor& x, at::IntArrayRef sizes, at::ScalarType dtype) {
+        return x.to(dtype).expand(sizes).contiguous().view({ row_count(sizes), sizes.back() });
+    }
+
+    /**
+     * 길이 D 인 벡터 쌍 N 개의 내적을 한 번의 순회로 계산
+     * lhs[k]·rhs[k] 를 SIMD 누산기로 더한 뒤 마지막에 수평 합산 (누산 타입은 행 타입 T)
+     */
+    template <size_t N, typename T>
+    inline std::array<T, N> row_dots(const T* const (&lhs)[N], const T* const (&rhs)[N], int64_t D) {
+        using Vec = at::vec::Vectorized<T>;
+        std::array<Vec, N> acc;
+        acc.fill(Vec(T(0)));
+        int64_t d = 0;
+        for (; d + Vec::size() <= D; d += Vec::size()) {
+            for (size_t k = 0; k < N; ++k) {
+                acc[k] = at::vec::fmadd(Vec::loadu(lhs[k] + d), Vec::loadu(rhs[k] + d), acc[k]);
+            }
+        }
+        std::array<T, N> out;
+        T buf[Vec::size()];
+        for (size_t k = 0; k < N; ++k) {
+            acc[k].store(buf);
+            T s = T(0);
+            for (int64_t j = 0; j < Vec::size(); ++j) s += buf[j];
+            for (int64_t j = d; j < D; ++j) s += lhs[k][j] * rhs[k][j];
+            out[k] = s;
+        }
+        return out;
+    }
+
+    // out = a·x
+    template <typename T>
+    inline void row_scale(T* out, int64_t D, nondeduced_t<T> a, const T* x) {
+        using Vec = at::vec::Vectorized<T>;
+        const Vec va(a);
+        int64_t d = 0;
+        for (; d + Vec::size() <= D; d += Vec::size()) {
+            (va * Vec::loadu(x + d)).store(out + d);
+        }
+        for (; d < D; ++d) out[d] = a * x[d];
+    }
+
+    // out = a·x + b·y
+    template <typename T>
+    inline void row_combine(T* out, int64_t D, nondeduced_t<T> a, const T* x, nondeduced_t<T> b, const T* y) {
+        using Vec = at::vec::Vectorized<T>;
+        const Vec va(a), vb(b);
+        int64_t d = 0;
+        for (; d + Vec::size() <= D; d += Vec::size()) {
+            auto r = at::vec::fmadd(va, Vec::loadu(x + d), vb * Vec::loadu(y + d));
+            r.store(out + d);
+        }
+        for (; d < D; ++d) out[d] = a * x[d] + b * y[d];
+    }
+
+    // out = a·x + b·y + c·z
+    template <typename T>
+    inline void row_combine(
+        T* out, int64_t D,
+        nondeduced_t<T> a, const T* x,
+        nondeduced_t<T> b, const T* y,
+        nondeduced_t<T> c, const T* z
+    ) {
+        using Vec = at::vec::Vectorized<T>;
+        const Vec va(a), vb(b), vc(c);
+        int64_t d = 0;
+        for (; d + Vec::size() <= D; d += Vec::size()) {
+            auto r = at::vec::fmadd(va, Vec::loadu(x + d),
+                at::vec::fmadd(vb, Vec::loadu(y + d), vc * Vec::loadu(z + d)));
+            r.store(out + d);
+        }
+        for (; d < D; ++d) out[d] = a * x[d] + b * y[d] + c * z[d];
+    }
+
+    // 행 불변량 (<u,u>, <v,v>, <u,v>), minkowski 이면 time - space 부호의 Lorentz 내적
+    template <typename T>
+    inline std::array<T, 3> pair_invariants(const T* u, const T* v, int64_t D, bool minkowski) {
+        auto s = row_dots<3>({ u, v, u }, { u, v, v }, D);
+        if (minkowski) {
+            s[0] = T(2) * u[0] * u[0] - s[0];
+            s[1] = T(2) * v[0] * v[0] - s[1];
+            s[2] = T(2) * u[0] * v[0] - s[2];
+        }
+        return s;
+    }
+
+    /**
+     * out = A·u + B·v, (A, B) = coeff_fn([b,] <u,u>, <v,v>, <u,v>)
+     * u, v 는 브로드캐스트한 뒤 (pair_shape) 앞쪽 차원을 행 b 로 합쳐 계산한다.
+     * 배치 병렬, 행 단위 누산 (fp32, double 은 fp64), 저장 타입은 out 과 동일.
+     * 각 행의 불변량을 먼저 구한 뒤 같은 위치에 쓰므로 out 이 u 또는 v 여도 된다 (in-place).
+     */
+    template <typename CoeffFn>
+    inline torch::Tensor pair_combine_out_cpu(
+        torch::Tensor u, torch::Tensor v, bool minkowski, CoeffFn coeff_fn, torch::Tensor out
+    ) {
+        auto sizes = pair_shape(u, v);
+        auto buffer = out_buffer(out, sizes, "pair_combine_out_cpu");
+        u = pair_rows(u, sizes, out.scalar_type());
+        v = pair_rows(v, sizes, out.scalar_type());
+        int64_t B = u.size(0), D = u.size(1);
+        RS_DISPATCH_FLOAT_TYPES(out.scalar_type(), "pair_combine_cpu", [&] {
+            const scalar_t* up = u.data_ptr<scalar_t>();
+            const scalar_t* vp = v.data_ptr<scalar_t>();
+            scalar_t* op = buffer.data_ptr<scalar_t>();
+            at::parallel_for(0, B, row_grain_size(D), [&](int64_t begin, int64_t end) {
+                RowScratch<scalar_t> scratch(3, D);
+                for (int64_t b = begin; b < end; ++b) {
+                    const auto* ub = load_row(up + b * D, scratch.row(0), D);
+                    const auto* vb = load_row(vp + b * D, scratch.row(1), D);
+                    auto s = pair_invariants(ub, vb, D, minkowski);
+                    at::opmath_type<scalar_t> coef_u, coef_v;
+                    call_row_fn(coeff_fn, b, s[0], s[1], s[2], coef_u, coef_v);
+                    auto* ob = work_row(op + b * D, scratch.row(2));
+                    row_combine(ob, D, coef_u, ub, coef_v, vb);
+                    store_row(op + b * D, ob, D);
+                }
+            });
+        });
+        return finish_out(out, buffer);
+    }
+
+    template <typename CoeffFn>
+    inline torch::Tensor pair_combine_cpu(torch::Tensor u, torch::Tensor v, bool minkowski, CoeffFn coeff_fn) {
+        auto out = torch::empty(pair_shape(u, v), u.options().dtype(at::result_type(u, v)));
+        return pair_combine_out_cpu(u, v, minkowski, coeff_fn, out);
+    }
+
+    // out[b] = fn([b,] <u,u>, <v,v>, <u,v>), 결과는 pair_shape 의 마지막 차원을 1 로 ([B,1] 등)
+    template <typename Fn>
+    inline torch::Tensor pair_reduce_out_cpu(torch::Tensor u, torch::Tensor v, bool minkowski, Fn fn, torch::Tensor out) {
+        auto sizes = pair_shape(u, v);
+        auto buffer = out_buffer(out, pair_reduce_shape(u, v), "pair_reduce_out_cpu");
+        u = pair_rows(u, sizes, out.scalar_type());
+        v = pair_rows(v, sizes, out.scalar_type());
+        int64_t B = u.size(0), D = u.size(1);
+        RS_DISPATCH_FLOAT_TYPES(out.scalar_type(), "pair_reduce_cpu", [&] {
+            const scalar_t* up = u.data_ptr<scalar_t>();
+            const scalar_t* vp = v.data_ptr<scalar_t>();
+            scalar_t* op = buffer.data_ptr<scalar_t>();
+            at::parallel_for(0, B, row_grain_size(D), [&](int64_t begin, int64_t end) {
+                RowScratch<scalar_t> scratch(2, D);
+                for (int64_t b = begin; b < end; ++b) {
+                    const auto* ub = load_row(up + b * D, scratch.row(0), D);
+                    const auto* vb = load_row(vp + b * D, scratch.row(1), D);
+                    auto s = pair_invariants(ub, vb, D, minkowski);
+                    op[b] = static_cast<scalar_t>(call_row_fn(fn, b, s[0], s[1], s[2]));
+                }
+            });
+        });
+        return finish_out(out, buffer);
+    }
+
+    template <typename Fn>
+    inline torch::Tensor pair_reduce_cpu(torch::Tensor u, torch::Tensor v, bool minkowski, Fn fn) {
+        auto out = torch::empty(pair_reduce_shape(u, v), u.options().dtype(at::result_type(u, v)));
+        return pair_reduce_out_cpu(u, v, minkowski, fn, out);
+    }
+
+    // out = s·x, s = scale_fn([b,] |x|²), out 이 x 여도 된다 (in-place)
+    template <typename ScaleFn>
+    inline torch::Tensor row_scale_out_cpu(torch::Tensor x, ScaleFn scale_fn, torch::Tensor out) {
+        auto buffer = out_buffer(out, x.sizes(), "row_scale_out_cpu");
+        x = x.to(out.scalar_type()).contiguous();
+        int64_t B = x.size(0), D = x.size(1);
+        RS_DISPATCH_FLOAT_TYPES(out.scalar_type(), "row_scale_cpu", [&] {
+            const scalar_t* xp = x.data_ptr<scalar_t>();
+            scalar_t* op = buffer.data_ptr<scalar_t>();
+            at::parallel_for(0, B, row_grain_size(D), [&](int64_t begin, int64_t end) {
+                RowScratch<scalar_t> scratch(2, D);
+                for (int64_t b = begin; b < end; ++b) {
+                    const auto* xb = load_row(xp + b * D, scratch.row(0), D);
+                    auto norm_sq = row_dots<1>({ xb }, { xb }, D)[0];
+                    auto* ob = work_row(op + b * D, scratch.row(1));
+                    row_scale(ob, D, call_row_fn(scale_fn, b, norm_sq), xb);
+                    store_row(op + b * D, ob, D);
+                }
+            });
+        });
+        return finish_out(out, buffer);
+    }
+
+    template <typename ScaleFn>
+    inline torch::Tensor row_scale_cpu(torch::Tensor x, ScaleFn scale_fn) {
+        return row_scale_out_cpu(x, scale_fn, torch::empty_like(x, at::MemoryFormat::Contiguous));
+    }
+
+    /**
+     * 행 커널의 autograd 경로 (미분 가능한 텐서 연산)
+     * 불변량을 [..., 1] 텐서로 구하고 행 커널에 넘기는 것과 같은 계수 함수를 텐서에 대해 평가하므로
+     * 한 연산의 수식은 한 곳 (계수 템플릿) 에만 있다. 계수 함수 안의 수학 함수는 utils::ad 의 텐서 오버로드를 쓴다.
+     */
+    inline std::array<torch::Tensor, 3> pair_invariants_autograd(const torch::Tensor& u, const torch::Tensor& v, bool minkowski) {
+        auto dot = [minkowski](const torch::Tensor& a, const torch::Tensor& b) {
+            auto s = (a * b).sum(-1, /*keepdim=*/true);
+            return minkowski ? 2 * a.narrow(-1, 0, 1) * b.narrow(-1, 0, 1) - s : s;
+        };
+        return { dot(u, u), dot(v, v), dot(u, v) };
+    }
+
+    // pair_combine_out_cpu 의 autograd 경로: A·u + B·v (브로드캐스트)
+    template <typename CoeffFn>
+    inline torch::Tensor pair_combine_autograd(const torch::Tensor& u, const torch::Tensor& v, bool minkowski, CoeffFn coeff_fn) {
+        auto s = pair_invariants_autograd(u, v, minkowski);
+        torch::Tensor coef_u, coef_v;
+        coeff_fn(s[0], s[1], s[2], coef_u, coef_v);
+        return coef_u * u + coef_v * v;
+    }
+
+    // pair_reduce_out_cpu 의 autograd 경로: [..., 1]
+    template <typename Fn>
+    inline torch::Tensor pair_reduce_autograd(const torch::Tensor& u, const torch::Tensor& v, bool minkowski, Fn fn) {
+        auto s = pair_invariants_autograd(u, v, minkowski);
+        return fn(s[0], s[1], s[2]);
+    }
+
+    // row_scale_out_cpu 의 autograd 경로: scale_fn(|x|²)·x
+    template <typename ScaleFn>
+    inline torch::Tensor row_scale_autograd(const torch::Tensor& x, ScaleFn scale_fn) {
+        return scale_fn((x * x).sum(-1, /*keepdim=*/true)) * x;
+    }
+
+    // 행별 |x|² 를 누산 타입 (fp32, double 은 fp64) [B,1] 로 계산 (저정밀도 입력을 통째로 올리지 않음)
+    inline torch::Tensor row_norm_sq_cpu(torch::Tensor x) {
+        x = x.contiguous();
+        int64_t B = x.size(0), D = x.size(1);
+        auto out = torch::empty({ B, 1 }, x.options().dtype(at::toOpMathType(x.scalar_type())));
+        RS_DISPATCH_FLOAT_TYPES(x.scalar_type(), "row_norm_sq_cpu", [&] {
+            const scalar_t* xp = x.data_ptr<scalar_t>();
+            auto* op = out.data_ptr<at::opmath_type<scalar_t>>();
+            at::parallel_for(0, B, row_grain_size(D), [&](int64_t begin, int64_t end) {
+                RowScratch<scalar_t> scratch(1, D);
+                for (int64_t b = begin; b < end; ++b) {
+                    const auto* xb = load_row(xp + b * D, scratch.row(0), D);
+                    op[b] = row_dots<1>({ xb }, { xb }, D)[0];
+                }
+            });
+        });
+        return out;
+    }
+}
@@ -0,0 +1,158 @@
+#pragma once
+#include <torch/extension.h>
+#include <cmath>
+#include <algorithm>
+#include <type_traits>
+
+namespace reality_stone::utils::ad {
+    // 스칼라 인자는 템플릿 추론에서 빼고 Dual 의 값 타입을 따르게 한다
+    template <typename T>
+    struct nondeduced { using type = T; };
+    template <typename T>
+    using nondeduced_t = typename nondeduced<T>::type;
+
+    template <typename T>
+    using enable_if_real_t = std::enable_if_t<std::is_floating_point_v<T>, int>;
+
+    /**
+     * 전진 모드 자동미분용 이원수
+     * 행 단위 스칼라 계수 (노름, 내적의 함수) 의 편미분을 계산할 때 사용
+     * T 는 누산 타입 (fp32, double 입력이면 fp64)
+     */
+    template <int N, typename T = float>
+    struct Dual {
+        T val = T(0);
+        T grad[N] = {};
+
+        Dual() = default;
+        Dual(T v) : val(v) {}
+
+        // i 번째 입력 변수로 초기화
+        static Dual variable(T v, int i) {
+            Dual d(v);
+            d.grad[i] = T(1);
+            return d;
+        }
+    };
+
+    template <int N, typename T>
+    inline Dual<N, T> operator+(const Dual<N, T>& a, const Dual<N, T>& b) {
+        Dual<N, T> r(a.val + b.val);
+        for (int i = 0; i < N; ++i) r.grad[i] = a.grad[i] + b.grad[i];
+        return r;
+    }
+    template <int N, typename T>
+    inline Dual<N, T> operator-(const Dual<N, T>& a, const Dual<N, T>& b) {
+        Dual<N, T> r(a.val - b.val);
+        for (int i = 0; i < N; ++i) r.grad[i] = a.grad[i] - b.grad[i];
+        return r;
+    }
+    template <int N, typename T>
+    inline Dual<N, T> operator-(const Dual<N, T>& a) {
+        Dual<N, T> r(-a.val);
+        for (int i = 0; i < N; ++i) r.grad[i] = -a.grad[i];
+        return r;
+    }
+    template <int N, typename T>
+    inline Dual<N, T> operator*(const Dual<N, T>& a, const Dual<N, T>& b) {
+        Dual<N, T> r(a.val * b.val);
+        for (int i = 0; i < N; ++i) r.grad[i] = a.grad[i] * b.val + a.val * b.grad[i];
+        return r;
+    }
+    template <int N, typename T>
+    inline Dual<N, T> operator/(const Dual<N, T>& a, const Dual<N, T>& b) {
+        Dual<N, T> r(a.val / b.val);
+        T inv = T(1) / b.val;
+        for (int i = 0; i < N; ++i) r.grad[i] = (a.grad[i] - r.val * b.grad[i]) * inv;
+        return r;
+    }
+    template <int N, typename T> inline Dual<N, T> operator+(const Dual<N, T>& a, nondeduced_t<T> b) { return a + Dual<N, T>(b); }
+    template <int N, typename T> inline Dual<N, T> operator+(nondeduced_t<T> a, const Dual<N, T>& b) { return Dual<N, T>(a) + b; }
+    template <int N, typename T> inline Dual<N, T> operator-(const Dual<N, T>& a, nondeduced_t<T> b) { return a - Dual<N, T>(b); }
+    template <int N, typename T> inline Dual<N, T> operator-(nondeduced_t<T> a, const Dual<N, T>& b) { return Dual<N, T>(a) - b; }
+    template <int N, typename T> inline Dual<N, T> operator*(const Dual<N, T>& a, nondeduced_t<T> b) { return a * Dual<N, T>(b); }
+    template <int N, typename T> inline Dual<N, T> operator*(nondeduced_t<T> a, const Dual<N, T>& b) { return Dual<N, T>(a) * b; }
+    template <int N, typename T> inline Dual<N, T> operator/(const Dual<N, T>& a, nondeduced_t<T> b) { return a * (T(1) / b); }
+    template <int N, typename T> inline Dual<N, T> operator/(nondeduced_t<T> a, const Dual<N, T>& b) { return Dual<N, T>(a) / b; }
+
+    // 실수 (float / double) 와 Dual 에 같은 이름으로 쓸 수 있는 수학 함수들
+    template <typename T, enable_if_real_t<T> = 0> inline T value(T x) { return x; }
+    template <int N, typename T> inline T value(const Dual<N, T>& x) { return x.val; }
+
+    template <typename T, enable_if_real_t<T> = 0> inline T sqrt(T x) { return std::sqrt(x); }
+    template <typename T, enable_if_real_t<T> = 0> inline T tanh(T x) { return std::tanh(x); }
+    template <typename T, enable_if_real_t<T> = 0> inline T atanh(T x) { return std::atanh(x); }
+    template <typename T, enable_if_real_t<T> = 0> inline T cosh(T x) { return std::cosh(x); }
+    template <typename T, enable_if_real_t<T> = 0> inline T sinh(T x) { return std::sinh(x); }
+    template <typename T, enable_if_real_t<T> = 0> inline T acosh(T x) { return std::acosh(x); }
+
+    template <int N, typename T>
+    inline Dual<N, T> sqrt(const Dual<N, T>& x) {
+        T s = std::sqrt(x.val);
+        Dual<N, T> r(s);
+        for (int i = 0; i < N; ++i) r.grad[i] = x.grad[i] != T(0) ? x.grad[i] / (T(2) * s) : T(0);
+        return r;
+    }
+    template <int N, typename T>
+    inline Dual<N, T> tanh(const Dual<N, T>& x) {
+        T th = std::tanh(x.val);
+        Dual<N, T> r(th);
+        for (int i = 0; i < N; ++i) r.grad[i] = (T(1) - th * th) * x.grad[i];
+        return r;
+    }
+    template <int N, typename T>
+    inline Dual<N, T> atanh(const Dual<N, T>& x) {
+        Dual<N, T> r(std::atanh(x.val));
+        T d = T(1) / (T(1) - x.val * x.val);
+        for (int i = 0; i < N; ++i) r.grad[i] = d * x.grad[i];
+        return r;
+    }
+    template <int N, typename T>
+    inline Dual<N, T> cosh(const Dual<N, T>& x) {
+        Dual<N, T> r(std::cosh(x.val));
+        T d = std::sinh(x.val);
+        for (int i = 0; i < N; ++i) r.grad[i] = d * x.grad[i];
+        return r;
+    }
+    template <int N, typename T>
+    inline Dual<N, T> sinh(const Dual<N, T>& x) {
+        Dual<N, T> r(std::sinh(x.val));
+        T d = std::cosh(x.val);
+        for (int i = 0; i < N; ++i) r.grad[i] = d * x.grad[i];
+        return r;
+    }
+    template <int N, typename T>
+    inline Dual<N, T> acosh(const Dual<N, T>& x) {
+        Dual<N, T> r(std::acosh(x.val));
+        T d = T(1) / std::sqrt(x.val * x.val - T(1));
+        for (int i = 0; i < N; ++i) r.grad[i] = d * x.grad[i];
+        return r;
+    }
+
+    // torch::clamp_min / clamp_max 와 같은 그래디언트 규칙 (경계값에서는 통과)
+    template <typename T, enable_if_real_t<T> = 0>
+    inline T clamp_min(T x, nondeduced_t<T> lo) { return std::max(x, lo); }
+    template <typename T, enable_if_real_t<T> = 0>
+    inline T clamp_max(T x, nondeduced_t<T> hi) { return std::min(x, hi); }
+    template <int N, typename T>
+    inline Dual<N, T> clamp_min(const Dual<N, T>& x, nondeduced_t<T> lo) { return x.val >= lo ? x : Dual<N, T>(lo); }
+    template <int N, typename T>
+    inline Dual<N, T> clamp_max(const Dual<N, T>& x, nondeduced_t<T> hi) { return x.val <= hi ? x : Dual<N, T>(hi); }
+
+    /**
+     * 행 불변량 텐서 ([..., 1]) 에 대한 같은 이름의 함수들
+     * 계수 템플릿을 autograd 가 필요한 텐서 연산 경로에서도 그대로 평가해 행 커널과 수식을 공유한다
+     */
+    inline torch::Tensor sqrt(const torch::Tensor& x) {
+        // x = 0 에서는 그래디언트를 0 으로 (torch::sqrt 는 0·∞ = NaN)
+        auto zero = x == 0;
+        return torch::where(zero, torch::zeros_like(x), torch::sqrt(torch::where(zero, torch::ones_like(x), x)));
+    }
+    inline torch::Tensor tanh(const torch::Tensor& x) { return torch::tanh(x); }
+    inline torch::Tensor atanh(const torch::Tensor& x) { return torch::atanh(x); }
+    inline torch::Tensor cosh(const torch::Tensor& x) { return torch::cosh(x); }
+    inline torch::Tensor sinh(const torch::Tensor& x) { return torch::sinh(x); }
+    inline torch::Tensor acosh(const torch::Tensor& x) { return torch::acosh(x); }
+    inline torch::Tensor clamp_min(const torch::Tensor& x, double lo) { return x.clamp_min(lo); }
+    inline torch::Tensor clamp_max(const torch::Tensor& x, double hi) { return x.clamp_max(hi); }
+}
@@ -0,0 +1,30 @@
+"""
+테스트 공용 도우미
+포인카레 공 안의 무작위 점과 로렌츠 / 클라인 모델로의 변환
+"""
+
+import torch
+
+
+def poincare_points(n, dim, seed=None, radius=0.8, dtype=torch.float32, uniform=False):
+    """반지름 radius 안의 무작위 점 [n, dim]
+
+    seed 가 없으면 전역 난수 상태를 쓴다. uniform 이면 반지름을 √U 로 뽑아 경계 근처 점을 늘린다.
+    """
+    g = None if seed is None else torch.Generator().manual_seed(seed)
+    x = torch.randn(n, dim, generator=g, dtype=dtype)
+    r = torch.rand(n, 1, generator=g, dtype=dtype)
+    if uniform:
+        r = r ** 0.5
+    return x / x.norm(dim=1, keepdim=True) * r * radius
+
+
+def to_lorentz(x, c):
+    """포인카레 점을 <x,x>_L = 1/c 인 쌍곡면으로"""
+    sq = c * x.pow(2).sum(1, keepdim=True)
+    return torch.cat([(1 + sq), 2 * c ** 0.5 * x], dim=1) / ((1 - sq) * c ** 0.5)
+
+
+def to_klein(x, c):
+    """포인카레 점을 클라인 모델로"""
+    return 2 * x / (1 + c * x.pow(2).sum(1, keepdim=True))
@@ -35,7 +35,18 @@ def run_all_tests():
         'test_lorentz',
         'test_klein',
         'test_models',
-        'test_numerical_stability'
+        'test_numerical_stability',
+        'test_reduced_precision',
+        'test_fused_linear',
+        'test_geodesic_activation',
+        'test_laplace_beltrami',
+        'test_spherical_harmonics',
+        'test_chebyshev',
+        'test_index',
+        'test_cdist',
+        'test_optim',
+        'test_library',
+        'test_import'
     ]
     
     for module_name in test_modules:
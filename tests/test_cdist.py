@@ -0,0 +1,157 @@
+"""
+쌍별 측지 거리 테스트
+GEMM 기반 묶음 cdist 를 쌍마다 계산한 공식과 대조, top-k / 묶음 크기 / autograd
+"""
+
+import torch
+import unittest
+import reality_stone as rs
+from helpers import poincare_points, to_lorentz, to_klein
+
+
+def reference(x, y, model, c):
+    """쌍마다 직접 계산한 측지 거리 [N, M] (float64)"""
+    x, y = x.double()[:, None, :], y.double()[None, :, :]
+    if model == "poincare":
+        num = 2 * c * (x - y).pow(2).sum(-1)
+        den = (1 - c * x.pow(2).sum(-1)) * (1 - c * y.pow(2).sum(-1))
+        arg = 1 + num / den
+    elif model == "lorentz":
+        arg = c * (x[..., 0] * y[..., 0] - (x[..., 1:] * y[..., 1:]).sum(-1))
+    else:
+        num = 1 - c * (x * y).sum(-1)
+        den = ((1 - c * x.pow(2).sum(-1)) * (1 - c * y.pow(2).sum(-1))).sqrt()
+        arg = num / den
+    return torch.acosh(arg.clamp_min(1.0)) / c ** 0.5
+
+
+class TestCdist(unittest.TestCase):
+    """rs.cdist 테스트"""
+
+    def setUp(self):
+        self.c = 0.8
+        self.x = poincare_points(37, 5, seed=0, radius=0.9, dtype=torch.float64, uniform=True)
+        self.y = poincare_points(53, 5, seed=1, radius=0.9, dtype=torch.float64, uniform=True)
+        self.inputs = {
+            "poincare": (self.x, self.y),
+            "lorentz": (to_lorentz(self.x, self.c), to_lorentz(self.y, self.c)),
+            "klein": (to_klein(self.x, self.c), to_klein(self.y, self.c)),
+        }
+
+    def test_matches_reference(self):
+        """세 모델 모두 쌍별 공식과 같은 값, 같은 점의 세 모델 거리도 일치"""
+        expected = reference(self.x, self.y, "poincare", self.c)
+        for model, (x, y) in self.inputs.items():
+            with self.subTest(model=model):
+                dist = rs.cdist(x, y, model=model, c=self.c)
+                self.assertEqual(dist.shape, (37, 53))
+                self.assertEqual(dist.dtype, torch.float64)
+                self.assertTrue(torch.allclose(dist, reference(x, y, model, self.c), atol=1e-9))
+                self.assertTrue(torch.allclose(dist, expected, atol=1e-6))
+
+    def test_float32(self):
+        """float32 입력은 float32 결과"""
+        for model, (x, y) in self.inputs.items():
+            with self.subTest(model=model):
+                dist = rs.cdist(x.float(), y.float(), model=model, c=self.c)
+                self.assertEqual(dist.dtype, torch.float32)
+                self.assertTrue(torch.allclose(dist.double(), reference(x, y, model, self.c), atol=5e-3))
+
+    def test_chunking_invariant(self):
+        """묶음 크기와 무관한 결과"""
+        full = rs.cdist(self.x, self.y, c=self.c)
+        for chunk_size in (1, 5, 100):
+            with self.subTest(chunk_size=chunk_size):
+                self.assertTrue(torch.allclose(rs.cdist(self.x, self.y, c=self.c, chunk_size=chunk_size), full))
+
+    def test_topk(self):
+        """fused top-k 가 전체 거리 행렬의 top-k 와 같음"""
+        for model, (x, y) in self.inputs.items():
+            with self.subTest(model=model):
+                full = rs.cdist(x, y, model=model, c=self.c)
+                expected, expected_idx = full.topk(7, dim=1, largest=False)
+                dist, idx = rs.cdist(x, y, model=model, c=self.c, k=7, chunk_size=4)
+                self.assertEqual(idx.shape, (37, 7))
+                self.assertTrue(torch.allclose(dist, expected, atol=1e-9))
+                self.assertTrue(torch.equal(idx, expected_idx))
+
+    def test_near_duplicates(self):
+        """1e-4 ~ 2e-4 떨어진 float32 점의 거리가 0 이 되지 않고 (GEMM 상쇄), top-k 첫 이웃은 자기 짝"""
+        g = torch.Generator().manual_seed(2)
+        offsets = torch.randn(37, 5, generator=g, dtype=torch.float64)
+        scale = 1e-4 * (1 + torch.arange(37, dtype=torch.float64)[:, None] / 37)
+        x = self.x * 0.8
+        y = torch.cat([x + offsets / offsets.norm(dim=1, keepdim=True) * scale, self.y * 0.8])
+        expected = reference(x, y, "poincare", self.c)
+        expected_values, _ = expected.topk(3, dim=1, largest=False)
+        convert = {"poincare": lambda p, c: p, "lorentz": to_lorentz, "klein": to_klein}
+        for model, to_model in convert.items():
+            xm, ym = to_model(x, self.c).float(), to_model(y, self.c).float()
+            with self.subTest(model=model):
+                dist = rs.cdist(xm, ym, model=model, c=self.c)
+                torch.testing.assert_close(dist.double(), expected, rtol=1e-2, atol=1e-6)
+                values, idx = rs.cdist(xm, ym, model=model, c=self.c, k=3, chunk_size=8)
+                torch.testing.assert_close(values.double(), expected_values, rtol=1e-2, atol=1e-6)
+                self.assertTrue(torch.equal(idx[:, 0], torch.arange(37)))
+                # CUDA 가 쓰는 텐서 연산 경로도 같은 거리와 순서
+                values, idx = rs._cdist_torch(xm, ym, model, self.c, 3, 8)
+                torch.testing.assert_close(values.double(), expected_values, rtol=1e-2, atol=1e-6)
+                self.assertTrue(torch.equal(idx[:, 0], torch.arange(37)))
+
+    def test_near_duplicate_gradients(self):
+        """가까운 float32 쌍의 그래디언트가 0 이 되지 않고 float64 기준과 같다, 같은 점은 그래디언트가 유한"""
+        g = torch.Generator().manual_seed(3)
+        offsets = torch.randn(37, 5, generator=g, dtype=torch.float64)
+        x = self.x * 0.8
+        y = x + offsets / offsets.norm(dim=1, keepdim=True) * 1e-4
+        convert = {"poincare": lambda p, c: p, "lorentz": to_lorentz, "klein": to_klein}
+        paths = {
+            "kernel": lambda a, b, model: rs.cdist(a, b, model=model, c=self.c),
+            "torch": lambda a, b, model: rs._cdist_torch(a, b, model, self.c, None, 8),
+        }
+        u = torch.randn(37, 5, generator=g, dtype=torch.float64)
+        for model, to_model in convert.items():
+            xm, ym = to_model(x, self.c), to_model(y, self.c)
+            if model == "lorentz":
+                # 쌍곡면 밖에서는 식마다 값이 달라 접방향 (<x,v>_L = 0) 미분만 비교
+                v = torch.cat([(xm[:, 1:] * u).sum(-1, keepdim=True) / xm[:, :1], u], 1)
+                project = lambda grad: (grad.double() * v).sum(-1)
+            else:
+                project = lambda grad: grad.double()
+            expected = xm.clone().requires_grad_()
+            reference(expected, ym, model, self.c).diagonal().sum().backward()
+            for path, fn in paths.items():
+                with self.subTest(model=model, path=path):
+                    xf = xm.float().requires_grad_()
+                    fn(xf, ym.float(), model).diagonal().sum().backward()
+                    self.assertGreater(xf.grad.norm().item(), 0)
+                    torch.testing.assert_close(project(xf.grad), project(expected.grad), rtol=2e-2, atol=1e-3)
+
+                    xf = xm.float().requires_grad_()
+                    fn(xf, xf.detach(), model).sum().backward()
+                    self.assertTrue(torch.isfinite(xf.grad).all())
+
+    def test_autograd(self):
+        """requires_grad 입력은 미분 가능한 경로"""
+        x = self.x.clone().requires_grad_(True)
+        y = self.y.clone().requires_grad_(True)
+        dist = rs.cdist(x, y, c=self.c)
+        self.assertTrue(torch.allclose(dist.detach(), reference(self.x, self.y, "poincare", self.c), atol=1e-9))
+        dist.sum().backward()
+        expected_x = self.x.clone().requires_grad_(True)
+        reference(expected_x, self.y, "poincare", self.c).sum().backward()
+        self.assertTrue(torch.allclose(x.grad, expected_x.grad, atol=1e-6))
+        self.assertIsNotNone(y.grad)
+
+    def test_invalid_arguments(self):
+        """지원하지 않는 모델 / 차원 불일치 / 너무 큰 k 는 오류"""
+        with self.assertRaises(ValueError):
+            rs.cdist(self.x, self.y, model="sphere")
+        with self.assertRaises(RuntimeError):
+            rs.cdist(self.x, self.y[:, :3])
+        with self.assertRaises(RuntimeError):
+            rs.cdist(self.x, self.y, k=100)
+
+
+if __name__ == "__main__":
+    unittest.main(verbosity=2)
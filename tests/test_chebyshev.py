@@ -0,0 +1,107 @@
+"""
+체비셰프 보조 함수 테스트
+행렬 형태의 평가 / 미분 / 적분 연산자와 PyTorch fallback
+"""
+
+import numpy as np
+import torch
+import unittest
+import reality_stone.advanced as advanced
+
+
+class TestChebyshevOperators(unittest.TestCase):
+    """inverse_chebyshev_transform, chebyshev_derivative, chebyshev_integral 테스트"""
+
+    def setUp(self):
+        torch.manual_seed(0)
+        self.coeffs = torch.randn(3, 4, 9, dtype=torch.float64)
+        self.points = torch.linspace(-0.95, 0.95, 17, dtype=torch.float64)
+
+    def reference(self, coeffs, points):
+        """numpy.polynomial.chebyshev 로 행별 평가"""
+        flat = coeffs.reshape(-1, coeffs.size(-1)).numpy()
+        values = np.stack([np.polynomial.chebyshev.chebval(points.numpy(), c) for c in flat])
+        return torch.from_numpy(values).reshape(*coeffs.shape[:-1], points.numel())
+
+    def test_inverse_transform(self):
+        """임의의 선행 차원에서 numpy 평가와 같음"""
+        for fn in (advanced.inverse_chebyshev_transform, advanced._inverse_chebyshev_transform_torch):
+            with self.subTest(fn=fn.__name__):
+                result = fn(self.coeffs, self.points)
+                self.assertEqual(result.shape, (3, 4, 17))
+                self.assertTrue(torch.allclose(result, self.reference(self.coeffs, self.points), atol=1e-10))
+
+    def test_default_nodes(self):
+        """eval_points 를 생략하면 n 개의 체비셰프 점에서 평가"""
+        coeffs = self.coeffs[0, 0].float()
+        nodes = advanced.chebyshev_nodes(coeffs.numel())
+        expected = advanced.inverse_chebyshev_transform(coeffs, nodes)
+        self.assertTrue(torch.allclose(advanced.inverse_chebyshev_transform(coeffs), expected))
+
+    def test_derivative(self):
+        """미분 계수가 numpy chebder 와 같음 (T_1' = T_0 포함)"""
+        expected = torch.from_numpy(np.polynomial.chebyshev.chebder(self.coeffs.numpy(), axis=-1))
+        for fn in (advanced.chebyshev_derivative, advanced._chebyshev_derivative_torch):
+            with self.subTest(fn=fn.__name__):
+                result = fn(self.coeffs)
+                self.assertEqual(result.shape, (3, 4, 8))
+                self.assertTrue(torch.allclose(result, expected, atol=1e-10))
+                self.assertEqual(fn(self.coeffs[..., :1]).shape, (3, 4, 1))
+
+    def test_integral(self):
+        """적분 후 미분하면 원래 계수, 상수항은 constant"""
+        for fn in (advanced.chebyshev_integral, advanced._chebyshev_integral_torch):
+            with self.subTest(fn=fn.__name__):
+                integral = fn(self.coeffs, 0.25)
+                self.assertEqual(integral.shape, (3, 4, 10))
+                self.assertTrue(torch.allclose(integral[..., 0], torch.full((3, 4), 0.25, dtype=torch.float64)))
+                self.assertTrue(torch.allclose(advanced.chebyshev_derivative(integral), self.coeffs, atol=1e-10))
+
+    def test_autograd(self):
+        """fallback 연산자는 계수에 대해 미분 가능"""
+        coeffs = self.coeffs.clone().requires_grad_()
+        advanced._chebyshev_integral_torch(advanced._chebyshev_derivative_torch(coeffs), 1.0).sum().backward()
+        self.assertEqual(coeffs.grad.shape, coeffs.shape)
+
+
+class TestChebyshevApproximation(unittest.TestCase):
+    """chebyshev_approximation (Clenshaw 평가) 테스트"""
+
+    def setUp(self):
+        torch.manual_seed(0)
+        # c ≤ 1 이면 근사 구간은 |√c·x| ≤ 3
+        self.x = (torch.rand(64, 33) * 2 - 1) * 2.5
+
+    def test_approximates_tanh(self):
+        """|√c·x| ≤ L 구간에서 tanh(√c·x) 에 수렴"""
+        for c in (0.5, 1.0):
+            with self.subTest(c=c):
+                result = advanced.chebyshev_approximation(self.x, order=15, curvature=c)
+                self.assertEqual(result.shape, self.x.shape)
+                expected = torch.tanh(np.sqrt(c) * self.x)
+                self.assertLess((result - expected).abs().max().item(), 1e-3)
+
+    def test_arguments_not_pinned(self):
+        """차수와 곡률을 바꾸면 첫 호출의 계수표를 재사용하지 않음"""
+        low = advanced.chebyshev_approximation(self.x, order=5, curvature=1.0)
+        high = advanced.chebyshev_approximation(self.x, order=15, curvature=1.0)
+        other = advanced.chebyshev_approximation(self.x, order=15, curvature=0.25)
+        self.assertFalse(torch.allclose(low, high))
+        self.assertTrue(torch.allclose(other, torch.tanh(0.5 * self.x), atol=1e-3))
+        self.assertTrue(torch.equal(high, advanced.chebyshev_approximation(self.x, order=15, curvature=1.0)))
+
+    def test_autograd_and_dtypes(self):
+        """미분 가능한 경로와 원소 커널이 같은 값, double / half 입력 지원"""
+        expected = advanced.chebyshev_approximation(self.x.double(), order=15)
+        x = self.x.double().requires_grad_()
+        result = advanced.chebyshev_approximation(x, order=15)
+        self.assertTrue(torch.allclose(result, expected, atol=1e-12))
+        result.sum().backward()
+        self.assertLess((x.grad - (1 - torch.tanh(self.x.double()) ** 2)).abs().max().item(), 2e-2)
+        half = advanced.chebyshev_approximation(self.x.half(), order=15)
+        self.assertEqual(half.dtype, torch.float16)
+        self.assertTrue(torch.allclose(half.float(), expected.float(), atol=2e-3))
+
+
+if __name__ == "__main__":
+    unittest.main(verbosity=2)
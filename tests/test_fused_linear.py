@@ -0,0 +1,96 @@
+"""
+텐서 곡률 퓨즈드 하이퍼볼릭 선형 레이어 테스트
+곡률은 스칼라 또는 배치별 [B] 텐서, .item() 없이 그래프 안에서 계산
+"""
+
+import torch
+import unittest
+from unittest import mock
+import reality_stone.advanced as advanced
+from reality_stone.advanced import AdvancedConfig, hyperbolic_linear_fused
+from reality_stone.layers import HyperbolicLinearAdvanced, DynamicCurvatureMLP
+
+
+class TestFusedLinear(unittest.TestCase):
+    """hyperbolic_linear_fused 테스트"""
+
+    def setUp(self):
+        torch.manual_seed(0)
+        self.x = torch.randn(8, 5) * 0.3
+        self.weight = torch.randn(4, 5) * 0.2
+        self.bias = torch.randn(4) * 0.05
+        self.c = torch.rand(8) + 0.5
+
+    def test_kernel_matches_reference(self):
+        """CPU 에필로그 커널이 텐서 연산 경로와 같음"""
+        for c in [self.c, self.c.unsqueeze(1), torch.tensor(0.7), 0.7]:
+            with self.subTest(shape=getattr(c, "shape", None)):
+                expected = advanced._hyperbolic_linear_torch(
+                    self.x, self.weight, self.bias, torch.as_tensor(c))
+                result = hyperbolic_linear_fused(self.x, self.weight, self.bias, c)
+                self.assertTrue(torch.allclose(result, expected, atol=1e-6))
+
+    def test_per_sample_rows(self):
+        """배치별 곡률은 행마다 각자의 곡률로 계산"""
+        result = hyperbolic_linear_fused(self.x, self.weight, self.bias, self.c)
+        for b in range(self.x.size(0)):
+            row = hyperbolic_linear_fused(self.x[b:b+1], self.weight, self.bias, self.c[b])
+            self.assertTrue(torch.allclose(result[b], row[0], atol=1e-6))
+
+    def test_gradient_reaches_curvature(self):
+        """곡률 텐서와 가중치까지 그래디언트가 흐름"""
+        c = self.c.clone().requires_grad_()
+        weight = self.weight.clone().requires_grad_()
+        hyperbolic_linear_fused(self.x, weight, self.bias, c).sum().backward()
+        self.assertTrue(torch.all(torch.isfinite(c.grad)))
+        self.assertGreater(c.grad.abs().sum().item(), 0.0)
+        self.assertGreater(weight.grad.abs().sum().item(), 0.0)
+
+
+class TestTensorCurvatureLayers(unittest.TestCase):
+    """동적 곡률 레이어가 곡률 예측기까지 학습되는지 테스트"""
+
+    def test_dynamic_curvature_mlp(self):
+        """DynamicCurvatureMLP 의 곡률 예측기에 그래디언트 전달"""
+        torch.manual_seed(0)
+        model = DynamicCurvatureMLP(input_dim=12, hidden_dim=6, output_dim=3)
+        out = model(torch.randn(5, 12))
+        self.assertEqual(out.shape, (5, 3))
+        out.sum().backward()
+        self.assertIsNotNone(model.curvature_predictor.curvature_weight.grad)
+        self.assertTrue(torch.all(torch.isfinite(model.curvature_predictor.curvature_weight.grad)))
+
+    def test_hyperbolic_linear_advanced(self):
+        """HyperbolicLinearAdvanced 가 정적/동적 곡률 모두에서 동작"""
+        torch.manual_seed(0)
+        x = torch.randn(4, 6) * 0.3
+        for dynamic in [False, True]:
+            with self.subTest(dynamic=dynamic):
+                config = AdvancedConfig(enable_fused_ops=True, enable_dynamic_curvature=dynamic)
+                layer = HyperbolicLinearAdvanced(6, 3, config)
+                out = layer(x)
+                self.assertEqual(out.shape, (4, 3))
+                out.sum().backward()
+                self.assertTrue(torch.all(torch.isfinite(layer.weight.grad)))
+
+    def test_regularization_uses_curvature_buffer(self):
+        """정규화 손실은 고정 곡률이면 curvature 버퍼를, 동적 곡률이면 base_curvature 를 쓴다"""
+        x = torch.randn(4, 6) * 0.3
+        for dynamic in [False, True]:
+            with self.subTest(dynamic=dynamic):
+                config = AdvancedConfig(enable_dynamic_curvature=dynamic, base_curvature=0.7)
+                layer = HyperbolicLinearAdvanced(6, 3, config)
+                if not dynamic:
+                    layer.curvature.fill_(1.5)
+                with mock.patch("reality_stone.layers.hyperbolic_regularization",
+                                return_value=torch.tensor(0.0)) as reg:
+                    layer.compute_regularization_loss(x)
+                curvature = reg.call_args.args[2]
+                if dynamic:
+                    self.assertEqual(curvature, 0.7)
+                else:
+                    self.assertIs(curvature, layer.curvature)
+
+
+if __name__ == "__main__":
+    unittest.main(verbosity=2)
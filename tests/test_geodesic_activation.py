@@ -0,0 +1,122 @@
+"""
+측지선 활성화 / Einstein 중점 테스트
+배치 [B, K, D] 입력, 공유 [K] 또는 배치별 [B, K] 가중치, 다중 측지선 혼합
+"""
+
+import torch
+import unittest
+import reality_stone.advanced as advanced
+from reality_stone.advanced import einstein_midpoint, multi_geodesic_mixing
+from reality_stone.layers import GeodesicActivationLayer
+
+
+def reference_midpoint(points, weights, curvature):
+    """행·점 단위 루프 기준 구현"""
+    sqrt_c = curvature ** 0.5
+    result = torch.zeros(points.size(0), points.size(2), dtype=torch.float64)
+    for b in range(points.size(0)):
+        acc = torch.zeros(points.size(2), dtype=torch.float64)
+        w = weights[b] if weights.dim() == 2 else weights
+        for k in range(points.size(1)):
+            x = points[b, k].double()
+            n = x.norm()
+            acc += w[k].double() * torch.atanh(torch.clamp(sqrt_c * n, -0.99, 0.99)) / (sqrt_c * n + 1e-7) * x
+        n = acc.norm()
+        result[b] = torch.tanh(torch.clamp(sqrt_c * n, -88.0, 88.0)) / (sqrt_c * n + 1e-7) * acc
+    return result
+
+
+class TestEinsteinMidpoint(unittest.TestCase):
+    """einstein_midpoint 테스트"""
+
+    def setUp(self):
+        torch.manual_seed(0)
+        self.points = torch.randn(6, 5, 7) * 0.2
+        self.curvature = 0.8
+
+    def test_shared_weights(self):
+        """공유 가중치 [K] 결과가 루프 기준 구현과 같음"""
+        weights = torch.softmax(torch.randn(5), 0)
+        result = einstein_midpoint(self.points, weights, self.curvature)
+        expected = reference_midpoint(self.points, weights, self.curvature)
+        self.assertEqual(result.shape, (6, 7))
+        self.assertTrue(torch.allclose(result.double(), expected, atol=1e-5))
+
+    def test_per_batch_weights(self):
+        """배치별 가중치 [B, K]"""
+        weights = torch.softmax(torch.randn(6, 5), 1)
+        result = einstein_midpoint(self.points, weights, self.curvature)
+        expected = reference_midpoint(self.points, weights, self.curvature)
+        self.assertTrue(torch.allclose(result.double(), expected, atol=1e-5))
+        fallback = advanced._einstein_midpoint_torch(self.points, weights, self.curvature)
+        self.assertTrue(torch.allclose(result, fallback, atol=1e-6))
+
+    def test_reduced_precision(self):
+        """bfloat16 입력은 fp32 누산 후 입력 타입으로 저장"""
+        weights = torch.softmax(torch.randn(5), 0)
+        result = einstein_midpoint(self.points.bfloat16(), weights, self.curvature)
+        self.assertEqual(result.dtype, torch.bfloat16)
+        expected = reference_midpoint(self.points.bfloat16().float(), weights, self.curvature)
+        self.assertTrue(torch.allclose(result.double(), expected, atol=2e-2))
+
+    def test_gradient(self):
+        """그래디언트가 필요하면 미분 가능한 경로 사용"""
+        points = self.points.clone().requires_grad_()
+        weights = torch.softmax(torch.randn(5), 0).requires_grad_()
+        einstein_midpoint(points, weights, self.curvature).sum().backward()
+        self.assertTrue(torch.all(torch.isfinite(points.grad)))
+        self.assertTrue(torch.all(torch.isfinite(weights.grad)))
+
+    def test_bad_weight_shape(self):
+        """가중치 모양이 맞지 않으면 오류"""
+        with self.assertRaises(RuntimeError):
+            einstein_midpoint(self.points, torch.ones(4), self.curvature)
+
+
+def reference_mixing(x, anchors, t_values, weights, curvature):
+    """(b, k) 이중 루프 기준 구현"""
+    t = torch.sigmoid(t_values)
+    w = torch.softmax(weights, 0)
+    result = torch.zeros_like(x)
+    for b in range(x.size(0)):
+        mixed = torch.zeros(x.size(1))
+        total = 0.0
+        for k in range(anchors.size(0)):
+            scaled = t[k] * x[b]
+            geodesic_point = scaled / (1.0 + curvature * torch.sum(scaled * scaled))
+            mw = w[k] * torch.exp(-torch.norm(x[b] - anchors[k]))
+            mixed += mw * geodesic_point
+            total += mw
+        result[b] = mixed / (total + 1e-7)
+    return result
+
+
+class TestMultiGeodesicMixing(unittest.TestCase):
+    """multi_geodesic_mixing 테스트"""
+
+    def setUp(self):
+        torch.manual_seed(0)
+        self.x = torch.randn(9, 4) * 0.3
+        self.anchors = torch.randn(6, 4) * 0.3
+        self.t_values = torch.randn(6)
+        self.weights = torch.randn(6)
+
+    def test_matches_loop(self):
+        """배치 연산 결과가 이중 루프 기준 구현과 같음"""
+        args = (self.x, self.anchors, self.t_values, self.weights, 0.7)
+        expected = reference_mixing(*args)
+        self.assertTrue(torch.allclose(multi_geodesic_mixing(*args), expected, atol=1e-6))
+        self.assertTrue(torch.allclose(advanced._multi_geodesic_mixing_torch(*args), expected, atol=1e-6))
+
+    def test_layer_many_anchors(self):
+        """GeodesicActivationLayer 가 많은 앵커에서도 동작하고 파라미터가 학습됨"""
+        layer = GeodesicActivationLayer(input_dim=8, num_anchors=64)
+        out = layer(torch.randn(256, 8) * 0.3)
+        self.assertEqual(out.shape, (256, 8))
+        out.sum().backward()
+        for p in (layer.anchors, layer.t_values, layer.anchor_weights):
+            self.assertTrue(torch.all(torch.isfinite(p.grad)))
+
+
+if __name__ == "__main__":
+    unittest.main(verbosity=2)
@@ -0,0 +1,76 @@
+"""
+패키지 import 테스트
+import 는 부작용이 없고 (_C 로드, CUDA 조사, 출력, op 등록 없음) 시간 예산 안에 끝나며, 커널은 처음 쓸 때 불러온다
+"""
+
+import json
+import os
+import subprocess
+import sys
+import unittest
+
+# torch 를 불러온 뒤 `import reality_stone` 에 쓸 수 있는 시간 (초)
+IMPORT_BUDGET = 0.08
+
+PROBE = r"""
+import json, sys, time
+import torch
+
+cuda_probes = []
+torch.cuda.is_available = lambda: cuda_probes.append(1) or False
+
+start = time.perf_counter()
+import reality_stone as rs
+elapsed = time.perf_counter() - start
+
+from reality_stone import library
+state = {
+    "elapsed": elapsed,
+    "extension_loaded": "reality_stone._C" in sys.modules,
+    "ops_registered": bool(library._OPS),
+    "cuda_probes": len(cuda_probes),
+}
+x = torch.zeros(2, 3)
+rs.mobius_add(x, x, 1.0)
+state["extension_loaded_after_use"] = "reality_stone._C" in sys.modules
+state["kernel_symbol"] = callable(rs.mobius_add_cpu)
+print("STATE" + json.dumps(state))
+"""
+
+
+def probe():
+    """새 인터프리터에서 import 를 측정 (stdout, 상태)"""
+    result = subprocess.run([sys.executable, "-c", PROBE], capture_output=True, text=True,
+                            env=os.environ.copy(), check=True)
+    lines = result.stdout.splitlines()
+    state = json.loads(lines[-1][len("STATE"):])
+    return lines[:-1], state
+
+
+class TestImport(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls):
+        cls.runs = [probe() for _ in range(3)]
+
+    def test_side_effect_free(self):
+        """import 시 _C 를 불러오지 않고, CUDA 를 조사하지 않고, 아무것도 출력하지 않는다"""
+        output, state = self.runs[0]
+        self.assertEqual(output, [])
+        self.assertFalse(state["extension_loaded"])
+        self.assertFalse(state["ops_registered"])
+        self.assertEqual(state["cuda_probes"], 0)
+
+    def test_lazy_resolution(self):
+        """첫 사용에서 _C 와 커널 심볼이 해석된다"""
+        _, state = self.runs[0]
+        self.assertTrue(state["extension_loaded_after_use"])
+        self.assertTrue(state["kernel_symbol"])
+
+    def test_import_budget(self):
+        """import 시간이 예산 안 (세 번 중 가장 빠른 값)"""
+        elapsed = min(state["elapsed"] for _, state in self.runs)
+        self.assertLess(elapsed, IMPORT_BUDGET, f"import reality_stone took {elapsed * 1000:.1f} ms")
+
+
+if __name__ == "__main__":
+    unittest.main()
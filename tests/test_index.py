@@ -0,0 +1,226 @@
+"""
+최근접 이웃 인덱스 테스트
+VP-트리 k-NN / 반경 질의를 전수 비교와 대조, HNSW / 양자화 저장소 재현율, 저장 / 불러오기
+"""
+
+import os
+import tempfile
+import torch
+import unittest
+from reality_stone.index import HNSWIndex, QuantizedPoincareStore, VPTreeIndex, _pairwise_distance_torch
+from helpers import poincare_points, to_lorentz
+
+
+class TestVPTreeIndex(unittest.TestCase):
+    """VPTreeIndex 테스트"""
+
+    def setUp(self):
+        self.c = 0.7
+        self.points = poincare_points(3000, 4, seed=0, radius=0.95, dtype=torch.float64, uniform=True)
+        self.queries = poincare_points(40, 4, seed=1, radius=0.95, dtype=torch.float64, uniform=True)
+
+    def brute_force(self, queries, points, model="poincare"):
+        return _pairwise_distance_torch(queries, points, model, self.c)
+
+    def test_knn_exact(self):
+        """k-NN 이 전수 비교와 같은 이웃과 거리"""
+        index = VPTreeIndex(self.points, c=self.c, leaf_size=8)
+        distances, indices = index.search(self.queries, 10)
+        self.assertEqual(indices.shape, (40, 10))
+        expected, expected_idx = self.brute_force(self.queries, self.points).topk(10, dim=1, largest=False)
+        self.assertTrue(torch.allclose(distances, expected, atol=1e-9))
+        self.assertTrue(torch.equal(indices, expected_idx))
+        self.assertTrue(torch.all(distances[:, 1:] >= distances[:, :-1]))
+
+    def test_lorentz_model(self):
+        """로렌츠 좌표의 인덱스가 같은 점의 포인카레 인덱스와 같은 결과"""
+        index = VPTreeIndex(to_lorentz(self.points, self.c), model="lorentz", c=self.c)
+        distances, indices = index.search(to_lorentz(self.queries, self.c), 5)
+        expected, expected_idx = self.brute_force(self.queries, self.points).topk(5, dim=1, largest=False)
+        self.assertTrue(torch.allclose(distances, expected, atol=1e-6))
+        self.assertTrue(torch.equal(indices, expected_idx))
+
+    def test_radius_search(self):
+        """반경 안의 점 집합이 전수 비교와 같음"""
+        index = VPTreeIndex(self.points.float(), c=self.c)
+        radius = 1.5
+        distances, indices = index.radius_search(self.queries.float(), radius)
+        full = self.brute_force(self.queries.float(), self.points.float())
+        for q in range(self.queries.size(0)):
+            expected = torch.nonzero(full[q] <= radius).flatten()
+            self.assertEqual(set(indices[q].tolist()), set(expected.tolist()))
+            self.assertTrue(torch.all(distances[q][1:] >= distances[q][:-1]))
+            self.assertEqual(distances[q].dtype, torch.float32)
+
+    def test_small_index(self):
+        """k 가 점 개수보다 크면 inf / -1 로 채우고, 1차원 쿼리는 한 행 결과"""
+        index = VPTreeIndex(self.points[:3], c=self.c)
+        distances, indices = index.search(self.queries[0], 5)
+        self.assertEqual(indices.shape, (5,))
+        self.assertEqual(sorted(indices[:3].tolist()), [0, 1, 2])
+        self.assertTrue(torch.all(indices[3:] == -1))
+        self.assertTrue(torch.all(torch.isinf(distances[3:])))
+
+    def test_save_load(self):
+        """저장한 인덱스를 불러와도 같은 결과"""
+        index = VPTreeIndex(self.points, c=self.c)
+        expected = index.search(self.queries, 7)
+        with tempfile.TemporaryDirectory() as tmp:
+            path = os.path.join(tmp, "index.pt")
+            index.save(path)
+            loaded = VPTreeIndex.load(path)
+        self.assertEqual(len(loaded), len(index))
+        result = loaded.search(self.queries, 7)
+        self.assertTrue(torch.equal(result[0], expected[0]))
+        self.assertTrue(torch.equal(result[1], expected[1]))
+
+    def test_invalid_model(self):
+        """지원하지 않는 모델은 오류"""
+        with self.assertRaises(ValueError):
+            VPTreeIndex(self.points, model="klein")
+
+
+class TestHNSWIndex(unittest.TestCase):
+    """HNSWIndex 테스트"""
+
+    def setUp(self):
+        self.c = 0.7
+        self.points = poincare_points(3000, 4, seed=0, radius=0.95, dtype=torch.float64, uniform=True).float()
+        self.queries = poincare_points(100, 4, seed=1, radius=0.95, dtype=torch.float64, uniform=True).float()
+
+    def recall(self, indices, points, queries, k=10):
+        expected = _pairwise_distance_torch(queries, points, "poincare", self.c).topk(k, dim=1, largest=False)[1]
+        hits = sum(len(set(a.tolist()) & set(b.tolist())) for a, b in zip(indices, expected))
+        return hits / expected.numel()
+
+    def test_recall(self):
+        """ef 가 충분하면 전수 비교와 거의 같은 이웃, 거리는 정확"""
+        index = HNSWIndex(4, c=self.c, M=8, ef_construction=100)
+        ids = index.add(self.points)
+        self.assertTrue(torch.equal(ids, torch.arange(3000)))
+        distances, indices = index.search(self.queries, 10, ef=100)
+        self.assertEqual(indices.shape, (100, 10))
+        self.assertGreaterEqual(self.recall(indices, self.points, self.queries), 0.95)
+        exact = _pairwise_distance_torch(self.queries, self.points, "poincare", self.c).gather(1, indices)
+        self.assertTrue(torch.allclose(distances, exact.float(), atol=1e-4))
+        self.assertTrue(torch.all(distances[:, 1:] >= distances[:, :-1]))
+
+    def test_incremental_insert(self):
+        """여러 번 나눠 넣어도 번호가 이어지고 재현율 유지"""
+        index = HNSWIndex(4, c=self.c, M=8, ef_construction=100)
+        for chunk in self.points.split(700):
+            index.add(chunk)
+        self.assertEqual(len(index), 3000)
+        _, indices = index.search(self.queries, 10, ef=100)
+        self.assertGreaterEqual(self.recall(indices, self.points, self.queries), 0.95)
+
+    def test_lorentz_model(self):
+        """로렌츠 좌표의 인덱스도 같은 점의 포인카레 이웃을 찾음"""
+        index = HNSWIndex(5, model="lorentz", c=self.c, M=8, ef_construction=100, dtype=torch.float64)
+        index.add(to_lorentz(self.points.double(), self.c))
+        _, indices = index.search(to_lorentz(self.queries.double(), self.c), 10, ef=100)
+        self.assertGreaterEqual(self.recall(indices, self.points, self.queries), 0.95)
+
+    def test_small_index(self):
+        """빈 인덱스와 k 보다 작은 인덱스는 inf / -1 로 채움"""
+        index = HNSWIndex(4, c=self.c)
+        distances, indices = index.search(self.queries[:2], 3)
+        self.assertTrue(torch.all(indices == -1))
+        index.add(self.points[:2])
+        distances, indices = index.search(self.queries[0], 3)
+        self.assertEqual(sorted(indices[:2].tolist()), [0, 1])
+        self.assertEqual(indices[2].item(), -1)
+        self.assertTrue(torch.isinf(distances[2]))
+
+    def test_save_load(self):
+        """저장한 인덱스를 (메모리 매핑으로) 불러와도 같은 결과, 이어서 삽입 가능"""
+        index = HNSWIndex(4, c=self.c, M=8)
+        index.add(self.points[:2000])
+        expected = index.search(self.queries, 10)
+        with tempfile.TemporaryDirectory() as tmp:
+            path = os.path.join(tmp, "hnsw.pt")
+            index.save(path)
+            for mmap in (False, True):
+                loaded = HNSWIndex.load(path, mmap=mmap)
+                result = loaded.search(self.queries, 10)
+                self.assertTrue(torch.equal(result[1], expected[1]))
+                self.assertTrue(torch.equal(result[0], expected[0]))
+            loaded.add(self.points[2000:])
+        self.assertEqual(len(loaded), 3000)
+        _, indices = loaded.search(self.queries, 10, ef=100)
+        self.assertGreaterEqual(self.recall(indices, self.points, self.queries), 0.9)
+
+
+class TestQuantizedPoincareStore(unittest.TestCase):
+    """QuantizedPoincareStore 테스트"""
+
+    def setUp(self):
+        self.c = 0.7
+        self.points = poincare_points(4000, 16, seed=0, radius=0.95, dtype=torch.float64, uniform=True).float()
+        self.queries = poincare_points(50, 16, seed=1, radius=0.95, dtype=torch.float64, uniform=True).float()
+        self.exact = _pairwise_distance_torch(self.queries, self.points, "poincare", self.c)
+
+    def recall(self, indices, k=10):
+        expected = self.exact.topk(k, dim=1, largest=False)[1]
+        hits = sum(len(set(a.tolist()) & set(b.tolist())) for a, b in zip(indices, expected))
+        return hits / expected.numel()
+
+    def test_compression(self):
+        """점당 (부분 공간 수 + 1) 바이트, 복원한 점은 원래 점 근처"""
+        store = QuantizedPoincareStore(16, c=self.c, num_subspaces=8)
+        store.add(self.points)
+        self.assertEqual(store.codes.dtype, torch.uint8)
+        self.assertEqual(store.nbytes - store.codebooks.numel() * 4 - store.radius_levels.numel() * 4, 4000 * 9)
+        decoded = store.decode()
+        self.assertTrue(torch.all(decoded.norm(dim=1) < 1 / self.c ** 0.5))
+        error = _pairwise_distance_torch(decoded, self.points, "poincare", self.c).diagonal()
+        self.assertLess(error.mean().item(), 0.5 * self.exact.mean().item())
+
+    def test_approximate_distances(self):
+        """코드로 계산한 근사 거리가 복원한 점까지의 정확한 거리와 일치"""
+        store = QuantizedPoincareStore(16, c=self.c, num_subspaces=8)
+        store.add(self.points)
+        distances, indices = store.search(self.queries, 20)
+        decoded = store.decode(indices.flatten()).view(50, 20, 16)
+        expected = torch.stack([_pairwise_distance_torch(q[None], d, "poincare", self.c)[0]
+                                for q, d in zip(self.queries, decoded)])
+        self.assertTrue(torch.allclose(distances.double(), expected, rtol=1e-3, atol=1e-3))
+        self.assertTrue(torch.all(distances[:, 1:] >= distances[:, :-1]))
+
+    def test_rerank(self):
+        """정확한 재정렬은 거리가 정확하고 재현율이 높음"""
+        store = QuantizedPoincareStore(16, c=self.c, num_subspaces=8, keep_vectors=True)
+        store.add(self.points)
+        distances, indices = store.search(self.queries, 10, rerank=200)
+        self.assertGreaterEqual(self.recall(indices), 0.95)
+        self.assertTrue(torch.allclose(distances.double(), self.exact.gather(1, indices), atol=1e-5))
+        # 원래 좌표를 search 에 직접 넘겨도 같은 결과
+        plain = QuantizedPoincareStore(16, c=self.c, num_subspaces=8)
+        plain.add(self.points)
+        _, same = plain.search(self.queries, 10, rerank=200, vectors=self.points)
+        self.assertTrue(torch.equal(same, indices))
+
+    def test_save_load(self):
+        """저장한 저장소를 (메모리 매핑으로) 불러와도 같은 결과"""
+        store = QuantizedPoincareStore(16, c=self.c, num_subspaces=4)
+        store.train(self.points)
+        store.add(self.points[:3000])
+        expected = store.search(self.queries, 5)
+        with tempfile.TemporaryDirectory() as tmp:
+            path = os.path.join(tmp, "store.pt")
+            store.save(path)
+            for mmap in (False, True):
+                loaded = QuantizedPoincareStore.load(path, mmap=mmap)
+                result = loaded.search(self.queries, 5)
+                self.assertTrue(torch.equal(result[1], expected[1]))
+            loaded.add(self.points[3000:])
+        self.assertEqual(len(loaded), 4000)
+
+    def test_invalid_arguments(self):
+        """차원이 부분 공간 수로 나눠지지 않으면 오류"""
+        with self.assertRaises(ValueError):
+            QuantizedPoincareStore(10, num_subspaces=4)
+
+
+if __name__ == "__main__":
+    unittest.main(verbosity=2)
@@ -87,6 +87,47 @@ class TestKleinOperations(unittest.TestCase):
         except Exception as e:
             self.skipTest(f"klein_layer 이슈: {e}")
 
+    def test_klein_backward_matches_autograd(self):
+        """klein_backward_cpu 가 autograd 의 전체 vector-Jacobian product 와 일치"""
+        c = self.c
+
+        def sq(x):
+            return (x * x).sum(dim=1, keepdim=True)
+
+        def mobius_scalar(x, r):
+            norm = x.norm(dim=1, keepdim=True).clamp_min(1e-6)
+            scn = (c ** 0.5 * norm).clamp(1e-6, 1.0 - 1e-5)
+            return torch.tanh(r * torch.atanh(scn)) * x / (c ** 0.5 * norm)
+
+        def mobius_add(a, b):
+            ab = (a * b).sum(dim=1, keepdim=True)
+            denom = (1 + 2 * c * ab + c * c * sq(a) * sq(b)).clamp_min(1e-5)
+            return ((1 + 2 * c * ab + c * sq(b)) * a + (1 - c * sq(a)) * b) / denom
+
+        def reference_forward(u, v, t):
+            up = u / (1 + torch.sqrt(1 - c * sq(u))).clamp_min(1e-6)
+            vp = v / (1 + torch.sqrt(1 - c * sq(v))).clamp_min(1e-6)
+            delta = mobius_add(mobius_scalar(up, -1.0), vp)
+            p = mobius_add(up, mobius_scalar(delta, t))
+            k = 2 * p / (1 + c * sq(p)).clamp_min(1e-6)
+            return k * torch.sqrt(torch.clamp((1 / c - 1e-6) / sq(k).clamp_min(1e-8), max=1.0))
+
+        torch.manual_seed(0)
+        batch_size, dim, t = 16, 37, 0.6
+        u = torch.randn(batch_size, dim)
+        v = torch.randn(batch_size, dim)
+        u = u / u.norm(dim=1, keepdim=True) * torch.rand(batch_size, 1) * 0.8
+        v = v / v.norm(dim=1, keepdim=True) * torch.rand(batch_size, 1) * 0.8
+        grad_out = torch.randn(batch_size, dim)
+
+        u64 = u.double().requires_grad_()
+        v64 = v.double().requires_grad_()
+        reference_forward(u64, v64, t).backward(grad_out.double())
+
+        grad_u, grad_v = reality_stone.klein_backward_cpu(grad_out, u, v, c, t)
+        self.assertTrue(torch.allclose(grad_u.double(), u64.grad, atol=1e-4, rtol=1e-3))
+        self.assertTrue(torch.allclose(grad_v.double(), v64.grad, atol=1e-4, rtol=1e-3))
+
 
 if __name__ == "__main__":
     unittest.main(verbosity=2) 
\ No newline at end of file
@@ -0,0 +1,324 @@
+"""
+라플라스-벨트라미 연산자 테스트
+포인카레 계량 Δ_H 의 닫힌 형태와 함수 핸들 경로
+"""
+
+import math
+import torch
+import unittest
+import reality_stone
+import reality_stone.advanced as advanced
+from reality_stone.advanced import hyperbolic_laplacian, geodesic_distance_matrix
+from helpers import poincare_points
+
+
+class TestHyperbolicLaplacian(unittest.TestCase):
+    """hyperbolic_laplacian 테스트"""
+
+    def setUp(self):
+        torch.manual_seed(0)
+        self.c = 0.7
+        self.x = poincare_points(16, 5)
+
+    def test_coordinate_functions(self):
+        """닫힌 형태가 좌표 함수에 대한 autograd 결과와 같음"""
+        result = hyperbolic_laplacian(self.x, self.c)
+        self.assertEqual(result.shape, self.x.shape)
+        self.assertTrue(torch.allclose(result, reality_stone.hyperbolic_laplacian(self.x, self.c)))
+        for d in range(self.x.size(1)):
+            expected = hyperbolic_laplacian(self.x.double(), self.c, fn=lambda x: x[:, d])
+            self.assertTrue(torch.allclose(result[:, d].double(), expected, atol=1e-5))
+
+    def test_distance_from_origin(self):
+        """원점으로부터의 거리 r 에 대해 Δ_H r = (D-1)·√c·coth(√c·r)"""
+        x = self.x.double()
+        sqrt_c = math.sqrt(self.c)
+        r = lambda p: 2.0 / sqrt_c * torch.atanh(sqrt_c * p.norm(dim=-1))
+        result = hyperbolic_laplacian(x, self.c, fn=r)
+        expected = (x.size(1) - 1) * sqrt_c / torch.tanh(sqrt_c * r(x))
+        self.assertTrue(torch.allclose(result, expected, atol=1e-8))
+
+    def test_explicit_derivatives(self):
+        """derivatives 핸들은 autograd 와 같은 결과"""
+        fn = lambda p: (p ** 2).sum(dim=-1)
+        derivatives = lambda p: (2 * p, torch.full(p.shape[:-1], 2.0 * p.size(-1)))
+        via_autograd = hyperbolic_laplacian(self.x, self.c, fn=fn)
+        explicit = hyperbolic_laplacian(self.x, self.c, derivatives=derivatives)
+        self.assertTrue(torch.allclose(via_autograd, explicit, atol=1e-5))
+
+    def test_large_batch_leading_dims(self):
+        """큰 배치와 임의의 선행 차원"""
+        x = poincare_points(4096, 64).view(64, 64, 64)
+        result = hyperbolic_laplacian(x, self.c)
+        self.assertEqual(result.shape, x.shape)
+        self.assertTrue(torch.all(torch.isfinite(result)))
+
+    @unittest.skipUnless(reality_stone.library.has_cuda() and torch.cuda.is_available(), "CUDA 커널 없음")
+    def test_cuda_matches_cpu(self):
+        """CUDA 커널이 CPU 의 닫힌 형태와 같음 (워프 하나보다 작거나 큰 차원, 선행 차원)"""
+        for x in (self.x, poincare_points(32, 1500).view(4, 8, 1500)):
+            with self.subTest(shape=tuple(x.shape)):
+                expected = reality_stone.hyperbolic_laplacian(x, self.c)
+                result = reality_stone.hyperbolic_laplacian(x.cuda(), self.c).cpu()
+                torch.testing.assert_close(result, expected, rtol=1e-5, atol=1e-6)
+
+
+def reference_distance(x, y, curvature):
+    """compute_manifold_distance 와 같은 수식의 쌍별 기준 구현"""
+    numerator = ((x - y) ** 2).sum()
+    denominator = (1 - (x * x).sum()) * (1 - (y * y).sum())
+    ratio = torch.clamp(1 + 2 * numerator / (denominator + 1e-7), 1 + 1e-7, 1e6)
+    return torch.acosh(ratio) / math.sqrt(curvature)
+
+
+class TestGeodesicDistanceMatrix(unittest.TestCase):
+    """타일 단위 geodesic_distance_matrix 테스트"""
+
+    def setUp(self):
+        torch.manual_seed(0)
+        self.c = 1.0
+        self.points = poincare_points(37, 6).double()
+
+    def test_matches_pairwise(self):
+        """타일 결과가 쌍별 기준 구현과 같고 대각은 0"""
+        result = geodesic_distance_matrix(self.points, self.c, tile_size=8)
+        n = self.points.size(0)
+        expected = torch.zeros(n, n, dtype=torch.float64)
+        for i in range(n):
+            for j in range(i + 1, n):
+                expected[i, j] = expected[j, i] = reference_distance(self.points[i], self.points[j], self.c)
+        self.assertTrue(torch.allclose(result, expected, atol=1e-6))
+        self.assertTrue(torch.all(result.diagonal() == 0))
+        self.assertTrue(torch.allclose(result, advanced._geodesic_distance_block_torch(
+            self.points, self.points, self.c, 0), atol=1e-8))
+
+    def test_streaming_callback(self):
+        """callback 은 행 타일을 순서대로 받고 행렬을 만들지 않음"""
+        full = geodesic_distance_matrix(self.points, self.c)
+        starts, tiles = [], []
+        result = geodesic_distance_matrix(self.points, self.c, tile_size=10,
+                                          callback=lambda start, tile: (starts.append(start), tiles.append(tile)))
+        self.assertIsNone(result)
+        self.assertEqual(starts, [0, 10, 20, 30])
+        self.assertTrue(torch.allclose(torch.cat(tiles), full))
+
+    def test_memory_mapped_out(self):
+        """torch.from_file 로 매핑된 out 에 직접 기록"""
+        import os
+        import tempfile
+        points = self.points.float()
+        n = points.size(0)
+        with tempfile.TemporaryDirectory() as tmp:
+            path = os.path.join(tmp, "dist.bin")
+            out = torch.from_file(path, shared=True, size=n * n, dtype=torch.float32).view(n, n)
+            geodesic_distance_matrix(points, self.c, out=out, tile_size=16)
+            del out
+            stored = torch.from_file(path, shared=False, size=n * n, dtype=torch.float32).view(n, n)
+            self.assertTrue(torch.allclose(stored, geodesic_distance_matrix(points, self.c), atol=1e-5))
+
+
+class TestSparseEigen(unittest.TestCase):
+    """kNN 희소 그래프 + 반복 고유값 풀이 테스트"""
+
+    def setUp(self):
+        torch.manual_seed(0)
+        self.c = 1.0
+        self.points = poincare_points(300, 4)
+
+    def dense_laplacian(self, weights):
+        dense = weights.to_dense().double() if weights.layout != torch.strided else weights.double()
+        return torch.diag(dense.sum(1)) - dense
+
+    def test_knn_graph(self):
+        """kNN 그래프가 대칭이고 이웃이 전체 거리 행렬의 최근접과 같음"""
+        k = 6
+        graph = advanced.knn_graph(self.points, self.c, num_neighbors=k)
+        self.assertEqual(graph.layout, torch.sparse_csr)
+        dense = graph.to_dense()
+        self.assertTrue(torch.allclose(dense, dense.t()))
+        self.assertTrue(torch.all(dense.diagonal() == 0))
+        distances = geodesic_distance_matrix(self.points, self.c)
+        distances.fill_diagonal_(float('inf'))
+        nearest = distances.topk(k, dim=1, largest=False).indices
+        self.assertTrue(torch.all(dense.gather(1, nearest) > 0))
+        self.assertLessEqual(graph.values().numel(), 2 * k * self.points.size(0))
+        self.assertTrue(torch.allclose(dense, advanced._knn_graph_torch(self.points, self.c, k).to_dense(), atol=1e-6))
+
+    def test_lanczos_matches_dense(self):
+        """반복법의 가장 작은 고유쌍이 조밀 eigh 와 같음"""
+        graph = advanced.knn_graph(self.points.double(), self.c, num_neighbors=10)
+        k = 8
+        eigenvalues, eigenvectors = reality_stone._C.graph_laplacian_eigen_cpu(graph, k, 1e-10)
+        laplacian = self.dense_laplacian(graph)
+        expected = torch.linalg.eigvalsh(laplacian)[:k]
+        self.assertTrue(torch.allclose(eigenvalues, expected, atol=1e-8))
+        residual = laplacian @ eigenvectors - eigenvectors * eigenvalues
+        self.assertLess(residual.norm(dim=0).max().item(), 1e-6)
+        self.assertTrue(torch.allclose(eigenvectors.t() @ eigenvectors, torch.eye(k, dtype=torch.float64), atol=1e-8))
+
+    def test_laplace_beltrami_eigen(self):
+        """laplace_beltrami_eigen 은 k 개 오름차순 고유쌍을 반환하고 곡률 인자를 따른다"""
+        k = 12
+        eigenvalues, eigenvectors = advanced.laplace_beltrami_eigen(self.points, self.c, k=k, num_neighbors=8)
+        self.assertEqual(eigenvalues.shape, (k,))
+        self.assertEqual(eigenvectors.shape, (self.points.size(0), k))
+        self.assertTrue(torch.all(eigenvalues[1:] >= eigenvalues[:-1] - 1e-5))
+        self.assertLess(abs(eigenvalues[0].item()), 1e-4)
+        laplacian = self.dense_laplacian(advanced.knn_graph(self.points, self.c, 8)).float()
+        residual = laplacian @ eigenvectors - eigenvectors * eigenvalues
+        self.assertLess(residual.norm(dim=0).max().item(), 1e-3)
+        other, _ = advanced.laplace_beltrami_eigen(self.points, 4.0, k=k, num_neighbors=8)
+        self.assertFalse(torch.allclose(eigenvalues, other))
+
+    def test_full_graph(self):
+        """num_neighbors <= 0 이면 조밀한 완전 가우시안 그래프"""
+        points = self.points[:40]
+        graph = advanced.knn_graph(points, self.c, num_neighbors=0)
+        expected = torch.exp(-geodesic_distance_matrix(points, self.c) ** 2 / 2)
+        self.assertTrue(torch.allclose(graph, expected))
+
+
+def same_partition(labels, truth):
+    """라벨 번호와 무관하게 두 분할이 같은지"""
+    pairs = set(zip(labels.tolist(), truth.tolist()))
+    return len(pairs) == len(set(labels.tolist())) == len(set(truth.tolist()))
+
+
+class TestClustering(unittest.TestCase):
+    """k-means++ 와 스펙트럴 클러스터링 테스트"""
+
+    def setUp(self):
+        torch.manual_seed(0)
+        # 포인카레 볼 안의 떨어진 세 덩어리
+        centers = torch.tensor([[0.5, 0.0, 0.0], [-0.3, 0.4, 0.0], [0.0, -0.3, -0.4]])
+        self.truth = torch.arange(3).repeat_interleave(100)
+        self.points = centers[self.truth] + 0.02 * torch.randn(300, 3)
+
+    def test_kmeans(self):
+        """전체 배치 / 미니배치 / 텐서 경로 모두 덩어리를 복원"""
+        for batch_size in (0, 32):
+            with self.subTest(batch_size=batch_size):
+                labels, centroids = advanced.kmeans(self.points, 3, max_iter=200, batch_size=batch_size)
+                self.assertEqual(centroids.shape, (3, 3))
+                self.assertTrue(same_partition(labels, self.truth))
+                fallback, _ = advanced._kmeans_torch(self.points, 3, max_iter=200, batch_size=batch_size)
+                self.assertTrue(same_partition(fallback, self.truth))
+
+    def test_kmeans_seed(self):
+        """같은 시드는 같은 결과"""
+        a, ca = advanced.kmeans(self.points, 5, seed=3)
+        b, cb = advanced.kmeans(self.points, 5, seed=3)
+        self.assertTrue(torch.equal(a, b))
+        self.assertTrue(torch.equal(ca, cb))
+
+    def test_disconnected_graph_eigen(self):
+        """연결 성분이 여럿이면 고유값 0 이 성분 수만큼 (반복법 경로)"""
+        graph = advanced.knn_graph(self.points.double(), 1.0, num_neighbors=5)
+        eigenvalues, eigenvectors = reality_stone._C.graph_laplacian_eigen_cpu(graph, 6, 1e-10)
+        dense = graph.to_dense()
+        laplacian = torch.diag(dense.sum(1)) - dense
+        self.assertTrue(torch.allclose(eigenvalues, torch.linalg.eigvalsh(laplacian)[:6], atol=1e-8))
+        self.assertTrue(torch.allclose(eigenvalues[:3], torch.zeros(3, dtype=torch.float64), atol=1e-10))
+
+    def test_spectral_clustering(self):
+        """스펙트럴 클러스터링이 덩어리를 복원"""
+        labels = advanced.spectral_clustering(self.points, 3, num_neighbors=8)
+        self.assertEqual(labels.shape, (300,))
+        self.assertTrue(same_partition(labels, self.truth))
+
+
+class TestDiffusion(unittest.TestCase):
+    """여러 시각의 확산 풀이 테스트"""
+
+    def setUp(self):
+        torch.manual_seed(0)
+        self.points = poincare_points(120, 3).double()
+        self.graph = advanced.knn_graph(self.points, 1.0, num_neighbors=6)
+        dense = self.graph.to_dense()
+        self.laplacian = torch.diag(dense.sum(1)) - dense
+        self.signal = torch.randn(120, 4, dtype=torch.float64)
+        self.times = torch.tensor([0.0, 0.1, 0.5, 2.0, 10.0], dtype=torch.float64)
+
+    def expected(self):
+        return torch.stack([torch.linalg.matrix_exp(-t * self.laplacian) @ self.signal for t in self.times])
+
+    def test_chebyshev_matches_matrix_exp(self):
+        """체비셰프 전개가 행렬 지수와 같고 모든 시각을 한 번에 반환"""
+        expected = self.expected()
+        result = advanced.graph_diffusion(self.graph, self.signal, self.times)
+        self.assertEqual(result.shape, (5, 120, 4))
+        self.assertTrue(torch.allclose(result, expected, atol=1e-8))
+        fallback = advanced._graph_diffusion_torch(self.graph, self.signal, self.times)
+        self.assertTrue(torch.allclose(fallback, expected, atol=1e-8))
+        vector = advanced.graph_diffusion(self.graph, self.signal[:, 0], self.times)
+        self.assertTrue(torch.allclose(vector, expected[..., 0], atol=1e-8))
+
+    def test_eigenbasis(self):
+        """고유기저 경로: 전체 기저면 정확, laplace_beltrami_eigen 결과 재사용"""
+        eigenpairs = torch.linalg.eigh(self.laplacian)
+        result = advanced.graph_diffusion(self.graph, self.signal, self.times, eigenpairs=eigenpairs)
+        self.assertTrue(torch.allclose(result, self.expected(), atol=1e-8))
+        eigenvalues, eigenvectors = advanced.laplace_beltrami_eigen(self.points, 1.0, k=20, num_neighbors=6)
+        low = advanced.graph_diffusion(self.graph, self.signal, self.times, eigenpairs=(eigenvalues, eigenvectors))
+        self.assertEqual(low.shape, (5, 120, 4))
+        # 큰 t 에서는 저주파 성분만 남는다
+        self.assertTrue(torch.allclose(low[-1], self.expected()[-1], atol=1e-4))
+
+    def test_solve_diffusion_equation(self):
+        """점 확산 방정식의 정확해가 작은 스텝 오일러와 같고 시각 벡터를 지원"""
+        x = poincare_points(8, 5, radius=0.5).double()
+        dt, steps = 1e-4, 5000
+        euler = x.clone()
+        for _ in range(steps):
+            # Δ_H x = (D-2)·c·(1 - c|x|²)/2 · x (hyperbolic_laplacian 의 닫힌 형태)
+            euler = euler + dt * 1.5 * 0.7 * (1 - 0.7 * (euler * euler).sum(1, keepdim=True)) * euler
+        result = advanced.solve_diffusion_equation(x, dt, steps, 0.7)
+        self.assertTrue(torch.allclose(result, euler, atol=1e-4))
+        times = torch.tensor([0.0, 0.25, dt * steps, 50.0])
+        many = advanced.solve_diffusion_equation(x, dt, steps, 0.7, times=times)
+        self.assertEqual(many.shape, (4, 8, 5))
+        self.assertTrue(torch.allclose(many[0], x))
+        self.assertTrue(torch.allclose(many[2], result, atol=1e-10))
+        self.assertTrue(torch.all(torch.isfinite(many)))
+        self.assertTrue(torch.allclose(advanced._diffusion_closed_form_torch(x, times, 0.7), many, atol=1e-10))
+
+
+class TestHeatKernel(unittest.TestCase):
+    """여러 시각 heat_kernel 테스트"""
+
+    def setUp(self):
+        torch.manual_seed(0)
+        self.c = 0.5
+        self.x = poincare_points(16, 4)
+        self.times = torch.tensor([0.05, 0.1, 0.5, 1.0, 4.0])
+
+    def test_matches_scalar_calls(self):
+        """시각 텐서 결과가 시각별 float 호출과 같음"""
+        result = reality_stone.heat_kernel(self.x, self.times, self.c)
+        self.assertEqual(result.shape, (5, 16, 4))
+        for i, t in enumerate(self.times.tolist()):
+            expected = reality_stone.heat_kernel(self.x, t, self.c)
+            reference = (4 * math.pi * t) ** (-2) * torch.exp(
+                -(self.x * self.x).sum(1, keepdim=True) / (4 * t) - self.c * t) * self.x
+            self.assertTrue(torch.allclose(result[i], expected, rtol=1e-5, atol=1e-7))
+            self.assertTrue(torch.allclose(expected, reference, rtol=1e-5, atol=1e-7))
+        self.assertTrue(torch.allclose(advanced.heat_kernel(self.x, self.times, self.c), result))
+        self.assertTrue(torch.allclose(reality_stone._heat_kernel_torch(self.x, self.times, self.c), result,
+                                       rtol=1e-5, atol=1e-7))
+
+    def test_leading_dims_and_large_dim(self):
+        """임의의 선행 차원과, (4πt)^{-D/2} 가 넘치는 큰 D 에서도 유한"""
+        x = poincare_points(6, 8).view(2, 3, 8)
+        self.assertEqual(reality_stone.heat_kernel(x, [0.1, 0.2], self.c).shape, (2, 2, 3, 8))
+        # D = 64, t = 0.005: (4πt)^{-D/2} ≈ e^88.6 은 float 범위를 넘지만 곱은 ≈ e^39
+        wide = torch.randn(4, 64)
+        wide = 0.99 * wide / wide.norm(dim=1, keepdim=True)
+        result = reality_stone.heat_kernel(wide, torch.tensor([0.005, 0.1]), self.c)
+        self.assertTrue(torch.all(torch.isfinite(result)))
+        self.assertTrue(torch.all(result.abs().sum(-1) > 0))
+        with self.assertRaises(RuntimeError):
+            reality_stone.heat_kernel(self.x, torch.tensor([0.0, 1.0]), self.c)
+
+
+if __name__ == "__main__":
+    unittest.main(verbosity=2)
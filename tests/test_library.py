@@ -0,0 +1,223 @@
+"""
+torch.library custom op 테스트
+reality_stone:: op 등록, 스키마 / fake / autograd 검사 (opcheck), 그래디언트, torch.compile 그래프 끊김 없음
+"""
+
+import os
+import subprocess
+import sys
+import torch
+import unittest
+from unittest import mock
+import reality_stone as rs
+from reality_stone import library
+from reality_stone.advanced import hyperbolic_linear_fused
+from helpers import poincare_points
+
+
+# register() 를 부르지 않은 새 인터프리터에서 첫 호출이 곧바로 fullgraph 추적인 경우
+FRESH_COMPILE = r"""
+import torch
+import reality_stone as rs
+from reality_stone import library
+from reality_stone.advanced import hyperbolic_linear_fused
+
+assert not library._OPS
+weight, bias = torch.randn(4, 4) * 0.3, torch.randn(4) * 0.1
+
+def block(x, y, c):
+    h = rs.mobius_add(x, y, c)
+    h = rs.poincare_ball_layer(h, y, 1.0, 0.3)
+    h = hyperbolic_linear_fused(h, weight, bias, 1.0)
+    d, _ = rs.cdist(h, y, k=2)
+    return h.sum() + d.sum()
+
+x, y = torch.rand(8, 4) * 0.2, torch.rand(8, 4) * 0.2
+c = torch.rand(8) + 0.5
+out = torch.compile(block, fullgraph=True, backend="aot_eager")(x, y, c)
+torch.testing.assert_close(out, block(x, y, c))
+"""
+
+
+def _ops():
+    return getattr(torch.ops, library.NAMESPACE)
+
+
+@unittest.skipUnless(library.enabled(), "torch.library.custom_op 이 없는 torch")
+class TestCustomOps(unittest.TestCase):
+    def setUp(self):
+        library.register()
+        self.x = poincare_points(8, 4, seed=0, radius=0.6)
+        self.y = poincare_points(8, 4, seed=1, radius=0.6)
+
+    def test_registered(self):
+        """모든 op 와 전용 역전파 커널 op 가 reality_stone 네임스페이스에 등록"""
+        for name, spec in library.SPECS.items():
+            with self.subTest(op=name):
+                self.assertTrue(hasattr(_ops(), name))
+                self.assertEqual(hasattr(_ops(), f"{name}_backward"), spec.backward_kernel is not None)
+
+    def test_opcheck(self):
+        """스키마, fake 구현, autograd 등록, AOT 디스패치 검사"""
+        x, y = self.x, self.y
+        cases = {
+            "mobius_add": (x, y, 1.0),
+            "mobius_add_batched": (x, y, torch.rand(8) + 0.5),
+            "mobius_scalar": (x, 1.0, 0.7),
+            "poincare_ball_forward": (x, y, 1.0, 0.5),
+            "poincare_to_lorentz": (x, 1.0),
+            "lorentz_to_poincare": (rs.poincare_to_lorentz(x, 1.0), 1.0),
+            "lorentz_distance": (rs.poincare_to_lorentz(x, 1.0), rs.poincare_to_lorentz(y, 1.0), 1.0),
+            "chebyshev_distance": (x, y, 1.0),
+            "heat_kernel_times": (x, torch.tensor([0.1, 0.5], dtype=torch.float64), 1.0),
+            "spherical_harmonics": (torch.rand(8, 2), 3),
+            "einstein_midpoint": (poincare_points(8, 4, seed=0, radius=0.6).view(2, 4, 4), torch.rand(2, 4), 1.0),
+        }
+        for name, args in cases.items():
+            spec = library.SPECS[name]
+            args = [a.clone().requires_grad_() if i in spec.differentiable else a for i, a in enumerate(args)]
+            with self.subTest(op=name):
+                torch.library.opcheck(getattr(_ops(), name).default, args)
+        torch.library.opcheck(_ops().cdist_topk.default, (x, y, 3, "poincare", 1.0, 0))
+
+    def test_opcheck_promotion_broadcast(self):
+        """fake 구현이 쌍 연산의 브로드캐스트 모양과 dtype 승격 (bf16 ⊕ f32 -> f32) 을 따른다"""
+        x, y = self.x.to(torch.bfloat16), self.y
+        lx, ly = rs.poincare_to_lorentz(x, 1.0), rs.poincare_to_lorentz(self.y * 0.3, 1.0)
+        cases = {
+            "mobius_add": [(x, y, 1.0), (self.x, y[:1], 1.0), (y[:1], x, 1.0)],
+            "mobius_add_batched": [(x, y, torch.rand(8) + 0.5)],
+            "klein_add": [(x, y[:1], 1.0)],
+            "klein_distance": [(x, y, 1.0), (self.x, y[:1], 1.0)],
+            "lorentz_distance": [(lx, ly, 1.0)],
+            "poincare_ball_forward": [(x, y, 1.0, 0.5), (self.x, y[:1], 1.0, 0.5)],
+            "dynamic_poincare_layer": [(x, y, torch.rand(8) + 0.5, 0.5)],
+        }
+        for name, arg_sets in cases.items():
+            spec = library.SPECS[name]
+            for args in arg_sets:
+                args = [a.clone().requires_grad_() if i in spec.differentiable else a for i, a in enumerate(args)]
+                with self.subTest(op=name, shapes=[tuple(a.shape) for a in args if torch.is_tensor(a)]):
+                    torch.library.opcheck(getattr(_ops(), name).default, args)
+
+    def test_fake_shapes(self):
+        """fake 구현의 모양 / dtype 이 커널 출력과 같다"""
+        from torch._subclasses.fake_tensor import FakeTensorMode
+        x, y = self.x, self.y
+        lx = rs.poincare_to_lorentz(x, 1.0)
+        cases = {
+            "lorentz_inner": (lx, lx),
+            "klein_distance": (x, y, 1.0),
+            "klein_to_lorentz": (x, 1.0),
+            "hyperbolic_fft": (torch.randn(8, 3) * 0.3, 1.0, 4),
+            "inverse_hyperbolic_fft": (torch.randn(8, 25), 1.0),
+            "cdist": (x, y[:5], "poincare", 1.0, 0),
+            "hyperbolic_linear_fused": (x, torch.randn(3, 4) * 0.3, torch.randn(3) * 0.1, torch.tensor([1.0])),
+        }
+        for name, args in cases.items():
+            with self.subTest(op=name):
+                real = getattr(_ops(), name)(*args)
+                with FakeTensorMode() as mode:
+                    fake = getattr(_ops(), name)(*[mode.from_tensor(a) if torch.is_tensor(a) else a for a in args])
+                self.assertEqual(fake.shape, real.shape)
+                self.assertEqual(fake.dtype, real.dtype)
+
+    def test_gradients_match_kernels(self):
+        """op 의 그래디언트가 커널을 직접 미분한 값 / 전용 역전파 커널과 같다"""
+        x, y = self.x, self.y
+        for name, kernel, args in [
+            ("mobius_add", rs._C.mobius_add_cpu, (x, y, 1.0)),
+            ("klein_to_poincare", rs._C.klein_to_poincare_cpu, (x, 1.0)),
+            ("chebyshev_approximation", rs._C.chebyshev_approximation_cpu, (x, 8, 1.0)),
+            ("dynamic_mobius_add", rs._C.dynamic_mobius_add_cpu, (x, y, torch.rand(8) + 0.5)),
+        ]:
+            spec = library.SPECS[name]
+            with self.subTest(op=name):
+                a = [t.clone().requires_grad_() if i in spec.differentiable else t for i, t in enumerate(args)]
+                b = [t.clone().requires_grad_() if i in spec.differentiable else t for i, t in enumerate(args)]
+                weight = torch.randn_like(kernel(*args))
+                (library.call(name, *a) * weight).sum().backward()
+                (kernel(*b) * weight).sum().backward()
+                for i in spec.differentiable:
+                    torch.testing.assert_close(a[i].grad, b[i].grad)
+
+        u, v = x.clone().requires_grad_(), y.clone().requires_grad_()
+        grad = torch.randn_like(x)
+        rs.poincare_ball_layer(u, v, 1.0, 0.3).backward(grad)
+        expected = rs._C.poincare_ball_backward_cpu(grad, x, y, 1.0, 0.3)
+        torch.testing.assert_close(u.grad, expected[0])
+        torch.testing.assert_close(v.grad, expected[1])
+
+    def test_partial_gradients(self):
+        """일부 입력만 그래디언트가 필요해도 동작"""
+        y = self.y.clone().requires_grad_()
+        rs.mobius_add(self.x, y, 1.0).sum().backward()
+        self.assertIsNotNone(y.grad)
+        self.assertTrue(torch.isfinite(y.grad).all())
+
+    def test_double_backward(self):
+        """전용 역전파 커널이 없는 op 는 커널의 autograd 경로로 2차 미분, 있는 op 는 명시적으로 거부"""
+        x, y = self.x.double().requires_grad_(), self.y.double().requires_grad_()
+        self.assertTrue(torch.autograd.gradgradcheck(lambda u, v: rs.mobius_add(u, v, 1.0), (x, y)))
+        self.assertTrue(torch.autograd.gradgradcheck(lambda u: rs.poincare_to_lorentz(u, 1.0), (x,)))
+
+        (grad,) = torch.autograd.grad(rs.poincare_ball_layer(x, y, 1.0, 0.3).sum(), x, create_graph=True)
+        with self.assertRaisesRegex(RuntimeError, "2차 미분"):
+            grad.sum().backward()
+
+    def test_recompute_backward_disconnected(self):
+        """커널의 autograd 경로가 끊기면 0 그래디언트 대신 오류"""
+        x, y = self.x.clone().requires_grad_(), self.y.clone().requires_grad_()
+        broken = {
+            "출력 0": lambda u, v, c: (u + v).detach(),
+            "인자 1": lambda u, v, c: u * c,
+        }
+        for message, fn in broken.items():
+            with self.subTest(message), mock.patch.object(library, "kernel", return_value=fn):
+                with self.assertRaisesRegex(RuntimeError, message):
+                    _ops().mobius_add(x, y, 1.0).sum().backward()
+
+    def test_compile_fullgraph(self):
+        """하이퍼볼릭 블록 전체가 그래프 끊김 없이 (fullgraph) 컴파일되고 eager 와 같다"""
+        weight = torch.randn(4, 4) * 0.3
+        bias = torch.randn(4) * 0.1
+
+        def block(x, y, c):
+            h = rs.mobius_add(x, y, 1.0)
+            h = rs.poincare_ball_layer(h, y, 1.0, 0.3)
+            h = rs.mobius_add(h, y, c)
+            h = hyperbolic_linear_fused(h, weight, bias, 1.0)
+            d, _ = rs.cdist(h, y, k=2)
+            return rs.lorentz_to_poincare(rs.poincare_to_lorentz(h, 1.0), 1.0).sum() + d.sum()
+
+        c = torch.rand(8) + 0.5
+        compiled = torch.compile(block, fullgraph=True, backend="aot_eager")
+        x1 = self.x.clone().requires_grad_()
+        x2 = self.x.clone().requires_grad_()
+        out = compiled(x1, self.y, c)
+        out.backward()
+        expected = block(x2, self.y, c)
+        expected.backward()
+        torch.testing.assert_close(out, expected)
+        torch.testing.assert_close(x1.grad, x2.grad)
+
+
+@unittest.skipUnless(library.enabled(), "torch.library.custom_op 이 없는 torch")
+class TestFreshCompile(unittest.TestCase):
+    def test_compile_fullgraph_without_register(self):
+        """register() 없이 첫 호출을 fullgraph 로 컴파일해도 등록 때문에 그래프가 끊기지 않는다"""
+        result = subprocess.run([sys.executable, "-c", FRESH_COMPILE], capture_output=True, text=True,
+                                env=os.environ.copy())
+        self.assertEqual(result.returncode, 0, result.stderr[-2000:])
+
+
+class TestCall(unittest.TestCase):
+    def test_call_matches_kernel(self):
+        """call 은 등록 여부와 관계없이 커널과 같은 값"""
+        x, y = poincare_points(8, 4, seed=2, radius=0.6), poincare_points(8, 4, seed=3, radius=0.6)
+        torch.testing.assert_close(library.call("mobius_add", x, y, 1.0), rs._C.mobius_add_cpu(x, y, 1.0))
+        torch.testing.assert_close(library.call("heat_kernel", x, 0.5, 1.0), rs._C.heat_kernel_cpu(x, 0.5, 1.0))
+
+
+if __name__ == "__main__":
+    unittest.main()
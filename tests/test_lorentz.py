@@ -87,6 +87,34 @@ class TestLorentzOperations(unittest.TestCase):
         except Exception as e:
             self.skipTest(f"lorentz_layer 이슈: {e}")
 
+    def test_lorentz_backward_matches_autograd(self):
+        """lorentz_backward_cpu 가 autograd 의 전체 vector-Jacobian product 와 일치"""
+        def inner(a, b):
+            return a[:, :1] * b[:, :1] - (a[:, 1:] * b[:, 1:]).sum(dim=1, keepdim=True)
+
+        def reference_forward(u, v, c, t):
+            uv = inner(u, v)
+            dist = torch.acosh((-uv).clamp_min(1 + 1e-6)) / c ** 0.5
+            v_perp = v + uv * u
+            v_perp_norm = torch.sqrt(-inner(v_perp, v_perp)).clamp_min(1e-8)
+            return torch.cosh(dist * t) * u + torch.sinh(dist * t) * v_perp / v_perp_norm
+
+        torch.manual_seed(0)
+        batch_size, dim, t = 16, 37, 0.6
+        u = torch.randn(batch_size, dim) * 0.3
+        v = 2 * u + 0.03 * torch.randn(batch_size, dim)
+        u[:, 0] = 0.1
+        v[:, 0] = 0.1
+        grad_out = torch.randn(batch_size, dim)
+
+        u64 = u.double().requires_grad_()
+        v64 = v.double().requires_grad_()
+        reference_forward(u64, v64, self.c, t).backward(grad_out.double())
+
+        grad_u, grad_v = reality_stone.lorentz_backward_cpu(grad_out, u, v, self.c, t)
+        self.assertTrue(torch.allclose(grad_u.double(), u64.grad, atol=1e-4, rtol=1e-3))
+        self.assertTrue(torch.allclose(grad_v.double(), v64.grad, atol=1e-4, rtol=1e-3))
+
 
 if __name__ == "__main__":
     unittest.main(verbosity=2) 
\ No newline at end of file
@@ -86,7 +86,7 @@ class TestMobiusScalar(unittest.TestCase):
         x = torch.randn(self.batch_size, self.dim, dtype=self.dtype) * 0.5
         r = 2.0
         
-        result = reality_stone.mobius_scalar(x, self.c, r)
+        result = reality_stone.mobius_scalar(x, r, self.c)
         self.assertEqual(result.shape, x.shape)
 
 
@@ -113,5 +113,221 @@ class TestMobiusEdgeCases(unittest.TestCase):
         self.assertTrue(torch.all(torch.isfinite(result)))
 
 
+
+class TestOutVariants(unittest.TestCase):
+    """out= / in-place 변형 테스트"""
+
+    def setUp(self):
+        torch.manual_seed(0)
+        self.c = 1.0
+        self.x = torch.randn(16, 8) * 0.2
+        self.y = torch.randn(16, 8) * 0.2
+
+    def test_out_matches_functional(self):
+        """out= 결과가 일반 호출과 같고 같은 버퍼를 반환"""
+        cases = [
+            (reality_stone.mobius_add, (self.x, self.y, self.c)),
+            (reality_stone.mobius_scalar, (self.x, 0.5, self.c)),
+            (reality_stone.klein_add, (self.x, self.y, self.c)),
+            (reality_stone.klein_scalar, (self.x, self.c, 0.5)),
+            (reality_stone.klein_distance, (self.x, self.y, self.c)),
+            (reality_stone.poincare_to_lorentz, (self.x, self.c)),
+            (reality_stone.poincare_to_klein, (self.x, self.c)),
+            (reality_stone.klein_to_lorentz, (self.x, self.c)),
+        ]
+        for fn, args in cases:
+            with self.subTest(fn=fn.__name__):
+                expected = fn(*args)
+                out = torch.empty_like(expected)
+                result = fn(*args, out=out)
+                self.assertEqual(result.data_ptr(), out.data_ptr())
+                self.assertTrue(torch.allclose(out, expected, atol=1e-6))
+
+    def test_lorentz_out(self):
+        """Lorentz 연산의 out= 와 모양이 바뀌는 변환"""
+        u = reality_stone.poincare_to_lorentz(self.x, self.c)
+        v = reality_stone.poincare_to_lorentz(self.y, self.c)
+        for fn, args in [
+            (reality_stone.lorentz_add, (u, v, self.c)),
+            (reality_stone.lorentz_scalar, (u, self.c, 0.5)),
+            (reality_stone.lorentz_inner, (u, v)),
+            (reality_stone.lorentz_distance, (u, v, self.c)),
+            (reality_stone.lorentz_to_poincare, (u, self.c)),
+            (reality_stone.lorentz_to_klein, (u, self.c)),
+        ]:
+            with self.subTest(fn=fn.__name__):
+                expected = fn(*args)
+                out = torch.empty_like(expected)
+                fn(*args, out=out)
+                self.assertTrue(torch.allclose(out, expected, atol=1e-5, equal_nan=True))
+
+    def test_non_contiguous_out(self):
+        """비연속 out 버퍼에도 올바르게 기록"""
+        expected = reality_stone.mobius_add(self.x, self.y, self.c)
+        out = torch.empty(8, 16).t()
+        reality_stone.mobius_add(self.x, self.y, self.c, out=out)
+        self.assertTrue(torch.allclose(out, expected, atol=1e-6))
+
+    def test_inplace(self):
+        """in-place 변형이 첫 번째 인자를 덮어씀"""
+        cases = [
+            (reality_stone.mobius_add_, reality_stone.mobius_add, (self.y, self.c)),
+            (reality_stone.mobius_scalar_, reality_stone.mobius_scalar, (0.5, self.c)),
+            (reality_stone.klein_add_, reality_stone.klein_add, (self.y, self.c)),
+            (reality_stone.klein_scalar_, reality_stone.klein_scalar, (self.c, 0.5)),
+            (reality_stone.poincare_to_klein_, reality_stone.poincare_to_klein, (self.c,)),
+            (reality_stone.klein_to_poincare_, reality_stone.klein_to_poincare, (self.c,)),
+        ]
+        for inplace_fn, fn, args in cases:
+            with self.subTest(fn=inplace_fn.__name__):
+                x = self.x.clone()
+                expected = fn(x, *args)
+                result = inplace_fn(x, *args)
+                self.assertIs(result, x)
+                self.assertTrue(torch.allclose(x, expected, atol=1e-6))
+
+    def test_out_shape_mismatch(self):
+        """모양이 다른 out 은 오류"""
+        with self.assertRaises(RuntimeError):
+            reality_stone.mobius_add(self.x, self.y, self.c, out=torch.empty(4, 8))
+
+    def test_mobius_scalar_argument_order(self):
+        """mobius_scalar 는 기존 순서 (x, r, c) 로 받아 커널 (x, c, r) 에 넘김"""
+        expected = reality_stone.mobius_scalar_cpu(self.x, 0.5, 0.7)
+        torch.testing.assert_close(reality_stone.mobius_scalar(self.x, 0.7, 0.5), expected)
+        torch.testing.assert_close(reality_stone.mobius_scalar(self.x, c=0.5, r=0.7), expected)
+        torch.testing.assert_close(reality_stone.mobius_scalar_(self.x.clone(), 0.7, 0.5), expected)
+
+    def test_autograd_path(self):
+        """입력이 그래디언트를 요구하면 미분 가능한 경로 사용"""
+        x = self.x.clone().requires_grad_()
+        reality_stone.poincare_to_klein(x, self.c).sum().backward()
+        self.assertIsNotNone(x.grad)
+        self.assertTrue(torch.all(torch.isfinite(x.grad)))
+
+        x.grad = None
+        out = torch.empty_like(self.x)
+        reality_stone.mobius_add(x, self.y, self.c, out=out).sum().backward()
+        self.assertIsNotNone(x.grad)
+
+
+class TestPerSampleCurvature(unittest.TestCase):
+    """배치별 곡률 텐서 [B] / [B,1] 테스트"""
+
+    def setUp(self):
+        torch.manual_seed(0)
+        self.x = torch.randn(12, 6) * 0.2
+        self.y = torch.randn(12, 6) * 0.2
+        self.c = torch.rand(12) * 2.0 + 0.1
+
+    def test_matches_per_row(self):
+        """배치 커널 결과가 행별 float 곡률 호출과 같음"""
+        add = reality_stone.mobius_add(self.x, self.y, self.c)
+        scalar = reality_stone.mobius_scalar(self.x, 0.7, self.c.unsqueeze(1))
+        for b in range(self.x.size(0)):
+            c_b = self.c[b].item()
+            self.assertTrue(torch.allclose(
+                add[b], reality_stone.mobius_add(self.x[b:b+1], self.y[b:b+1], c_b)[0], atol=1e-6))
+            self.assertTrue(torch.allclose(
+                scalar[b], reality_stone.mobius_scalar(self.x[b:b+1], 0.7, c_b)[0], atol=1e-6))
+
+    def test_single_curvature_broadcast(self):
+        """원소 1개짜리 곡률 텐서는 배치 전체에 브로드캐스트"""
+        expected = reality_stone.mobius_add(self.x, self.y, 0.5)
+        result = reality_stone.mobius_add(self.x, self.y, torch.tensor([0.5]))
+        self.assertTrue(torch.allclose(result, expected, atol=1e-6))
+        with self.assertRaises(RuntimeError):
+            reality_stone.mobius_add(self.x, self.y, torch.ones(5))
+
+    def test_dynamic_poincare_layer(self):
+        """dynamic_poincare_layer 가 ((1-t)u) ⊕_c (tv) 와 같고 out= 도 지원"""
+        t = 0.3
+        expected = reality_stone.mobius_add((1 - t) * self.x, t * self.y, self.c)
+        result = reality_stone.dynamic_poincare_layer(self.x, self.y, self.c, t)
+        self.assertTrue(torch.allclose(result, expected, atol=1e-6))
+        self.assertTrue(torch.allclose(
+            reality_stone.dynamic_mobius_add(self.x, self.y, self.c),
+            reality_stone.mobius_add(self.x, self.y, self.c), atol=1e-6))
+        out = torch.empty_like(self.x)
+        reality_stone.mobius_add(self.x, self.y, self.c, out=out)
+        self.assertTrue(torch.allclose(out, reality_stone.mobius_add(self.x, self.y, self.c), atol=1e-6))
+
+    def test_curvature_gradient(self):
+        """곡률 텐서가 그래디언트를 요구하면 곡률까지 미분"""
+        c = self.c.clone().requires_grad_()
+        x = self.x.clone().requires_grad_()
+        reality_stone.dynamic_poincare_layer(x, self.y, c, 0.5).sum().backward()
+        self.assertEqual(c.grad.shape, c.shape)
+        self.assertTrue(torch.all(torch.isfinite(c.grad)))
+        self.assertTrue(torch.all(torch.isfinite(x.grad)))
+
+
+class TestPairBroadcast(unittest.TestCase):
+    """쌍 연산 (u, v) 의 브로드캐스트와 모양 검사"""
+
+    def setUp(self):
+        torch.manual_seed(0)
+        self.c = 1.0
+        self.x = torch.randn(5, 3) * 0.3
+        self.y = torch.randn(5, 3) * 0.3
+        lx = reality_stone.poincare_to_lorentz_cpu(self.x * 0.3, self.c)
+        ly = reality_stone.poincare_to_lorentz_cpu(self.y * 0.3, self.c)
+        tangent = torch.cat([torch.zeros(5, 1), self.y], 1)   # lorentz_add 의 두 번째 인자는 접벡터
+        c = self.c
+        self.cases = [
+            (lambda u, v: reality_stone.mobius_add_cpu(u, v, c), self.x, self.y),
+            (lambda u, v: reality_stone.mobius_add_cpu(u, v, torch.rand(5) + 0.5), self.x, self.y),
+            (lambda u, v: reality_stone.klein_add_cpu(u, v, c), self.x, self.y),
+            (lambda u, v: reality_stone.klein_distance_cpu(u, v, c), self.x, self.y),
+            (lambda u, v: reality_stone.lorentz_add_cpu(u, v, c), lx, tangent),
+            (lambda u, v: reality_stone.lorentz_inner_cpu(u, v), lx, ly),
+            (lambda u, v: reality_stone.lorentz_distance_cpu(u, v, c), lx, ly),
+        ]
+
+    def test_row_broadcast(self):
+        """[B,D] 와 [1,D] 는 순서와 관계없이 expand 한 입력과 같은 결과"""
+        for i, (fn, u, v) in enumerate(self.cases):
+            with self.subTest(case=i):
+                torch.manual_seed(1)
+                expected = fn(u, v[:1].expand_as(u))
+                torch.manual_seed(1)
+                result = fn(u, v[:1])
+                self.assertEqual(result.shape, expected.shape)
+                torch.testing.assert_close(result, expected)
+                torch.manual_seed(1)
+                swapped = fn(v[:1], u)
+                torch.manual_seed(1)
+                # 순서를 바꾸면 lorentz_add 는 정의역 밖 (NaN) 이므로 NaN 위치까지 같은지만 본다
+                torch.testing.assert_close(swapped, fn(v[:1].expand_as(u), u), equal_nan=True)
+
+    def test_one_and_three_dims(self):
+        """1차원 입력은 한 행, 3차원 입력은 앞쪽 차원을 행으로 합쳐 계산"""
+        fn = lambda u, v: reality_stone.mobius_add_cpu(u, v, self.c)
+        torch.testing.assert_close(fn(self.x[0], self.y[0]), fn(self.x[:1], self.y[:1])[0])
+        x3 = torch.randn(2, 5, 3) * 0.3
+        expected = fn(x3.reshape(-1, 3), self.y.repeat(2, 1)).view(2, 5, 3)
+        torch.testing.assert_close(fn(x3, self.y), expected)
+        dist = reality_stone.klein_distance_cpu(x3, self.y, self.c)
+        self.assertEqual(dist.shape, (2, 5, 1))
+        torch.testing.assert_close(
+            dist, reality_stone.klein_distance_cpu(x3.reshape(-1, 3), self.y.repeat(2, 1), self.c).view(2, 5, 1))
+
+    def test_mismatched_shapes(self):
+        """브로드캐스트할 수 없는 모양은 오류"""
+        for fn, u, v in self.cases[:1] + self.cases[2:]:
+            for other in (v[:4], torch.cat([v, v[:, :1]], 1)):
+                with self.subTest(shape=tuple(other.shape)):
+                    with self.assertRaises(RuntimeError):
+                        fn(u, other)
+
+    def test_autograd_path_broadcast(self):
+        """그래디언트 경로도 같은 브로드캐스트 규칙"""
+        x = self.x.clone().requires_grad_()
+        result = reality_stone.mobius_add_cpu(x, self.y[:1], self.c)
+        torch.testing.assert_close(result, reality_stone.mobius_add_cpu(self.x, self.y[:1], self.c))
+        result.sum().backward()
+        self.assertEqual(x.grad.shape, x.shape)
+
+
 if __name__ == "__main__":
     unittest.main(verbosity=2) 
\ No newline at end of file
@@ -0,0 +1,253 @@
+"""
+리만 최적화기 테스트
+C++ 다중 텐서 스텝과 PyTorch 구현 대조, 다양체 위 유지, 평행 이동의 노름 보존, 수렴, 희소 임베딩 갱신
+"""
+
+import torch
+import unittest
+from reality_stone.layers import HyperbolicEmbedding
+from reality_stone.optim import RiemannianAdagrad, RiemannianAdam, RiemannianSGD, _C, _expmap, _minkowski, _transport
+from helpers import poincare_points, to_lorentz
+
+
+def cosh_distance_minus_one(x, y, c):
+    """cosh(√c·d) - 1 (d = 0 에서도 매끄러운 거리 함수)"""
+    diff = (x - y).pow(2).sum(-1)
+    denom = (1 - c * x.pow(2).sum(-1)) * (1 - c * y.pow(2).sum(-1))
+    return 2 * c * diff / denom
+
+
+def poincare_distance(x, y, c):
+    return torch.acosh(1 + cosh_distance_minus_one(x, y, c)) / c ** 0.5
+
+
+def make_params(manifold, c, seed=0):
+    """폭이 다른 텐서 셋 (행 묶음 경계 확인용)"""
+    shapes = [(7, 3), (2, 5, 3), (11, 6)]
+    params = []
+    for i, shape in enumerate(shapes):
+        rows = shape[0] * (shape[1] if len(shape) == 3 else 1)
+        if manifold == "lorentz":
+            x = poincare_points(rows, shape[-1] - 1, seed=seed + i, radius=0.6 / c ** 0.5, dtype=torch.float64)
+            x = to_lorentz(x, c)
+        else:
+            x = poincare_points(rows, shape[-1], seed=seed + i, radius=0.9 / c ** 0.5, dtype=torch.float64)
+        params.append(torch.nn.Parameter(x.reshape(shape)))
+    return params
+
+
+def run(optimizer_cls, manifold, c, fused, steps=5, **kwargs):
+    params = make_params(manifold, c)
+    opt = optimizer_cls(params, manifold=manifold, c=c, fused=fused, **kwargs)
+    g = torch.Generator().manual_seed(1)
+    for _ in range(steps):
+        opt.zero_grad()
+        for p in params:
+            p.grad = torch.randn(p.shape, generator=g, dtype=p.dtype)
+        opt.step()
+    return params, opt
+
+
+@unittest.skipIf(_C is None or not hasattr(_C, "riemannian_adam_step_cpu"), "C++ extension not available")
+class TestFusedStep(unittest.TestCase):
+    """C++ 다중 텐서 스텝 == PyTorch 구현"""
+
+    def test_adam_matches_torch(self):
+        """Adam: 파라미터와 모멘트가 PyTorch 구현과 일치"""
+        for manifold in ("poincare", "lorentz", "euclidean"):
+            with self.subTest(manifold=manifold):
+                fused, fused_opt = run(RiemannianAdam, manifold, 0.7, None, lr=0.05, weight_decay=1e-3)
+                ref, ref_opt = run(RiemannianAdam, manifold, 0.7, False, lr=0.05, weight_decay=1e-3)
+                for a, b in zip(fused, ref):
+                    torch.testing.assert_close(a, b, rtol=1e-6, atol=1e-7)
+                    torch.testing.assert_close(fused_opt.state[a]["exp_avg"], ref_opt.state[b]["exp_avg"],
+                                               rtol=1e-6, atol=1e-7)
+
+    def test_sgd_matches_torch(self):
+        """SGD (+ 모멘텀): 파라미터와 모멘텀 버퍼가 PyTorch 구현과 일치"""
+        for manifold in ("poincare", "lorentz"):
+            for momentum in (0.0, 0.9):
+                with self.subTest(manifold=manifold, momentum=momentum):
+                    fused, _ = run(RiemannianSGD, manifold, 1.3, None, lr=0.02, momentum=momentum)
+                    ref, _ = run(RiemannianSGD, manifold, 1.3, False, lr=0.02, momentum=momentum)
+                    for a, b in zip(fused, ref):
+                        torch.testing.assert_close(a, b, rtol=1e-6, atol=1e-7)
+
+    def test_float32(self):
+        """float32 파라미터도 fused 커널로 갱신"""
+        params = [torch.nn.Parameter(poincare_points(64, 8, seed=0, radius=0.9, dtype=torch.float64).float())]
+        opt = RiemannianAdam(params, lr=0.1)
+        params[0].grad = torch.randn(64, 8)
+        opt.step()
+        self.assertTrue(torch.isfinite(params[0]).all())
+        self.assertTrue((params[0].norm(dim=1) < 1).all())
+
+
+class TestRiemannianOptim(unittest.TestCase):
+    """RiemannianAdam / RiemannianSGD 테스트"""
+
+    def test_stays_on_manifold(self):
+        """큰 스텝 뒤에도 포인카레 점은 공 안, 로렌츠 점은 쌍곡면 위"""
+        c = 0.5
+        for fused in (None, False):
+            params, _ = run(RiemannianAdam, "poincare", c, fused, steps=20, lr=2.0)
+            for p in params:
+                self.assertTrue((p.reshape(-1, p.size(-1)).norm(dim=1) < 1 / c ** 0.5).all())
+            params, _ = run(RiemannianSGD, "lorentz", c, fused, steps=20, lr=0.01, momentum=0.9)
+            for p in params:
+                rows = p.reshape(-1, p.size(-1))
+                torch.testing.assert_close(_minkowski(rows, rows).squeeze(1),
+                                           torch.full((rows.size(0),), 1 / c, dtype=rows.dtype), rtol=1e-6, atol=1e-6)
+
+    def test_first_adam_step_length(self):
+        """첫 Adam 스텝의 측지 이동 거리는 lr·√D (방향별 |m̂ / √v̂| = 1)"""
+        c, lr, dim = 0.8, 0.01, 4
+        x = poincare_points(10, dim, seed=0, radius=0.9, dtype=torch.float64)
+        p = torch.nn.Parameter(x.clone())
+        opt = RiemannianAdam([p], lr=lr, eps=0.0, c=c)
+        p.grad = torch.randn(10, dim, dtype=torch.float64)
+        opt.step()
+        torch.testing.assert_close(poincare_distance(x, p.detach(), c),
+                                   torch.full((10,), lr * dim ** 0.5, dtype=torch.float64), rtol=1e-6, atol=1e-9)
+
+    def test_transport_preserves_norm(self):
+        """평행 이동이 리만 노름을 보존"""
+        c = 0.6
+        x = poincare_points(20, 5, seed=0, radius=0.9, dtype=torch.float64)
+        y = poincare_points(20, 5, seed=1, radius=0.9, dtype=torch.float64)
+        v = torch.randn(20, 5, dtype=torch.float64)
+        lam = lambda p: 2 / (1 - c * p.pow(2).sum(-1))
+        moved = _transport(x, y, v, "poincare", c)
+        torch.testing.assert_close(lam(y) * moved.norm(dim=-1), lam(x) * v.norm(dim=-1))
+
+        lx, ly = to_lorentz(x, c), to_lorentz(y, c)
+        u = torch.randn(20, 6, dtype=torch.float64)
+        u = u - c * _minkowski(lx, u) * lx
+        moved = _transport(lx, ly, u, "lorentz", c)
+        torch.testing.assert_close(_minkowski(moved, moved), _minkowski(u, u))
+        torch.testing.assert_close(_minkowski(ly, moved), torch.zeros(20, 1, dtype=torch.float64), atol=1e-9, rtol=0)
+        # 지수 사상 결과는 쌍곡면 위
+        z = _expmap(lx, u, "lorentz", c)
+        torch.testing.assert_close(_minkowski(z, z), torch.full((20, 1), 1 / c, dtype=torch.float64))
+
+    def test_adam_converges(self):
+        """Σ (cosh(√c·d) - 1) 최소화로 목표 점에 수렴 (d = 0 에서도 매끄러운 손실)"""
+        c = 1.0
+        target = poincare_points(32, 3, seed=3, radius=0.95, dtype=torch.float64)
+        p = torch.nn.Parameter(torch.zeros(32, 3, dtype=torch.float64))
+        opt = RiemannianAdam([p], lr=0.05, c=c)
+        for _ in range(300):
+            opt.zero_grad()
+            cosh_distance_minus_one(p, target, c).sum().backward()
+            opt.step()
+        self.assertLess(poincare_distance(p.detach(), target, c).max().item(), 0.05)
+
+    def test_param_groups(self):
+        """그룹마다 다른 다양체 / 곡률"""
+        ball = torch.nn.Parameter(poincare_points(5, 3, seed=0, radius=0.9, dtype=torch.float64))
+        hyper = torch.nn.Parameter(to_lorentz(poincare_points(5, 3, seed=0, radius=0.6, dtype=torch.float64), 2.0))
+        opt = RiemannianSGD([{"params": [ball]}, {"params": [hyper], "manifold": "lorentz", "c": 2.0}], lr=0.1)
+        ball.grad = torch.randn_like(ball)
+        hyper.grad = torch.randn_like(hyper)
+        opt.step()
+        torch.testing.assert_close(_minkowski(hyper.detach(), hyper.detach()),
+                                   torch.full((5, 1), 0.5, dtype=torch.float64))
+        self.assertTrue((ball.norm(dim=1) < 1).all())
+
+    def test_invalid_arguments(self):
+        """잘못된 다양체 / 희소 그래디언트"""
+        p = torch.nn.Parameter(torch.zeros(4, 3))
+        with self.assertRaises(ValueError):
+            RiemannianAdam([p], manifold="sphere")
+        with self.assertRaises(ValueError):
+            RiemannianSGD([p], lr=0.1, c=-1.0)
+        opt = RiemannianAdam([p])
+        p.grad = torch.zeros(4, 3).to_sparse()
+        with self.assertRaises(RuntimeError):
+            opt.step()
+
+
+class TestSparseEmbedding(unittest.TestCase):
+    """HyperbolicEmbedding + 희소 리만 SGD / Adagrad 테스트"""
+
+    def setUp(self):
+        # 중복 행 포함 (coalesce 확인)
+        self.indices = torch.tensor([[3, 7, 3], [11, 7, 0]])
+
+    def sparse_and_dense(self, optimizer_cls, manifold, fused, **kwargs):
+        """같은 손실에 대해 희소 / 밀집 그래디언트로 두 번 갱신한 테이블"""
+        tables = []
+        for sparse in (True, False):
+            torch.manual_seed(0)
+            emb = HyperbolicEmbedding(20, 4, manifold=manifold, curvature=0.8, init_range=0.3, sparse=sparse).double()
+            opt = optimizer_cls([emb.param_group()], fused=fused, **kwargs)
+            for _ in range(3):
+                opt.zero_grad()
+                out = emb(self.indices)
+                (out * torch.arange(out.size(-1), dtype=out.dtype)).sum().backward()
+                self.assertEqual(emb.weight.grad.is_sparse, sparse)
+                opt.step()
+            tables.append(emb.weight.detach())
+        return tables
+
+    def test_sparse_matches_dense(self):
+        """희소 스텝 == 밀집 스텝 (0 그래디언트 행은 그대로이므로)"""
+        for fused in (None, False):
+            for manifold in ("poincare", "lorentz"):
+                for cls, kwargs in ((RiemannianSGD, {"lr": 0.05}), (RiemannianAdagrad, {"lr": 0.1})):
+                    with self.subTest(fused=fused, manifold=manifold, optimizer=cls.__name__):
+                        sparse, dense = self.sparse_and_dense(cls, manifold, fused, **kwargs)
+                        torch.testing.assert_close(sparse, dense)
+
+    def test_untouched_rows(self):
+        """건드리지 않은 행과 누적값은 그대로, 건드린 행은 다양체 위"""
+        for manifold in ("poincare", "lorentz"):
+            emb = HyperbolicEmbedding(50, 3, manifold=manifold, init_range=0.5).double()
+            before = emb.weight.detach().clone()
+            opt = RiemannianAdagrad([emb.param_group()], lr=0.5)
+            emb(self.indices).pow(2).sum().backward()
+            opt.step()
+            touched = self.indices.unique()
+            untouched = torch.ones(50, dtype=torch.bool)
+            untouched[touched] = False
+            self.assertTrue(torch.equal(emb.weight[untouched], before[untouched]))
+            self.assertFalse(torch.equal(emb.weight[touched], before[touched]))
+            acc = opt.state[emb.weight]["sum"]
+            self.assertEqual(acc.shape, (50,))
+            self.assertTrue((acc[untouched] == 0).all() and (acc[touched] > 0).all())
+            w = emb.weight.detach()[touched]
+            if manifold == "lorentz":
+                torch.testing.assert_close(_minkowski(w, w), torch.ones(len(touched), 1, dtype=w.dtype))
+            else:
+                self.assertTrue((w.norm(dim=1) < 1).all())
+
+    def test_sparse_unsupported(self):
+        """희소 그래디언트 + 모멘텀 / Adam 은 오류"""
+        for opt_fn in (lambda p: RiemannianSGD(p, lr=0.1, momentum=0.9), lambda p: RiemannianAdam(p)):
+            emb = HyperbolicEmbedding(10, 3)
+            opt = opt_fn(emb.parameters())
+            emb(torch.tensor([1, 2])).sum().backward()
+            with self.assertRaises(RuntimeError):
+                opt.step()
+
+    def test_embedding_training(self):
+        """이웃 쌍은 가깝게, 무작위 쌍은 멀게 (희소 Adagrad 로 학습)"""
+        torch.manual_seed(0)
+        emb = HyperbolicEmbedding(8, 2, init_range=0.1)
+        opt = RiemannianAdagrad([emb.param_group()], lr=0.3)
+        pairs = torch.tensor([[0, 1], [2, 3], [4, 5], [6, 7]])
+        negatives = torch.tensor([[0, 2], [1, 4], [3, 6], [5, 7], [0, 6], [2, 5]])
+        for _ in range(200):
+            opt.zero_grad()
+            pos = cosh_distance_minus_one(emb(pairs[:, 0]), emb(pairs[:, 1]), 1.0)
+            neg = poincare_distance(emb(negatives[:, 0]), emb(negatives[:, 1]), 1.0)
+            (pos.mean() + torch.relu(2.0 - neg).pow(2).mean()).backward()
+            opt.step()
+        with torch.no_grad():
+            pos = poincare_distance(emb(pairs[:, 0]), emb(pairs[:, 1]), 1.0)
+            neg = poincare_distance(emb(negatives[:, 0]), emb(negatives[:, 1]), 1.0)
+        self.assertLess(pos.max().item(), neg.min().item())
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,162 @@
+"""
+Poincaré 레이어 테스트
+poincare_ball 계열 함수
+"""
+
+import torch
+import unittest
+import reality_stone
+from helpers import poincare_points
+
+
+def composed_poincare_forward(u, v, c, t):
+    """Möbius 연산 4단계로 계산한 참조 구현"""
+    minus_u = reality_stone.mobius_scalar_cpu(u, c, -1.0)
+    delta = reality_stone.mobius_add_cpu(minus_u, v, c)
+    delta_t = reality_stone.mobius_scalar_cpu(delta, c, t)
+    return reality_stone.mobius_add_cpu(u, delta_t, c)
+
+
+def reference_mobius_scalar(x, c, r):
+    """mobius_scalar_cpu 와 같은 클램핑의 torch 구현 (autograd 용)"""
+    sqrtc = c ** 0.5
+    norm = x.norm(dim=1, keepdim=True).clamp_min(1e-6)
+    scn = (sqrtc * norm).clamp(1e-6, 1.0 - 1e-5)
+    return torch.tanh(r * torch.atanh(scn)) * x / (sqrtc * norm)
+
+
+def reference_mobius_add(u, v, c):
+    """mobius_add_cpu 와 같은 클램핑의 torch 구현 (autograd 용)"""
+    u2 = (u * u).sum(dim=1, keepdim=True)
+    v2 = (v * v).sum(dim=1, keepdim=True)
+    uv = (u * v).sum(dim=1, keepdim=True)
+    denom = (1 + 2 * c * uv + c * c * u2 * v2).clamp_min(1e-5)
+    return ((1 + 2 * c * uv + c * v2) * u + (1 - c * u2) * v) / denom
+
+
+def reference_poincare_forward(u, v, c, t):
+    """autograd 로 미분 가능한 Poincaré 측지선 참조 구현"""
+    delta = reference_mobius_add(reference_mobius_scalar(u, c, -1.0), v, c)
+    return reference_mobius_add(u, reference_mobius_scalar(delta, c, t), c)
+
+
+class TestPoincareForward(unittest.TestCase):
+    """융합 Poincaré forward 커널 테스트"""
+
+    def setUp(self):
+        torch.manual_seed(0)
+        self.dtype = torch.float32
+        self.c = 1.0
+        self.t = 0.7
+
+    def test_matches_composed_ops(self):
+        """융합 커널이 Möbius 연산 조합과 일치"""
+        for batch_size, dim in [(5, 3), (64, 512)]:
+            u = torch.randn(batch_size, dim, dtype=self.dtype)
+            v = torch.randn(batch_size, dim, dtype=self.dtype)
+            u = u / u.norm(dim=1, keepdim=True) * torch.rand(batch_size, 1) * 0.9
+            v = v / v.norm(dim=1, keepdim=True) * torch.rand(batch_size, 1) * 0.9
+
+            result = reality_stone.poincare_ball_forward_cpu(u, v, self.c, self.t)
+            expected = composed_poincare_forward(u, v, self.c, self.t)
+
+            self.assertEqual(result.shape, u.shape)
+            self.assertTrue(torch.allclose(result, expected, atol=1e-5, rtol=1e-4))
+
+    def test_small_curvature(self):
+        """작은 곡률에서도 조합 결과와 일치"""
+        u = torch.randn(8, 16, dtype=self.dtype) * 0.1
+        v = torch.randn(8, 16, dtype=self.dtype) * 0.1
+        c = 1e-3
+
+        result = reality_stone.poincare_ball_forward_cpu(u, v, c, self.t)
+        expected = composed_poincare_forward(u, v, c, self.t)
+        self.assertTrue(torch.allclose(result, expected, atol=1e-5, rtol=1e-4))
+
+    def test_endpoints(self):
+        """t=0 이면 u, t=1 이면 v"""
+        u = torch.randn(4, 8, dtype=self.dtype) * 0.1
+        v = torch.randn(4, 8, dtype=self.dtype) * 0.1
+
+        at_zero = reality_stone.poincare_ball_forward_cpu(u, v, self.c, 0.0)
+        at_one = reality_stone.poincare_ball_forward_cpu(u, v, self.c, 1.0)
+        self.assertTrue(torch.allclose(at_zero, u, atol=1e-5))
+        self.assertTrue(torch.allclose(at_one, v, atol=1e-4))
+
+    def test_non_contiguous_input(self):
+        """비연속 텐서 입력 처리"""
+        u = (torch.randn(16, 6, dtype=self.dtype) * 0.2).t()
+        v = (torch.randn(16, 6, dtype=self.dtype) * 0.2).t()
+
+        result = reality_stone.poincare_ball_forward_cpu(u, v, self.c, self.t)
+        expected = composed_poincare_forward(u.contiguous(), v.contiguous(), self.c, self.t)
+        self.assertTrue(torch.allclose(result, expected, atol=1e-5, rtol=1e-4))
+
+    def test_poincare_ball_layer(self):
+        """poincare_ball_layer 래퍼 테스트"""
+        u = torch.randn(3, 4, dtype=self.dtype) * 0.3
+        v = torch.randn(3, 4, dtype=self.dtype) * 0.3
+
+        result = reality_stone.poincare_ball_layer(u, v, self.c, self.t)
+        self.assertEqual(result.shape, u.shape)
+        self.assertTrue(torch.all(torch.isfinite(result)))
+
+
+class TestPoincareBackward(unittest.TestCase):
+    """Poincaré backward 커널 테스트"""
+
+    def setUp(self):
+        torch.manual_seed(0)
+        self.c = 1.0
+        self.t = 0.6
+
+    def test_matches_autograd(self):
+        """backward 가 autograd 의 전체 vector-Jacobian product 와 일치"""
+        for batch_size, dim in [(5, 3), (32, 37)]:
+            u = poincare_points(batch_size, dim)
+            v = poincare_points(batch_size, dim)
+            grad_out = torch.randn(batch_size, dim)
+
+            u64 = u.double().requires_grad_()
+            v64 = v.double().requires_grad_()
+            reference_poincare_forward(u64, v64, self.c, self.t).backward(grad_out.double())
+
+            grad_u, grad_v = reality_stone.poincare_ball_backward_cpu(grad_out, u, v, self.c, self.t)
+            self.assertTrue(torch.allclose(grad_u.double(), u64.grad, atol=1e-4, rtol=1e-3))
+            self.assertTrue(torch.allclose(grad_v.double(), v64.grad, atol=1e-4, rtol=1e-3))
+
+    def test_poincare_ball_layer_gradient(self):
+        """poincare_ball_layer 의 autograd 경로가 참조 구현과 일치"""
+        u = poincare_points(8, 16).requires_grad_()
+        v = poincare_points(8, 16).requires_grad_()
+        reality_stone.poincare_ball_layer(u, v, self.c, self.t).sum().backward()
+
+        u64 = u.detach().double().requires_grad_()
+        v64 = v.detach().double().requires_grad_()
+        reference_poincare_forward(u64, v64, self.c, self.t).sum().backward()
+        self.assertTrue(torch.allclose(u.grad.double(), u64.grad, atol=1e-4, rtol=1e-3))
+        self.assertTrue(torch.allclose(v.grad.double(), v64.grad, atol=1e-4, rtol=1e-3))
+
+    def test_poincare_ball_layer_broadcast(self):
+        """공유 v [1,D] 는 expand 한 것과 같은 결과, v 의 그래디언트는 행 방향 합"""
+        u = poincare_points(5, 3).requires_grad_()
+        v = poincare_points(1, 3).requires_grad_()
+        u_ref = u.detach().clone().requires_grad_()
+        v_ref = v.detach().clone().requires_grad_()
+        grad = torch.randn(5, 3)
+
+        result = reality_stone.poincare_ball_layer(u, v, self.c, self.t)
+        expected = reality_stone.poincare_ball_layer(u_ref, v_ref.expand_as(u_ref), self.c, self.t)
+        torch.testing.assert_close(result, expected)
+        result.backward(grad)
+        expected.backward(grad)
+        self.assertEqual(v.grad.shape, v.shape)
+        torch.testing.assert_close(u.grad, u_ref.grad)
+        torch.testing.assert_close(v.grad, v_ref.grad)
+
+        with self.assertRaises(RuntimeError):
+            reality_stone.poincare_ball_layer(u.detach(), poincare_points(4, 3), self.c, self.t)
+
+
+if __name__ == "__main__":
+    unittest.main(verbosity=2)
@@ -0,0 +1,125 @@
+"""
+저정밀도 (float16 / bfloat16) 와 float64 입력 테스트
+저장은 입력 타입, 노름/내적 누산은 fp32 (float64 는 fp64)
+"""
+
+import torch
+import unittest
+import reality_stone
+from helpers import poincare_points
+
+
+class TestReducedPrecision(unittest.TestCase):
+    """half / bfloat16 디스패치 테스트"""
+
+    def setUp(self):
+        torch.manual_seed(0)
+        self.c = 1.0
+        self.t = 0.6
+        self.dtypes = [torch.float16, torch.bfloat16]
+        self.u = poincare_points(32, 67)
+        self.v = poincare_points(32, 67)
+
+    def assert_close_to_fp32(self, result, expected, dtype, tol=3e-2):
+        self.assertEqual(result.dtype, dtype)
+        self.assertEqual(result.shape, expected.shape)
+        self.assertTrue(torch.allclose(result.float(), expected, atol=tol, rtol=tol))
+
+    def test_mobius_ops(self):
+        """mobius_add / mobius_scalar 가 입력 타입을 유지하고 fp32 결과와 일치"""
+        add_ref = reality_stone.mobius_add_cpu(self.u, self.v, self.c)
+        scalar_ref = reality_stone.mobius_scalar_cpu(self.u, self.c, 0.5)
+        for dtype in self.dtypes:
+            with self.subTest(dtype=dtype):
+                u, v = self.u.to(dtype), self.v.to(dtype)
+                self.assert_close_to_fp32(reality_stone.mobius_add_cpu(u, v, self.c), add_ref, dtype)
+                self.assert_close_to_fp32(reality_stone.mobius_scalar_cpu(u, self.c, 0.5), scalar_ref, dtype)
+
+    def test_conversions(self):
+        """모델 간 변환이 입력 타입을 유지"""
+        lorentz_ref = reality_stone.poincare_to_lorentz_cpu(self.u, self.c)
+        klein_ref = reality_stone.poincare_to_klein_cpu(self.u, self.c)
+        for dtype in self.dtypes:
+            with self.subTest(dtype=dtype):
+                u = self.u.to(dtype)
+                self.assert_close_to_fp32(reality_stone.poincare_to_lorentz_cpu(u, self.c), lorentz_ref, dtype)
+                self.assert_close_to_fp32(reality_stone.poincare_to_klein_cpu(u, self.c), klein_ref, dtype)
+                self.assert_close_to_fp32(
+                    reality_stone.klein_to_poincare_cpu(klein_ref.to(dtype), self.c), self.u, dtype)
+
+    def test_layer_forward_backward(self):
+        """레이어 forward / backward 가 저정밀도 입력을 그대로 처리"""
+        grad_out = torch.randn_like(self.u)
+        layers = [
+            (reality_stone.poincare_ball_forward_cpu, reality_stone.poincare_ball_backward_cpu),
+            (reality_stone.klein_forward_cpu, reality_stone.klein_backward_cpu),
+        ]
+        for forward, backward in layers:
+            out_ref = forward(self.u, self.v, self.c, self.t)
+            grad_u_ref, grad_v_ref = backward(grad_out, self.u, self.v, self.c, self.t)
+            for dtype in self.dtypes:
+                with self.subTest(layer=forward.__name__, dtype=dtype):
+                    u, v = self.u.to(dtype), self.v.to(dtype)
+                    self.assert_close_to_fp32(forward(u, v, self.c, self.t), out_ref, dtype)
+                    grad_u, grad_v = backward(grad_out.to(dtype), u, v, self.c, self.t)
+                    self.assert_close_to_fp32(grad_u, grad_u_ref, dtype, tol=1e-1)
+                    self.assert_close_to_fp32(grad_v, grad_v_ref, dtype, tol=1e-1)
+
+    def test_layer_autograd(self):
+        """poincare_ball_layer 의 그래디언트가 bfloat16 파라미터 타입과 일치"""
+        u = self.u.to(torch.bfloat16).requires_grad_()
+        v = self.v.to(torch.bfloat16).requires_grad_()
+        reality_stone.poincare_ball_layer(u, v, self.c, self.t).sum().backward()
+        self.assertEqual(u.grad.dtype, torch.bfloat16)
+        self.assertTrue(torch.all(torch.isfinite(u.grad.float())))
+
+
+class TestDoublePrecision(unittest.TestCase):
+    """float64 디스패치 테스트 (fp64 누산)"""
+
+    def setUp(self):
+        torch.manual_seed(0)
+        self.c = 1.0
+        self.u = poincare_points(16, 67).double()
+        self.v = poincare_points(16, 67).double()
+
+    def test_mobius_add_exact(self):
+        """mobius_add 가 float64 를 유지하고 fp64 기준식과 반올림 오차 수준으로 일치"""
+        u, v, c = self.u, self.v, self.c
+        uv = (u * v).sum(1, keepdim=True)
+        u2 = (u * u).sum(1, keepdim=True)
+        v2 = (v * v).sum(1, keepdim=True)
+        expected = ((1 + 2 * c * uv + c * v2) * u + (1 - c * u2) * v) / (1 + 2 * c * uv + c * c * u2 * v2)
+        result = reality_stone.mobius_add_cpu(u, v, c)
+        self.assertEqual(result.dtype, torch.float64)
+        torch.testing.assert_close(result, expected, atol=1e-12, rtol=1e-12)
+
+    def test_kernels_keep_dtype(self):
+        """행 커널이 float64 입력을 float64 로 돌려주고 fp32 결과와 일치"""
+        u, v, c = self.u, self.v, self.c
+        cases = [
+            (reality_stone.mobius_scalar_cpu, (u, c, 0.5)),
+            (reality_stone.poincare_to_lorentz_cpu, (u, c)),
+            (reality_stone.poincare_to_klein_cpu, (u, c)),
+            (reality_stone.klein_add_cpu, (u, v, c)),
+            (reality_stone.klein_distance_cpu, (u, v, c)),
+            (reality_stone.poincare_ball_forward_cpu, (u, v, c, 0.3)),
+            (reality_stone.klein_forward_cpu, (u, v, c, 0.3)),
+        ]
+        for fn, args in cases:
+            with self.subTest(op=fn.__name__):
+                result = fn(*args)
+                expected = fn(*[a.float() if torch.is_tensor(a) else a for a in args])
+                self.assertEqual(result.dtype, torch.float64)
+                torch.testing.assert_close(result.float(), expected, atol=1e-4, rtol=1e-4)
+
+    def test_layer_gradcheck(self):
+        """poincare_ball_layer 의 forward / 전용 backward 커널이 float64 수치 미분과 일치"""
+        u = self.u[:4, :5].clone().requires_grad_()
+        v = self.v[:4, :5].clone().requires_grad_()
+        self.assertTrue(torch.autograd.gradcheck(
+            lambda a, b: reality_stone.poincare_ball_layer(a, b, self.c, 0.3), (u, v)))
+
+
+if __name__ == "__main__":
+    unittest.main(verbosity=2)
@@ -0,0 +1,102 @@
+"""
+구면 조화 함수 테스트
+세 항 점화로 만든 전체 (l, m) 실수 구면 조화 함수와 hyperbolic_fft
+"""
+
+import math
+import numpy as np
+import torch
+import unittest
+import reality_stone
+import reality_stone.advanced
+
+
+def random_angles(batch_size, dtype=torch.float64):
+    """θ ∈ [0, π], φ ∈ [-π, π]"""
+    return torch.stack([torch.rand(batch_size, dtype=dtype) * math.pi,
+                        (torch.rand(batch_size, dtype=dtype) * 2 - 1) * math.pi], dim=1)
+
+
+class TestSphericalHarmonics(unittest.TestCase):
+    """spherical_harmonics 테스트"""
+
+    def setUp(self):
+        torch.manual_seed(0)
+        self.theta_phi = random_angles(64)
+
+    def test_closed_forms(self):
+        """낮은 차수는 닫힌 형태와 같음 (열 번호 l² + l + m)"""
+        result = reality_stone.spherical_harmonics(self.theta_phi, 2)
+        self.assertEqual(result.shape, (64, 9))
+        theta, phi = self.theta_phi[:, 0], self.theta_phi[:, 1]
+        expected = {
+            0: torch.full_like(theta, 0.5 / math.sqrt(math.pi)),
+            2: math.sqrt(3 / (4 * math.pi)) * torch.cos(theta),
+            3: -math.sqrt(3 / (4 * math.pi)) * torch.sin(theta) * torch.cos(phi),
+            1: -math.sqrt(3 / (4 * math.pi)) * torch.sin(theta) * torch.sin(phi),
+            6: math.sqrt(5 / (16 * math.pi)) * (3 * torch.cos(theta) ** 2 - 1),
+        }
+        for idx, value in expected.items():
+            with self.subTest(idx=idx):
+                self.assertTrue(torch.allclose(result[:, idx], value, atol=1e-12))
+
+    def test_orthonormal(self):
+        """가우스-르장드르 구적으로 구한 그람 행렬이 단위 행렬"""
+        l_max = 8
+        nodes, weights = np.polynomial.legendre.leggauss(l_max + 1)
+        num_phi = 2 * l_max + 2
+        theta = torch.from_numpy(np.arccos(nodes)).repeat_interleave(num_phi)
+        phi = torch.arange(num_phi, dtype=torch.float64).repeat(l_max + 1) * (2 * math.pi / num_phi)
+        quad = torch.from_numpy(weights).repeat_interleave(num_phi) * (2 * math.pi / num_phi)
+        harmonics = reality_stone.spherical_harmonics(torch.stack([theta, phi], dim=1), l_max)
+        gram = harmonics.t() @ (quad[:, None] * harmonics)
+        self.assertTrue(torch.allclose(gram, torch.eye((l_max + 1) ** 2, dtype=torch.float64), atol=1e-10))
+
+    def test_high_degree(self):
+        """l_max = 32 에서도 유한하고 (계승 넘침 없음) 값이 유계"""
+        result = reality_stone.spherical_harmonics(random_angles(1000, torch.float32), 32)
+        self.assertEqual(result.shape, (1000, 33 * 33))
+        self.assertTrue(torch.all(torch.isfinite(result)))
+        # |Y_l^m| <= sqrt((2l+1)/(2π))
+        self.assertLess(result.abs().max().item(), math.sqrt(65 / (2 * math.pi)) + 1e-3)
+
+    def test_autograd_path(self):
+        """미분 가능한 경로가 행 커널과 같은 값"""
+        theta_phi = self.theta_phi.clone().requires_grad_()
+        result = reality_stone.spherical_harmonics(theta_phi, 6)
+        self.assertTrue(torch.allclose(result, reality_stone.spherical_harmonics(self.theta_phi, 6), atol=1e-12))
+        result.sum().backward()
+        self.assertTrue(torch.all(torch.isfinite(theta_phi.grad)))
+
+    def test_torch_fallback(self):
+        """PyTorch fallback 이 C++ 결과와 같고 선행 배치 차원을 유지"""
+        theta_phi = self.theta_phi.reshape(4, 16, 2)
+        for l_max in (0, 1, 8, 32):
+            with self.subTest(l_max=l_max):
+                result = reality_stone.advanced._spherical_harmonics_torch(theta_phi, l_max)
+                self.assertEqual(result.shape, (4, 16, (l_max + 1) ** 2))
+                expected = reality_stone.spherical_harmonics(self.theta_phi, l_max).reshape(4, 16, -1)
+                self.assertTrue(torch.allclose(result, expected, atol=1e-10))
+        self.assertTrue(torch.allclose(reality_stone.advanced.spherical_harmonics(theta_phi, 4),
+                                       reality_stone.advanced._spherical_harmonics_torch(theta_phi, 4), atol=1e-10))
+
+
+class TestHyperbolicFFT(unittest.TestCase):
+    """hyperbolic_fft 테스트"""
+
+    def test_coefficients(self):
+        """계수는 방향의 구면 조화 함수 × tanh(√c·|x|)"""
+        torch.manual_seed(0)
+        x = torch.randn(32, 3, dtype=torch.float64) * 0.3
+        c = 0.5
+        coeffs = reality_stone.hyperbolic_fft(x, c, max_l=32)
+        self.assertEqual(coeffs.shape, (32, 33 * 33))
+        r = x.norm(dim=1, keepdim=True)
+        theta = torch.atan2(x[:, :2].norm(dim=1), x[:, 2])
+        phi = torch.atan2(x[:, 1], x[:, 0])
+        expected = reality_stone.spherical_harmonics(torch.stack([theta, phi], dim=1), 32) * torch.tanh(math.sqrt(c) * r)
+        self.assertTrue(torch.allclose(coeffs, expected, atol=1e-12))
+
+
+if __name__ == "__main__":
+    unittest.main(verbosity=2)